@@ -15,6 +15,7 @@ from google.protobuf.wrappers_pb2 import StringValue
 
 from bosdyn.api.spot import (choreography_sequence_pb2, choreography_service_pb2,
                              choreography_service_pb2_grpc)
+from bosdyn.client import data_chunk
 from bosdyn.client.common import (BaseClient, common_header_errors, common_lease_errors,
                                   error_factory, error_pair, handle_common_header_errors,
                                   handle_lease_use_result_errors, handle_unset_status_error)
@@ -1127,19 +1128,18 @@ def _get_streamed_choreography_state_log(response):
         A tuple containing the response status (choreography_sequence_pb2.DownloadRobotStateLogResponse.Status) and
         the choreography_sequence_pb2.ChoreographyStateLog constructed from the streaming response message.
     """
-    data = ''
-    num_chunks = 0
     initial_status = None
-    for resp in response:
-        if num_chunks == 0:
-            initial_status = resp.status
-            data = resp.chunk.data
-        else:
-            data += resp.chunk.data
-        num_chunks += 1
+
+    def chunks():
+        # Yield the chunks as they arrive so each can be freed once it has been assembled.
+        nonlocal initial_status
+        for resp in response:
+            if initial_status is None:
+                initial_status = resp.status
+            yield resp.chunk
+
     choreography_log = choreography_sequence_pb2.ChoreographyStateLog()
-    if (num_chunks > 0):
-        choreography_log.ParseFromString(data)
+    data_chunk.parse_from_chunks(chunks(), choreography_log)
     return (initial_status, choreography_log)
 
 
@@ -7,6 +7,7 @@
 import logging
 
 import grpc
+import grpc.aio
 
 from .exceptions import (ClientCancelledOperationError, InvalidClientCertificateError,
                          NonexistentAuthorityError, NotFoundError, PermissionDeniedError,
@@ -82,6 +83,29 @@ def create_secure_channel(address, port, creds, authority, options=[]):
     return grpc.secure_channel(socket, creds, complete_options)
 
 
+def create_secure_aio_channel(address, port, creds, authority, options=[]):
+    """Create a secure grpc.aio channel to given host:port.
+
+    The channel is bound to the asyncio event loop it is created from, and clients using it
+    return awaitables from their RPC methods.
+
+    Args:
+        address: Connection host address.
+        port: Connection port.
+        creds: A ChannelCredentials instance.
+        authority: Authority option for the channel.
+        options: A list of additional parameters for the GRPC channel.
+
+    Returns:
+        A secure grpc.aio channel.
+    """
+
+    socket = '{}:{}'.format(address, port)
+    complete_options = [('grpc.ssl_target_name_override', authority)]
+    complete_options.extend(options)
+    return grpc.aio.secure_channel(socket, creds, complete_options)
+
+
 def create_insecure_channel(address, port, authority=None, options=[]):
     """Create an insecure channel to given host and port.
 
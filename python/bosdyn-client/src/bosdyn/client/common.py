@@ -5,7 +5,6 @@
 # Development Kit License (20191101-BDSDK-SL).
 
 """Contains elements common to all service clients."""
-import concurrent
 import copy
 import functools
 import logging
@@ -13,6 +12,7 @@ import socket
 import types
 
 import grpc
+import grpc.aio
 from deprecated.sphinx import deprecated
 
 from bosdyn.api.header_pb2 import CommonError
@@ -22,6 +22,8 @@ from .channel import TransportError, translate_exception
 from .data_chunk import chunk_message, parse_from_chunks
 from .exceptions import (CustomParamError, Error, InternalServerError, InvalidRequestError,
                          LeaseUseError, LicenseError, ResponseError, UnsetStatusError)
+from .pools import get_default_executor
+from .processors import are_read_only, get_mutated_fields
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -29,6 +31,28 @@ from bosdyn.api import license_pb2
 
 DEFAULT_RPC_TIMEOUT = 30  # seconds
 
+# Value for the copy_request argument of BaseClient calls. Rather than deep-copying the request,
+# the fields that the request processors declare in `mutated_fields` are saved, the processors
+# modify the request in place, and the saved fields are restored once the RPC has been sent.
+# The request must not be shared with other threads while the call is being made.
+COPY_REQUEST_ON_WRITE = 'copy_on_write'
+
+_AIO_STREAMING_REQUEST_TYPES = (grpc.aio.StreamUnaryMultiCallable,
+                                grpc.aio.StreamStreamMultiCallable)
+_AIO_STREAMING_RESPONSE_TYPES = (grpc.aio.UnaryStreamMultiCallable,
+                                 grpc.aio.StreamStreamMultiCallable)
+_AIO_TYPES = _AIO_STREAMING_REQUEST_TYPES + (grpc.aio.UnaryUnaryMultiCallable,
+                                             grpc.aio.UnaryStreamMultiCallable)
+
+
+def is_aio_rpc(rpc_method):
+    """Returns True if rpc_method is a stub method on a grpc.aio channel.
+
+    Calls to such methods through a BaseClient return an AioCallWrapper, which raises any error
+    only once awaited.
+    """
+    return isinstance(rpc_method, _AIO_TYPES)
+
 
 def common_header_errors(response):
     """Return an exception based on common response header. None if no error."""
@@ -310,6 +334,10 @@ def process_kwargs(func):
     return processor
 
 
+def _do_nothing():
+    pass
+
+
 class BaseClient(object):
     """Helper base class for all clients to Boston Dynamics services."""
 
@@ -377,8 +405,11 @@ class BaseClient(object):
 
     def update_response_iterator(self, response_iterator, logger, rpc_method, is_blocking):
         try:
+            copy_response = not are_read_only(self.response_processors)
             for response in response_iterator:
-                response = self._apply_response_processors(copy.deepcopy(response))
+                if copy_response:
+                    response = copy.deepcopy(response)
+                response = self._apply_response_processors(response)
                 if is_blocking:
                     logger.debug('blocking response: %s\n%s', rpc_method._method, response)
                 else:
@@ -401,15 +432,29 @@ class BaseClient(object):
         value_from_response and error_from_response should not raise their own exceptions!
         Additionally, value_from_response and error_from_response that are not common handlers
         must accept streaming responses if it is a grpc streaming response.
+
+        copy_request controls how the caller's request is protected from the request processors:
+        True copies it (skipped when all processors are read-only), False lets the processors
+        modify it in place, and COPY_REQUEST_ON_WRITE only saves and restores the fields the
+        processors modify. Streaming requests and grpc.aio channels treat COPY_REQUEST_ON_WRITE
+        like True. With COPY_REQUEST_ON_WRITE the caller's request is modified until the request
+        has been sent, so it must not be used by other threads during the call.
+
+        If the client's channel is a grpc.aio channel, an AioCallWrapper is returned instead of the
+        result. Awaiting it gives the value that this call would have returned.
         """
+        if isinstance(rpc_method, _AIO_TYPES):
+            return self._call_aio(rpc_method, request, value_from_response, error_from_response,
+                                  assemble_type, copy_request, **kwargs)
         logger = self._get_logger(rpc_method)
         if isinstance(rpc_method, grpc.StreamUnaryMultiCallable) or isinstance(
                 rpc_method, grpc.StreamStreamMultiCallable):
             # The incoming request is a streaming request.
             request = self.update_request_iterator(request, logger, rpc_method, is_blocking=True,
                                                    copy_request=copy_request)
+            restore_request = _do_nothing
         else:
-            request = self._apply_request_processors(request, copy_request=copy_request)
+            request, restore_request = self._prepare_request(request, copy_request)
             logger.debug('blocking request: %s\n%s', rpc_method._method, request)
 
         try:
@@ -419,6 +464,8 @@ class BaseClient(object):
             # Use the "raise from None" pattern to reset the exception's context, which produces
             # confusing stack traces.
             raise translate_exception(e) from None
+        finally:
+            restore_request()
 
         if isinstance(rpc_method, grpc.UnaryStreamMultiCallable) or isinstance(
                 rpc_method, grpc.StreamStreamMultiCallable):
@@ -478,12 +525,20 @@ class BaseClient(object):
         value_from_response and error_from_response should not raise their own exceptions!
 
         call_async does not accept streaming rpcs, see 'call_async_streaming'.
+        See 'call' for the meaning of copy_request, and for calls made on a grpc.aio channel.
         """
-        request = self._apply_request_processors(request, copy_request=copy_request)
+        if isinstance(rpc_method, _AIO_TYPES):
+            return self._call_aio(rpc_method, request, value_from_response, error_from_response,
+                                  None, copy_request, **kwargs)
+        request, restore_request = self._prepare_request(request, copy_request)
         logger = self._get_logger(rpc_method)
         logger.debug('async request: %s\n%s', rpc_method._method, request)
         timeout = kwargs.pop('timeout', DEFAULT_RPC_TIMEOUT)
-        response_future = rpc_method.future(request, timeout=timeout, **kwargs)
+        try:
+            # The request is serialized before future() returns.
+            response_future = rpc_method.future(request, timeout=timeout, **kwargs)
+        finally:
+            restore_request()
 
         def on_finish(fut):
             try:
@@ -510,20 +565,92 @@ class BaseClient(object):
         value_from_response and error_from_response should not raise their own exceptions.
 
         A version of 'call_async' for streaming rpcs. True async streaming calls are not supported by
-        python grpc. Instead, this call creates a thread that runs the synchronous 'call' function.
+        python grpc. Instead, this call runs the synchronous 'call' function on the client's executor,
+        which defaults to a pool shared by all clients.
+        On a grpc.aio channel no thread is needed, and an AioCallWrapper is returned as in 'call'.
         """
+        if isinstance(rpc_method, _AIO_TYPES):
+            return self._call_aio(rpc_method, request, value_from_response, error_from_response,
+                                  assemble_type, copy_request, **kwargs)
         request = self._apply_request_processors(request, copy_request=copy_request)
         if self.executor is None:
-            self.executor = concurrent.futures.ThreadPoolExecutor()
+            self.executor = get_default_executor()
 
         future = self.executor.submit(self.call, rpc_method, request, assemble_type=assemble_type,
                                       copy_request=copy_request, **kwargs)
         return FutureWrapper(future, value_from_response, error_from_response, is_streaming=True)
 
+    def _call_aio(self, rpc_method, request, value_from_response, error_from_response,
+                  assemble_type, copy_request, **kwargs):
+        """Start rpc_method on a grpc.aio channel and wrap the call for awaiting or iterating."""
+        logger = self._get_logger(rpc_method)
+        if isinstance(rpc_method, _AIO_STREAMING_REQUEST_TYPES):
+            request = self.update_request_iterator(request, logger, rpc_method, is_blocking=False,
+                                                   copy_request=copy_request)
+        else:
+            # grpc.aio serializes the request after the call is started, so the fields modified by
+            # the processors cannot be restored. Fall back to a full copy instead.
+            request = self._apply_request_processors(request, copy_request=bool(copy_request))
+            logger.debug('async request: %s\n%s', rpc_method._method, request)
+        timeout = kwargs.pop('timeout', DEFAULT_RPC_TIMEOUT)
+        call = rpc_method(request, timeout=timeout, **kwargs)
+        return AioCallWrapper(self, call, rpc_method, logger, value_from_response,
+                              error_from_response, assemble_type)
+
+    def _prepare_request(self, request, copy_request):
+        """Run the request processors on a unary request.
+
+        Returns:
+            The request to send, and a function to call once the request has been sent.
+        """
+        if copy_request == COPY_REQUEST_ON_WRITE and request is not None:
+            restore_request = self._save_mutated_fields(request)
+            if restore_request is not None:
+                try:
+                    return (self._apply_request_processors(request, copy_request=False),
+                            restore_request)
+                except:
+                    restore_request()
+                    raise
+        return self._apply_request_processors(request, copy_request=copy_request), _do_nothing
+
+    def _save_mutated_fields(self, request):
+        """Save the request fields that the request processors may modify.
+
+        Returns:
+            A function restoring the saved fields, or None if the processors do not declare
+            which fields they modify.
+        """
+        field_names = get_mutated_fields(self.request_processors)
+        descriptor = getattr(request, 'DESCRIPTOR', None)
+        if field_names is None or descriptor is None:
+            return None
+        fields = [
+            descriptor.fields_by_name[name]
+            for name in field_names
+            if name in descriptor.fields_by_name
+        ]
+        saved = type(request)()
+        for field in fields:
+            value = getattr(request, field.name)
+            if field.label == field.LABEL_REPEATED:
+                getattr(saved, field.name).extend(value)
+            elif field.message_type is None:
+                setattr(saved, field.name, value)
+            elif request.HasField(field.name):
+                getattr(saved, field.name).CopyFrom(value)
+
+        def restore():
+            for field in fields:
+                request.ClearField(field.name)
+            request.MergeFrom(saved)
+
+        return restore
+
     def _apply_request_processors(self, request, copy_request=True):
         if request is None:
             return
-        if copy_request:
+        if copy_request and not are_read_only(self.request_processors):
             request = copy.deepcopy(request)
         for proc in self.request_processors:
             proc.mutate(request)
@@ -607,6 +734,96 @@ class FutureWrapper():
         return translate_exception(error)
 
 
+class AioCallWrapper():
+    """Wraps a grpc.aio call made through a BaseClient.
+
+    Awaiting the wrapper returns what the blocking call would have returned, after running the
+    response processors and the error and value handlers. Calls with streaming responses can
+    instead be consumed with `async for`, which yields each processed response as it arrives and
+    raises as soon as error_from_response reports an error for one of them.
+    """
+
+    def __init__(self, client, call, rpc_method, logger, value_from_response, error_from_response,
+                 assemble_type=None):
+        self.call = call
+        self._client = client
+        self._method = getattr(rpc_method, '_method', None)
+        self._logger = logger
+        self._value_from_response = value_from_response
+        self._error_from_response = error_from_response
+        self._assemble_type = assemble_type
+        self._is_streaming = isinstance(rpc_method, _AIO_STREAMING_RESPONSE_TYPES)
+
+    def __repr__(self):
+        return self.call.__repr__()
+
+    def __await__(self):
+        return self._result().__await__()
+
+    def __aiter__(self):
+        if not self._is_streaming:
+            raise TypeError('Only calls with a streaming response can be iterated.')
+        return self._checked_responses()
+
+    def cancel(self):
+        return self.call.cancel()
+
+    def cancelled(self):
+        return self.call.cancelled()
+
+    def done(self):
+        return self.call.done()
+
+    async def _result(self):
+        if not self._is_streaming:
+            try:
+                response = await self.call
+            except TransportError as e:
+                raise translate_exception(e) from None
+            response = self._client._apply_response_processors(response)
+            self._logger.debug('async response: %s\n%s', self._method, response)
+            return self._client.handle_response(response, self._error_from_response,
+                                                self._value_from_response)
+
+        if self._assemble_type is not None:
+            # Assemble the data chunks into a message before passing to non-streaming handlers.
+            msg = self._assemble_type()
+            try:
+                chunks = [chunk async for chunk in self.call]
+            except TransportError as e:
+                raise translate_exception(e) from None
+            parse_from_chunks(chunks, msg)
+            msg = self._client._apply_response_processors(msg)
+            self._logger.debug('async response: %s\n%s', self._method, msg)
+            return self._client.handle_response(msg, self._error_from_response,
+                                                self._value_from_response)
+
+        responses = [response async for response in self._processed_responses()]
+        return self._client.handle_response_streaming(responses, self._error_from_response,
+                                                      self._value_from_response)
+
+    async def _processed_responses(self):
+        copy_response = not are_read_only(self._client.response_processors)
+        try:
+            async for response in self.call:
+                if copy_response:
+                    response = copy.deepcopy(response)
+                response = self._client._apply_response_processors(response)
+                self._logger.debug('async response: %s\n%s', self._method, response)
+                yield response
+        except TransportError as e:
+            raise translate_exception(e) from None
+
+    async def _checked_responses(self):
+        async for response in self._processed_responses():
+            if self._error_from_response is not None:
+                # Streaming error handlers take a list of responses.
+                exc = self._error_from_response([response])
+                if exc is not None:
+                    raise exc  # pylint: disable=raising-bad-type
+            yield response
+
+
 def get_self_ip(robot_hostname):
     """ Get the IP address of the ethernet or WiFi interface used to talk to the robot."""
     s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -7,15 +7,13 @@
 """Client implementation for data acquisition store service.
 """
 
-from os import fstat
 from pathlib import Path
 
 from bosdyn.api import data_acquisition_store_pb2 as data_acquisition_store
 from bosdyn.api import data_acquisition_store_service_pb2_grpc as data_acquisition_store_service
-from bosdyn.api import data_chunk_pb2 as data_chunk
 from bosdyn.client.channel import DEFAULT_HEADER_BUFFER_LENGTH, DEFAULT_MAX_MESSAGE_LENGTH
 from bosdyn.client.common import BaseClient, common_header_errors
-from bosdyn.client.data_chunk import split_serialized
+from bosdyn.client.data_chunk import chunk_file, chunk_serialized
 
 DEFAULT_CHUNK_SIZE_BYTES = int(DEFAULT_MAX_MESSAGE_LENGTH - DEFAULT_HEADER_BUFFER_LENGTH)
 
@@ -256,7 +254,7 @@ class DataAcquisitionStoreClient(BaseClient):
         """Store data using streaming, supports storing of large data that is too large for a single store_data rpc. Note: using this rpc means that the data must be loaded into memory.
 
         Args:
-            data (bytes) : Arbitrary data to store.
+            data (bytes) : Arbitrary data to store, or any object supporting the buffer protocol.
             data_id (bosdyn.api.DataIdentifier) : Data identifier to use for storing this data.
             file_extension (string) : File extension to use for writing the data to a file.
 
@@ -360,34 +358,25 @@ def _iterate_store_file(file, data_id, file_extension=None):
         Returns:
             StoreStreamRequests iterates over these requests.
         """
-    total_size = fstat(file.fileno()).st_size
-    while True:
-        chunk = file.read(DEFAULT_CHUNK_SIZE_BYTES)
-        if not chunk:
-            # No more data
-            break
-        data = data_chunk.DataChunk(data=chunk, total_size=total_size)
-        request = data_acquisition_store.StoreStreamRequest(chunk=data, data_id=data_id,
+    with file:
+        for chunk in chunk_file(file, DEFAULT_CHUNK_SIZE_BYTES):
+            yield data_acquisition_store.StoreStreamRequest(chunk=chunk, data_id=data_id,
                                                             file_extension=file_extension)
-        yield request
 
 
 def _iterate_data_chunks(data, data_id, file_extension=None):
     """Iterator over data and create multiple StoreDataRequest
 
         Args:
-            data (bytes) : Arbitrary data to store.
+            data (bytes) : Arbitrary data to store, or any object supporting the buffer protocol.
             data_id (bosdyn.api.DataIdentifier) : Data identifier to use for storing this data.
             file_extension (string) : File extension to use for writing the data to a file.
         Returns:
             StoreDataRequests iterates over these requests.
         """
-    total_size = len(data)
-    for chunk in split_serialized(data, DEFAULT_CHUNK_SIZE_BYTES):
-        chunk_data = data_chunk.DataChunk(data=chunk, total_size=total_size)
-        request = data_acquisition_store.StoreStreamRequest(chunk=chunk_data, data_id=data_id,
-                                                            file_extension=file_extension)
-        yield request
+    for chunk in chunk_serialized(data, DEFAULT_CHUNK_SIZE_BYTES):
+        yield data_acquisition_store.StoreStreamRequest(chunk=chunk, data_id=data_id,
+                                                        file_extension=file_extension)
 
 
 def _get_action_ids(response):
@@ -4,23 +4,40 @@
 # is subject to the terms and conditions of the Boston Dynamics Software
 # Development Kit License (20191101-BDSDK-SL).
 
+"""Split serialized data into DataChunks and assemble it back.
+
+Data to send may be any object supporting the buffer protocol (bytes, bytearray, memoryview, mmap).
+Chunks are cut from a memoryview of it, so the only copy made is of the chunk being sent, and files
+are streamed from a memory map rather than read whole. Received chunks are assembled into a single
+buffer preallocated from the DataChunk total_size.
+"""
+
+import mmap
+import os
+import stat
+
 from bosdyn.api import data_chunk_pb2
 
 
-def split_serialized(serialized: bytes, data_chunk_byte_size: int):
-    """Split a byte string into appropriately-sized chunks."""
-    start_index = 0
-    end_index = 0
-    total_size = len(serialized)
-    while end_index < total_size:
-        end_index = start_index + data_chunk_byte_size
-        yield serialized[start_index:min(end_index, total_size)]
-        start_index = end_index
+def split_serialized(serialized, data_chunk_byte_size: int):
+    """Split serialized data into appropriately-sized chunks.
 
+    Args:
+        serialized: Bytes, or any other object supporting the buffer protocol.
+        data_chunk_byte_size: Maximum size of each chunk.
 
-def chunk_serialized(serialized: bytes, data_chunk_byte_size: int):
-    """Yield DataChunks for the given bytes."""
-    total_bytes_size = len(serialized)
+    Returns:
+        Generator of bytes, one per chunk. Only the chunk yielded last is held in memory.
+    """
+    with memoryview(serialized) as view, view.cast('B') as data:
+        total_size = len(data)
+        for start_index in range(0, total_size, data_chunk_byte_size):
+            yield data[start_index:start_index + data_chunk_byte_size].tobytes()
+
+
+def chunk_serialized(serialized, data_chunk_byte_size: int):
+    """Yield DataChunks for the given bytes, or other object supporting the buffer protocol."""
+    total_bytes_size = memoryview(serialized).nbytes
     for data in split_serialized(serialized, data_chunk_byte_size):
         yield data_chunk_pb2.DataChunk(total_size=total_bytes_size, data=data)
 
@@ -34,9 +51,76 @@ def chunk_message(message, data_chunk_byte_size: int):
     return chunk_serialized(message.SerializeToString(), data_chunk_byte_size)
 
 
+def chunk_file(file, data_chunk_byte_size: int):
+    """Yield DataChunks for the rest of an open binary file, from its current position.
+
+    Regular files are memory-mapped, so only the chunk being sent is read into memory. Other files,
+    such as pipes, are read one chunk at a time and their chunks have no total_size.
+
+    Args:
+        file: File object opened for reading in binary mode.
+        data_chunk_byte_size: max size of each streamed message
+    """
+    start = file.tell()
+    file_stat = os.fstat(file.fileno())
+    if not stat.S_ISREG(file_stat.st_mode):
+        data = file.read(data_chunk_byte_size)
+        while data:
+            yield data_chunk_pb2.DataChunk(data=data)
+            data = file.read(data_chunk_byte_size)
+        return
+    total_size = file_stat.st_size
+    if start >= total_size:
+        return
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        with memoryview(mapped) as view:
+            for start_index in range(start, total_size, data_chunk_byte_size):
+                data = view[start_index:start_index + data_chunk_byte_size].tobytes()
+                yield data_chunk_pb2.DataChunk(total_size=total_size - start, data=data)
+    file.seek(total_size)
+
+
+# Bounds on the buffer preallocated from the total_size of received chunks, so that a corrupt
+# total_size does not allocate memory before the data arrives. Larger data grows the buffer.
+MAX_PREALLOCATION_BYTES = 512 * 1024 * 1024
+_MAX_PREALLOCATION_CHUNKS = 1024
+
+
+def assemble_chunks(iterable_chunks):
+    """Assemble data chunks into one buffer, preallocated from the total_size of the first chunk.
+
+    Chunks are copied into the buffer as they arrive, so the chunks do not need to be kept. The
+    buffer grows or shrinks if the chunks do not add up to total_size. The preallocation is
+    limited to MAX_PREALLOCATION_BYTES, and to 1024 times the size of the first chunk.
+
+    Returns:
+        bytearray holding the assembled data.
+    """
+    assembled = None
+    size = 0
+    for chunk in iterable_chunks:
+        if assembled is None:
+            assembled = bytearray(
+                min(chunk.total_size, MAX_PREALLOCATION_BYTES,
+                    len(chunk.data) * _MAX_PREALLOCATION_CHUNKS))
+        end = size + len(chunk.data)
+        assembled[size:end] = chunk.data
+        size = end
+    if assembled is None:
+        return bytearray()
+    del assembled[size:]
+    return assembled
+
+
 def parse_from_chunks(iterable_chunks, out_msg):
     """Parse out a message from chunks."""
-    return out_msg.ParseFromString(serialized_from_chunks(iterable_chunks))
+    with memoryview(assemble_chunks(iterable_chunks)) as view:
+        return out_msg.ParseFromString(view)
+
+
+def parse_from_messages(iterable_messages, out_msg):
+    """Parse out a message from messages that define a DataChunk chunk field."""
+    return parse_from_chunks((msg.chunk for msg in iterable_messages), out_msg)
 
 
 def serialized_from_messages(iterable_messages):
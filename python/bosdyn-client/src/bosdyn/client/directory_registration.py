@@ -88,13 +88,34 @@ class DirectoryRegistrationClient(BaseClient):
             liveness_timeout_secs=liveness_timeout_secs)
         return self._call_register_rpc(service_entry, host_ip, port, **kwargs)
 
-    def _call_register_rpc(self, service_entry, host_ip, port, **kwargs):
+    def register_async(
+            self,
+            name,
+            service_type,
+            authority,
+            host_ip,
+            port,
+            user_token_required=True,
+            liveness_timeout_secs=0,
+            **kwargs):
+        """Async version of register()."""
+        service_entry = directory_pb2.ServiceEntry(
+            name=name,
+            type=service_type,
+            authority=authority,
+            user_token_required=user_token_required,
+            liveness_timeout_secs=liveness_timeout_secs)
+        return self._call_register_rpc(service_entry, host_ip, port, call=self.call_async,
+                                       **kwargs)
+
+    def _call_register_rpc(self, service_entry, host_ip, port, call=None, **kwargs):
         """Helper function to register a service definition.
 
         Args:
           service_entry (directory_pb2.ServiceEntry): Service definition to register.
           host_ip: The ip address of the system that the service is being hosted on.
           port: The port number the service can be accessed through on the host system.
+          call: BaseClient method making the RPC. Defaults to the blocking self.call.
 
         Raises:
           RpcError: Problem communicating with the robot.
@@ -107,9 +128,9 @@ class DirectoryRegistrationClient(BaseClient):
         req = directory_registration_pb2.RegisterServiceRequest(service_entry=service_entry,
                                                                 endpoint=endpoint)
 
-        return self.call(self._stub.RegisterService, req,
-                         error_from_response=_directory_register_error, copy_request=False,
-                         **kwargs)
+        call = call or self.call
+        return call(self._stub.RegisterService, req,
+                    error_from_response=_directory_register_error, copy_request=False, **kwargs)
 
 
     def update(
@@ -303,10 +324,12 @@ class DirectoryRegistrationKeepAlive(object):
       rpc_interval_seconds: Interval at which to request service registrations.
       initial_retry_seconds: Initial number of seconds to wait before retrying a failed
           registration request. Defaults to 1 second.
+      scheduler: HeartbeatScheduler to send the registration requests from, as async RPCs.
+          Defaults to None, in which case this object runs its own thread.
     """
 
     def __init__(self, dir_reg_client, logger=None, rpc_timeout_seconds=None,
-                 rpc_interval_seconds=30, initial_retry_seconds=1):
+                 rpc_interval_seconds=30, initial_retry_seconds=1, scheduler=None):
         self.authority = None
         self.directory_name = None
         self.host = None
@@ -323,10 +346,15 @@ class DirectoryRegistrationKeepAlive(object):
         self._rpc_timeout = rpc_timeout_seconds
         self._reregister_period = rpc_interval_seconds
         self._initial_retry_seconds = initial_retry_seconds
+        self._retry_interval = initial_retry_seconds
 
-        # Configure the thread to do re-registration.
-        self._thread = threading.Thread(target=self._periodic_reregister)
-        self._thread.daemon = True
+        # Configure the thread or heartbeat to do re-registration.
+        self._scheduler = scheduler
+        self._heartbeat = None
+        self._thread = None
+        if scheduler is None:
+            self._thread = threading.Thread(target=self._periodic_reregister)
+            self._thread.daemon = True
 
     def __enter__(self):
         return self
@@ -404,8 +432,18 @@ class DirectoryRegistrationKeepAlive(object):
         self.user_token_required = user_token_required
         self.liveness_timeout_secs = liveness_timeout_secs
 
-        # This will raise an exception if the thread has already started.
-        self._thread.start()
+        if self._scheduler is None:
+            # This will raise an exception if the thread has already started.
+            self._thread.start()
+        else:
+            if self._heartbeat is not None:
+                raise RuntimeError('DirectoryRegistrationKeepAlive can only be started once')
+            self.logger.info('Starting directory registration loop for {}'.format(
+                self.directory_name))
+            self._heartbeat = self._scheduler.add(
+                'directory registration {}'.format(self.directory_name),
+                self._scheduled_reregister, self._reregister_period,
+                deadline_sec=self._rpc_timeout, first_delay_sec=self._reregister_period)
         return self
 
     def is_alive(self):
@@ -414,13 +452,19 @@ class DirectoryRegistrationKeepAlive(object):
         Returns:
           A bool stating if still alive
         """
+        if self._scheduler is not None:
+            return self._heartbeat is not None and self._heartbeat.is_active()
         return self._thread.is_alive()
 
     def shutdown(self):
         """Stop the background thread."""
         self.logger.info('Shutting down {} keep alive'.format(self.directory_name))
         self._end_reregister_signal.set()
-        self._thread.join()
+        if self._scheduler is None:
+            self._thread.join()
+        elif self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat.wait()
 
     def unregister(self):
         """Remove service from the directory.
@@ -438,7 +482,6 @@ class DirectoryRegistrationKeepAlive(object):
         Raises:
           RpcError: Problem communicating with the robot.
         """
-        retry_interval = self._initial_retry_seconds
         wait_time = self._reregister_period
 
         self.logger.info('Starting directory registration loop for {}'.format(self.directory_name))
@@ -455,38 +498,102 @@ class DirectoryRegistrationKeepAlive(object):
                     user_token_required=self.user_token_required,
                     liveness_timeout_secs=self.liveness_timeout_secs,
                     timeout=self._rpc_timeout)
-            except ServiceAlreadyExistsError:
-                # Ignore "already registered" errors -- we expect those.
-                # We do not allow anyone to change the directory parameters with an "update" call,
-                # because we assume that the lifespan of this thread matches the lifespan of the
-                # service being registered.
-                pass
-            except RetryableUnavailableError:
-                # Ignore transient availability errors and retry.
-                pass
-            except TimedOutError:
-                self.logger.warning('Timed out, timeout set to "{}"'.format(self._rpc_timeout))
-            except RpcError as exc:
-                self.logger.exception('Reregistration failed with RpcError')
-                if self.reregistration_error_callback is not None:
-                    try:
-                        action = self.reregistration_error_callback(exc)
-                    except Exception:  #pylint: disable=broad-except
-                        self.logger.exception('Exception thrown in the provided error callback')
-            except Exception:
-                # Log all other exceptions, but continue looping in hopes that it resolves itself
-                self.logger.exception('Caught general exception')
-
-            elapsed = now_sec() - exec_start
-            if action == ErrorCallbackResult.RETRY_IMMEDIATELY:
-                wait_time = 0.0
-            elif action == ErrorCallbackResult.ABORT:
+            except Exception as exc:  #pylint: disable=broad-except
+                action = self._reregister_failed(exc)
+
+            wait_time = self._next_wait_time(action, now_sec() - exec_start)
+            if wait_time is None:
                 break
-            elif action == ErrorCallbackResult.RETRY_WITH_EXPONENTIAL_BACK_OFF:
-                wait_time = retry_interval - elapsed
-                retry_interval = min(2.0 * retry_interval, self._reregister_period)
-            else:
-                # action doesn't match one of the enum values or is one of
-                # RESUME_NORMAL_OPERATION or DEFAULT_ACTION
-                retry_interval = self._initial_retry_seconds
-                wait_time = self._reregister_period - elapsed
+
+    def _reregister_failed(self, exc):
+        """Handle an exception raised by a reregistration request.
+
+        Must be called from the except block handling exc.
+
+        Returns:
+          The ErrorCallbackResult deciding when to try again.
+        """
+        action = ErrorCallbackResult.RESUME_NORMAL_OPERATION
+        if isinstance(exc, ServiceAlreadyExistsError):
+            # Ignore "already registered" errors -- we expect those.
+            # We do not allow anyone to change the directory parameters with an "update" call,
+            # because we assume that the lifespan of this thread matches the lifespan of the
+            # service being registered.
+            pass
+        elif isinstance(exc, RetryableUnavailableError):
+            # Ignore transient availability errors and retry.
+            pass
+        elif isinstance(exc, TimedOutError):
+            self.logger.warning('Timed out, timeout set to "{}"'.format(self._rpc_timeout))
+        elif isinstance(exc, RpcError):
+            self.logger.exception('Reregistration failed with RpcError')
+            if self.reregistration_error_callback is not None:
+                try:
+                    action = self.reregistration_error_callback(exc)
+                except Exception:  #pylint: disable=broad-except
+                    self.logger.exception('Exception thrown in the provided error callback')
+        else:
+            # Log all other exceptions, but continue looping in hopes that it resolves itself
+            self.logger.exception('Caught general exception')
+        return action
+
+    def _next_wait_time(self, action, elapsed):
+        """Get the time to wait before the next registration request.
+
+        Args:
+          action: The ErrorCallbackResult of the last request.
+          elapsed: Time in seconds the last request took.
+
+        Returns:
+          The time in seconds to wait, or None to stop reregistering.
+        """
+        if action == ErrorCallbackResult.RETRY_IMMEDIATELY:
+            return 0.0
+        elif action == ErrorCallbackResult.ABORT:
+            return None
+        elif action == ErrorCallbackResult.RETRY_WITH_EXPONENTIAL_BACK_OFF:
+            wait_time = self._retry_interval - elapsed
+            self._retry_interval = min(2.0 * self._retry_interval, self._reregister_period)
+            return wait_time
+        # action doesn't match one of the enum values or is one of
+        # RESUME_NORMAL_OPERATION or DEFAULT_ACTION
+        self._retry_interval = self._initial_retry_seconds
+        return self._reregister_period - elapsed
+
+    def _scheduled_reregister(self):
+        """Start one registration request from the HeartbeatScheduler's thread.
+
+        Returns:
+          The future of the RegisterService RPC, or None if no RPC was started.
+        """
+        if self._end_reregister_signal.is_set():
+            return None
+        exec_start = now_sec()
+        future = self.dir_reg_client.register_async(
+            self.directory_name,
+            self.service_type,
+            self.authority,
+            self.host,
+            self.port,
+            user_token_required=self.user_token_required,
+            liveness_timeout_secs=self.liveness_timeout_secs,
+            timeout=self._rpc_timeout)
+        future.add_done_callback(
+            lambda done_future: self._scheduled_reregister_done(done_future, exec_start))
+        return future
+
+    def _scheduled_reregister_done(self, future, exec_start):
+        action = ErrorCallbackResult.RESUME_NORMAL_OPERATION
+        try:
+            future.result()
+        except Exception as exc:  #pylint: disable=broad-except
+            action = self._reregister_failed(exc)
+
+        wait_time = self._next_wait_time(action, now_sec() - exec_start)
+        if wait_time is None:
+            self._heartbeat.cancel()
+        elif action in (ErrorCallbackResult.RETRY_IMMEDIATELY,
+                        ErrorCallbackResult.RETRY_WITH_EXPONENTIAL_BACK_OFF):
+            # Otherwise the scheduler already runs the next request one period after this one
+            # started.
+            self._heartbeat.run_after(max(wait_time, 0.0))
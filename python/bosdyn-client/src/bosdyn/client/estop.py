@@ -447,11 +447,14 @@ class EstopKeepAlive(object):
     check-ins. See the command line utility and the "Big Red Button" application for examples.
 
     You should not access any of the "private" members, or the wrapped endpoint.
+
+    If a HeartbeatScheduler is given as scheduler, the periodic check-ins are issued as async RPCs
+    from the scheduler's thread rather than from a thread of this object.
     """
 
     def __init__(self, endpoint, rpc_timeout_seconds=None, rpc_interval_seconds=None,
-                 keep_running_cb=None, max_status_queue_size=20):
-        """Kicks off periodic check-in on a thread."""
+                 keep_running_cb=None, max_status_queue_size=20, scheduler=None):
+        """Kicks off periodic check-in on a thread, or on the scheduler if one is given."""
 
         self._endpoint = endpoint
         self._lock = threading.Lock()
@@ -481,10 +484,18 @@ class EstopKeepAlive(object):
         except Exception as exc:
             self.logger.warning('Estop initial check-in exception:\n{}\n'.format(exc))
 
-        # Configure the thread to do check-ins, and begin checking in.
-        self._thread = threading.Thread(target=self._periodic_check_in)
-        self._thread.daemon = True
-        self._thread.start()
+        # Configure the thread or heartbeat to do check-ins, and begin checking in.
+        self._thread = None
+        self._heartbeat = None
+        if scheduler is None:
+            self._thread = threading.Thread(target=self._periodic_check_in)
+            self._thread.daemon = True
+            self._thread.start()
+        else:
+            self.logger.info('Starting estop check-in')
+            self._heartbeat = scheduler.add('estop check-in {}'.format(self._endpoint._name),
+                                            self._scheduled_check_in, self._check_in_period,
+                                            deadline_sec=self._rpc_timeout)
 
     def __enter__(self):
         return self
@@ -495,7 +506,10 @@ class EstopKeepAlive(object):
     def shutdown(self):
         self.logger.debug('Shutting down')
         self._end_periodic_check_in()
-        self._thread.join()
+        if self._heartbeat is not None:
+            self._heartbeat.wait()
+        else:
+            self._thread.join()
 
     @property
     def last_set_level(self):
@@ -534,6 +548,8 @@ class EstopKeepAlive(object):
         """Stop checking into the robot estop system."""
         self.logger.debug('Stopping check-in')
         self._end_check_in_signal.set()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
 
     def _error(self, msg, exception=None, disable=False):
         """Handle an error message; optionally disable the application.
@@ -559,7 +575,8 @@ class EstopKeepAlive(object):
 
         Note: this method is not thread safe because if called by multiple different threads it could
         create a race condition which will raise a FullQueue exception. The EstopKeepAlive only uses
-        this in a single background thread for the _periodic_check_in method.
+        this in a single background thread for the _periodic_check_in method, or from the completion
+        of one scheduled check-in at a time.
         """
         if self.status_queue.full():
             # Remove an element to clear out the status queue for the new element.
@@ -584,22 +601,10 @@ class EstopKeepAlive(object):
                 break
             try:
                 self._check_in()
-            except TimedOutError as exc:
-                self._error('RPC took longer than {:.2f} seconds'.format(self._rpc_timeout),
-                            exception=exc)
-            except RpcError as exc:
-                self._error(
-                    'Transport exception during check-in:\n{}\n'
-                    '    (resuming check-in)'.format(exc), exception=exc)
-            except EndpointUnknownError as exc:
-                # Disable ourself to show we cannot estop any longer.
-                self._error(str(exc), exception=exc, disable=True)
-
             # We really do want to catch anything.
             #pylint: disable=broad-except
             except Exception as exc:
-                self.logger.warning(('Generic exception during check-in:\n{}\n'
-                                     '    (resuming check-in)').format(exc))
+                self._check_in_failed(exc)
             else:
                 # No errors!
                 self._ok()
@@ -615,6 +620,57 @@ class EstopKeepAlive(object):
                 break
         self.logger.info('Estop check-in stopped')
 
+    def _check_in_failed(self, exc):
+        """Handle the exception of a failed periodic check-in."""
+        if isinstance(exc, TimedOutError):
+            self._error('RPC took longer than {:.2f} seconds'.format(self._rpc_timeout),
+                        exception=exc)
+        elif isinstance(exc, RpcError):
+            self._error(
+                'Transport exception during check-in:\n{}\n'
+                '    (resuming check-in)'.format(exc), exception=exc)
+        elif isinstance(exc, EndpointUnknownError):
+            # Disable ourself to show we cannot estop any longer.
+            self._error(str(exc), exception=exc, disable=True)
+        else:
+            self.logger.warning(('Generic exception during check-in:\n{}\n'
+                                 '    (resuming check-in)').format(exc))
+
+    def _scheduled_check_in(self):
+        """Start one check-in from the HeartbeatScheduler's thread.
+
+        Returns:
+            The future of the CheckIn RPC, or None if no RPC was started.
+        """
+        if self._end_check_in_signal.is_set() or not self._keep_running():
+            self._end_periodic_check_in()
+            self.logger.info('Estop check-in stopped')
+            return None
+        # Check-ins must not overlap, since each one answers the challenge of the previous one.
+        # If allow() or stop() is checking in right now, that check-in counts as this one.
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            future = self._endpoint.check_in_at_level_async(self._desired_stop_level,
+                                                            timeout=self._rpc_timeout)
+        except Exception as exc:  #pylint: disable=broad-except
+            self._lock.release()
+            self._check_in_failed(exc)
+            return None
+        # The endpoint's callbacks, which store the new challenge, run before this one.
+        future.add_done_callback(self._scheduled_check_in_done)
+        return future
+
+    def _scheduled_check_in_done(self, future):
+        self._lock.release()
+        try:
+            future.result()
+        #pylint: disable=broad-except
+        except Exception as exc:
+            self._check_in_failed(exc)
+        else:
+            self._ok()
+
     @property
     def endpoint(self):
         """Return the _endpoint. Should be used as read-only."""
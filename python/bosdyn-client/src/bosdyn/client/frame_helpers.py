@@ -117,6 +117,204 @@ def validate_frame_tree_snapshot(frame_tree_snapshot):
     return True
 
 
+class FrameTree(object):
+    """A FrameTreeSnapshot that is validated and indexed once, for repeated transform queries.
+
+    get_a_tform_b() re-validates the snapshot and walks it to the root on every call. A FrameTree
+    does that work once in its constructor, in time linear in the number of frames, and caches
+    the root_tform_frame transform of every frame on first use. Queries then only walk up to the
+    lowest common ancestor of the two frames.
+
+    A FrameTree can be passed in place of a snapshot to get_a_tform_b() and the functions that
+    use it, such as get_se2_a_tform_b() and express_se3_velocity_in_new_frame().
+
+    The snapshot is copied into the tree, so later changes to the snapshot are not reflected.
+
+    Raises:
+        ValidateFrameTreeError if the snapshot is not a well-formed tree, see
+        validate_frame_tree_snapshot().
+    """
+
+    def __init__(self, frame_tree_snapshot):
+        if not frame_tree_snapshot:
+            raise ValueError('No frame_tree_snapshot')
+        edges = frame_tree_snapshot.child_to_parent_edge_map
+        if not edges:
+            raise ValidateFrameTreeError("Empty edges in FrameTreeSnapshot")
+
+        self._parent = {}
+        self._parent_tform_child = {}
+        for frame_name, edge in edges.items():
+            if not frame_name:
+                raise ValidateFrameTreeError("Empty child frame name")
+            self._parent[frame_name] = edge.parent_frame_name
+            self._parent_tform_child[frame_name] = math_helpers.SE3Pose.from_proto(
+                edge.parent_tform_child)
+
+        # Walk up from every frame until reaching a frame with a known depth, so that each frame
+        # is visited once.
+        self._depth = {}
+        self._root_frame_name = None
+        for frame_name in self._parent:
+            path = []
+            on_path = set()
+            cur_frame_name = frame_name
+            while cur_frame_name not in self._depth:
+                if cur_frame_name in on_path:
+                    raise ValidateFrameTreeCycleError()
+                parent_frame_name = self._parent.get(cur_frame_name)
+                if parent_frame_name is None:
+                    raise ValidateFrameTreeUnknownFrameError()
+                if not parent_frame_name:
+                    # At the root of the tree
+                    if self._root_frame_name is not None:
+                        raise ValidateFrameTreeDisjointError()
+                    self._root_frame_name = cur_frame_name
+                    self._depth[cur_frame_name] = 0
+                    break
+                path.append(cur_frame_name)
+                on_path.add(cur_frame_name)
+                cur_frame_name = parent_frame_name
+            depth = self._depth[cur_frame_name]
+            for path_frame_name in reversed(path):
+                depth += 1
+                self._depth[path_frame_name] = depth
+
+        self._root_tform_frame = {self._root_frame_name: math_helpers.SE3Pose.from_identity()}
+        self._root_tform_frame_matrix = {}
+
+    def __contains__(self, frame_name):
+        return frame_name in self._parent
+
+    def __len__(self):
+        return len(self._parent)
+
+    @property
+    def root_frame_name(self):
+        """The name of the root frame of the tree."""
+        return self._root_frame_name
+
+    @property
+    def frame_names(self):
+        """List of all frame names in the tree."""
+        return list(self._parent)
+
+    def parent_frame_name(self, frame_name):
+        """The parent of frame_name, or an empty string for the root frame."""
+        return self._parent[frame_name]
+
+    def root_tform_frame(self, frame_name):
+        """Get the math_helpers.SE3Pose of frame_name relative to the root frame.
+
+        Returns:
+            math_helpers.SE3Pose, or None if frame_name is not in the tree.
+        """
+        if frame_name not in self._parent:
+            return None
+        return _copy_se3_pose(self._get_root_tform_frame(frame_name))
+
+    def root_tform_frame_matrix(self, frame_name):
+        """Get the cached 4x4 matrix of the transform from frame_name to the root frame.
+
+        The returned array is shared between calls and must not be modified.
+
+        Raises:
+            ValidateFrameTreeUnknownFrameError if frame_name is not in the tree.
+        """
+        matrix = self._root_tform_frame_matrix.get(frame_name)
+        if matrix is None:
+            matrix = self._get_root_tform_frame(self._check_frame(frame_name)).to_matrix()
+            matrix.flags.writeable = False
+            self._root_tform_frame_matrix[frame_name] = matrix
+        return matrix
+
+    def lowest_common_ancestor(self, frame_a, frame_b):
+        """Get the name of the deepest frame that is an ancestor of (or equal to) both frames.
+
+        Raises:
+            ValidateFrameTreeUnknownFrameError if either frame is not in the tree.
+        """
+        self._check_frame(frame_a)
+        self._check_frame(frame_b)
+        while self._depth[frame_a] > self._depth[frame_b]:
+            frame_a = self._parent[frame_a]
+        while self._depth[frame_b] > self._depth[frame_a]:
+            frame_b = self._parent[frame_b]
+        while frame_a != frame_b:
+            frame_a = self._parent[frame_a]
+            frame_b = self._parent[frame_b]
+        return frame_a
+
+    def a_tform_b(self, frame_a, frame_b):
+        """Get the SE(3) pose representing the transform between frame_a and frame_b.
+
+        Returns:
+            math_helpers.SE3Pose between frame_a and frame_b if they exist in the tree. None
+            otherwise.
+        """
+        if frame_a not in self._parent or frame_b not in self._parent:
+            return None
+        ancestor = self.lowest_common_ancestor(frame_a, frame_b)
+        ancestor_tform_b = self._ancestor_tform_frame(ancestor, frame_b)
+        if ancestor == frame_a:
+            return _copy_se3_pose(ancestor_tform_b)
+        return self._ancestor_tform_frame(ancestor, frame_a).inverse() * ancestor_tform_b
+
+    def a_tform_frames(self, frame_a, frame_names):
+        """Get the transforms from every frame in frame_names to frame_a at once.
+
+        Args:
+            frame_a (string)
+            frame_names (iterable of strings)
+
+        Returns:
+            math_helpers.SE3PoseArray where element i is frame_a_tform_frame_names[i].
+
+        Raises:
+            ValidateFrameTreeUnknownFrameError if any of the frames is not in the tree.
+        """
+        root_tform_frames = math_helpers.SE3PoseArray.from_poses(
+            self._get_root_tform_frame(self._check_frame(frame_name))
+            for frame_name in frame_names)
+        return self._get_root_tform_frame(self._check_frame(frame_a)).inverse() * root_tform_frames
+
+    def _check_frame(self, frame_name):
+        if frame_name not in self._parent:
+            raise ValidateFrameTreeUnknownFrameError(
+                'Frame "{}" is not in the frame tree.'.format(frame_name))
+        return frame_name
+
+    def _get_root_tform_frame(self, frame_name):
+        """Returns the cached root_tform_frame, computing it and its uncached ancestors."""
+        root_tform_frame = self._root_tform_frame.get(frame_name)
+        if root_tform_frame is not None:
+            return root_tform_frame
+        path = []
+        while root_tform_frame is None:
+            path.append(frame_name)
+            frame_name = self._parent[frame_name]
+            root_tform_frame = self._root_tform_frame.get(frame_name)
+        for path_frame_name in reversed(path):
+            root_tform_frame = root_tform_frame * self._parent_tform_child[path_frame_name]
+            self._root_tform_frame[path_frame_name] = root_tform_frame
+        return root_tform_frame
+
+    def _ancestor_tform_frame(self, ancestor, frame_name):
+        """Returns ancestor_tform_frame, for an ancestor of (or equal to) frame_name."""
+        if ancestor == self._root_frame_name:
+            return self._get_root_tform_frame(frame_name)
+        ret = math_helpers.SE3Pose.from_identity()
+        while frame_name != ancestor:
+            ret = self._parent_tform_child[frame_name] * ret
+            frame_name = self._parent[frame_name]
+        return ret
+
+
+def _copy_se3_pose(pose):
+    return math_helpers.SE3Pose(pose.x, pose.y, pose.z,
+                                math_helpers.Quat(pose.rot.w, pose.rot.x, pose.rot.y, pose.rot.z))
+
+
 def get_a_tform_b(frame_tree_snapshot, frame_a, frame_b, validate=True):
     """Get the SE(3) pose representing the transform between frame_a and frame_b.
 
@@ -124,14 +322,19 @@ def get_a_tform_b(frame_tree_snapshot, frame_a, frame_b, validate=True):
     frame_a's representation to frame_b's.
 
     Args:
-        frame_tree_snapshot (dict) dictionary representing the child_to_parent_edge_map
+        frame_tree_snapshot (dict) dictionary representing the child_to_parent_edge_map, or a
+            FrameTree, which should be preferred when querying the same snapshot repeatedly
         frame_a (string)
         frame_b (string)
-        validate (bool) if the FrameTreeSnapshot should be checked for a valid tree structure
+        validate (bool) if the FrameTreeSnapshot should be checked for a valid tree structure. A
+            FrameTree is always valid.
 
     Returns:
         math_helpers.SE3Pose between frame_a and frame_b if they exist in the tree. None otherwise.
     """
+    if isinstance(frame_tree_snapshot, FrameTree):
+        return frame_tree_snapshot.a_tform_b(frame_a, frame_b)
+
     if validate:
         validate_frame_tree_snapshot(frame_tree_snapshot)
 
@@ -154,7 +357,7 @@ def get_a_tform_b(frame_tree_snapshot, frame_a, frame_b, validate=True):
     inverse_edges = _list_parent_edges(frame_a)
     forward_edges = _list_parent_edges(frame_b)
 
-    # Possible optimization: Nearest common ancestor pruning.
+    # FrameTree prunes the edges above the nearest common ancestor.
 
     def _accumulate_transforms(parent_edges):
         ret = math_helpers.SE3Pose.from_identity()
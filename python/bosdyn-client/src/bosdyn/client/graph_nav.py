@@ -6,19 +6,20 @@
 
 """For clients to the graphnav service."""
 import collections
-import math
 import os
 import time
 
 from deprecated.sphinx import deprecated
 
-from bosdyn.api import data_chunk_pb2, lease_pb2
+from bosdyn.api import lease_pb2
 from bosdyn.api.graph_nav import graph_nav_pb2, graph_nav_service_pb2_grpc, map_pb2, nav_pb2
+from bosdyn.client import data_chunk
 from bosdyn.client.common import (BaseClient, common_header_errors, common_lease_errors,
                                   error_factory, error_pair, handle_common_header_errors,
                                   handle_lease_use_result_errors, handle_license_errors_if_present,
-                                  handle_unset_status_error)
+                                  handle_unset_status_error, is_aio_rpc)
 from bosdyn.client.exceptions import ResponseError, UnimplementedError
+from bosdyn.client.graph_nav_sync import GraphNavMapSync, MapSyncError
 from bosdyn.client.lease import add_lease_wallet_processors
 from bosdyn.util import now_sec
 
@@ -487,6 +488,8 @@ class GraphNavClient(BaseClient):
             replace_graph: If true, replaces the existing graph with the new one rather than adding to it.
         Returns:
             The response, which includes waypoint and edge id's sorted by whether it was cached.
+            On a grpc.aio channel, an awaitable that falls back from UploadGraphStreaming to
+            UploadGraph like the blocking call.
         Raises:
             RpcError: Problem communicating with the robot.
             UploadGraphError: Indicates a problem with the map provided.
@@ -495,6 +498,9 @@ class GraphNavClient(BaseClient):
             LeaseUseError: Error using provided lease.
             LicenseError: The robot's license is not valid.
         """
+        if is_aio_rpc(self._stub.UploadGraph):
+            return self._upload_graph_aio(lease, graph, generate_new_anchoring, replace_graph,
+                                          **kwargs)
         request = self._build_upload_graph_request(lease, graph, generate_new_anchoring,
                                                    replace_graph)
         # Use streaming to upload the graph, if applicable.
@@ -518,6 +524,29 @@ class GraphNavClient(BaseClient):
         return self.call(self._stub.UploadGraph, request, value_from_response=_get_response,
                          error_from_response=_upload_graph_error, copy_request=False, **kwargs)
 
+    async def _upload_graph_aio(self, lease, graph, generate_new_anchoring, replace_graph,
+                                **kwargs):
+        """upload_graph() on a grpc.aio channel, where errors are only raised once awaited."""
+        request = self._build_upload_graph_request(lease, graph, generate_new_anchoring,
+                                                   replace_graph)
+        if self._use_streaming_graph_upload:
+            self._apply_request_processors(request, copy_request=False)
+            serialized = request.SerializeToString()
+            try:
+                return await self.call(
+                    self._stub.UploadGraphStreaming,
+                    GraphNavClient._data_chunk_iterator_upload_graph(serialized,
+                                                                     self._data_chunk_size),
+                    value_from_response=_get_response, error_from_response=_upload_graph_error,
+                    **kwargs)
+            except UnimplementedError:
+                print('UploadGraphStreaming unimplemented. Old robot release?')
+                request = self._build_upload_graph_request(lease, graph, generate_new_anchoring,
+                                                           replace_graph)
+        return await self.call(self._stub.UploadGraph, request, value_from_response=_get_response,
+                               error_from_response=_upload_graph_error, copy_request=False,
+                               **kwargs)
+
     def upload_graph_async(self, lease=None, graph=None, generate_new_anchoring=False,
                            replace_graph=False, **kwargs):
         """Async version of upload_graph()."""
@@ -578,7 +607,8 @@ class GraphNavClient(BaseClient):
 
         Args:
             lease: Leases to show ownership of necessary resources. Will use the client's leases by default.
-            snapshots: UploadSnapshotsRequest.Snapshots protobuf that will be stream-uploaded to the robot.
+            snapshots: UploadSnapshotsRequest.Snapshots protobuf that will be stream-uploaded to the robot,
+                or its serialization as bytes, bytearray, memoryview or mmap.
         Returns:
             The status of the upload request.
         Raises:
@@ -586,7 +616,10 @@ class GraphNavClient(BaseClient):
             LeaseUseError: Error using provided leases.
         """
         lease = lease or lease_pb2.Lease()
-        serialized = snapshots.SerializeToString()
+        if hasattr(snapshots, 'SerializeToString'):
+            serialized = snapshots.SerializeToString()
+        else:
+            serialized = snapshots
         self.call(
             self._stub.UploadSnapshots,
             GraphNavClient._data_chunk_iterator_upload_snapshots(serialized, lease,
@@ -599,9 +632,13 @@ class GraphNavClient(BaseClient):
 
         Returns:
             The graph protobuf that represents the current map on the robot (with waypoints and edges).
+            On a grpc.aio channel, an awaitable that falls back from DownloadGraphStreaming to
+            DownloadGraph like the blocking call.
         Raises:
             RpcError: Problem communicating with the robot
         """
+        if is_aio_rpc(self._stub.DownloadGraph):
+            return self._download_graph_aio(**kwargs)
         request = self._build_download_graph_request()
         # Use streaming to download the graph, if applicable.
         if self._use_streaming_graph_upload:
@@ -617,6 +654,21 @@ class GraphNavClient(BaseClient):
         return self.call(self._stub.DownloadGraph, request, value_from_response=_get_graph,
                          error_from_response=common_header_errors, copy_request=False, **kwargs)
 
+    async def _download_graph_aio(self, **kwargs):
+        """download_graph() on a grpc.aio channel, where errors are only raised once awaited."""
+        request = self._build_download_graph_request()
+        if self._use_streaming_graph_upload:
+            try:
+                return await self.call(self._stub.DownloadGraphStreaming, request,
+                                       value_from_response=_get_streamed_download_graph,
+                                       error_from_response=_download_graph_stream_errors,
+                                       copy_request=False, **kwargs)
+            except UnimplementedError:
+                print('DownloadGraphStreaming unimplemented. Old robot release?')
+        return await self.call(self._stub.DownloadGraph, request, value_from_response=_get_graph,
+                               error_from_response=common_header_errors, copy_request=False,
+                               **kwargs)
+
     def download_graph_async(self, **kwargs):
         """Async version of download_graph()."""
         request = self._build_download_graph_request()
@@ -677,25 +729,29 @@ class GraphNavClient(BaseClient):
             f.write(data)
             f.close()
 
-    def write_graph_and_snapshots(self, directory):
-        """Download the graph and snapshots from robot to the specified directory."""
-        graph = self.download_graph()
-        graph_bytes = graph.SerializeToString()
-        self._write_bytes(directory, '/graph', graph_bytes)
-
-        for waypoint in graph.waypoints:
-            if len(waypoint.snapshot_id) == 0:
-                continue
-            waypoint_snapshot = self.download_waypoint_snapshot(waypoint.snapshot_id)
-            self._write_bytes(directory + '/waypoint_snapshots', '/' + waypoint.snapshot_id,
-                              waypoint_snapshot.SerializeToString())
-
-        for edge in graph.edges:
-            if len(edge.snapshot_id) == 0:
-                continue
-            edge_snapshot = self.download_edge_snapshot(edge.snapshot_id)
-            self._write_bytes(directory + '/edge_snapshots', '/' + edge.snapshot_id,
-                              edge_snapshot.SerializeToString())
+    def write_graph_and_snapshots(self, directory, max_workers=4, cache=None):
+        """Download the graph and snapshots from robot to the specified directory.
+
+        Snapshots are downloaded concurrently, and those already in the directory are not
+        downloaded again, so an interrupted download can be resumed. See GraphNavMapSync.
+
+        Args:
+            directory: Directory to write the map into.
+            max_workers: Maximum number of snapshots downloaded at the same time.
+            cache: Optional SnapshotCache to take snapshots from and add them to.
+        Returns:
+            MapSyncReport of the download.
+
+        Raises:
+            RpcError: Problem communicating with the robot. Unlike GraphNavMapSync, the error of
+                the first failed download is raised rather than a MapSyncError.
+        """
+        try:
+            return GraphNavMapSync(self, cache=cache, max_workers=max_workers).download(directory)
+        except MapSyncError as exc:
+            if exc.__cause__ is None:
+                raise
+            raise exc.__cause__ from None
 
     @staticmethod
     def _build_set_localization_request(
@@ -821,74 +877,42 @@ class GraphNavClient(BaseClient):
                                                 generate_new_anchoring=generate_new_anchoring,
                                                 replace_graph=replace_graph)
 
+    @staticmethod
+    def _data_chunk_iterator(serialized, data_chunk_byte_size, build_request):
+        """Converts serialized data into a series of requests built by build_request(chunk)."""
+        for chunk in data_chunk.chunk_serialized(serialized, data_chunk_byte_size):
+            yield build_request(chunk)
+
     @staticmethod
     def _data_chunk_iterator_upload_graph(serialized_upload_graph, data_chunk_byte_size):
         """Converts a serialized UploadGraphRequest into a series of UploadGraphStreamingRequests."""
-        total_bytes_size = len(serialized_upload_graph)
-        num_chunks = math.ceil(total_bytes_size / data_chunk_byte_size)
-        for i in range(num_chunks):
-            start_index = i * data_chunk_byte_size
-            end_index = (i + 1) * data_chunk_byte_size
-            chunk = data_chunk_pb2.DataChunk(total_size=total_bytes_size)
-            if (end_index > total_bytes_size):
-                chunk.data = serialized_upload_graph[start_index:total_bytes_size]
-            else:
-                chunk.data = serialized_upload_graph[start_index:end_index]
-            req = graph_nav_pb2.UploadGraphStreamingRequest(chunk=chunk)
-            yield req
+        return GraphNavClient._data_chunk_iterator(
+            serialized_upload_graph, data_chunk_byte_size,
+            lambda chunk: graph_nav_pb2.UploadGraphStreamingRequest(chunk=chunk))
 
     @staticmethod
     def _data_chunk_iterator_upload_waypoint_snapshot(serialized_waypoint_snapshot, lease,
                                                       data_chunk_byte_size):
-        total_bytes_size = len(serialized_waypoint_snapshot)
-        num_chunks = math.ceil(total_bytes_size / data_chunk_byte_size)
-        for i in range(num_chunks):
-            start_index = i * data_chunk_byte_size
-            end_index = (i + 1) * data_chunk_byte_size
-            chunk = data_chunk_pb2.DataChunk(total_size=total_bytes_size)
-            if (end_index > total_bytes_size):
-                chunk.data = serialized_waypoint_snapshot[start_index:total_bytes_size]
-            else:
-                chunk.data = serialized_waypoint_snapshot[start_index:end_index]
-            req = graph_nav_pb2.UploadWaypointSnapshotRequest(lease=lease, chunk=chunk)
-            yield req
+        return GraphNavClient._data_chunk_iterator(
+            serialized_waypoint_snapshot, data_chunk_byte_size,
+            lambda chunk: graph_nav_pb2.UploadWaypointSnapshotRequest(lease=lease, chunk=chunk))
 
     @staticmethod
     def _data_chunk_iterator_upload_edge_snapshot(serialized_edge_snapshot, lease,
                                                   data_chunk_byte_size):
-        total_bytes_size = len(serialized_edge_snapshot)
-        num_chunks = math.ceil(total_bytes_size / data_chunk_byte_size)
-        for i in range(num_chunks):
-            start_index = i * data_chunk_byte_size
-            end_index = (i + 1) * data_chunk_byte_size
-            chunk = data_chunk_pb2.DataChunk(total_size=total_bytes_size)
-            if (end_index > total_bytes_size):
-                chunk.data = serialized_edge_snapshot[start_index:total_bytes_size]
-            else:
-                chunk.data = serialized_edge_snapshot[start_index:end_index]
-            req = graph_nav_pb2.UploadEdgeSnapshotRequest(lease=lease, chunk=chunk)
-            yield req
+        return GraphNavClient._data_chunk_iterator(
+            serialized_edge_snapshot, data_chunk_byte_size,
+            lambda chunk: graph_nav_pb2.UploadEdgeSnapshotRequest(lease=lease, chunk=chunk))
 
     @staticmethod
     def _data_chunk_iterator_upload_snapshots(serialized_snapshots, lease, data_chunk_byte_size):
-        total_bytes_size = len(serialized_snapshots)
         # If the snapshots are empty, still send one empty request.
         # This is used to probe if the RPC is implemented.
-        if 0 == total_bytes_size:
-            req = graph_nav_pb2.UploadSnapshotsRequest(lease=lease)
-            yield req
-
-        num_chunks = math.ceil(total_bytes_size / data_chunk_byte_size)
-        for i in range(num_chunks):
-            start_index = i * data_chunk_byte_size
-            end_index = (i + 1) * data_chunk_byte_size
-            chunk = data_chunk_pb2.DataChunk(total_size=total_bytes_size)
-            if (end_index > total_bytes_size):
-                chunk.data = serialized_snapshots[start_index:total_bytes_size]
-            else:
-                chunk.data = serialized_snapshots[start_index:end_index]
-            req = graph_nav_pb2.UploadSnapshotsRequest(lease=lease, chunk=chunk)
-            yield req
+        if 0 == memoryview(serialized_snapshots).nbytes:
+            yield graph_nav_pb2.UploadSnapshotsRequest(lease=lease)
+        yield from GraphNavClient._data_chunk_iterator(
+            serialized_snapshots, data_chunk_byte_size,
+            lambda chunk: graph_nav_pb2.UploadSnapshotsRequest(lease=lease, chunk=chunk))
 
     @staticmethod
     def _build_download_graph_request():
@@ -1136,11 +1160,8 @@ def _get_graph(response):
 
 def _get_streamed_data(response, data_type):
     """Given a list of streamed responses, return an instance of the given data type that is parsed from those responses."""
-    data = bytes()
-    for resp in response:
-        data += resp.chunk.data
     proto_instance = data_type()
-    proto_instance.ParseFromString(data)
+    data_chunk.parse_from_messages(response, proto_instance)
     return proto_instance
 
 
@@ -0,0 +1,407 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Download and upload GraphNav maps, transferring the snapshots concurrently.
+
+Maps are stored in the directory layout of GraphNavClient.write_graph_and_snapshots():
+
+    <directory>/graph
+    <directory>/waypoint_snapshots/<snapshot id>
+    <directory>/edge_snapshots/<snapshot id>
+
+Every file is written under a temporary name and renamed once complete, and the graph is written
+last. After an interruption, every snapshot file present is whole, so downloading again only
+transfers the missing snapshots.
+"""
+
+import collections
+import concurrent.futures
+import hashlib
+import logging
+import os
+import threading
+import time
+
+from bosdyn.api.graph_nav import map_pb2
+from bosdyn.client.exceptions import Error, UnimplementedError
+
+_LOGGER = logging.getLogger(__name__)
+
+GRAPH_FILENAME = 'graph'
+WAYPOINT_SNAPSHOTS = 'waypoint_snapshots'
+EDGE_SNAPSHOTS = 'edge_snapshots'
+
+# Wire-format tags of the waypoint_snapshots and edge_snapshots fields of
+# UploadSnapshotsRequest.Snapshots, both length-delimited.
+_SNAPSHOTS_FIELD_TAGS = {WAYPOINT_SNAPSHOTS: b'\x0a', EDGE_SNAPSHOTS: b'\x12'}
+
+
+class MapSyncReport(
+        collections.namedtuple(
+            'MapSyncReport', ['transferred', 'skipped', 'cached', 'num_bytes', 'elapsed_sec'])):
+    """Summary of a map download or upload by GraphNavMapSync.
+
+    Attributes:
+        transferred: Number of snapshots sent or received over the network.
+        skipped: Number of snapshots already present at the destination.
+        cached: Number of snapshots taken from the SnapshotCache instead of the robot.
+        num_bytes: Number of snapshot bytes sent or received over the network.
+        elapsed_sec: Duration of the whole operation, in seconds.
+    """
+
+    __slots__ = ()
+
+    @property
+    def bytes_per_sec(self):
+        """Throughput of the snapshot transfers over the whole operation."""
+        return self.num_bytes / self.elapsed_sec if self.elapsed_sec > 0 else 0.0
+
+    def __str__(self):
+        return ('{} snapshots transferred ({:.1f} MB, {:.2f} MB/s), {} already present, '
+                '{} from cache, in {:.1f}s').format(self.transferred, self.num_bytes / 1e6,
+                                                    self.bytes_per_sec / 1e6, self.skipped,
+                                                    self.cached, self.elapsed_sec)
+
+
+class MapSyncError(Error):
+    """A snapshot transfer failed. Transfers which had completed are kept.
+
+    Attributes:
+        report: MapSyncReport of the snapshots transferred before the failure.
+    """
+
+    def __init__(self, message, report):
+        super(MapSyncError, self).__init__(message)
+        self.report = report
+
+
+def _write_atomic(path, data):
+    """Write data to path through a temporary file, so that path is either absent or whole."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = '{}.{}.{}.tmp'.format(path, os.getpid(), threading.get_ident())
+    with open(temp_path, 'wb') as temp_file:
+        temp_file.write(data)
+    os.replace(temp_path, path)
+
+
+def _read_bytes(path):
+    with open(path, 'rb') as infile:
+        return infile.read()
+
+
+def _encode_varint(value):
+    """Encode a non-negative integer as a protobuf varint."""
+    encoded = bytearray()
+    while value > 0x7f:
+        encoded.append((value & 0x7f) | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+class SnapshotCache(object):
+    """Content-addressed store of serialized snapshots, shared between map directories.
+
+    Snapshots are stored once per content, under their SHA-256 digest, and found by snapshot id:
+
+        <directory>/objects/<sha256 hex digest>
+        <directory>/waypoint_snapshots/<snapshot id>     holding the digest of the snapshot
+        <directory>/edge_snapshots/<snapshot id>         holding the digest of the snapshot
+
+    Snapshots read from the cache are checked against their digest; corrupt entries are removed.
+
+    Args:
+        directory (str): Root directory of the cache, created if needed.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _id_path(self, kind, snapshot_id):
+        return os.path.join(self.directory, kind, snapshot_id)
+
+    def _object_path(self, digest):
+        return os.path.join(self.directory, 'objects', digest)
+
+    def has(self, kind, snapshot_id):
+        """Returns True if the cache has an entry for the snapshot id, without checking it."""
+        return os.path.exists(self._id_path(kind, snapshot_id))
+
+    def get(self, kind, snapshot_id):
+        """Get a serialized snapshot.
+
+        Args:
+            kind (str): WAYPOINT_SNAPSHOTS or EDGE_SNAPSHOTS.
+            snapshot_id (str): Id of the snapshot.
+
+        Returns:
+            The serialized snapshot, or None if it is not in the cache or is corrupt.
+        """
+        try:
+            digest = _read_bytes(self._id_path(kind, snapshot_id)).decode('ascii')
+            data = _read_bytes(self._object_path(digest))
+        except (OSError, UnicodeDecodeError):
+            return None
+        if hashlib.sha256(data).hexdigest() != digest:
+            _LOGGER.warning('Removing corrupt cached %s %s', kind, snapshot_id)
+            for path in (self._id_path(kind, snapshot_id), self._object_path(digest)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            return None
+        return data
+
+    def put(self, kind, snapshot_id, data):
+        """Add a serialized snapshot.
+
+        Returns:
+            The SHA-256 hex digest of the snapshot.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        object_path = self._object_path(digest)
+        if not os.path.exists(object_path):
+            _write_atomic(object_path, data)
+        _write_atomic(self._id_path(kind, snapshot_id), digest.encode('ascii'))
+        return digest
+
+
+class GraphNavMapSync(object):
+    """Downloads and uploads GraphNav maps with a bounded number of concurrent snapshot transfers.
+
+    Downloads skip the snapshots already in the map directory, and take those in the cache from
+    the cache, so an interrupted download resumes where it stopped. Uploads only send the
+    snapshots which the robot reports as unknown after the graph upload, in batches through
+    UploadSnapshots, read straight from the files without parsing them.
+
+    Args:
+        graph_nav_client (GraphNavClient): Client for the robot's GraphNav service.
+        cache (SnapshotCache): Optional cache of snapshots, shared between maps.
+        max_workers (int): Maximum number of concurrent snapshot RPCs.
+        upload_batch_bytes (int): Approximate size of each UploadSnapshots batch.
+        logger (logging.Logger): Logger for progress and throughput reports.
+    """
+
+    def __init__(self, graph_nav_client, cache=None, max_workers=4,
+                 upload_batch_bytes=16 * 1024 * 1024, logger=None):
+        if max_workers < 1:
+            raise ValueError('max_workers must be at least 1, was {}'.format(max_workers))
+        self._client = graph_nav_client
+        self.cache = cache
+        self.max_workers = max_workers
+        self.upload_batch_bytes = upload_batch_bytes
+        self.logger = logger or _LOGGER
+
+    @staticmethod
+    def snapshot_ids(graph):
+        """Get the (kind, snapshot id) of each snapshot referenced by a graph, without repeats."""
+        ids = collections.OrderedDict()
+        for waypoint in graph.waypoints:
+            if waypoint.snapshot_id:
+                ids[(WAYPOINT_SNAPSHOTS, waypoint.snapshot_id)] = None
+        for edge in graph.edges:
+            if edge.snapshot_id:
+                ids[(EDGE_SNAPSHOTS, edge.snapshot_id)] = None
+        return list(ids)
+
+    def download(self, directory, graph=None):
+        """Download the robot's map into directory.
+
+        Args:
+            directory (str): Map directory, created if needed.
+            graph (map_pb2.Graph): Graph of the map, downloaded from the robot if not given.
+
+        Returns:
+            MapSyncReport of the download.
+
+        Raises:
+            RpcError: Problem communicating with the robot.
+            MapSyncError: A snapshot could not be downloaded. Running the download again resumes
+                          it.
+        """
+        start = time.monotonic()
+        if graph is None:
+            graph = self._client.download_graph()
+        skipped = cached = 0
+        pending = []
+        for kind, snapshot_id in self.snapshot_ids(graph):
+            path = os.path.join(directory, kind, snapshot_id)
+            if os.path.exists(path):
+                skipped += 1
+                continue
+            data = self.cache.get(kind, snapshot_id) if self.cache else None
+            if data is not None:
+                _write_atomic(path, data)
+                cached += 1
+                continue
+            pending.append((kind, snapshot_id, path))
+
+        transferred, num_bytes = self._run('download', pending, self._download_snapshot, start,
+                                           skipped, cached)
+        # The graph is written last: a map directory with a graph holds all its snapshots.
+        _write_atomic(os.path.join(directory, GRAPH_FILENAME), graph.SerializeToString())
+        report = MapSyncReport(transferred, skipped, cached, num_bytes, time.monotonic() - start)
+        self.logger.info('Downloaded map to %s: %s', directory, report)
+        return report
+
+    def upload(self, directory, lease=None, generate_new_anchoring=None, replace_graph=False):
+        """Upload the map in directory to the robot.
+
+        Args:
+            directory (str): Map directory, as written by download().
+            lease: Lease to show ownership of the GraphNav resources.
+            generate_new_anchoring (bool): Whether the robot should generate a new anchoring.
+                                           Defaults to True if the graph has no anchoring.
+            replace_graph (bool): Replace the robot's graph rather than adding to it.
+
+        Returns:
+            Tuple of the UploadGraphResponse and the MapSyncReport of the snapshot upload.
+
+        Raises:
+            RpcError: Problem communicating with the robot.
+            UploadGraphError: Indicates a problem with the map provided.
+            MapSyncError: Snapshots could not be uploaded. Uploading the map again only sends
+                          the snapshots the robot is still missing.
+        """
+        start = time.monotonic()
+        graph = map_pb2.Graph()
+        graph.ParseFromString(_read_bytes(os.path.join(directory, GRAPH_FILENAME)))
+        if generate_new_anchoring is None:
+            generate_new_anchoring = not len(graph.anchoring.anchors)
+        response = self._client.upload_graph(lease=lease, graph=graph,
+                                             generate_new_anchoring=generate_new_anchoring,
+                                             replace_graph=replace_graph)
+        skipped = len(response.loaded_waypoint_snapshot_ids) + len(
+            response.loaded_edge_snapshot_ids)
+        unknown = [(WAYPOINT_SNAPSHOTS, snapshot_id)
+                   for snapshot_id in response.unknown_waypoint_snapshot_ids]
+        unknown += [(EDGE_SNAPSHOTS, snapshot_id)
+                    for snapshot_id in response.unknown_edge_snapshot_ids]
+
+        transferred = num_bytes = 0
+        batches = self._upload_batches(directory, unknown)
+        if batches:
+            # The first batch shows whether the robot implements UploadSnapshots.
+            try:
+                transferred, num_bytes = self._upload_batch(*batches[0], lease)
+            except UnimplementedError:
+                self.logger.info(
+                    'UploadSnapshots unimplemented, uploading snapshots one at a time.')
+                jobs = [(kind, snapshot_id, os.path.join(directory, kind, snapshot_id))
+                        for kind, snapshot_id in unknown]
+                upload = lambda kind, snapshot_id, path: self._upload_snapshot(
+                    kind, snapshot_id, path, lease)
+            except Exception as exc:
+                report = MapSyncReport(0, skipped, 0, 0, time.monotonic() - start)
+                raise MapSyncError('Map upload failed: {}'.format(exc), report) from exc
+            else:
+                jobs = batches[1:]
+                upload = lambda batch: self._upload_batch(batch, lease)
+            transferred, num_bytes = self._run('upload', jobs, upload, start, skipped, 0,
+                                               transferred, num_bytes)
+        report = MapSyncReport(transferred, skipped, 0, num_bytes, time.monotonic() - start)
+        self.logger.info('Uploaded map from %s: %s', directory, report)
+        return response, report
+
+    def _run(self, operation, jobs, function, start, skipped, cached, transferred=0,
+             num_bytes=0):
+        """Run function(*job) for each job on a pool of max_workers threads.
+
+        Each call returns the number of snapshots and bytes it transferred. On the first failure,
+        jobs which have not started are cancelled and a MapSyncError is raised once the running
+        ones finish.
+
+        Returns:
+            Tuple of the total number of snapshots and bytes transferred, counting from the given
+            transferred and num_bytes.
+        """
+        first_error = None
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(function, *job) for job in jobs]
+            for future in concurrent.futures.as_completed(futures):
+                if future.cancelled():
+                    continue
+                try:
+                    count, size = future.result()
+                except Exception as exc:  # pylint: disable=broad-except
+                    if first_error is None:
+                        first_error = exc
+                        for other in futures:
+                            other.cancel()
+                    continue
+                transferred += count
+                num_bytes += size
+        if first_error is not None:
+            report = MapSyncReport(transferred, skipped, cached, num_bytes,
+                                   time.monotonic() - start)
+            raise MapSyncError('Map {} failed: {}'.format(operation, first_error),
+                               report) from first_error
+        return transferred, num_bytes
+
+    def _download_snapshot(self, kind, snapshot_id, path):
+        if kind == WAYPOINT_SNAPSHOTS:
+            snapshot = self._client.download_waypoint_snapshot(snapshot_id)
+        else:
+            snapshot = self._client.download_edge_snapshot(snapshot_id)
+        data = snapshot.SerializeToString()
+        _write_atomic(path, data)
+        if self.cache:
+            self.cache.put(kind, snapshot_id, data)
+        return 1, len(data)
+
+    def _upload_batches(self, directory, snapshot_ids):
+        """Group snapshots into batches of about upload_batch_bytes, by file size."""
+        batches = []
+        batch = []
+        batch_bytes = 0
+        for kind, snapshot_id in snapshot_ids:
+            path = os.path.join(directory, kind, snapshot_id)
+            size = os.path.getsize(path)
+            if batch and batch_bytes + size > self.upload_batch_bytes:
+                batches.append((batch,))
+                batch = []
+                batch_bytes = 0
+            batch.append((kind, path))
+            batch_bytes += size
+        if batch:
+            batches.append((batch,))
+        return batches
+
+    def _upload_batch(self, batch, lease):
+        """Upload a batch of snapshot files as one serialized UploadSnapshotsRequest.Snapshots."""
+        # A serialized message is the concatenation of its fields, so the snapshots are added as
+        # length-delimited fields without parsing them. The files are read straight into one
+        # buffer, which is chunked for the upload without further copies of the whole batch.
+        parts = []
+        for kind, path in batch:
+            size = os.path.getsize(path)
+            parts.append((_SNAPSHOTS_FIELD_TAGS[kind] + _encode_varint(size), path, size))
+        serialized = bytearray(sum(len(header) + size for header, _, size in parts))
+        num_bytes = 0
+        with memoryview(serialized) as view:
+            offset = 0
+            for header, path, size in parts:
+                view[offset:offset + len(header)] = header
+                offset += len(header)
+                with open(path, 'rb') as infile:
+                    if infile.readinto(view[offset:offset + size]) != size:
+                        raise IOError('{} changed size while being uploaded'.format(path))
+                offset += size
+                num_bytes += size
+            self._client.upload_snapshots(view, lease=lease)
+        return len(batch), num_bytes
+
+    def _upload_snapshot(self, kind, snapshot_id, path, lease):
+        data = _read_bytes(path)
+        if kind == WAYPOINT_SNAPSHOTS:
+            snapshot = map_pb2.WaypointSnapshot()
+            snapshot.ParseFromString(data)
+            self._client.upload_waypoint_snapshot(snapshot, lease=lease)
+        else:
+            snapshot = map_pb2.EdgeSnapshot()
+            snapshot.ParseFromString(data)
+            self._client.upload_edge_snapshot(snapshot, lease=lease)
+        return 1, len(data)
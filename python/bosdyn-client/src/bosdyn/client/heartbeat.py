@@ -0,0 +1,397 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""A single thread which runs the periodic check-ins of many keep-alives.
+
+Keep-alives like LeaseKeepAlive and EstopKeepAlive normally each run their own thread. Passing
+them a HeartbeatScheduler instead registers their check-ins as Heartbeats on the scheduler's one
+thread. A heartbeat's beat function starts an async RPC and returns its future, so a slow RPC
+does not delay the beats of other heartbeats.
+"""
+
+import bisect
+import collections
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+# Upper edges of the histogram buckets, in seconds. The last bucket has no upper edge.
+HISTOGRAM_BUCKET_EDGES_SEC = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0,
+                              5.0, 10.0)
+
+HeartbeatMetrics = collections.namedtuple(
+    'HeartbeatMetrics', ['name', 'beats', 'failures', 'missed_deadlines', 'jitter', 'latency'])
+HeartbeatMetrics.__doc__ = """Snapshot of a Heartbeat.
+
+    name: Name of the heartbeat.
+    beats: Number of beats started.
+    failures: Number of beats which raised, or whose future finished with an exception.
+    missed_deadlines: Number of beats which did not finish within the deadline of the heartbeat.
+    jitter: LatencyHistogram of how late each beat started after its scheduled time.
+    latency: LatencyHistogram of how long each beat took to finish.
+"""
+
+
+class LatencyHistogram(object):
+    """Histogram of durations in fixed buckets, see HISTOGRAM_BUCKET_EDGES_SEC."""
+
+    def __init__(self):
+        self.counts = [0] * (len(HISTOGRAM_BUCKET_EDGES_SEC) + 1)
+        self.count = 0
+        self.total_sec = 0.0
+        self.max_sec = 0.0
+
+    def add(self, duration_sec):
+        """Record one duration in seconds."""
+        self.counts[bisect.bisect_left(HISTOGRAM_BUCKET_EDGES_SEC, duration_sec)] += 1
+        self.count += 1
+        self.total_sec += duration_sec
+        self.max_sec = max(self.max_sec, duration_sec)
+
+    @property
+    def mean_sec(self):
+        """Mean of the recorded durations, or 0 if there are none."""
+        return self.total_sec / self.count if self.count else 0.0
+
+    def percentile(self, percent):
+        """Get an upper bound on the given percentile of the recorded durations.
+
+        Args:
+            percent (float): Percentile to get, from 0 to 100.
+
+        Returns:
+            The upper edge of the bucket holding the percentile, or the largest recorded duration
+            if the percentile is in the last bucket. 0 if nothing has been recorded.
+        """
+        if not self.count:
+            return 0.0
+        rank = percent / 100.0 * self.count
+        seen = 0
+        for edge, count in zip(HISTOGRAM_BUCKET_EDGES_SEC, self.counts):
+            seen += count
+            if seen >= rank and seen > 0:
+                return min(edge, self.max_sec)
+        return self.max_sec
+
+    def copy(self):
+        """Get a copy of this histogram."""
+        histogram = LatencyHistogram()
+        histogram.counts = list(self.counts)
+        histogram.count = self.count
+        histogram.total_sec = self.total_sec
+        histogram.max_sec = self.max_sec
+        return histogram
+
+    def __repr__(self):
+        return 'LatencyHistogram(count={}, mean={:.4f}s, p99<={:.4f}s, max={:.4f}s)'.format(
+            self.count, self.mean_sec, self.percentile(99), self.max_sec)
+
+
+class Heartbeat(object):
+    """A periodic task of a HeartbeatScheduler. Created by HeartbeatScheduler.add().
+
+    Attributes:
+        name (str): Name used in logs and metrics.
+        period_sec (float): Time between the scheduled starts of consecutive beats.
+        deadline_sec (float): Time a beat may take to finish before it counts as a missed deadline.
+    """
+
+    def __init__(self, scheduler, name, beat, period_sec, deadline_sec, on_missed_deadline):
+        self.name = name
+        self.period_sec = period_sec
+        self.deadline_sec = deadline_sec
+        self._scheduler = scheduler
+        self._beat = beat
+        self._on_missed_deadline = on_missed_deadline
+        # All the members below are protected by the scheduler's lock.
+        self._due = None
+        self._generation = 0
+        self._cancelled = False
+        self._outstanding = False
+        self._requested_due = None  # Due time requested by run_after() during a beat.
+        self._start = None
+        self._missed_current = False
+        self._beats = 0
+        self._failures = 0
+        self._missed_deadlines = 0
+        self._jitter = LatencyHistogram()
+        self._latency = LatencyHistogram()
+        self._done = threading.Event()
+
+    def run_after(self, delay_sec):
+        """Schedule the next beat delay_sec from now, instead of after the usual period.
+
+        If a beat is running, for example when this is called from the done callback of the
+        beat's future, the next beat starts when it finishes, if that is later.
+        """
+        self._scheduler._reschedule(self, self._scheduler.clock() + delay_sec)
+
+    def cancel(self):
+        """Stop running beats. A beat which is running is allowed to finish."""
+        self._scheduler._cancel(self)
+
+    def is_active(self):
+        """True until the heartbeat is cancelled and its last beat has finished."""
+        return not self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Wait until the heartbeat is cancelled and its last beat has finished.
+
+        Returns:
+            True if the heartbeat finished, False on timeout.
+        """
+        return self._done.wait(timeout)
+
+    def metrics(self):
+        """Get a HeartbeatMetrics snapshot of this heartbeat."""
+        with self._scheduler._lock:
+            return HeartbeatMetrics(self.name, self._beats, self._failures, self._missed_deadlines,
+                                    self._jitter.copy(), self._latency.copy())
+
+    def __repr__(self):
+        return 'Heartbeat({!r}, period_sec={})'.format(self.name, self.period_sec)
+
+
+class HeartbeatScheduler(object):
+    """Runs the beats of many Heartbeats on one thread.
+
+    A beat is a callable which takes no arguments. It may do its work immediately and return None,
+    or start it and return a future with an add_done_callback() method, such as the FutureWrapper
+    returned by the async methods of the clients. The beats of a heartbeat never overlap: if a
+    beat has not finished when the next one is due, the next one is skipped and the beat counts
+    as having missed its deadline.
+
+    Beats are scheduled at a fixed rate, so the time a beat takes does not delay the following
+    ones. Beats run on the scheduler thread and should return quickly; blocking work should be
+    done through an async call.
+
+    Args:
+        name (str): Name of the scheduler thread.
+        logger (logging.Logger): Logger for failed beats and missed deadlines.
+    """
+
+    def __init__(self, name='bosdyn-heartbeat', logger=None):
+        self.name = name
+        self.logger = logger or _LOGGER
+        self.clock = time.monotonic
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._queue = []  # heap of (due time, sequence number, generation, heartbeat)
+        self._sequence = itertools.count()
+        self._heartbeats = []
+        self._thread = None
+        self._shutdown = False
+
+    def add(self, name, beat, period_sec, deadline_sec=None, first_delay_sec=0.0,
+            on_missed_deadline=None):
+        """Start running beat() every period_sec.
+
+        Args:
+            name (str): Name of the heartbeat for logs and metrics.
+            beat (callable): Called on the scheduler thread with no arguments. Returns None, or a
+                             future for work which finishes later.
+            period_sec (float): Time between the scheduled starts of consecutive beats.
+            deadline_sec (float): Time a beat may take before it counts as a missed deadline.
+                                  Defaults to period_sec.
+            first_delay_sec (float): Delay before the first beat.
+            on_missed_deadline (callable): Called as on_missed_deadline(heartbeat, late_sec) when
+                                           a beat misses its deadline, in addition to a logged
+                                           warning.
+
+        Returns:
+            The Heartbeat, which can be used to cancel it or get its metrics.
+
+        Raises:
+            ValueError: period_sec is not positive.
+            RuntimeError: The scheduler has been shut down.
+        """
+        if period_sec <= 0:
+            raise ValueError('period_sec must be > 0, was {}'.format(period_sec))
+        heartbeat = Heartbeat(self, name, beat, period_sec,
+                              period_sec if deadline_sec is None else deadline_sec,
+                              on_missed_deadline)
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError('HeartbeatScheduler {} has been shut down'.format(self.name))
+            self._heartbeats.append(heartbeat)
+            self._push(heartbeat, self.clock() + first_delay_sec)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name)
+                self._thread.daemon = True
+                self._thread.start()
+        return heartbeat
+
+    def heartbeats(self):
+        """Get the heartbeats which are still active."""
+        with self._lock:
+            return list(self._heartbeats)
+
+    def metrics(self):
+        """Get a list of HeartbeatMetrics for the active heartbeats."""
+        return [heartbeat.metrics() for heartbeat in self.heartbeats()]
+
+    def shutdown(self, wait=True):
+        """Cancel all heartbeats and stop the scheduler thread."""
+        for heartbeat in self.heartbeats():
+            heartbeat.cancel()
+        with self._lock:
+            self._shutdown = True
+            self._wakeup.notify()
+            thread = self._thread
+        if wait and thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _push(self, heartbeat, due):
+        """Schedule the next beat of heartbeat. Call with the lock held."""
+        heartbeat._generation += 1
+        heartbeat._due = due
+        heapq.heappush(self._queue, (due, next(self._sequence), heartbeat._generation, heartbeat))
+        if self._queue[0][3] is heartbeat:
+            self._wakeup.notify()
+
+    def _reschedule(self, heartbeat, due):
+        with self._lock:
+            if heartbeat._cancelled:
+                return
+            if heartbeat._outstanding:
+                # Pushing now would only skip the beat, so wait for the running one to finish.
+                heartbeat._requested_due = due
+            else:
+                self._push(heartbeat, due)
+
+    def _cancel(self, heartbeat):
+        with self._lock:
+            if heartbeat._cancelled:
+                return
+            heartbeat._cancelled = True
+            heartbeat._generation += 1
+            if heartbeat in self._heartbeats:
+                self._heartbeats.remove(heartbeat)
+            if not heartbeat._outstanding:
+                heartbeat._done.set()
+
+    @staticmethod
+    def _count_missed_deadline(heartbeat):
+        """Count a missed deadline once per beat. Call with the lock held.
+
+        Returns:
+            True if this is the first time the current beat missed its deadline.
+        """
+        if heartbeat._missed_current:
+            return False
+        heartbeat._missed_current = True
+        heartbeat._missed_deadlines += 1
+        return True
+
+    def _report_missed_deadline(self, heartbeat, late_sec):
+        self.logger.warning('Heartbeat %s missed its %.3fs deadline by %.3fs', heartbeat.name,
+                            heartbeat.deadline_sec, late_sec)
+        if heartbeat._on_missed_deadline is not None:
+            try:
+                heartbeat._on_missed_deadline(heartbeat, late_sec)
+            except Exception:  # pylint: disable=broad-except
+                self.logger.exception('Exception in on_missed_deadline of heartbeat %s',
+                                      heartbeat.name)
+
+    def _run(self):
+        """Main loop of the scheduler thread."""
+        while True:
+            with self._lock:
+                while True:
+                    if self._shutdown:
+                        return
+                    if not self._queue:
+                        self._wakeup.wait()
+                        continue
+                    due, _, generation, heartbeat = self._queue[0]
+                    if generation != heartbeat._generation:
+                        # Stale entry of a rescheduled or cancelled heartbeat.
+                        heapq.heappop(self._queue)
+                        continue
+                    now = self.clock()
+                    if due > now:
+                        self._wakeup.wait(due - now)
+                        continue
+                    heapq.heappop(self._queue)
+                    break
+                # Fixed rate: the next beat is due one period after this one was due, but never
+                # in the past, so a stalled scheduler does not fire a burst of beats.
+                self._push(heartbeat, max(due + heartbeat.period_sec, now))
+                late_sec = None
+                if heartbeat._outstanding:
+                    # The previous beat is still running, so this one is skipped.
+                    late = now - heartbeat._start - heartbeat.deadline_sec
+                    if late > 0 and self._count_missed_deadline(heartbeat):
+                        late_sec = late
+                    start = None
+                else:
+                    start = now
+                    heartbeat._outstanding = True
+                    heartbeat._missed_current = False
+                    heartbeat._start = start
+                    heartbeat._beats += 1
+                    heartbeat._jitter.add(now - due)
+            if late_sec is not None:
+                self._report_missed_deadline(heartbeat, late_sec)
+            if start is not None:
+                self._start_beat(heartbeat, start)
+
+    def _start_beat(self, heartbeat, start):
+        try:
+            future = heartbeat._beat()
+        except Exception:  # pylint: disable=broad-except
+            self.logger.exception('Heartbeat %s failed', heartbeat.name)
+            self._finish_beat(heartbeat, start, failed=True)
+            return
+        if future is None:
+            self._finish_beat(heartbeat, start, failed=False)
+        else:
+            future.add_done_callback(
+                lambda done_future: self._finish_beat(heartbeat, start, future=done_future))
+
+    def _finish_beat(self, heartbeat, start, failed=False, future=None):
+        if future is not None:
+            try:
+                failed = future.exception() is not None
+            except Exception:  # pylint: disable=broad-except
+                # Cancelled futures raise instead of returning an exception.
+                failed = True
+        now = self.clock()
+        latency_sec = now - start
+        late_sec = None
+        with self._lock:
+            heartbeat._outstanding = False
+            if heartbeat._requested_due is not None:
+                if not heartbeat._cancelled:
+                    self._push(heartbeat, heartbeat._requested_due)
+                heartbeat._requested_due = None
+            heartbeat._latency.add(latency_sec)
+            if failed:
+                heartbeat._failures += 1
+            if (latency_sec > heartbeat.deadline_sec and
+                    self._count_missed_deadline(heartbeat)):
+                late_sec = latency_sec - heartbeat.deadline_sec
+            if heartbeat._cancelled:
+                heartbeat._done.set()
+        if late_sec is not None:
+            self._report_missed_deadline(heartbeat, late_sec)
+
+
+_default_scheduler = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_default_heartbeat_scheduler():
+    """Get the HeartbeatScheduler shared by the whole process, creating it if needed."""
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None or _default_scheduler._shutdown:
+            _default_scheduler = HeartbeatScheduler()
+        return _default_scheduler
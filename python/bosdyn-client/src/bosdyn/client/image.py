@@ -6,6 +6,7 @@
 
 """For clients to use the image service."""
 import collections
+import io
 import os
 import warnings
 
@@ -15,6 +16,7 @@ from bosdyn.api import image_pb2, image_service_pb2_grpc
 from bosdyn.client.common import (BaseClient, common_header_errors, custom_params_error,
                                   error_factory, error_pair, handle_common_header_errors)
 from bosdyn.client.exceptions import ResponseError, UnsetStatusError
+from bosdyn.client.frame_helpers import get_a_tform_b
 
 
 class ImageResponseError(ResponseError):
@@ -432,6 +434,19 @@ def _depth_image_data_to_numpy(image_response):
     return depth_array
 
 
+def _check_depth_image_response(image_response):
+    """Raises ValueError if image_response is not a pinhole depth image."""
+    if image_response.source.image_type != image_pb2.ImageSource.IMAGE_TYPE_DEPTH:
+        raise ValueError('requires an image_type of IMAGE_TYPE_DEPTH.')
+
+    if image_response.shot.image.pixel_format != image_pb2.Image.PIXEL_FORMAT_DEPTH_U16:
+        raise ValueError(
+            'IMAGE_TYPE_DEPTH with an unsupported format, requires PIXEL_FORMAT_DEPTH_U16.')
+
+    if not image_response.source.HasField('pinhole'):
+        raise ValueError('Requires a pinhole camera_model.')
+
+
 def depth_image_to_pointcloud(image_response, min_dist=0, max_dist=1000):
     """Converts a depth image into a point cloud using the camera intrinsics. The point
     cloud is represented as a numpy array of (x,y,z) values.  Requests can optionally filter
@@ -451,16 +466,7 @@ def depth_image_to_pointcloud(image_response, min_dist=0, max_dist=1000):
     Returns:
         A numpy stack of (x,y,z) values representing depth image as a point cloud expressed in the sensor frame.
     """
-
-    if image_response.source.image_type != image_pb2.ImageSource.IMAGE_TYPE_DEPTH:
-        raise ValueError('requires an image_type of IMAGE_TYPE_DEPTH.')
-
-    if image_response.shot.image.pixel_format != image_pb2.Image.PIXEL_FORMAT_DEPTH_U16:
-        raise ValueError(
-            'IMAGE_TYPE_DEPTH with an unsupported format, requires PIXEL_FORMAT_DEPTH_U16.')
-
-    if not image_response.source.HasField('pinhole'):
-        raise ValueError('Requires a pinhole camera_model.')
+    _check_depth_image_response(image_response)
 
     source_rows = image_response.source.rows
     source_cols = image_response.source.cols
@@ -488,3 +494,304 @@ def depth_image_to_pointcloud(image_response, min_dist=0, max_dist=1000):
     x = np.multiply(z, (cols - cx)) / fx
     y = np.multiply(z, (rows - cy)) / fy
     return np.vstack((x, y, z)).T
+
+
+class DepthProjector(object):
+    """Converts depth images into point clouds, like depth_image_to_pointcloud.
+
+    The camera intrinsics of an image source rarely change, so the projector computes the ray of
+    every pixel once per source and reuses it for every image from that source. Output arrays are
+    also kept per source and reused.
+
+    Args:
+        min_dist (double): All points in the returned point clouds will be greater than min_dist
+            from the image plane [meters].
+        max_dist (double): All points in the returned point clouds will be less than max_dist from
+            the image plane [meters].
+        reuse_buffers (bool): If True, the point cloud returned for a source is a view into a
+            buffer that is overwritten by the next image from the same source. The view is not
+            C-contiguous. Set to False to get a new, C-contiguous array for every image.
+    """
+
+    def __init__(self, min_dist=0, max_dist=1000, reuse_buffers=True):
+        self._min_dist = min_dist
+        self._max_dist = max_dist
+        self._reuse_buffers = reuse_buffers
+        # Map of source name to (intrinsics key, x ray table, y ray table).
+        self._rays = {}
+        # Map of source name to (points buffer, transformed points buffer).
+        self._buffers = {}
+
+    def clear(self):
+        """Drop the cached ray tables and buffers of all sources."""
+        self._rays.clear()
+        self._buffers.clear()
+
+    def pointcloud(self, image_response, frame_name=None):
+        """Converts a depth image into an Nx3 numpy array of (x,y,z) points.
+
+        Args:
+            image_response (image_pb2.ImageResponse): An ImageResponse containing a depth image.
+            frame_name (string): If set, the points are expressed in this frame instead of the
+                sensor frame, using the transforms_snapshot of the image.
+
+        Returns:
+            Nx3 numpy array of the points with valid depth in the requested range.
+
+        Raises:
+            ValueError if the image is not a pinhole depth image, or if frame_name is not in the
+            transforms_snapshot of the image.
+        """
+        points, _ = self._project(image_response, frame_name)
+        if not self._reuse_buffers:
+            return np.ascontiguousarray(points.T)
+        return points.T
+
+    def pointclouds(self, image_responses, frame_name=None):
+        """Converts several depth images, for example from the body depth cameras, at once.
+
+        Args:
+            image_responses (List[image_pb2.ImageResponse]): ImageResponses containing depth
+                images. Responses that are not depth images are skipped.
+            frame_name (string): If set, the points are expressed in this frame instead of the
+                sensor frames, which puts the point clouds of all sources in a common frame.
+
+        Returns:
+            Dictionary of image source name to Nx3 numpy array of points.
+        """
+        return {
+            image_response.source.name: self.pointcloud(image_response, frame_name)
+            for image_response in image_responses
+            if image_response.source.image_type == image_pb2.ImageSource.IMAGE_TYPE_DEPTH
+        }
+
+    def colored_pointcloud(self, depth_response, visual_response, frame_name=None,
+                           visual_image=None):
+        """Converts a depth image into a point cloud colored by a pixel-aligned visual image.
+
+        The depth image must be registered to the visual image, like the
+        "<camera>_depth_in_visual_frame" and "<camera>_fisheye_image" sources of the body cameras,
+        so that both images have the same size and the same pixels.
+
+        Args:
+            depth_response (image_pb2.ImageResponse): An ImageResponse containing a depth image.
+            visual_response (image_pb2.ImageResponse): The matching visual ImageResponse.
+            frame_name (string): If set, the points are expressed in this frame instead of the
+                sensor frame, using the transforms_snapshot of the depth image.
+            visual_image (numpy array): The already decoded visual image, see decode_image().
+
+        Returns:
+            Nx6 numpy array of (x, y, z, r, g, b) rows, where the colors are the pixel values of the
+            visual image. Greyscale images give equal r, g and b.
+
+        Raises:
+            ValueError if the images are not a pinhole depth image and a visual image of the same
+            size, or if frame_name is not in the transforms_snapshot of the depth image.
+        """
+        if visual_image is None:
+            visual_image = decode_image(visual_response)
+        rows = depth_response.source.rows
+        cols = depth_response.source.cols
+        if visual_image.shape[:2] != (rows, cols):
+            raise ValueError('Visual image of size {} does not match the {}x{} depth image.'.format(
+                visual_image.shape[:2], rows, cols))
+
+        points, valid_inds = self._project(depth_response, frame_name)
+        colored_points = np.empty((points.shape[1], 6))
+        colored_points[:, 0:3] = points.T
+        if visual_image.ndim == 2:
+            colored_points[:, 3:6] = visual_image.reshape(-1)[valid_inds, np.newaxis]
+        else:
+            colored_points[:, 3:6] = visual_image.reshape(rows * cols, -1)[valid_inds, 0:3]
+        return colored_points
+
+    def colored_pointclouds(self, image_responses, frame_name=None):
+        """Converts all matched depth and visual images in image_responses to colored point clouds.
+
+        A depth image is matched with the visual image that has the same frame_name_image_sensor
+        and size. Every visual image is decoded once.
+
+        Args:
+            image_responses (List[image_pb2.ImageResponse]): ImageResponses, for example from a
+                GetImage request for the depth_in_visual_frame and fisheye_image sources of the
+                body cameras. Depth images without a matching visual image are skipped.
+            frame_name (string): If set, the points are expressed in this frame instead of the
+                sensor frames, which puts the point clouds of all sources in a common frame.
+
+        Returns:
+            Dictionary of depth image source name to Nx6 numpy array of (x, y, z, r, g, b) rows.
+        """
+        visual_responses = {}
+        for image_response in image_responses:
+            if image_response.source.image_type == image_pb2.ImageSource.IMAGE_TYPE_VISUAL:
+                key = (image_response.shot.frame_name_image_sensor, image_response.shot.image.rows,
+                       image_response.shot.image.cols)
+                visual_responses.setdefault(key, image_response)
+
+        decoded_images = {}
+        colored_points = {}
+        for image_response in image_responses:
+            if image_response.source.image_type != image_pb2.ImageSource.IMAGE_TYPE_DEPTH:
+                continue
+            key = (image_response.shot.frame_name_image_sensor, image_response.source.rows,
+                   image_response.source.cols)
+            visual_response = visual_responses.get(key)
+            if visual_response is None:
+                continue
+            if key not in decoded_images:
+                decoded_images[key] = decode_image(visual_response)
+            colored_points[image_response.source.name] = self.colored_pointcloud(
+                image_response, visual_response, frame_name, visual_image=decoded_images[key])
+        return colored_points
+
+    def _project(self, image_response, frame_name):
+        """Returns the 3xN array of points and the valid pixel mask of the depth image."""
+        _check_depth_image_response(image_response)
+        ray_x, ray_y = self._get_rays(image_response.source)
+        depth_array = _depth_image_data_to_numpy(image_response).reshape(-1)
+        depth_scale = image_response.source.depth_scale
+        valid_inds = _depth_image_get_valid_indices(depth_array,
+                                                    np.rint(self._min_dist * depth_scale),
+                                                    np.rint(self._max_dist * depth_scale))
+
+        # The points are computed as rows of a 3xN array, which keeps every step contiguous.
+        num_points = np.count_nonzero(valid_inds)
+        points_buffer, transformed_buffer = self._get_buffers(image_response.source.name,
+                                                              len(ray_x))
+        points = points_buffer[:3 * num_points].reshape(3, num_points)
+        points[2] = depth_array[valid_inds]
+        points[2] /= depth_scale
+        points[0] = ray_x[valid_inds]
+        points[0] *= points[2]
+        points[1] = ray_y[valid_inds]
+        points[1] *= points[2]
+
+        if frame_name is not None:
+            frame_tform_sensor = get_a_tform_b(image_response.shot.transforms_snapshot,
+                                               frame_name,
+                                               image_response.shot.frame_name_image_sensor)
+            if frame_tform_sensor is None:
+                raise ValueError(
+                    'No transform from "{}" to "{}" in the transforms_snapshot.'.format(
+                        frame_name, image_response.shot.frame_name_image_sensor))
+            matrix = frame_tform_sensor.to_matrix()
+            transformed = transformed_buffer[:3 * num_points].reshape(3, num_points)
+            np.dot(matrix[0:3, 0:3], points, out=transformed)
+            transformed += matrix[0:3, 3:4]
+            points = transformed
+        return points, valid_inds
+
+    def _get_rays(self, image_source):
+        """Returns the flattened per-pixel (x, y) ray tables, for a depth of 1 meter."""
+        intrinsics = image_source.pinhole.intrinsics
+        key = (image_source.rows, image_source.cols, intrinsics.focal_length.x,
+               intrinsics.focal_length.y, intrinsics.principal_point.x,
+               intrinsics.principal_point.y)
+        cached = self._rays.get(image_source.name)
+        if cached is not None and cached[0] == key:
+            return cached[1:]
+
+        rows, cols, fx, fy, cx, cy = key
+        ray_x = np.empty((rows, cols))
+        ray_x[:] = ((np.arange(cols) - cx) / fx)[np.newaxis, :]
+        ray_y = np.empty((rows, cols))
+        ray_y[:] = ((np.arange(rows) - cy) / fy)[:, np.newaxis]
+        self._rays[image_source.name] = (key, ray_x.reshape(-1), ray_y.reshape(-1))
+        return self._rays[image_source.name][1:]
+
+    def _get_buffers(self, source_name, num_pixels):
+        buffers = self._buffers.get(source_name)
+        if buffers is None or len(buffers[0]) < 3 * num_pixels:
+            buffers = (np.empty(3 * num_pixels), np.empty(3 * num_pixels))
+            self._buffers[source_name] = buffers
+        return buffers
+
+
+def _decode_jpeg(data):
+    """Decodes JPEG data with OpenCV if it is installed, or else with Pillow."""
+    try:
+        import cv2  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        cv2 = None
+    if cv2 is not None:
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+        if image is None:
+            raise ValueError('Could not decode the JPEG image data.')
+        if image.ndim == 3:
+            # OpenCV decodes color images as BGR.
+            image = image[:, :, ::-1]
+        return image
+
+    try:
+        from PIL import Image  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        raise ImportError('Decoding JPEG images requires the opencv-python or Pillow package.')
+    return np.asarray(Image.open(io.BytesIO(data)))
+
+
+def decode_image(image_response):
+    """Decodes the image data of an ImageResponse into a numpy array.
+
+    JPEG images are decoded with OpenCV or Pillow, whichever is installed.
+
+    Args:
+        image_response (image_pb2.ImageResponse): An ImageResponse with a FORMAT_JPEG or
+            FORMAT_RAW image.
+
+    Returns:
+        A (rows, cols) numpy array for single channel images, or a (rows, cols, channels) array
+        with RGB or RGBA channels for color images.
+
+    Raises:
+        ValueError if the image format is not supported or the data does not match the image size.
+    """
+    image = image_response.shot.image
+    if image.format == image_pb2.Image.FORMAT_JPEG:
+        return _decode_jpeg(image.data)
+    if image.format != image_pb2.Image.FORMAT_RAW:
+        raise ValueError('Unsupported image format {}.'.format(
+            image_pb2.Image.Format.Name(image.format)))
+
+    num_channels = {
+        image_pb2.Image.PIXEL_FORMAT_RGB_U8: 3,
+        image_pb2.Image.PIXEL_FORMAT_RGBA_U8: 4,
+    }.get(image.pixel_format, 1)
+    try:
+        decoded = np.frombuffer(image.data, dtype=pixel_format_to_numpy_type(image.pixel_format))
+        if num_channels == 1:
+            return decoded.reshape(image.rows, image.cols)
+        return decoded.reshape(image.rows, image.cols, num_channels)
+    except ValueError as err:
+        raise ValueError('Image data does not match the {}x{} image size: {}'.format(
+            image.rows, image.cols, err))
+
+
+def merge_pointclouds(pointclouds, voxel_size=None):
+    """Concatenates point clouds, such as those of several cameras in a common frame.
+
+    Args:
+        pointclouds (iterable of numpy arrays): NxM arrays whose first three columns are (x, y, z),
+            for example the results of DepthProjector.pointclouds() or colored_pointclouds().
+        voxel_size (double): If set, the merged cloud is downsampled to at most one point per cubic
+            voxel of this size [meters]. Each such point is the mean of all columns of the points
+            in its voxel, so colors are averaged too.
+
+    Returns:
+        NxM numpy array of the merged points.
+    """
+    pointclouds = list(pointclouds)
+    if not pointclouds:
+        return np.empty((0, 3))
+    merged = np.concatenate(pointclouds, axis=0)
+    if voxel_size is None or len(merged) == 0:
+        return merged
+
+    voxels = np.floor(merged[:, 0:3] / voxel_size).astype(np.int64)
+    _, voxel_inds, counts = np.unique(voxels, axis=0, return_inverse=True, return_counts=True)
+    voxel_inds = voxel_inds.reshape(-1)
+    downsampled = np.empty((len(counts), merged.shape[1]))
+    for column in range(merged.shape[1]):
+        downsampled[:, column] = np.bincount(voxel_inds, weights=merged[:, column],
+                                             minlength=len(counts))
+    downsampled /= counts[:, np.newaxis]
+    return downsampled
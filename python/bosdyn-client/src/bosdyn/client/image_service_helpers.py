@@ -4,6 +4,8 @@
 # is subject to the terms and conditions of the Boston Dynamics Software
 # Development Kit License (20191101-BDSDK-SL).
 
+import collections
+import concurrent.futures
 import contextlib
 import inspect
 import logging
@@ -29,6 +31,17 @@ _LOGGER = logging.getLogger(__name__)
 
 CLEAR_FAULT_RPC_TIMEOUT_SECS = 0.1
 
+# gRPC trailing metadata key under which GetImage reports the per-source timing of a request.
+IMAGE_TIMING_METADATA_KEY = 'bosdyn-image-timing'
+
+ImageTiming = collections.namedtuple('ImageTiming', ['source_name', 'capture_secs', 'decode_secs'])
+ImageTiming.__doc__ = """Time spent on one image request of a GetImage call.
+
+    source_name: The requested image source.
+    capture_secs: Time spent retrieving the image data from the image source.
+    decode_secs: Time spent decoding the image data into the response.
+"""
+
 
 def convert_RGB_to_grayscale(image_data_RGB_np):
     """Convert numpy image from RGB to grayscale using Pillow's formula.
@@ -94,6 +107,116 @@ class CameraInterface(ABC):
         """
 
 
+EncodedImageCacheMetrics = collections.namedtuple('EncodedImageCacheMetrics',
+                                                  ['hits', 'misses', 'size', 'max_size'])
+EncodedImageCacheMetrics.__doc__ = """Snapshot of an EncodedImageCache.
+
+    hits: Lookups answered from the cache since it was created.
+    misses: Lookups which had to decode the image since the cache was created.
+    size: Number of encoded images currently in the cache.
+    max_size: Maximum number of encoded images kept.
+"""
+
+
+CaptureBufferMetrics = collections.namedtuple('CaptureBufferMetrics',
+                                              ['frames', 'capacity', 'nbytes'])
+CaptureBufferMetrics.__doc__ = """Snapshot of the frame buffer of an ImageCaptureThread.
+
+    frames: Number of captured frames currently in the buffer.
+    capacity: Maximum number of frames the buffer holds.
+    nbytes: Approximate memory held by the buffered frames, in bytes.
+"""
+
+
+def _frame_nbytes(image_frame):
+    """Approximate the memory held by the image data returned from a capture function."""
+    nbytes = getattr(image_frame, 'nbytes', None)  # numpy arrays and memoryviews
+    if nbytes is not None:
+        return nbytes
+    if isinstance(image_frame, (bytes, bytearray)):
+        return len(image_frame)
+    return sys.getsizeof(image_frame)
+
+
+class EncodedImageCache():
+    """Bounded LRU cache of decoded Image protos for one image source.
+
+    Entries are keyed by the capture time of the image data and the format parameters of the
+    image request, so that requests for the same captured frame with the same output format only
+    decode it once. Safe to use from several threads.
+
+    Args:
+        max_size (int): Maximum number of encoded images kept. The least recently used entry is
+                        evicted once the cache is full.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._images = collections.OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def make_key(capture_time, image_req):
+        """Create the cache key for image data captured at capture_time and an image request.
+
+        Args:
+            capture_time (float): The capture time of the image data, as returned by the capture
+                                  function.
+            image_req (image_pb2.ImageRequest): The image request the data is decoded for.
+
+        Returns:
+            A hashable key for get() and put().
+        """
+        if image_req is None:
+            return (capture_time, None)
+        custom_params = None
+        if image_req.HasField('custom_params'):
+            custom_params = image_req.custom_params.SerializeToString(deterministic=True)
+        return (capture_time, image_req.image_format, image_req.pixel_format,
+                image_req.quality_percent, image_req.resize_ratio, custom_params)
+
+    def get(self, key, image_proto):
+        """Copy the cached image for key into image_proto.
+
+        Returns:
+            True if the image was in the cache, otherwise False and image_proto is unchanged.
+        """
+        with self._lock:
+            cached = self._images.get(key)
+            if cached is None:
+                self._misses += 1
+                return False
+            self._images.move_to_end(key)
+            self._hits += 1
+        image_proto.CopyFrom(cached)
+        return True
+
+    def put(self, key, image_proto):
+        """Store a copy of the decoded image_proto under key."""
+        if self.max_size <= 0:
+            return
+        cached = image_pb2.Image()
+        cached.CopyFrom(image_proto)
+        with self._lock:
+            self._images[key] = cached
+            self._images.move_to_end(key)
+            while len(self._images) > self.max_size:
+                self._images.popitem(last=False)
+
+    def clear(self):
+        """Remove all cached images. The hit and miss counts are kept."""
+        with self._lock:
+            self._images.clear()
+
+    def metrics(self):
+        """Get an EncodedImageCacheMetrics snapshot of the cache."""
+        with self._lock:
+            return EncodedImageCacheMetrics(self._hits, self._misses, len(self._images),
+                                            self.max_size)
+
+
 class VisualImageSource():
     """Helper class to represent a single image source.
 
@@ -118,10 +241,14 @@ class VisualImageSource():
         param_spec (service_customization_pb2.DictParam.Spec): A set of custom parameters passed into this
                                                                image source
         logger (logging.Logger): Logger for debug and warning messages.
+        encoded_image_cache_size (int): Number of decoded images to keep, so that requests for an
+                                        already decoded frame with the same format, pixel format,
+                                        quality and resize ratio skip the decode. 0 disables the
+                                        cache.
     """
 
     def __init__(self, image_name, camera_interface, rows=None, cols=None, gain=None, exposure=None,
-                 pixel_formats=[], logger=None, param_spec=None):
+                 pixel_formats=[], logger=None, param_spec=None, encoded_image_cache_size=8):
         self.image_source_name = image_name
         self.supported_pixel_formats = pixel_formats
         self.image_source_proto = self.make_image_source(image_name, rows, cols,
@@ -150,6 +277,11 @@ class VisualImageSource():
         # service to respond quickly to a GetImage request, since it can use the last captured image.
         self.capture_thread = None
 
+        # Decoded images of recent captures, keyed by capture time and request format.
+        self.encoded_image_cache = None
+        if encoded_image_cache_size > 0:
+            self.encoded_image_cache = EncodedImageCache(encoded_image_cache_size)
+
         # Fault client to report errors. Requires the image service name to
         # properly create the fault id.
         self.fault_client = None
@@ -178,12 +310,17 @@ class VisualImageSource():
         if logger is not None:
             self.logger = logger
 
-    def create_capture_thread(self, custom_params=None):
+    def create_capture_thread(self, custom_params=None, buffer_size=1):
         """Initialize a background thread to continuously capture images.
 
+        Args:
+            custom_params (service_customization_pb2.DictParam): Custom parameters used for the
+                                                                 background captures.
+            buffer_size (int): Number of recent captures kept for get_image_nearest().
         """
         self.capture_thread = ImageCaptureThread(self.image_source_name, self.capture_function,
-                                                 custom_params=custom_params)
+                                                 custom_params=custom_params,
+                                                 buffer_size=buffer_size)
         self.capture_thread.start_capturing()
 
     def initialize_faults(self, fault_client, image_service):
@@ -332,7 +469,33 @@ class VisualImageSource():
             # capture_function already handles pre-3.3 blocking capture compatibility
             return self.capture_function(custom_params=custom_params, **capture_func_kwargs)
 
-    def image_decode_with_error_checking(self, image_data, image_proto, image_req):
+    def get_image_nearest(self, capture_time, custom_params=None, **capture_func_kwargs):
+        """Retrieve the buffered capture closest in time to capture_time.
+
+        Args:
+            capture_time (float): The time (in seconds, in the clock of the capture function's
+                                  timestamps) to find the closest capture to.
+            custom_params (service_customization_pb2.DictParam): Custom parameters passed to the object's
+                                                                 capture_function affecting the resulting capture
+            **capture_func_kwargs: Other keyword arguments for the capture_function
+
+        Returns:
+            The captured image and the time (in seconds) associated with that image capture. Without
+            a background capture thread, or if the thread has no capture with the requested
+            parameters yet, a new image is captured as in get_image_and_timestamp().
+        """
+        if self.capture_thread is not None:
+            thread_capture_output = self.capture_thread.get_image_nearest(
+                capture_time, custom_params=custom_params, **capture_func_kwargs)
+            if thread_capture_output.is_valid:
+                if thread_capture_output.image is None or thread_capture_output.timestamp is None:
+                    # Force the printout of the last error message since the capture failed.
+                    self._maybe_log_error(show_last_error=True)
+                return thread_capture_output.image, thread_capture_output.timestamp
+        return self.capture_function(custom_params=custom_params, **capture_func_kwargs)
+
+    def image_decode_with_error_checking(self, image_data, image_proto, image_req,
+                                         capture_time=None):
         """Decode the image data into an Image proto based on the requested format and quality.
 
         Args:
@@ -340,6 +503,9 @@ class VisualImageSource():
                                     blocking_capture function.
             image_proto (image_pb2.Image): The image proto to be mutated with the decoded data.
             image_req (image_pb2.ImageRequest): The image request associated with the image_data.
+            capture_time (float): The capture time returned with image_data. If provided, the
+                                  decoded image is looked up in and stored to the encoded image
+                                  cache.
 
         Returns:
             image_pb2.ImageResponse.Status indicating if the decoding succeeds, or image format conversion or
@@ -356,6 +522,11 @@ class VisualImageSource():
             pixel_format = image_req.pixel_format
             if pixel_format and (pixel_format not in self.supported_pixel_formats):
                 return image_pb2.ImageResponse.STATUS_UNSUPPORTED_PIXEL_FORMAT_REQUESTED
+        cache_key = None
+        if self.encoded_image_cache is not None and capture_time is not None:
+            cache_key = EncodedImageCache.make_key(capture_time, image_req)
+            if self.encoded_image_cache.get(cache_key, image_proto):
+                return image_pb2.ImageResponse.STATUS_OK
         try:
             # Older function definition did not have image_req
             # Try/except for backwards compatibility
@@ -366,6 +537,8 @@ class VisualImageSource():
                                                    quality_percent)
             # Clear any previous decode data faults after a successful decoding by this image source.
             self.clear_fault(self.decode_data_fault)
+            if cache_key is not None:
+                self.encoded_image_cache.put(cache_key, image_proto)
             return image_pb2.ImageResponse.STATUS_OK
         except Exception as err:
             decode_format_str = None
@@ -475,6 +648,11 @@ class ImageCaptureThread():
     """Continuously query and store the last successfully captured image and its
     associated timestamp for a single camera device.
 
+    The most recent successful captures are also kept in a ring buffer of buffer_size frames, so
+    that get_image_nearest() can return the capture closest to a given time. Frames are held by
+    reference, so the buffer costs roughly buffer_size times the size of one captured frame (see
+    buffer_metrics()).
+
     Args:
         image_source_name(string): The image source name.
         capture_func (CameraInterface.blocking_capture): The function capturing the image
@@ -484,11 +662,12 @@ class ImageCaptureThread():
                                    0.05s between captures.
         custom_params (service_customization_pb2.DictParam): Custom parameters passed to capture_func
                                                              affecting the resulting capture
+        buffer_size (int): Number of recent successful captures to keep. Defaults to 1.
         **capture_func_kwargs: Other keyword arguments for the capture_func
     """
 
     def __init__(self, image_source_name, capture_func, capture_period_secs=0.05,
-                 custom_params=None, **capture_func_kwargs):
+                 custom_params=None, buffer_size=1, **capture_func_kwargs):
         # Name of the image source that is being requested from.
         self.image_source_name = image_source_name
 
@@ -502,6 +681,16 @@ class ImageCaptureThread():
         # Has a capture with the latest parameters completed (not necessarily successfully)
         self.has_updated_capture = False
 
+        # Ring buffer of the recent successful captures. Slots without a capture have a NaN time.
+        if buffer_size < 1:
+            raise ValueError("buffer_size must be at least 1, not %d." % buffer_size)
+        self.buffer_size = buffer_size
+        self._frames = [None] * buffer_size
+        self._frame_times = np.full(buffer_size, np.nan)
+        self._frame_nbytes = [0] * buffer_size
+        self._next_slot = 0
+        self._buffered_nbytes = 0
+
         # Lock for the thread.
         self._thread_lock = threading.Lock()
         self._thread = None
@@ -537,6 +726,16 @@ class ImageCaptureThread():
             self.custom_params = custom_params
             self.capture_func_kwargs = capture_func_kwargs
             self.has_updated_capture = False
+            # Captures with the previous parameters must not be returned for the new ones.
+            self._clear_buffer()
+
+    def _clear_buffer(self):
+        """Empty the ring buffer of captures."""
+        self._frames[:] = [None] * self.buffer_size
+        self._frame_times.fill(np.nan)
+        self._frame_nbytes[:] = [0] * self.buffer_size
+        self._next_slot = 0
+        self._buffered_nbytes = 0
 
     def set_last_captured_image(self, image_frame, capture_time):
         """Update the last image capture and timestamp."""
@@ -544,6 +743,14 @@ class ImageCaptureThread():
             self.last_captured_image = image_frame
             self.last_captured_time = capture_time
             self.has_updated_capture = True
+            if image_frame is not None and capture_time is not None:
+                slot = self._next_slot
+                nbytes = _frame_nbytes(image_frame)
+                self._buffered_nbytes += nbytes - self._frame_nbytes[slot]
+                self._frames[slot] = image_frame
+                self._frame_times[slot] = capture_time
+                self._frame_nbytes[slot] = nbytes
+                self._next_slot = (slot + 1) % self.buffer_size
 
     def get_latest_captured_image(self, custom_params=None, **capture_func_kwargs):
         """Returns the last found image and timestamp in a ThreadCaptureOutput object if that
@@ -559,6 +766,32 @@ class ImageCaptureThread():
                 self.maybe_update_thread(custom_params=custom_params, **capture_func_kwargs)
                 return ThreadCaptureOutput(False, None, None)
 
+    def get_image_nearest(self, capture_time, custom_params=None, **capture_func_kwargs):
+        """Returns the buffered image and timestamp closest to capture_time in a ThreadCaptureOutput
+            object if the buffered images use the latest params. Otherwise returns a
+            ThreadCaptureOutput object with is_valid = False and capture/timestamp as None.
+
+            If no capture with the latest params succeeded yet, the output of the last failed
+            capture is returned, as in get_latest_captured_image.
+        """
+        with self._thread_lock:
+            if (custom_params != self.custom_params or
+                    capture_func_kwargs != self.capture_func_kwargs or
+                    not self.has_updated_capture):
+                self.maybe_update_thread(custom_params=custom_params, **capture_func_kwargs)
+                return ThreadCaptureOutput(False, None, None)
+            time_differences = np.abs(self._frame_times - capture_time)
+            if np.isnan(time_differences).all():
+                return ThreadCaptureOutput(True, self.last_captured_image, self.last_captured_time)
+            slot = int(np.nanargmin(time_differences))
+            return ThreadCaptureOutput(True, self._frames[slot], float(self._frame_times[slot]))
+
+    def buffer_metrics(self):
+        """Get a CaptureBufferMetrics snapshot of the ring buffer of captures."""
+        with self._thread_lock:
+            return CaptureBufferMetrics(int(np.count_nonzero(~np.isnan(self._frame_times))),
+                                        self.buffer_size, self._buffered_nbytes)
+
     def _make_capture_func(self, capture_func, custom_params=None, **capture_func_kwargs):
         """Update the capture function to use custom_params and capture_func_kwargs if it can"""
 
@@ -590,7 +823,8 @@ class ImageCaptureThread():
     def stop_capturing(self, timeout_secs=10):
         """Stop the image capture thread."""
         self.stop_capturing_event.set()
-        self._thread.join(timeout=timeout_secs)
+        if self._thread is not None:
+            self._thread.join(timeout=timeout_secs)
 
 
 class CameraBaseImageServicer(image_service_pb2_grpc.ImageServiceServicer):
@@ -610,12 +844,22 @@ class CameraBaseImageServicer(image_service_pb2_grpc.ImageServiceServicer):
             custom image source parameters used for all of the background captures. Otherwise ignored
         log_images (bool): if true, include image request/response messages in robot logs.  This is turned off
             by default.
+        max_workers (int): Maximum number of image sources captured and decoded concurrently for a
+            single GetImage request. Defaults to one thread per image source. A value of 1 handles
+            every image request serially in the calling thread.
+        capture_buffer_size (int): If use_background_capture_thread is true, the number of recent
+            captures each background thread keeps. Larger buffers use more memory, but let
+            synchronize_sources find closer matches between sources.
+        synchronize_sources (bool): If true and use_background_capture_thread is true, every image
+            source in a GetImage request is answered with its buffered capture closest in time to
+            the latest capture of the first requested source, rather than with its latest capture.
 
     """
 
     def __init__(self, bosdyn_sdk_robot, service_name, image_sources, logger=None,
                  use_background_capture_thread=True, background_capture_params=None,
-                 log_images=False):
+                 log_images=False, max_workers=None, capture_buffer_size=1,
+                 synchronize_sources=False):
         super(CameraBaseImageServicer, self).__init__()
         if logger is None:
             # Set up the logger to remove duplicated messages and use a specific logging format.
@@ -652,10 +896,30 @@ class CameraBaseImageServicer(image_service_pb2_grpc.ImageServiceServicer):
             source.initialize_faults(self.fault_client, self.service_name)
             # Potentially start the capture threads in the background.
             if use_background_capture_thread:
-                source.create_capture_thread(background_capture_params)
+                source.create_capture_thread(background_capture_params,
+                                             buffer_size=capture_buffer_size)
             # Save the visual image source class associated with the image source name.
             self.image_sources_mapped[source.image_source_name] = source
 
+        # Worker threads which capture and decode the requested image sources in parallel. Requests
+        # for the same image source are always handled by one thread, in request order.
+        if max_workers is None:
+            max_workers = len(self.image_sources_mapped)
+        self._executor = None
+        if max_workers > 1:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix='image-service')
+
+        self.synchronize_sources = synchronize_sources
+
+        # The ImageTimings of the most recent GetImage request, in request order.
+        self.last_image_timings = []
+
+        # Subclasses may override _set_format_and_decode without the capture_time argument, in
+        # which case decoded images are not cached.
+        self._decode_takes_capture_time = 'capture_time' in inspect.signature(
+            self._set_format_and_decode).parameters
+
     def ListImageSources(self, request, context):
         """Obtain the list of ImageSources for this given service.
 
@@ -673,16 +937,145 @@ class CameraBaseImageServicer(image_service_pb2_grpc.ImageServiceServicer):
         populate_response_header(response, request)
         return response
 
-    def _set_format_and_decode(self, image_data, img_proto, img_req):
+    def _set_format_and_decode(self, image_data, img_proto, img_req, capture_time=None):
         """Calls the image_decode_with_error_checking function, which returns a (Boolean, Boolean) if the decoding succeeds."""
         # This function should set the image data, pixel format, image format, and transform snapshot fields.
         return self.image_sources_mapped[
             img_req.image_source_name].image_decode_with_error_checking(
-                image_data, img_proto, img_req)
+                image_data, img_proto, img_req, capture_time=capture_time)
+
+    def capture_buffer_metrics(self):
+        """Get the memory used by the capture buffers of the image sources.
+
+        Returns:
+            A dict of image source name to CaptureBufferMetrics, for the image sources which
+            capture on a background thread.
+        """
+        return {
+            name: source.capture_thread.buffer_metrics()
+            for name, source in self.image_sources_mapped.items()
+            if source.capture_thread is not None
+        }
+
+    def _get_reference_time(self, img_reqs):
+        """Get the time of the latest capture of the first requested image source, if any."""
+        for img_req in img_reqs:
+            source = self.image_sources_mapped.get(img_req.image_source_name)
+            if source is None or source.capture_thread is None:
+                continue
+            custom_params = img_req.custom_params if img_req.HasField("custom_params") else None
+            thread_capture_output = source.capture_thread.get_latest_captured_image(
+                custom_params=custom_params)
+            if thread_capture_output.is_valid:
+                return thread_capture_output.timestamp
+            return None
+        return None
+
+    def _get_image_response(self, img_req, img_resp, reference_time=None):
+        """Capture and decode the image for a single image request.
+
+        Args:
+            img_req (image_pb2.ImageRequest): The request for a single image source.
+            img_resp (image_pb2.ImageResponse): The response to be mutated with the image data and
+                                                status.
+            reference_time (float): If provided, the capture closest to this time is used rather
+                                    than the latest capture.
+
+        Returns:
+            A tuple of the error message for the response header (or None) and the ImageTiming of
+            the request (or None if the request was rejected before capturing).
+        """
+        src_name = img_req.image_source_name
+        if src_name not in self.image_sources_mapped:
+            # The requested camera source does not match the name of the Ricoh Theta camera, so it cannot
+            # be completed and will have a failure status in the response message.
+            img_resp.status = image_pb2.ImageResponse.STATUS_UNKNOWN_CAMERA
+            self.logger.warning("Camera source '%s' is unknown.", src_name)
+            return None, None
+
+        if img_req.resize_ratio < 0 or img_req.resize_ratio > 1:
+            img_resp.status = image_pb2.ImageResponse.STATUS_UNSUPPORTED_RESIZE_RATIO_REQUESTED
+            self.logger.warning("Resize ratio %f is unsupported.", img_req.resize_ratio)
+            return None, None
+
+        if img_req.HasField("custom_params"):
+            value_validation_error = self.image_sources_mapped[src_name].value_validator(
+                img_req.custom_params)
+            if value_validation_error:
+                img_resp.status = image_pb2.ImageResponse.STATUS_CUSTOM_PARAMS_ERROR
+                img_resp.custom_param_error.CopyFrom(value_validation_error)
+                return None, None
+
+        # Set the image source information in the response.
+        img_resp.source.CopyFrom(self.image_sources_mapped[src_name].image_source_proto)
+
+        # Set the image capture parameters in the response.
+        img_resp.shot.capture_params.CopyFrom(
+            self.image_sources_mapped[src_name].get_image_capture_params(img_req.custom_params))
+
+        start_time = time.perf_counter()
+        if reference_time is not None:
+            custom_params = img_req.custom_params if img_req.HasField("custom_params") else None
+            captured_image, img_time_seconds = self.image_sources_mapped[
+                src_name].get_image_nearest(reference_time, custom_params=custom_params)
+        elif img_req.HasField("custom_params"):
+            #If future keyword arguments are added here, they'll need to be added to this call
+            #get_image_and_timestamp already calls a 'sanitized' capture function that handles pre-3.3 blocking_captures
+            captured_image, img_time_seconds = self.image_sources_mapped[
+                src_name].get_image_and_timestamp(custom_params=img_req.custom_params)
+        else:
+            #get_image_and_timestamp() can accommodate pre-3.3 blocking_capture calls if no custom params are supplied
+            captured_image, img_time_seconds = self.image_sources_mapped[
+                src_name].get_image_and_timestamp()
+        capture_secs = time.perf_counter() - start_time
+
+        if captured_image is None or img_time_seconds is None:
+            img_resp.status = image_pb2.ImageResponse.STATUS_IMAGE_DATA_ERROR
+            error_message = "Failed to capture an image from %s on the server." % src_name
+            self.logger.warning(error_message)
+            return error_message, ImageTiming(src_name, capture_secs, 0.0)
+
+        # Convert the image capture time from the local clock time into the robot's time. Then set it as
+        # the acquisition timestamp for the image data.
+        img_resp.shot.acquisition_time.CopyFrom(
+            self.bosdyn_sdk_robot.time_sync.robot_timestamp_from_local_secs(img_time_seconds))
+
+        img_resp.shot.image.rows = img_resp.source.rows
+        img_resp.shot.image.cols = img_resp.source.cols
+
+        # Set the image data.
+        img_resp.shot.image.format = img_req.image_format
+        start_time = time.perf_counter()
+        if self._decode_takes_capture_time:
+            decode_status = self._set_format_and_decode(captured_image, img_resp.shot.image,
+                                                        img_req, capture_time=img_time_seconds)
+        else:
+            decode_status = self._set_format_and_decode(captured_image, img_resp.shot.image,
+                                                        img_req)
+        decode_secs = time.perf_counter() - start_time
+        if decode_status != image_pb2.ImageResponse.STATUS_OK:
+            img_resp.status = decode_status
+
+        # Set that we successfully got the image.
+        if img_resp.status == image_pb2.ImageResponse.STATUS_UNKNOWN:
+            img_resp.status = image_pb2.ImageResponse.STATUS_OK
+        return None, ImageTiming(src_name, capture_secs, decode_secs)
+
+    def _get_source_image_responses(self, img_reqs, img_resps, reference_time):
+        """Handle the image requests for one image source in order, on a worker thread."""
+        return [
+            self._get_image_response(img_req, img_resp, reference_time)
+            for img_req, img_resp in zip(img_reqs, img_resps)
+        ]
 
     def GetImage(self, request, context):
         """Gets the latest image capture from all the image sources specified in the request.
 
+        Different image sources are captured and decoded concurrently on the servicer's worker
+        threads, and the image responses are returned in the order of the image requests. The time
+        spent on each image request is sent back in the trailing metadata of the RPC (see
+        image_timings_from_metadata).
+
         Args:
             request (image_pb2.GetImageRequest): The image request, which specifies the image sources to
                                                  query, and other format parameters.
@@ -698,73 +1091,47 @@ class CameraBaseImageServicer(image_service_pb2_grpc.ImageServiceServicer):
         else:
             response_context = contextlib.nullcontext()
         with response_context:
-            for img_req in request.image_requests:
-                img_resp = response.image_responses.add()
-                src_name = img_req.image_source_name
-                if src_name not in self.image_sources_mapped:
-                    # The requested camera source does not match the name of the Ricoh Theta camera, so it cannot
-                    # be completed and will have a failure status in the response message.
-                    img_resp.status = image_pb2.ImageResponse.STATUS_UNKNOWN_CAMERA
-                    self.logger.warning("Camera source '%s' is unknown.", src_name)
-                    continue
-
-                if img_req.resize_ratio < 0 or img_req.resize_ratio > 1:
-                    img_resp.status = image_pb2.ImageResponse.STATUS_UNSUPPORTED_RESIZE_RATIO_REQUESTED
-                    self.logger.warning("Resize ratio %f is unsupported.", img_req.resize_ratio)
-                    continue
-
-                if img_req.HasField("custom_params"):
-                    value_validation_error = self.image_sources_mapped[src_name].value_validator(
-                        img_req.custom_params)
-                    if value_validation_error:
-                        img_resp.status = image_pb2.ImageResponse.STATUS_CUSTOM_PARAMS_ERROR
-                        img_resp.custom_param_error.CopyFrom(value_validation_error)
-                        continue
-
-                # Set the image source information in the response.
-                img_resp.source.CopyFrom(self.image_sources_mapped[src_name].image_source_proto)
-
-                # Set the image capture parameters in the response.
-                img_resp.shot.capture_params.CopyFrom(
-                    self.image_sources_mapped[src_name].get_image_capture_params(
-                        img_req.custom_params))
-
-                if img_req.HasField("custom_params"):
-                    #If future keyword arguments are added here, they'll need to be added to this call
-                    #get_image_and_timestamp already calls a 'sanitized' capture function that handles pre-3.3 blocking_captures
-                    captured_image, img_time_seconds = self.image_sources_mapped[
-                        src_name].get_image_and_timestamp(custom_params=img_req.custom_params)
-                else:
-                    #get_image_and_timestamp() can accommodate pre-3.3 blocking_capture calls if no custom params are supplied
-                    captured_image, img_time_seconds = self.image_sources_mapped[
-                        src_name].get_image_and_timestamp()
-
-                if captured_image is None or img_time_seconds is None:
-                    img_resp.status = image_pb2.ImageResponse.STATUS_IMAGE_DATA_ERROR
-                    error_message = "Failed to capture an image from %s on the server." % src_name
+            img_reqs = list(request.image_requests)
+            # Indices of the image requests for each image source.
+            source_indices = collections.OrderedDict()
+            for index, img_req in enumerate(img_reqs):
+                source_indices.setdefault(img_req.image_source_name, []).append(index)
+            reference_time = None
+            if self.synchronize_sources:
+                reference_time = self._get_reference_time(img_reqs)
+
+            if self._executor is None or len(source_indices) < 2:
+                img_resps = [response.image_responses.add() for _ in img_reqs]
+                results = [
+                    self._get_image_response(img_req, img_resp, reference_time)
+                    for img_req, img_resp in zip(img_reqs, img_resps)
+                ]
+            else:
+                # Protobuf messages cannot be built concurrently within one parent message, so each
+                # worker fills in standalone image responses which are added to the response after.
+                img_resps = [image_pb2.ImageResponse() for _ in img_reqs]
+                futures = [
+                    self._executor.submit(self._get_source_image_responses,
+                                          [img_reqs[index] for index in indices],
+                                          [img_resps[index] for index in indices], reference_time)
+                    for indices in source_indices.values()
+                ]
+                results = [None] * len(img_reqs)
+                for indices, future in zip(source_indices.values(), futures):
+                    for index, result in zip(indices, future.result()):
+                        results[index] = result
+                response.image_responses.extend(img_resps)
+
+            timings = []
+            for error_message, timing in results:
+                if error_message is not None:
                     response.header.error.message = error_message
-                    self.logger.warning(error_message)
-                    continue
-
-                # Convert the image capture time from the local clock time into the robot's time. Then set it as
-                # the acquisition timestamp for the image data.
-                img_resp.shot.acquisition_time.CopyFrom(
-                    self.bosdyn_sdk_robot.time_sync.robot_timestamp_from_local_secs(
-                        img_time_seconds))
-
-                img_resp.shot.image.rows = img_resp.source.rows
-                img_resp.shot.image.cols = img_resp.source.cols
-
-                # Set the image data.
-                img_resp.shot.image.format = img_req.image_format
-                decode_status = self._set_format_and_decode(captured_image, img_resp.shot.image,
-                                                            img_req)
-                if decode_status != image_pb2.ImageResponse.STATUS_OK:
-                    img_resp.status = decode_status
-
-                # Set that we successfully got the image.
-                if img_resp.status == image_pb2.ImageResponse.STATUS_UNKNOWN:
-                    img_resp.status = image_pb2.ImageResponse.STATUS_OK
+                if timing is not None:
+                    timings.append(timing)
+            self.last_image_timings = timings
+            if context is not None:
+                context.set_trailing_metadata(
+                    ((IMAGE_TIMING_METADATA_KEY, _format_image_timings(timings)),))
 
             # No header error codes, so set the response header as CODE_OK.
             populate_response_header(response, request)
@@ -773,3 +1140,32 @@ class CameraBaseImageServicer(image_service_pb2_grpc.ImageServiceServicer):
     def __del__(self):
         for source in self.image_sources_mapped.values():
             source.stop_capturing()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
+def _format_image_timings(timings):
+    """Encode ImageTimings as the string value of the image timing metadata."""
+    return ';'.join('%s=%.6f,%.6f' % timing for timing in timings)
+
+
+def image_timings_from_metadata(metadata):
+    """Get the per-source timing of a GetImage request from the trailing metadata of the RPC.
+
+    Args:
+        metadata: The trailing metadata of a GetImage call, as a sequence of (key, value) pairs.
+
+    Returns:
+        A list of ImageTiming in the order of the image requests, or an empty list if the image
+        service did not report timing.
+    """
+    for key, value in metadata or ():
+        if key != IMAGE_TIMING_METADATA_KEY or not value:
+            continue
+        timings = []
+        for entry in value.split(';'):
+            source_name, _, secs = entry.rpartition('=')
+            capture_secs, decode_secs = secs.split(',')
+            timings.append(ImageTiming(source_name, float(capture_secs), float(decode_secs)))
+        return timings
+    return []
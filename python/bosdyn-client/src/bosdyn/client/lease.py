@@ -738,6 +738,8 @@ class LeaseWalletRequestProcessor(object):
                         to use the default resource.
     """
 
+    mutated_fields = ('lease', 'leases')
+
     def __init__(self, lease_wallet, resource_list=None):
         self.lease_wallet = lease_wallet
         if resource_list is None:
@@ -802,6 +804,8 @@ class LeaseWalletResponseProcessor(object):
         lease_wallet: Lease wallet to use.
     """
 
+    mutated_fields = ()
+
     def __init__(self, lease_wallet):
         self.lease_wallet = lease_wallet
 
@@ -874,11 +878,14 @@ class LeaseKeepAlive(object):
         warnings(bool): Used to determine if the _periodic_check_in function will print lease check-in errors.
         must_acquire(bool): If True, exceptions when trying to acquire the lease will not be caught.
         return_at_exit(bool): If True, return the lease when shutting down.
+        scheduler(HeartbeatScheduler): If specified, issue the liveness checks as async RPCs from
+                the scheduler's thread rather than from a thread of this object.
     """
 
     def __init__(self, lease_client, lease_wallet=None, resource=_RESOURCE_BODY,
                  rpc_interval_seconds=2, keep_running_cb=None, host_name="",
-                 on_failure_callback=None, warnings=True, must_acquire=False, return_at_exit=False):
+                 on_failure_callback=None, warnings=True, must_acquire=False, return_at_exit=False,
+                 scheduler=None):
         """Create a new LeaseKeepAlive object."""
         self.host_name = host_name
         self.print_warnings = warnings
@@ -921,10 +928,17 @@ class LeaseKeepAlive(object):
         # If the on_failure_callback is not provided, then set the default as a no-op function.
         self._retain_lease_failed_cb = on_failure_callback or (lambda err: None)
 
-        # Configure the thread to do check-ins, and begin checking in.
-        self._thread = threading.Thread(target=self._periodic_check_in)
-        self._thread.daemon = True
-        self._thread.start()
+        # Configure the thread or heartbeat to do check-ins, and begin checking in.
+        self._thread = None
+        self._heartbeat = None
+        if scheduler is None:
+            self._thread = threading.Thread(target=self._periodic_check_in)
+            self._thread.daemon = True
+            self._thread.start()
+        else:
+            self.logger.info('Starting lease check-in')
+            self._heartbeat = scheduler.add('lease check-in {}'.format(self._resource),
+                                            self._scheduled_check_in, self._rpc_interval_seconds)
 
     def shutdown(self):
         """Shut the background thread down and stop the liveness checks.
@@ -945,6 +959,8 @@ class LeaseKeepAlive(object):
                 _LOGGER.error('Failed to return the lease at the end: %s', exc)
 
     def is_alive(self):
+        if self._heartbeat is not None:
+            return self._heartbeat.is_active()
         return self._thread.is_alive()
 
     @property
@@ -959,12 +975,17 @@ class LeaseKeepAlive(object):
 
         However, this can be useful in unit tests for ensuring exits.
         """
-        self._thread.join()
+        if self._heartbeat is not None:
+            self._heartbeat.wait()
+        else:
+            self._thread.join()
 
     def _end_periodic_check_in(self):
         """Stop checking into the Lease system."""
         self.logger.debug('Stopping check-in')
         self._end_check_in_signal.set()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
 
     def __enter__(self):
         return self
@@ -999,11 +1020,7 @@ class LeaseKeepAlive(object):
             # We really do want to catch anything.
             #pylint: disable=broad-except
             except Exception as exc:
-                if self.print_warnings:
-                    self.logger.warning(
-                        'Generic exception for %s during check-in:\n%s\n'
-                        '    (resuming check-in)', self.host_name, exc)
-                self._retain_lease_failed_cb(exc)
+                self._check_in_failed(exc)
             else:
                 # No errors!
                 self._ok()
@@ -1019,6 +1036,45 @@ class LeaseKeepAlive(object):
                 break
         self.logger.info('Lease check-in stopped')
 
+    def _check_in_failed(self, exc):
+        """Report a failed check-in, which will be retried at the next one."""
+        if self.print_warnings:
+            self.logger.warning(
+                'Generic exception for %s during check-in:\n%s\n'
+                '    (resuming check-in)', self.host_name, exc)
+        self._retain_lease_failed_cb(exc)
+
+    def _scheduled_check_in(self):
+        """Start one liveness check from the HeartbeatScheduler's thread.
+
+        Returns:
+            The future of the RetainLease RPC, or None if no RPC was started.
+        """
+        if self._end_check_in_signal.is_set() or not self._keep_running():
+            self._end_periodic_check_in()
+            self.logger.info('Lease check-in stopped')
+            return None
+        try:
+            lease = self._lease_wallet.get_lease(self._resource)
+            if not lease:
+                return None
+            future = self._lease_client.retain_lease_async(lease)
+        #pylint: disable=broad-except
+        except Exception as exc:
+            self._check_in_failed(exc)
+            return None
+        future.add_done_callback(self._check_in_done)
+        return future
+
+    def _check_in_done(self, future):
+        try:
+            future.result()
+        #pylint: disable=broad-except
+        except Exception as exc:
+            self._check_in_failed(exc)
+        else:
+            self._ok()
+
 
 def test_active_lease(incoming_lease_proto, active_lease, sublease_name=None,
                       allow_super_leases=False):
@@ -273,6 +273,8 @@ class LeaseValidatorResponseProcessor:  # pylint: disable=too-few-public-methods
         lease_validator (LeaseValidator): validator for a specific robot to be updated.
     """
 
+    mutated_fields = ()
+
     def __init__(self, lease_validator):
         self.lease_validator = lease_validator
 
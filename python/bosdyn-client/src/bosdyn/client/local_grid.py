@@ -4,10 +4,16 @@
 # is subject to the terms and conditions of the Boston Dynamics Software
 # Development Kit License (20191101-BDSDK-SL).
 
-"""Client support for the LocalGridService."""
+"""Client support for the LocalGridService, and decoding of the returned local grids."""
+
+import threading
+from collections import namedtuple
+
+import numpy as np
 
 from bosdyn.api import local_grid_pb2, local_grid_service_pb2_grpc
 from bosdyn.client.common import BaseClient, common_header_errors
+from bosdyn.client.frame_helpers import get_a_tform_b
 
 
 class LocalGridClient(BaseClient):
@@ -70,3 +76,271 @@ class LocalGridClient(BaseClient):
                                value_from_response=lambda res: res.local_grid_responses,
                                error_from_response=common_header_errors, copy_request=False,
                                **kwargs)
+
+
+_CELL_FORMAT_TO_DTYPE = {
+    local_grid_pb2.LocalGrid.CELL_FORMAT_FLOAT32: np.dtype('<f4'),
+    local_grid_pb2.LocalGrid.CELL_FORMAT_FLOAT64: np.dtype('<f8'),
+    local_grid_pb2.LocalGrid.CELL_FORMAT_INT8: np.dtype('i1'),
+    local_grid_pb2.LocalGrid.CELL_FORMAT_UINT8: np.dtype('u1'),
+    local_grid_pb2.LocalGrid.CELL_FORMAT_INT16: np.dtype('<i2'),
+    local_grid_pb2.LocalGrid.CELL_FORMAT_UINT16: np.dtype('<u2'),
+}
+
+
+def _as_local_grid(local_grid):
+    """Accept either a LocalGrid or a LocalGridResponse."""
+    if isinstance(local_grid, local_grid_pb2.LocalGridResponse):
+        return local_grid.local_grid
+    return local_grid
+
+
+def cell_format_to_numpy_type(cell_format):
+    """Convert a LocalGrid.CellFormat to the numpy dtype of the encoded cells.
+
+    Raises:
+        ValueError: The cell format is not known.
+    """
+    try:
+        return _CELL_FORMAT_TO_DTYPE[cell_format]
+    except KeyError:
+        raise ValueError('Local grid CellFormat {} not supported'.format(cell_format))
+
+
+def decode_local_grid(local_grid, apply_scale=True, dtype=np.float64, out=None):
+    """Decode the cells of a local grid into a 2D numpy array.
+
+    The cells are expanded from their encoding with vectorized numpy operations, and the
+    cell_value_scale and cell_value_offset are applied.
+
+    Args:
+        local_grid (local_grid_pb2.LocalGrid or LocalGridResponse): The local grid to decode.
+        apply_scale (bool): If False, return the cells in their encoded type, without applying
+                            cell_value_scale and cell_value_offset.
+        dtype: Floating point type of the cells when the scale and offset are applied.
+        out: Optional array of the shape and type of the result to decode into, instead of
+             allocating a new one.
+
+    Returns:
+        A numpy array of shape (num_cells_y, num_cells_x), such that the cell at [yj, xi] has its
+        center at {(xi + 0.5) * cell_size, (yj + 0.5) * cell_size} in the local grid frame. The
+        array is in the encoded cell type if there is no scale and offset to apply, and may be a
+        read-only view of the proto data for raw encoded grids.
+
+    Raises:
+        ValueError: The cell format or encoding is not supported, or the data does not match the
+                    extent of the grid.
+    """
+    local_grid = _as_local_grid(local_grid)
+    cell_type = cell_format_to_numpy_type(local_grid.cell_format)
+    num_cells_x = local_grid.extent.num_cells_x
+    num_cells_y = local_grid.extent.num_cells_y
+    if len(local_grid.data) % cell_type.itemsize:
+        raise ValueError('Local grid data length {} is not a multiple of the cell size {}'.format(
+            len(local_grid.data), cell_type.itemsize))
+    values = np.frombuffer(local_grid.data, dtype=cell_type)
+    if local_grid.encoding == local_grid_pb2.LocalGrid.ENCODING_RLE:
+        if len(local_grid.rle_counts) != len(values):
+            raise ValueError('Local grid has {} rle_counts for {} encoded values'.format(
+                len(local_grid.rle_counts), len(values)))
+        # Reading the repeated field is the slowest step, and fromiter is the fastest way to do it.
+        rle_counts = np.fromiter(local_grid.rle_counts, dtype=np.int64,
+                                 count=len(local_grid.rle_counts))
+        values = np.repeat(values, rle_counts)
+    elif local_grid.encoding != local_grid_pb2.LocalGrid.ENCODING_RAW:
+        raise ValueError('Local grid Encoding {} not supported'.format(local_grid.encoding))
+    if len(values) != num_cells_x * num_cells_y:
+        raise ValueError('Local grid has {} cells, but its extent is {}x{}'.format(
+            len(values), num_cells_x, num_cells_y))
+    values = values.reshape(num_cells_y, num_cells_x)
+
+    scale = local_grid.cell_value_scale
+    offset = local_grid.cell_value_offset
+    if not apply_scale or (scale == 0 and offset == 0):
+        if out is None:
+            return values
+        out[...] = values
+        return out
+    if out is None:
+        cells = values.astype(dtype)
+    else:
+        cells = out
+        cells[...] = values
+    # The scale is only valid if it is non-zero.
+    if scale != 0:
+        cells *= scale
+    if offset != 0:
+        cells += offset
+    return cells
+
+
+def decode_unknown_cells(local_grid):
+    """Decode the map of unknown cells of a local grid.
+
+    Args:
+        local_grid (local_grid_pb2.LocalGrid or LocalGridResponse): The local grid to decode.
+
+    Returns:
+        A boolean numpy array of shape (num_cells_y, num_cells_x), True where a cell is unknown,
+        or None if the local grid has no unknown cells map.
+    """
+    local_grid = _as_local_grid(local_grid)
+    if not local_grid.unknown_cells:
+        return None
+    unknown = np.frombuffer(local_grid.unknown_cells, dtype=np.uint8)
+    return unknown.reshape(local_grid.extent.num_cells_y, local_grid.extent.num_cells_x) != 0
+
+
+def local_grid_cell_centers(local_grid, frame_name=None, heights=None):
+    """Compute the position of the center of each cell of a local grid.
+
+    Args:
+        local_grid (local_grid_pb2.LocalGrid or LocalGridResponse): The local grid.
+        frame_name (string): Frame in which to express the positions, which must be in the
+                             transforms_snapshot of the local grid. By default, the local grid frame.
+        heights: Optional array of shape (num_cells_y, num_cells_x) with the z coordinate of each
+                 cell in the local grid frame, such as a decoded terrain grid. By default, 0.
+
+    Returns:
+        A numpy array of shape (num_cells_y, num_cells_x, 3) with the (x, y, z) position of the
+        center of the cell at [yj, xi].
+
+    Raises:
+        ValueError: The local grid frame is not connected to frame_name in the snapshot.
+    """
+    local_grid = _as_local_grid(local_grid)
+    extent = local_grid.extent
+    centers = np.empty((extent.num_cells_y, extent.num_cells_x, 3))
+    centers[:, :, 0] = (np.arange(extent.num_cells_x) + 0.5) * extent.cell_size
+    centers[:, :, 1] = ((np.arange(extent.num_cells_y) + 0.5) * extent.cell_size)[:, np.newaxis]
+    centers[:, :, 2] = 0 if heights is None else heights
+    if frame_name is None or frame_name == local_grid.frame_name_local_grid_data:
+        return centers
+    frame_tform_grid = get_a_tform_b(local_grid.transforms_snapshot, frame_name,
+                                     local_grid.frame_name_local_grid_data)
+    if frame_tform_grid is None:
+        raise ValueError('Frame {} is not connected to local grid frame {}'.format(
+            frame_name, local_grid.frame_name_local_grid_data))
+    transform = frame_tform_grid.to_matrix()
+    # Transform in place through a flat view, so no temporary copy of the points is kept.
+    points = centers.reshape(-1, 3)
+    points[:] = points @ transform[:3, :3].T
+    points += transform[:3, 3]
+    return centers
+
+
+CachedLocalGrid = namedtuple('CachedLocalGrid',
+                             ['local_grid', 'cells', 'unknown_cells', 'acquisition_time_nsec'])
+CachedLocalGrid.__doc__ = """A local grid held by a LocalGridCache.
+
+    local_grid: The LocalGrid proto.
+    cells: The cells, as returned by decode_local_grid().
+    unknown_cells: The map of unknown cells, as returned by decode_unknown_cells().
+    acquisition_time_nsec: The acquisition time of the local grid, in robot clock nanoseconds.
+"""
+
+
+class LocalGridCache:
+    """Cache of decoded local grids, which only decodes grids which have changed.
+
+    Grids are kept by type name and acquisition time, and a grid with the same acquisition time as
+    the cached grid of its type is not decoded again. Consumers can use changed_since() to only
+    redo their work when a grid changes.
+
+    By default, when a new grid has the same extent and cell type as the cached grid of its type,
+    it is decoded into the arrays of the cached grid rather than into new ones. Copy the cells to
+    keep them across updates, or pass reuse_arrays=False.
+    """
+
+    def __init__(self, local_grid_client=None, apply_scale=True, dtype=np.float64,
+                 reuse_arrays=True):
+        """
+        Args:
+            local_grid_client (LocalGridClient): Client used by fetch(), if any.
+            apply_scale (bool): Passed to decode_local_grid().
+            dtype: Passed to decode_local_grid().
+            reuse_arrays (bool): Decode new grids into the arrays of the cached grids when possible.
+        """
+        self._client = local_grid_client
+        self._apply_scale = apply_scale
+        self._dtype = dtype
+        self._reuse_arrays = reuse_arrays
+        self._lock = threading.Lock()
+        self._grids = {}  # local grid type name -> CachedLocalGrid
+
+    def fetch(self, local_grid_type_names, **kwargs):
+        """Get local grids from the robot and update the cache with them.
+
+        Args:
+            local_grid_type_names (list of strings): Types of the local grids to request.
+
+        Returns:
+            A list of the type names of the grids which changed.
+
+        Raises:
+            RpcError: Problem communicating with the robot.
+            ValueError: A grid could not be decoded.
+        """
+        return self.update(self._client.get_local_grids(local_grid_type_names, **kwargs))
+
+    def update(self, local_grid_responses):
+        """Update the cache with the local grids of some LocalGridResponses.
+
+        Responses without a grid, and grids with the same acquisition time as the cached grid of
+        their type, are skipped without decoding.
+
+        Returns:
+            A list of the type names of the grids which changed.
+
+        Raises:
+            ValueError: A grid could not be decoded.
+        """
+        changed = []
+        with self._lock:
+            for response in local_grid_responses:
+                if response.status != local_grid_pb2.LocalGridResponse.STATUS_OK:
+                    continue
+                local_grid = response.local_grid
+                name = local_grid.local_grid_type_name or response.local_grid_type_name
+                acquisition_time_nsec = local_grid.acquisition_time.ToNanoseconds()
+                cached = self._grids.get(name)
+                if cached is not None and cached.acquisition_time_nsec == acquisition_time_nsec:
+                    continue
+                self._grids[name] = CachedLocalGrid(local_grid, self._decode(local_grid, cached),
+                                                    decode_unknown_cells(local_grid),
+                                                    acquisition_time_nsec)
+                changed.append(name)
+        return changed
+
+    def get(self, local_grid_type_name):
+        """Get the cached grid of a type, as a CachedLocalGrid, or None if there is none."""
+        with self._lock:
+            return self._grids.get(local_grid_type_name)
+
+    def changed_since(self, acquisition_time_nsec):
+        """Get the type names of the cached grids acquired after a time, in robot clock nsec.
+
+        Pass the acquisition_time_nsec of the last grid that was processed, to find the grids
+        which need to be processed again.
+        """
+        with self._lock:
+            return [
+                name for name, cached in self._grids.items()
+                if cached.acquisition_time_nsec > acquisition_time_nsec
+            ]
+
+    def clear(self):
+        """Remove all grids from the cache."""
+        with self._lock:
+            self._grids.clear()
+
+    def _decode(self, local_grid, cached):
+        out = None
+        if self._reuse_arrays and cached is not None and cached.cells.flags.writeable:
+            scaled = self._apply_scale and (local_grid.cell_value_scale != 0 or
+                                            local_grid.cell_value_offset != 0)
+            dtype = self._dtype if scaled else cell_format_to_numpy_type(local_grid.cell_format)
+            shape = (local_grid.extent.num_cells_y, local_grid.extent.num_cells_x)
+            if cached.cells.shape == shape and cached.cells.dtype == dtype:
+                out = cached.cells
+        return decode_local_grid(local_grid, self._apply_scale, self._dtype, out=out)
@@ -10,7 +10,8 @@ import numbers
 import numpy
 from deprecated.sphinx import deprecated
 
-from bosdyn.api import geometry_pb2
+from bosdyn.api import geometry_pb2, trajectory_pb2
+from bosdyn.util import duration_to_seconds, seconds_to_duration
 
 
 def recenter_value_mod(value, center, amplitude):
@@ -38,6 +39,8 @@ def angle_diff_degrees(a1, a2):
 class Vec2(object):
     """Class representing a two-dimensional vector."""
 
+    __slots__ = ('x', 'y')
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
@@ -117,6 +120,8 @@ class Vec2(object):
 class Vec3(object):
     """Class representing a three-dimensional vector."""
 
+    __slots__ = ('x', 'y', 'z')
+
     def __init__(self, x, y, z):
         self.x = x
         self.y = y
@@ -212,6 +217,8 @@ class Vec3(object):
 class SE2Pose(object):
     """Class representing an SE2Pose with position and angle."""
 
+    __slots__ = ('x', 'y', 'angle')
+
     def __init__(self, x, y, angle):
         self.x = x
         self.y = y
@@ -263,6 +270,18 @@ class SE2Pose(object):
         s = math.sin(self.angle)
         return SE2Pose(-self.x * c - self.y * s, self.x * s - self.y * c, -self.angle)
 
+    def inverse_into(self, out):
+        """Computes the inverse of the math_helpers.SE2Pose into the existing SE2Pose 'out'.
+
+        'out' may be self. Returns 'out'.
+        """
+        c = math.cos(self.angle)
+        s = math.sin(self.angle)
+        x = -self.x * c - self.y * s
+        y = self.x * s - self.y * c
+        out.x, out.y, out.angle = x, y, -self.angle
+        return out
+
     def mult(self, se2pose):
         """
         Computes the multiplication between the current math_helpers.SE2Pose and the input se2pose.
@@ -281,6 +300,19 @@ class SE2Pose(object):
         return SE2Pose(self.x + rotated_pos[0], self.y + rotated_pos[1],
                        recenter_angle_mod(self.angle + se2pose.angle, 0.0))
 
+    def mult_into(self, se2pose, out):
+        """Computes the multiplication of the current math_helpers.SE2Pose and se2pose into the
+        existing SE2Pose 'out', without allocating a new pose.
+
+        'out' may be self or se2pose. Returns 'out'.
+        """
+        c = math.cos(self.angle)
+        s = math.sin(self.angle)
+        x = self.x + (c * se2pose.x - s * se2pose.y)
+        y = self.y + (s * se2pose.x + c * se2pose.y)
+        out.x, out.y, out.angle = x, y, recenter_angle_mod(self.angle + se2pose.angle, 0.0)
+        return out
+
     def __mul__(self, other):
         """Overrides the '*' symbol to compute the multiplication between two SE(2) poses,
         or between an SE(2) pose and a Vec2"""
@@ -361,6 +393,8 @@ class SE2Pose(object):
 class SE2Velocity(object):
     """Class representing an SE2Velocity with linear velocity and angular velocity."""
 
+    __slots__ = ('linear_velocity_x', 'linear_velocity_y', 'angular_velocity')
+
     def __init__(self, x, y, angular):
         self.linear_velocity_x = float(x)
         self.linear_velocity_y = float(y)
@@ -441,6 +475,9 @@ class SE2Velocity(object):
 class SE3Velocity(object):
     """Class representing an SE3Velocity with linear velocity and angular velocity."""
 
+    __slots__ = ('linear_velocity_x', 'linear_velocity_y', 'linear_velocity_z',
+                 'angular_velocity_x', 'angular_velocity_y', 'angular_velocity_z')
+
     def __init__(self, lin_x, lin_y, lin_z, ang_x, ang_y, ang_z):
         self.linear_velocity_x = float(lin_x)
         self.linear_velocity_y = float(lin_y)
@@ -538,6 +575,10 @@ class SE3Velocity(object):
 class SE3Pose(object):
     """Class representing an SE3Pose with position and rotation."""
 
+    # The matrix form is cached along with the values it was computed from, so that mutating the
+    # pose (including its rotation) invalidates it.
+    __slots__ = ('x', 'y', 'z', 'rot', '_matrix', '_matrix_key')
+
     def __init__(self, x, y, z, rot):
         self.x = x
         self.y = y
@@ -547,6 +588,8 @@ class SE3Pose(object):
         if isinstance(rot, geometry_pb2.Quaternion):
             rot = Quat.from_proto(rot)
         self.rot = rot
+        self._matrix = None
+        self._matrix_key = None
 
     def __str__(self):
         return 'position -- X: %0.3f Y: %0.3f Z: %0.3f rotation -- %s' % (self.x, self.y, self.z,
@@ -601,6 +644,17 @@ class SE3Pose(object):
         (x, y, z) = inv_rot.transform_point(self.x, self.y, self.z)
         return SE3Pose(-x, -y, -z, inv_rot)
 
+    def inverse_into(self, out):
+        """Computes the inverse of the math_helpers.SE3Pose into the existing SE3Pose 'out'.
+
+        'out' may be self. Returns 'out'.
+        """
+        rot = self.rot
+        (x, y, z) = _quat_transform_point(rot.w, -rot.x, -rot.y, -rot.z, self.x, self.y, self.z)
+        rot.inverse_into(out.rot)
+        out.x, out.y, out.z = -x, -y, -z
+        return out
+
     def transform_point(self, x, y, z):
         """
         Compute the transformation (translation and rotation) of a (x,y,z) vector using the
@@ -653,12 +707,24 @@ class SE3Pose(object):
         trans = transform[0:3, 3]
         return (numpy.dot(points, rot.T) + trans)
 
-    def to_matrix(self):
-        """Returns the 4x4 matrix to transform a 3D point (in generalized coordinates)."""
-        ret = numpy.eye(4)
-        ret[0:3, 0:3] = self.rot.to_matrix()
-        ret[0:3, 3] = [self.x, self.y, self.z]
-        return ret
+    def to_matrix(self, out=None):
+        """Returns the 4x4 matrix to transform a 3D point (in generalized coordinates).
+
+        The matrix is cached until the pose is modified. If 'out' is given, the matrix is written
+        into that 4x4 array and 'out' is returned, which avoids allocating a new array.
+        """
+        rot = self.rot
+        key = (self.x, self.y, self.z, rot.w, rot.x, rot.y, rot.z)
+        if key != self._matrix_key:
+            matrix = numpy.eye(4)
+            rot.to_matrix(out=matrix[0:3, 0:3])
+            matrix[0:3, 3] = key[0:3]
+            self._matrix = matrix
+            self._matrix_key = key
+        if out is None:
+            return self._matrix.copy()
+        out[...] = self._matrix
+        return out
 
     def translation_norm(self):
         """Calculates the Euclidean norm (magnitude) of the translation component pose."""
@@ -680,6 +746,20 @@ class SE3Pose(object):
         (x, y, z) = self.rot.transform_point(se3pose.x, se3pose.y, se3pose.z)
         return SE3Pose(self.x + x, self.y + y, self.z + z, self.rot.mult(se3pose.rot))
 
+    def mult_into(self, se3pose, out):
+        """Computes the multiplication of the current math_helpers.SE3Pose and se3pose into the
+        existing SE3Pose 'out', without allocating a new pose.
+
+        'out' may be self or se3pose. Returns 'out'.
+        """
+        (x, y, z) = self.rot.transform_point(se3pose.x, se3pose.y, se3pose.z)
+        x += self.x
+        y += self.y
+        z += self.z
+        self.rot.mult_into(se3pose.rot, out.rot)
+        out.x, out.y, out.z = x, y, z
+        return out
+
     def __mul__(self, other):
         """Overrides the '*' symbol to compute the multiplication between two SE(3) poses,
         or between an SE(3) pose and a Vec3."""
@@ -689,6 +769,8 @@ class SE3Pose(object):
         if isinstance(other, SE3Pose):
             (x, y, z) = self.rot.transform_point(other.x, other.y, other.z)
             return SE3Pose(self.x + x, self.y + y, self.z + z, self.rot.mult(other.rot))
+        if isinstance(other, SE3PoseArray):
+            return SE3PoseArray(_se3_mult_arrays(_se3_data(self), other.data))
         else:
             raise TypeError("Can't multiply types %s and %s." % (type(self), type(other)))
 
@@ -768,11 +850,17 @@ class SE3Pose(object):
 class Quat(object):
     """Class representing a Quaternion."""
 
+    # The matrix form is cached along with the values it was computed from, so that mutating the
+    # quaternion invalidates it.
+    __slots__ = ('w', 'x', 'y', 'z', '_matrix', '_matrix_key')
+
     def __init__(self, w=1, x=0, y=0, z=0):
         self.w = w
         self.x = x
         self.y = y
         self.z = z
+        self._matrix = None
+        self._matrix_key = None
 
     def __repr__(self):
         return 'W: %0.4f X: %0.4f Y: %0.4f Z: %0.4f' % (self.w, self.x, self.y, self.z)
@@ -781,14 +869,18 @@ class Quat(object):
         """Computes the inverse of the current math_helpers.Quat."""
         return Quat(self.w, -self.x, -self.y, -self.z)
 
+    def inverse_into(self, out):
+        """Computes the inverse of the current math_helpers.Quat into the existing Quat 'out'.
+
+        'out' may be self. Returns 'out'.
+        """
+        out.w, out.x, out.y, out.z = self.w, -self.x, -self.y, -self.z
+        return out
+
     def transform_point(self, x, y, z):
         """Computes the transformation (rotation by the quaternion) of a single (x,y,z)
             point using the current math_helpers.Quat."""
-        inv = self.inverse()
-        q = Quat(0, x, y, z)
-        q = q.mult(inv)
-        q = self.mult(q)
-        return (q.x, q.y, q.z)
+        return _quat_transform_point(self.w, self.x, self.y, self.z, x, y, z)
 
     def transform_vec3(self, vec3):
         """Computes the transformation (rotation by the quaternion) of a Vec3
@@ -796,22 +888,27 @@ class Quat(object):
         x, y, z = self.transform_point(vec3.x, vec3.y, vec3.z)
         return geometry_pb2.Vec3(x=x, y=y, z=z)
 
-    def to_matrix(self):
-        """Creates the 3x3 numpy rotation matrix from the current math_helpers.Quat"""
-        ret = numpy.eye(3)
-        ret[0, 0] = 1.0 - 2.0 * self.y * self.y - 2.0 * self.z * self.z
-        ret[0, 1] = 2.0 * self.x * self.y - 2.0 * self.z * self.w
-        ret[0, 2] = 2.0 * self.x * self.z + 2.0 * self.y * self.w
-
-        ret[1, 0] = 2.0 * self.x * self.y + 2.0 * self.z * self.w
-        ret[1, 1] = 1.0 - 2.0 * self.x * self.x - 2.0 * self.z * self.z
-        ret[1, 2] = 2.0 * self.y * self.z - 2.0 * self.x * self.w
+    def to_matrix(self, out=None):
+        """Creates the 3x3 numpy rotation matrix from the current math_helpers.Quat
 
-        ret[2, 0] = 2.0 * self.x * self.z - 2.0 * self.y * self.w
-        ret[2, 1] = 2.0 * self.y * self.z + 2.0 * self.x * self.w
-        ret[2, 2] = 1.0 - 2.0 * self.x * self.x - 2.0 * self.y * self.y
-
-        return ret
+        The matrix is cached until the quaternion is modified. If 'out' is given, the matrix is
+        written into that 3x3 array and 'out' is returned, which avoids allocating a new array.
+        """
+        w, x, y, z = key = (self.w, self.x, self.y, self.z)
+        if key != self._matrix_key:
+            self._matrix = numpy.array([
+                [1.0 - 2.0 * y * y - 2.0 * z * z, 2.0 * x * y - 2.0 * z * w,
+                 2.0 * x * z + 2.0 * y * w],
+                [2.0 * x * y + 2.0 * z * w, 1.0 - 2.0 * x * x - 2.0 * z * z,
+                 2.0 * y * z - 2.0 * x * w],
+                [2.0 * x * z - 2.0 * y * w, 2.0 * y * z + 2.0 * x * w,
+                 1.0 - 2.0 * x * x - 2.0 * y * y],
+            ], dtype=numpy.float64)
+            self._matrix_key = key
+        if out is None:
+            return self._matrix.copy()
+        out[...] = self._matrix
+        return out
 
     @staticmethod
     def from_matrix(rot):
@@ -951,6 +1048,20 @@ class Quat(object):
             self.w * other_quat.z + self.x * other_quat.y - self.y * other_quat.x +
             self.z * other_quat.w)
 
+    def mult_into(self, other_quat, out):
+        """Computes the multiplication of two math_helpers.Quats into the existing Quat 'out',
+        without allocating a new quaternion.
+
+        'out' may be self or other_quat. Returns 'out'.
+        """
+        w, x, y, z = self.w, self.x, self.y, self.z
+        ow, ox, oy, oz = other_quat.w, other_quat.x, other_quat.y, other_quat.z
+        out.w, out.x, out.y, out.z = (w * ow - x * ox - y * oy - z * oz,
+                                      w * ox + x * ow + y * oz - z * oy,
+                                      w * oy - x * oz + y * ow + z * ox,
+                                      w * oz + x * oy - y * ox + z * ow)
+        return out
+
     def __mul__(self, other):
         """Overrides the '*' symbol to compute the multiplication between two math_helpers.Quats
         or between a Quat and a Vec3."""
@@ -959,6 +1070,8 @@ class Quat(object):
             return Vec3(x, y, z)
         if isinstance(other, Quat):
             return self.mult(other)
+        if isinstance(other, QuatArray):
+            return QuatArray(_quat_mult_arrays(_quat_data(self), other.data))
         raise TypeError("Can't multiply types %s and %s." % (type(self), type(other)))
 
     def normalize(self):
@@ -1073,6 +1186,487 @@ class Quat(object):
         return Quat(self.w, -self.x, -self.y, -self.z)
 
 
+def _quat_mult_arrays(a, b):
+    """Hamilton product of two (..., 4) arrays of [w, x, y, z] quaternions."""
+    aw, ax, ay, az = a[..., 0], a[..., 1], a[..., 2], a[..., 3]
+    bw, bx, by, bz = b[..., 0], b[..., 1], b[..., 2], b[..., 3]
+    return numpy.stack([
+        aw * bw - ax * bx - ay * by - az * bz,
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+    ], axis=-1)
+
+
+def _quat_rotate_arrays(q, points):
+    """Rotates (..., 3) points by (..., 4) [w, x, y, z] quaternions, broadcasting leading axes."""
+    w = q[..., :1]
+    xyz = q[..., 1:]
+    # Equivalent to q * (0, p) * q^-1 for unit quaternions, without the intermediate products.
+    t = 2.0 * numpy.cross(xyz, points)
+    return points + w * t + numpy.cross(xyz, t)
+
+
+class QuatArray(object):
+    """Class representing N quaternions, stored as an Nx4 numpy array of [w, x, y, z] rows.
+
+    The operations mirror those of math_helpers.Quat, but are computed for all quaternions at once.
+    """
+
+    def __init__(self, data):
+        data = numpy.asarray(data, dtype=numpy.float64)
+        if data.ndim == 1:
+            data = data.reshape(1, -1)
+        if data.ndim != 2 or data.shape[1] != 4:
+            raise ValueError('Expected an Nx4 array of quaternions, got shape %s.' % (data.shape,))
+        self.data = data
+
+    def __repr__(self):
+        return 'QuatArray(%d quaternions)' % len(self)
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    def __getitem__(self, idx):
+        """Returns a math_helpers.Quat for an integer index, and a QuatArray otherwise."""
+        if isinstance(idx, numbers.Integral):
+            return Quat(*self.data[idx].tolist())
+        return QuatArray(self.data[idx])
+
+    def __iter__(self):
+        for row in self.data.tolist():
+            yield Quat(*row)
+
+    @property
+    def w(self):
+        return self.data[:, 0]
+
+    @property
+    def x(self):
+        return self.data[:, 1]
+
+    @property
+    def y(self):
+        return self.data[:, 2]
+
+    @property
+    def z(self):
+        return self.data[:, 3]
+
+    @staticmethod
+    def from_quats(quats):
+        """Create a QuatArray from an iterable of math_helpers.Quat."""
+        return QuatArray(numpy.array([(q.w, q.x, q.y, q.z) for q in quats],
+                                     dtype=numpy.float64).reshape(-1, 4))
+
+    @staticmethod
+    def from_proto(protos):
+        """Create a QuatArray from an iterable of geometry_pb2.Quaternion protos."""
+        return QuatArray.from_quats(protos)
+
+    @staticmethod
+    def from_identity(num):
+        """Create a QuatArray of 'num' identity quaternions."""
+        data = numpy.zeros((num, 4))
+        data[:, 0] = 1.0
+        return QuatArray(data)
+
+    def to_quats(self):
+        """Converts the QuatArray into a list of math_helpers.Quat."""
+        return list(self)
+
+    def to_proto(self):
+        """Converts the QuatArray into a list of geometry_pb2.Quaternion protos."""
+        return [geometry_pb2.Quaternion(w=w, x=x, y=y, z=z) for w, x, y, z in self.data.tolist()]
+
+    def inverse(self):
+        """Computes the inverse (conjugate) of every quaternion."""
+        return QuatArray(self.data * numpy.array([1.0, -1.0, -1.0, -1.0]))
+
+    def mult(self, other):
+        """Computes the element-wise multiplication with 'other'.
+
+        Inputs:
+            other (QuatArray or math_helpers.Quat): A QuatArray of the same length, or a single
+                Quat which is multiplied with every element.
+
+        Returns:
+            QuatArray representing self[i] * other[i].
+        """
+        return QuatArray(_quat_mult_arrays(self.data, _quat_data(other)))
+
+    def __mul__(self, other):
+        """Overrides the '*' symbol to compute the element-wise multiplication of quaternions."""
+        if isinstance(other, (QuatArray, Quat)):
+            return self.mult(other)
+        raise TypeError("Can't multiply types %s and %s." % (type(self), type(other)))
+
+    def transform_points(self, points):
+        """Rotates points[i] by the i-th quaternion.
+
+        Inputs:
+            points (Nx3 numpy array, or a single 3 element point applied to every quaternion)
+
+        Returns:
+            Nx3 numpy array of the rotated points.
+        """
+        return _quat_rotate_arrays(self.data, numpy.asarray(points, dtype=numpy.float64))
+
+    def to_matrix(self):
+        """Creates an Nx3x3 numpy array of rotation matrices."""
+        w, x, y, z = self.data.T
+        ret = numpy.empty((len(self), 3, 3))
+        ret[:, 0, 0] = 1.0 - 2.0 * y * y - 2.0 * z * z
+        ret[:, 0, 1] = 2.0 * x * y - 2.0 * z * w
+        ret[:, 0, 2] = 2.0 * x * z + 2.0 * y * w
+
+        ret[:, 1, 0] = 2.0 * x * y + 2.0 * z * w
+        ret[:, 1, 1] = 1.0 - 2.0 * x * x - 2.0 * z * z
+        ret[:, 1, 2] = 2.0 * y * z - 2.0 * x * w
+
+        ret[:, 2, 0] = 2.0 * x * z - 2.0 * y * w
+        ret[:, 2, 1] = 2.0 * y * z + 2.0 * x * w
+        ret[:, 2, 2] = 1.0 - 2.0 * x * x - 2.0 * y * y
+        return ret
+
+    @staticmethod
+    def from_matrix(rots):
+        """Creates a QuatArray from an Nx3x3 numpy array of rotation matrices."""
+        return QuatArray.from_quats(Quat.from_matrix(rot) for rot in numpy.asarray(rots))
+
+    def to_yaw(self):
+        """Computes the Euler angle yaw of every quaternion, like math_helpers.Quat.to_yaw."""
+        w, x, y, z = self.data.T
+        mag = numpy.hypot(w, z)
+        # Ill posed quaternions are rotated 180 degrees around the y-axis, as in
+        # Quat.closest_yaw_only_quaternion.
+        ill_posed = mag == 0
+        yaw_w = numpy.where(ill_posed, -y, w)
+        yaw_z = numpy.where(ill_posed, -x, z)
+        yaw = 2 * numpy.arctan2(yaw_z, yaw_w)
+        return (yaw + math.pi) % (2 * math.pi) - math.pi
+
+    def normalize(self):
+        """Normalizes every quaternion in place. Zero length quaternions become the identity."""
+        length = numpy.linalg.norm(self.data, axis=1)
+        zero = length < 1e-15
+        self.data[zero] = (1.0, 0.0, 0.0, 0.0)
+        length[zero] = 1.0
+        self.data /= length[:, numpy.newaxis]
+        return self
+
+    @staticmethod
+    def slerp(a, b, fraction):
+        """Spherical linear interpolation between the quaternions of 'a' and 'b'.
+
+        Args:
+            a(QuatArray or Quat): Lower blend input.
+            b(QuatArray or Quat): Upper blend input.
+            fraction(float or array of N floats): The blending factor(s). Should be inside [0, 1].
+        Returns:
+            QuatArray, computed like math_helpers.Quat.slerp for each element.
+        """
+        v0, v1 = numpy.broadcast_arrays(_quat_data(a), _quat_data(b))
+        v0 = numpy.array(v0, ndmin=2)
+        v1 = numpy.array(v1, ndmin=2)
+        fraction = numpy.asarray(fraction, dtype=numpy.float64)
+        if fraction.ndim == 1:
+            fraction = fraction[:, numpy.newaxis]
+        dot = numpy.sum(v0 * v1, axis=-1, keepdims=True)
+        # Take the shorter path, see Quat.slerp.
+        v0 = numpy.where(dot < 0.0, -v0, v0)
+        dot = numpy.abs(dot)
+
+        DOT_THRESHOLD = 1.0 - 1e-4
+        close = dot > DOT_THRESHOLD
+        # Compute the spherical blend with a safe angle for the close inputs, then replace those
+        # with a normalized linear blend.
+        theta_0 = numpy.arccos(numpy.where(close, 0.0, dot))
+        theta = theta_0 * fraction
+        sin_theta = numpy.sin(theta)
+        sin_theta_0 = numpy.sin(theta_0)
+        s0 = numpy.cos(theta) - dot * sin_theta / sin_theta_0
+        s1 = sin_theta / sin_theta_0
+        spherical = s0 * v0 + s1 * v1
+        linear = v0 + fraction * (v1 - v0)
+        linear /= numpy.linalg.norm(linear, axis=-1, keepdims=True)
+        return QuatArray(numpy.where(close, linear, spherical))
+
+
+def _quat_data(quat):
+    """Returns the [w, x, y, z] numpy data of a QuatArray or math_helpers.Quat."""
+    if isinstance(quat, QuatArray):
+        return quat.data
+    return numpy.array([quat.w, quat.x, quat.y, quat.z], dtype=numpy.float64)
+
+
+class SE3PoseArray(object):
+    """Class representing N SE(3) poses, stored as an Nx7 numpy array.
+
+    Each row is [x, y, z, qw, qx, qy, qz], the same order as iterating a math_helpers.SE3Pose.
+    The operations mirror those of math_helpers.SE3Pose, but are computed for all poses at once,
+    which is much faster than looping over SE3Pose objects when building or analyzing trajectories.
+    """
+
+    def __init__(self, data):
+        data = numpy.asarray(data, dtype=numpy.float64)
+        if data.ndim == 1:
+            data = data.reshape(1, -1)
+        if data.ndim != 2 or data.shape[1] != 7:
+            raise ValueError('Expected an Nx7 array of poses, got shape %s.' % (data.shape,))
+        self.data = data
+
+    def __repr__(self):
+        return 'SE3PoseArray(%d poses)' % len(self)
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    def __getitem__(self, idx):
+        """Returns a math_helpers.SE3Pose for an integer index, and a SE3PoseArray otherwise."""
+        if isinstance(idx, numbers.Integral):
+            x, y, z, qw, qx, qy, qz = self.data[idx].tolist()
+            return SE3Pose(x, y, z, Quat(qw, qx, qy, qz))
+        return SE3PoseArray(self.data[idx])
+
+    def __iter__(self):
+        for x, y, z, qw, qx, qy, qz in self.data.tolist():
+            yield SE3Pose(x, y, z, Quat(qw, qx, qy, qz))
+
+    @property
+    def position(self):
+        """Nx3 numpy view of the translations."""
+        return self.data[:, :3]
+
+    @property
+    def rotation(self):
+        """QuatArray sharing its data with the rotations of the poses."""
+        return QuatArray(self.data[:, 3:])
+
+    @staticmethod
+    def from_poses(poses):
+        """Create a SE3PoseArray from an iterable of math_helpers.SE3Pose."""
+        return SE3PoseArray(numpy.array([tuple(pose) for pose in poses],
+                                        dtype=numpy.float64).reshape(-1, 7))
+
+    @staticmethod
+    def from_proto(protos):
+        """Create a SE3PoseArray from an iterable of geometry_pb2.SE3Pose protos."""
+        return SE3PoseArray.from_poses(SE3Pose.from_proto(proto) for proto in protos)
+
+    @staticmethod
+    def from_position_rotation(positions, rotations):
+        """Create a SE3PoseArray from an Nx3 array of positions and a QuatArray or Nx4 array."""
+        positions = numpy.asarray(positions, dtype=numpy.float64).reshape(-1, 3)
+        rotations = _quat_data(rotations) if isinstance(rotations, QuatArray) else rotations
+        rotations = numpy.broadcast_to(numpy.asarray(rotations, dtype=numpy.float64),
+                                       (len(positions), 4))
+        return SE3PoseArray(numpy.hstack([positions, rotations]))
+
+    @staticmethod
+    def from_identity(num):
+        """Create a SE3PoseArray of 'num' identity poses."""
+        data = numpy.zeros((num, 7))
+        data[:, 3] = 1.0
+        return SE3PoseArray(data)
+
+    def to_poses(self):
+        """Converts the SE3PoseArray into a list of math_helpers.SE3Pose."""
+        return list(self)
+
+    def to_proto(self):
+        """Converts the SE3PoseArray into a list of geometry_pb2.SE3Pose protos."""
+        return [
+            geometry_pb2.SE3Pose(position=geometry_pb2.Vec3(x=x, y=y, z=z),
+                                 rotation=geometry_pb2.Quaternion(w=qw, x=qx, y=qy, z=qz))
+            for x, y, z, qw, qx, qy, qz in self.data.tolist()
+        ]
+
+    def inverse(self):
+        """Computes the inverse of every pose, i.e. b_tform_a for each a_tform_b."""
+        inv_rot = self.data[:, 3:] * numpy.array([1.0, -1.0, -1.0, -1.0])
+        position = -_quat_rotate_arrays(inv_rot, self.data[:, :3])
+        return SE3PoseArray(numpy.hstack([position, inv_rot]))
+
+    def mult(self, other):
+        """Computes the element-wise multiplication with 'other'.
+
+        For example, if 'self' holds a_tform_b poses and 'other' holds b_tform_c poses, the output
+        holds the a_tform_c poses.
+
+        Inputs:
+            other (SE3PoseArray or math_helpers.SE3Pose): A SE3PoseArray of the same length, or a
+                single SE3Pose which is composed with every element.
+
+        Returns:
+            SE3PoseArray representing self[i] * other[i].
+        """
+        return SE3PoseArray(_se3_mult_arrays(self.data, _se3_data(other)))
+
+    def __mul__(self, other):
+        """Overrides the '*' symbol to compute the element-wise multiplication of SE(3) poses."""
+        if isinstance(other, (SE3PoseArray, SE3Pose)):
+            return self.mult(other)
+        raise TypeError("Can't multiply types %s and %s." % (type(self), type(other)))
+
+    def transform_points(self, points):
+        """Transforms points[i] by the i-th pose.
+
+        Inputs:
+            points (Nx3 numpy array, or a single 3 element point applied to every pose)
+
+        Returns:
+            Nx3 numpy array of the transformed points.
+        """
+        points = numpy.asarray(points, dtype=numpy.float64)
+        return _quat_rotate_arrays(self.data[:, 3:], points) + self.data[:, :3]
+
+    def transform_cloud(self, points):
+        """Transforms a whole point cloud by every pose.
+
+        Inputs:
+            points (Mx3 numpy array) representing a set of (x,y,z) points to be transformed
+
+        Returns:
+            NxMx3 numpy array, where [i] is the cloud transformed by the i-th pose.
+        """
+        points = numpy.asarray(points, dtype=numpy.float64)
+        rot = QuatArray(self.data[:, 3:]).to_matrix()
+        return numpy.matmul(points, rot.transpose(0, 2, 1)) + self.data[:, numpy.newaxis, :3]
+
+    def to_matrix(self):
+        """Returns an Nx4x4 numpy array of homogeneous transformation matrices."""
+        ret = numpy.zeros((len(self), 4, 4))
+        ret[:, 0:3, 0:3] = QuatArray(self.data[:, 3:]).to_matrix()
+        ret[:, 0:3, 3] = self.data[:, :3]
+        ret[:, 3, 3] = 1.0
+        return ret
+
+    @staticmethod
+    def from_matrix(mats):
+        """Creates a SE3PoseArray from an Nx4x4 numpy array of homogeneous transforms."""
+        mats = numpy.asarray(mats)
+        return SE3PoseArray.from_position_rotation(mats[:, 0:3, 3],
+                                                   QuatArray.from_matrix(mats[:, 0:3, 0:3]))
+
+    def translation_norm(self):
+        """Calculates the Euclidean norm of the translation of every pose."""
+        return numpy.linalg.norm(self.data[:, :3], axis=1)
+
+    @staticmethod
+    def interp(a, b, fraction):
+        """
+        Performs a blend of SE3Poses.  Out = a * (1 - fraction) + b * fraction
+
+        Args:
+            a(SE3PoseArray or SE3Pose): Lower blend input.
+            b(SE3PoseArray or SE3Pose): Upper blend input.
+            fraction(float or array of N floats): The blending factor(s). Should be inside [0, 1].
+        Returns:
+            SE3PoseArray
+        """
+        a_data = _se3_data(a)
+        b_data = _se3_data(b)
+        fraction = numpy.asarray(fraction, dtype=numpy.float64)
+        blend = fraction[:, numpy.newaxis] if fraction.ndim == 1 else fraction
+        position = a_data[..., :3] * (1.0 - blend) + b_data[..., :3] * blend
+        rot = QuatArray.slerp(QuatArray(a_data[..., 3:]), QuatArray(b_data[..., 3:]), fraction)
+        return SE3PoseArray.from_position_rotation(position, rot)
+
+    def interp_times(self, times, sample_times):
+        """Samples the poses at 'sample_times', interpolating between neighboring poses.
+
+        Args:
+            times(array of N floats): Increasing time of every pose.
+            sample_times(array of M floats): Times to sample. Times outside of 'times' are clamped
+                to the first or last pose.
+        Returns:
+            SE3PoseArray with M poses.
+        """
+        times = numpy.asarray(times, dtype=numpy.float64)
+        if len(times) == 1:
+            return SE3PoseArray(numpy.repeat(self.data, len(sample_times), axis=0))
+        sample_times = numpy.clip(numpy.asarray(sample_times, dtype=numpy.float64), times[0],
+                                  times[-1])
+        upper = numpy.clip(numpy.searchsorted(times, sample_times, side='right'), 1,
+                           len(times) - 1)
+        lower = upper - 1
+        span = times[upper] - times[lower]
+        fraction = numpy.divide(sample_times - times[lower], span, out=numpy.zeros_like(span),
+                                where=span > 0)
+        return SE3PoseArray.interp(self[lower], self[upper], fraction)
+
+    @staticmethod
+    def from_trajectory_proto(trajectory):
+        """Create a SE3PoseArray from the points of a trajectory_pb2.SE3Trajectory.
+
+        Returns:
+            Tuple of the SE3PoseArray and a numpy array with the time_since_reference of every
+            point, in seconds.
+        """
+        poses = SE3PoseArray.from_proto(point.pose for point in trajectory.points)
+        times = numpy.array(
+            [duration_to_seconds(point.time_since_reference) for point in trajectory.points],
+            dtype=numpy.float64)
+        return poses, times
+
+    def to_trajectory_proto(self, times, reference_time=None, pos_interpolation=None,
+                            ang_interpolation=None):
+        """Converts the poses into a trajectory_pb2.SE3Trajectory.
+
+        Args:
+            times(array of N floats): time_since_reference of every pose, in seconds.
+            reference_time(google.protobuf.Timestamp): Optional reference time of the trajectory.
+            pos_interpolation(trajectory_pb2.PositionalInterpolation): Optional interpolation.
+            ang_interpolation(trajectory_pb2.AngularInterpolation): Optional interpolation.
+        Returns:
+            trajectory_pb2.SE3Trajectory
+        """
+        times = numpy.asarray(times, dtype=numpy.float64)
+        if times.shape != (len(self),):
+            raise ValueError('Expected %d times, got shape %s.' % (len(self), times.shape))
+        trajectory = trajectory_pb2.SE3Trajectory()
+        if reference_time is not None:
+            trajectory.reference_time.CopyFrom(reference_time)
+        if pos_interpolation is not None:
+            trajectory.pos_interpolation = pos_interpolation
+        if ang_interpolation is not None:
+            trajectory.ang_interpolation = ang_interpolation
+        for pose, seconds in zip(self.to_proto(), times.tolist()):
+            trajectory.points.add(pose=pose, time_since_reference=seconds_to_duration(seconds))
+        return trajectory
+
+
+def _se3_data(pose):
+    """Returns the [x, y, z, qw, qx, qy, qz] numpy data of a SE3PoseArray or math_helpers.SE3Pose."""
+    if isinstance(pose, SE3PoseArray):
+        return pose.data
+    return numpy.array(tuple(pose), dtype=numpy.float64)
+
+
+def _se3_mult_arrays(a, b):
+    """Composes (..., 7) arrays of poses, broadcasting leading axes."""
+    position = a[..., :3] + _quat_rotate_arrays(a[..., 3:], b[..., :3])
+    rot = _quat_mult_arrays(a[..., 3:], b[..., 3:])
+    return numpy.concatenate([position, rot], axis=-1)
+
+
+def _quat_transform_point(w, x, y, z, px, py, pz):
+    """Rotates the point (px, py, pz) by the quaternion (w, x, y, z), as q * (0, p) * q^-1.
+
+    This expands the two quaternion multiplications in the same order of operations as
+    Quat.mult, without creating the intermediate Quat objects.
+    """
+    # r = (0, p) * q^-1
+    rw = 0 * w - px * -x - py * -y - pz * -z
+    rx = 0 * -x + px * w + py * -z - pz * -y
+    ry = 0 * -y - px * -z + py * w + pz * -x
+    rz = 0 * -z + px * -y - py * -x + pz * w
+    # q * r
+    return (w * rx + x * rw + y * rz - z * ry, w * ry - x * rz + y * rw + z * rx,
+            w * rz + x * ry - y * rx + z * rw)
+
+
 def pose_to_xyz_yaw(A_tform_B):
     """Gets the x,y,z yaw of B in A from the SE3Pose protobuf message."""
     yaw = Quat.from_proto(A_tform_B.rotation).to_yaw()
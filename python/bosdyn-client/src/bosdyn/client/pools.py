@@ -0,0 +1,238 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Thread and channel pools shared by the robots and clients created from one Sdk."""
+
+import collections
+import concurrent.futures
+import logging
+import threading
+
+from .exceptions import Error
+
+_LOGGER = logging.getLogger(__name__)
+
+ExecutorMetrics = collections.namedtuple('ExecutorMetrics',
+                                         ['max_workers', 'active', 'queued', 'completed', 'robots'])
+ExecutorMetrics.__doc__ = """Snapshot of an ExecutorPool.
+
+    max_workers: Number of threads the pool may start.
+    active: Tasks currently running.
+    queued: Tasks submitted but not yet started, including those held back by per-robot limits.
+    completed: Tasks finished since the pool was created.
+    robots: Dict of robot key to RobotExecutorMetrics, for the robots with tasks running or
+            queued.
+"""
+
+RobotExecutorMetrics = collections.namedtuple('RobotExecutorMetrics', ['active', 'queued'])
+
+ChannelMetrics = collections.namedtuple('ChannelMetrics', ['total', 'robots'])
+ChannelMetrics.__doc__ = """Snapshot of a ChannelPool.
+
+    total: Number of open channels.
+    robots: Dict of robot key to the number of channels it has open.
+"""
+
+
+class ChannelLimitError(Error):
+    """A robot tried to open more channels than its ChannelPool allows."""
+
+
+class _RobotTasks(object):
+    """Bookkeeping for the tasks of one robot in an ExecutorPool."""
+
+    def __init__(self):
+        self.active = 0
+        self.pending = collections.deque()
+
+
+class ExecutorPool(object):
+    """Bounded thread pool shared by the clients of every robot created from an Sdk.
+
+    Tasks are submitted through submit(), or through the handle returned by for_robot() so that
+    no single robot can occupy more than max_workers_per_robot threads. Tasks over a robot's
+    limit wait in a per-robot queue rather than blocking the caller.
+
+    Robots are identified by a hashable key. Robot uses its (name, address), so robots created
+    with the same name for different addresses do not share a limit.
+
+    Args:
+        max_workers: Maximum number of threads. Default None to use the ThreadPoolExecutor default.
+        max_workers_per_robot: Maximum number of threads used by a single robot's tasks.
+                                 Default None for no per-robot limit.
+    """
+
+    def __init__(self, max_workers=None, max_workers_per_robot=None):
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers,
+                                                               thread_name_prefix='bosdyn-client')
+        self.max_workers = self._executor._max_workers
+        self.max_workers_per_robot = max_workers_per_robot
+        self._lock = threading.Lock()
+        self._active = 0
+        self._queued = 0
+        self._completed = 0
+        self._robots = collections.defaultdict(_RobotTasks)
+
+    def submit(self, fn, *args, **kwargs):
+        """Schedule fn(*args, **kwargs) to run on the pool, returning a concurrent Future."""
+        return self._submit(None, fn, args, kwargs)
+
+    def for_robot(self, robot):
+        """Get a handle that submits tasks on behalf of a robot.
+
+        Args:
+            robot: Hashable key identifying the robot, such as Robot's (name, address).
+        """
+        return RobotExecutor(self, robot)
+
+    def metrics(self):
+        """Get an ExecutorMetrics snapshot of the pool."""
+        with self._lock:
+            robots = {
+                robot: RobotExecutorMetrics(tasks.active, len(tasks.pending))
+                for robot, tasks in self._robots.items()
+            }
+            return ExecutorMetrics(self.max_workers, self._active, self._queued, self._completed,
+                                   robots)
+
+    def shutdown(self, wait=True):
+        """Stop accepting tasks, and optionally wait for the running ones to finish."""
+        self._executor.shutdown(wait=wait)
+
+    def _submit(self, robot, fn, args, kwargs):
+        future = concurrent.futures.Future()
+        task = (future, robot, fn, args, kwargs)
+        with self._lock:
+            self._queued += 1
+            if robot is not None:
+                robot_tasks = self._robots[robot]
+                if (self.max_workers_per_robot is not None and
+                        robot_tasks.active >= self.max_workers_per_robot):
+                    robot_tasks.pending.append(task)
+                    return future
+                robot_tasks.active += 1
+        self._executor.submit(self._run, task)
+        return future
+
+    def _run(self, task):
+        future, robot, fn, args, kwargs = task
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException as exc:  # pylint: disable=broad-except
+                    future.set_exception(exc)
+                else:
+                    future.set_result(result)
+        finally:
+            next_task = None
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+                if robot is not None:
+                    robot_tasks = self._robots[robot]
+                    if robot_tasks.pending:
+                        # Hand this robot's slot straight to its next task.
+                        next_task = robot_tasks.pending.popleft()
+                    else:
+                        robot_tasks.active -= 1
+                        if not robot_tasks.active:
+                            # Do not keep idle robots, which may have shut down.
+                            del self._robots[robot]
+            if next_task is not None:
+                self._executor.submit(self._run, next_task)
+
+
+class RobotExecutor(object):
+    """Submits tasks to an ExecutorPool on behalf of one robot.
+
+    Has the submit() method that BaseClient expects of its executor.
+    """
+
+    def __init__(self, pool, robot):
+        self.pool = pool
+        self.robot = robot
+
+    def submit(self, fn, *args, **kwargs):
+        """Schedule fn(*args, **kwargs) to run on the pool, returning a concurrent Future."""
+        return self.pool._submit(self.robot, fn, args, kwargs)
+
+    def metrics(self):
+        """Get the RobotExecutorMetrics of this robot."""
+        return self.pool.metrics().robots.get(self.robot, RobotExecutorMetrics(0, 0))
+
+
+class ChannelPool(object):
+    """Keeps track of the channels opened by the robots created from an Sdk.
+
+    Channels are reused by every client of a robot that talks to the same authority with the same
+    options. They are not shared between robots, since each channel carries its robot's user token.
+    Robots are identified by a hashable key, as in ExecutorPool.
+
+    Args:
+        max_channels_per_robot: Maximum number of channels a robot may open. Default None for no
+                                  limit.
+    """
+
+    def __init__(self, max_channels_per_robot=None):
+        self.max_channels_per_robot = max_channels_per_robot
+        self._lock = threading.Lock()
+        self._channels = collections.defaultdict(dict)
+
+    def get_or_create(self, robot, address, authority, options, create_channel):
+        """Get the channel of a robot for an authority, creating it if needed.
+
+        Args:
+            robot: Hashable key identifying the robot opening the channel.
+            address: Network address of the robot.
+            authority: Authority the channel connects to.
+            options: List of (key, value) channel options.
+            create_channel: Callable taking no arguments that returns a new channel.
+
+        Raises:
+            ChannelLimitError: The robot already has max_channels_per_robot channels open.
+        """
+        key = (address, authority, tuple(options))
+        with self._lock:
+            robot_channels = self._channels[robot]
+            if key in robot_channels:
+                return robot_channels[key]
+            if (self.max_channels_per_robot is not None and
+                    len(robot_channels) >= self.max_channels_per_robot):
+                raise ChannelLimitError('Robot {} already has {} channels open'.format(
+                    robot, len(robot_channels)))
+            channel = create_channel()
+            robot_channels[key] = channel
+            return channel
+
+    def remove_robot(self, robot):
+        """Forget all channels of a robot, returning them so they can be closed."""
+        with self._lock:
+            return list(self._channels.pop(robot, {}).values())
+
+    def metrics(self):
+        """Get a ChannelMetrics snapshot of the pool."""
+        with self._lock:
+            robots = {
+                robot: len(channels) for robot, channels in self._channels.items() if channels
+            }
+        return ChannelMetrics(sum(robots.values()), robots)
+
+
+_default_executor_lock = threading.Lock()
+_default_executor = None
+
+
+def get_default_executor():
+    """Get the ExecutorPool used by clients that were not given an executor."""
+    global _default_executor
+    with _default_executor_lock:
+        if _default_executor is None:
+            _default_executor = ExecutorPool()
+        return _default_executor
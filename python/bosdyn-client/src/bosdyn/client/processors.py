@@ -4,7 +4,13 @@
 # is subject to the terms and conditions of the Boston Dynamics Software
 # Development Kit License (20191101-BDSDK-SL).
 
-"""Common message processors."""
+"""Common message processors.
+
+Processors expose a mutate(proto) method that is run by BaseClient on every request or response.
+A processor may also advertise which top-level fields it writes through a `mutated_fields`
+attribute. An empty tuple marks a read-only processor. Processors without the attribute are
+assumed to modify anything, which forces BaseClient to deep-copy requests before running them.
+"""
 
 from bosdyn.api.header_pb2 import RequestHeader
 from bosdyn.util import now_nsec, set_timestamp_from_nsec  # bosdyn-core
@@ -13,6 +19,8 @@ from bosdyn.util import now_nsec, set_timestamp_from_nsec  # bosdyn-core
 class AddRequestHeader(object):
     """Sets header fields common to all bosdyn.api requests."""
 
+    mutated_fields = ('header',)
+
     def __init__(self, client_name_func):
         """Constructor, takes function to access the client name to insert into request headers."""
         self.get_client_name = client_name_func
@@ -38,6 +46,8 @@ class AddRequestHeader(object):
 class DataBufferLoggingProcessor:
     """Processor that logs every protobuf message to the robot's data buffer."""
 
+    mutated_fields = ()
+
     def __init__(self, data_buffer_client):
         """
         Args:
@@ -58,3 +68,26 @@ def log_all_rpcs(client, data_buffer_client):
     processor = DataBufferLoggingProcessor(data_buffer_client)
     client.request_processors.append(processor)
     client.response_processors.append(processor)
+
+
+def get_mutated_fields(processors):
+    """Get the top-level fields that a list of processors may write.
+
+    Args:
+        processors: Iterable of request or response processors.
+
+    Returns:
+        A frozenset of field names, or None if any processor does not declare `mutated_fields`.
+    """
+    fields = set()
+    for proc in processors:
+        proc_fields = getattr(proc, 'mutated_fields', None)
+        if proc_fields is None:
+            return None
+        fields.update(proc_fields)
+    return frozenset(fields)
+
+
+def are_read_only(processors):
+    """Returns True if none of the processors modify the messages passed to them."""
+    return get_mutated_fields(processors) == frozenset()
@@ -114,6 +114,8 @@ class Robot(object):
         self._current_user = None
         self.service_clients_by_name = {}
         self.channels_by_authority = {}
+        self.aio_service_clients_by_name = {}
+        self.aio_channels_by_authority = {}
         self.authorities_by_name = {}
         self._robot_id = None
         self._hardware_config = None
@@ -130,6 +132,7 @@ class Robot(object):
         self.lease_wallet = LeaseWallet()
         self._time_sync_thread = None
         self.executor = None
+        self.channel_pool = None
 
         #: Callable[[Exception], ErrorCallbackResult] | None: Optional callback to be invoked when
         #: an error occurs in the token refresh thread.
@@ -162,6 +165,11 @@ class Robot(object):
     def host(self):
         return self._name
 
+    @property
+    def pool_key(self):
+        """Key identifying this robot in the Sdk's ExecutorPool and ChannelPool."""
+        return (self._name, self.address)
+
     def _get_token_id(self, username):
         return '{}.{}'.format(self.serial_number, username)
 
@@ -203,7 +211,10 @@ class Robot(object):
         self.max_receive_message_length = other.max_receive_message_length
         self.client_name = other.client_name
         self.lease_wallet.set_client_name(self.client_name)
-        self.executor = other.executor
+        # A shared ExecutorPool is used through a handle that applies this robot's limits.
+        for_robot = getattr(other.executor, 'for_robot', None)
+        self.executor = for_robot(self.pool_key) if for_robot else other.executor
+        self.channel_pool = getattr(other, 'channel_pool', None)
 
     def ensure_client(self, service_name, channel=None, options=[], service_endpoint=None):
         """Ensure a Client for a given service.
@@ -226,7 +237,51 @@ class Robot(object):
         if service_name in self.service_clients_by_name:
             return self.service_clients_by_name[service_name]
 
-        # Create an instance of the class
+        client = self._create_client(service_name)
+
+        if channel is None:
+            channel = self.ensure_channel(service_name, options=options,
+                                          service_endpoint=service_endpoint)
+
+        client.channel = channel
+        client.update_from(self)
+        # Track service clients that have been created to avoid duplicate clients
+        self.service_clients_by_name[service_name] = client
+        return client
+
+    def ensure_aio_client(self, service_name, channel=None, options=[]):
+        """Ensure a Client for a given service that makes its RPCs on a grpc.aio channel.
+
+        The client is separate from the one returned by ensure_client(). Its RPC methods return
+        AioCallWrappers, so `await client.get_robot_state()` and `async for` over streaming
+        responses can be used from a single asyncio event loop without a thread per call.
+        This must be called from the event loop that will await the RPCs.
+
+        Args:
+            service_name: The name of the service.
+            channel: grpc.aio channel object to use. Default None, in which case the Sdk data
+                       is used to generate a channel.
+
+        Raises:
+            UnregisteredServiceNameError: The service is not known.
+            UnregisteredServiceTypeError: The client type for this service was never registered.
+            RpcError:                There was an error communicating with the robot.
+        """
+        if service_name in self.aio_service_clients_by_name:
+            return self.aio_service_clients_by_name[service_name]
+
+        client = self._create_client(service_name)
+        if channel is None:
+            channel = self.ensure_secure_aio_channel(self._get_authority(service_name),
+                                                     options=options)
+
+        client.channel = channel
+        client.update_from(self)
+        self.aio_service_clients_by_name[service_name] = client
+        return client
+
+    def _create_client(self, service_name):
+        """Create an instance of the client class registered for the named service."""
         try:
             service_type = self.service_type_by_name[service_name]
         except KeyError:
@@ -238,20 +293,20 @@ class Robot(object):
 
         client = creation_function()
         self.logger.debug('Created client for %s', service_name)
-
-        if channel is None:
-            channel = self.ensure_channel(service_name, options=options,
-                                          service_endpoint=service_endpoint)
-
-        client.channel = channel
-        client.update_from(self)
-        # Track service clients that have been created to avoid duplicate clients
-        self.service_clients_by_name[service_name] = client
         return client
 
     def shutdown(self):
         for channel_from_auth in self.channels_by_authority.values():
             channel_from_auth.close()
+        if self.channel_pool is not None:
+            self.channel_pool.remove_robot(self.pool_key)
+
+    async def shutdown_aio(self):
+        """Close the grpc.aio channels, cancelling any of their RPCs still in progress."""
+        for channel_from_auth in self.aio_channels_by_authority.values():
+            await channel_from_auth.close()
+        self.aio_channels_by_authority = {}
+        self.aio_service_clients_by_name = {}
 
     def get_cached_robot_id(self, timeout=None):
         """Return the RobotId proto for this robot, querying it from the robot if not yet cached.
@@ -289,7 +344,15 @@ class Robot(object):
             RpcError: There was a problem communicating with the robot.
             UnregisteredServiceNameError: service_name is unknown.
         """
+        return self.ensure_secure_channel(self._get_authority(service_name), options=options)
+
+    def _get_authority(self, service_name):
+        """Look up the authority of the named service, syncing with the directory if needed.
 
+        Raises:
+            RpcError: There was a problem communicating with the robot.
+            UnregisteredServiceNameError: service_name is unknown.
+        """
         # If a specific channel was not set, look up the authority so we can get a channel.
         # Get the authority from either
         #   1. The bootstrap authority for this client_class, if available
@@ -307,20 +370,25 @@ class Robot(object):
         if not authority:
             raise UnregisteredServiceNameError(service_name)
 
-        return self.ensure_secure_channel(authority, options=options)
+        return authority
 
     def ensure_secure_channel(self, authority, options=[]):
         """Get the channel to access the given authority, creating it if it doesn't exist."""
         if authority in self.channels_by_authority:
             return self.channels_by_authority[authority]
 
-        # Update max send/receive message lengths.
-        if 'grpc.max_receive_message_length' not in [option[0] for option in options]:
-            options.append(('grpc.max_receive_message_length', self.max_receive_message_length))
-        if 'grpc.max_send_message_length' not in [option[0] for option in options]:
-            options.append(('grpc.max_send_message_length', self.max_send_message_length))
+        self._add_message_length_options(options)
 
-        # Channel doesn't exist, so create it.
+        if self.channel_pool is None:
+            channel = self._create_secure_channel(authority, options)
+        else:
+            channel = self.channel_pool.get_or_create(
+                self.pool_key, self.address, authority, options,
+                lambda: self._create_secure_channel(authority, options))
+        self.channels_by_authority[authority] = channel
+        return channel
+
+    def _create_secure_channel(self, authority, options):
         creds = bosdyn.client.channel.create_secure_channel_creds(self.cert,
                                                                   lambda: self.user_token)
         channel = bosdyn.client.channel.create_secure_channel(self.address,
@@ -328,9 +396,34 @@ class Robot(object):
                                                               authority, options=options)
         self.logger.debug('Created channel to %s at port %i with authority %s', self.address,
                           self._secure_channel_port, authority)
-        self.channels_by_authority[authority] = channel
         return channel
 
+    def ensure_secure_aio_channel(self, authority, options=[]):
+        """Get the grpc.aio channel to access the given authority, creating it if it doesn't exist.
+
+        A new channel is bound to the running asyncio event loop.
+        """
+        if authority in self.aio_channels_by_authority:
+            return self.aio_channels_by_authority[authority]
+
+        self._add_message_length_options(options)
+        creds = bosdyn.client.channel.create_secure_channel_creds(self.cert,
+                                                                  lambda: self.user_token)
+        channel = bosdyn.client.channel.create_secure_aio_channel(self.address,
+                                                                  self._secure_channel_port, creds,
+                                                                  authority, options=options)
+        self.logger.debug('Created aio channel to %s at port %i with authority %s', self.address,
+                          self._secure_channel_port, authority)
+        self.aio_channels_by_authority[authority] = channel
+        return channel
+
+    def _add_message_length_options(self, options):
+        """Update max send/receive message lengths in the channel options."""
+        if 'grpc.max_receive_message_length' not in [option[0] for option in options]:
+            options.append(('grpc.max_receive_message_length', self.max_receive_message_length))
+        if 'grpc.max_send_message_length' not in [option[0] for option in options]:
+            options.append(('grpc.max_send_message_length', self.max_send_message_length))
+
 
     def authenticate(
             self,
@@ -493,15 +586,19 @@ class Robot(object):
             payload.GUID, secret, payload_registration_client=payload_registration_client,
             timeout=timeout, retry_interval=auth_retry_interval)
 
-    def start_time_sync(self, time_sync_interval_sec=None):
+    def start_time_sync(self, time_sync_interval_sec=None, skew_estimator=None):
         """Start time sync thread if needed.
 
         Args:
             time_sync_interval_sec (float): The interval (in seconds) that the time-sync estimate should be updated.
+            skew_estimator (ClockSkewEstimator): If specified, filter the time-sync round trips on
+                the client with this estimator, and adapt the update interval to its stability.
         """
         if not self._time_sync_thread:
             self._time_sync_thread = TimeSyncThread(
                 self.ensure_client(TimeSyncClient.default_service_name))
+        if skew_estimator is not None:
+            self._time_sync_thread.endpoint.skew_estimator = skew_estimator
         if time_sync_interval_sec:
             self._time_sync_thread.time_sync_interval_sec = time_sync_interval_sec
         if self._time_sync_thread.stopped:
@@ -21,7 +21,7 @@ from bosdyn.api.spot import robot_command_pb2 as spot_command_pb2
 from bosdyn.client.common import (BaseClient, error_factory, error_pair,
                                   handle_common_header_errors, handle_lease_use_result_errors,
                                   handle_unset_status_error)
-from bosdyn.util import now_sec, seconds_to_duration
+from bosdyn.util import now_sec, sec_to_nsec, seconds_to_duration
 
 from .exceptions import Error as BaseError
 from .exceptions import InvalidRequestError, ResponseError, TimedOutError, UnsetStatusError
@@ -109,12 +109,16 @@ class _TimeConverter(object):
         self._endpoint = endpoint
         self._converter = None
 
+    @property
+    def endpoint(self):
+        """The time sync endpoint used for conversions."""
+        return self._endpoint or self._parent.timesync_endpoint
+
     @property
     def obj(self):
         """Accessor which lazily constructs the RobotTimeConverter."""
         if not self._converter:
-            endpoint = self._endpoint or self._parent.timesync_endpoint
-            self._converter = endpoint.get_robot_time_converter()
+            self._converter = self.endpoint.get_robot_time_converter()
         return self._converter
 
     def convert_timestamp_from_local_to_robot(self, timestamp):
@@ -125,6 +129,14 @@ class _TimeConverter(object):
         """
         self.obj.convert_timestamp_from_local_to_robot(timestamp)
 
+    def convert_timestamps_from_local_to_robot(self, timestamps):
+        """Calls RobotTimeConverter.convert_timestamps_from_local_to_robot().
+
+        Args:
+            timestamps: Sequence of timestamps to convert in place.
+        """
+        self.obj.convert_timestamps_from_local_to_robot(timestamps)
+
     def robot_timestamp_from_local_secs(self, end_time_secs):
         """Calls RobotTimeConverter.robot_timestamp_from_local_secs().
 
@@ -133,6 +145,23 @@ class _TimeConverter(object):
         """
         return self.obj.robot_timestamp_from_local_secs(end_time_secs)
 
+    def robot_end_timestamp_from_local_secs(self, end_time_secs):
+        """Convert an end time, pulled in by the uncertainty of the clock skew estimate.
+
+        If the endpoint has a ClockSkewEstimator, the end time is made earlier by the estimate's
+        uncertainty, so that an overestimated clock skew cannot push the end time further into
+        the future than the robot allows. Otherwise this is robot_timestamp_from_local_secs().
+
+        Args:
+            end_time_secs: Time in seconds to convert.
+        """
+        skew_estimator = getattr(self.endpoint, 'skew_estimator', None)
+        estimate = skew_estimator.estimate if skew_estimator else None
+        if estimate is None:
+            return self.robot_timestamp_from_local_secs(end_time_secs)
+        return self.obj.robot_timestamp_from_local_nsecs(
+            sec_to_nsec(end_time_secs) - estimate.uncertainty_nsec)
+
     def local_seconds_from_robot_timestamp(self, robot_timestamp):
         """Calls RobotTimeConverter.local_seconds_from_robot_timestamp().
 
@@ -264,7 +293,14 @@ def _edit_proto(proto, edit_tree, edit_fn):
             _edit_proto(getattr(proto, which_oneof), subtree[which_oneof], edit_fn)
         elif subtree:
             # Recursion into a sub-message by field name.
-            if key in proto.DESCRIPTOR.fields_by_name and proto.HasField(key):
+            field = proto.DESCRIPTOR.fields_by_name.get(key)
+            if field is None:
+                continue
+            if field.label == field.LABEL_REPEATED:
+                # Recursion into each message of a repeated field, such as trajectory points.
+                for subproto in getattr(proto, key):
+                    _edit_proto(subproto, subtree, edit_fn)
+            elif proto.HasField(key):
                 subproto = getattr(proto, key)
                 _edit_proto(subproto, subtree, edit_fn)
         else:
@@ -272,6 +308,31 @@ def _edit_proto(proto, edit_tree, edit_fn):
             edit_fn(key, proto)
 
 
+def _collect_timestamps(proto, edit_tree):
+    """Collect the timestamps at the leaves of an edit tree, to convert them all at once.
+
+    Args:
+        proto: Protobuf to search recursively.
+        edit_tree: Tree of the fields leading to the timestamps, as for _edit_proto().
+
+    Returns:
+        List of the Timestamp messages which are set, including each element of repeated fields.
+    """
+    timestamps = []
+
+    def _collect(key, proto):
+        field = proto.DESCRIPTOR.fields_by_name.get(key)
+        if field is None:
+            return  # No such field in the proto.
+        if field.label == field.LABEL_REPEATED:
+            timestamps.extend(getattr(proto, key))
+        elif proto.HasField(key):
+            timestamps.append(getattr(proto, key))
+
+    _edit_proto(proto, edit_tree, _collect)
+    return timestamps
+
+
 class RobotCommandClient(BaseClient):
     """Client for calling RobotCommand services."""
     default_service_name = 'robot-command'
@@ -472,28 +533,24 @@ class RobotCommandClient(BaseClient):
             if key not in proto.DESCRIPTOR.fields_by_name:
                 return  # No such field in the proto to be set to the end-time.
             end_time = getattr(proto, key)
-            end_time.CopyFrom(converter.robot_timestamp_from_local_secs(end_time_secs))
-
-        def _to_robot_time(key, proto):
-            """If proto has a field named key with a timestamp, convert timestamp to robot time."""
-            if not (key in proto.DESCRIPTOR.fields_by_name and proto.HasField(key)):
-                # No such field in proto, or field does not contain a timestamp.
-                return
-            timestamp = getattr(proto, key)
-            converter.convert_timestamp_from_local_to_robot(timestamp)
+            end_time.CopyFrom(converter.robot_end_timestamp_from_local_secs(end_time_secs))
 
         # Set fields needing to be set from end_time_secs.
         if end_time_secs:
             _edit_proto(command, END_TIME_EDIT_TREE, _set_end_time)
 
-        # Convert timestamps from local time to robot time.
-        _edit_proto(command, EDIT_TREE_CONVERT_LOCAL_TIME_TO_ROBOT_TIME, _to_robot_time)
+        # Convert timestamps from local time to robot time, all at once.
+        timestamps = _collect_timestamps(command, EDIT_TREE_CONVERT_LOCAL_TIME_TO_ROBOT_TIME)
+        if timestamps:
+            converter.convert_timestamps_from_local_to_robot(timestamps)
         if command.synchronized_command.mobility_command.HasField("params"):
             params = spot_command_pb2.MobilityParams()
             command.synchronized_command.mobility_command.params.Unpack(params)
-            _edit_proto(params, MOBILITY_PARAM_TREE_CONVERT_LOCAL_TIME_TO_ROBOT_TIME,
-                        _to_robot_time)
-            command.synchronized_command.mobility_command.params.Pack(params)
+            timestamps = _collect_timestamps(params,
+                                             MOBILITY_PARAM_TREE_CONVERT_LOCAL_TIME_TO_ROBOT_TIME)
+            if timestamps:
+                converter.convert_timestamps_from_local_to_robot(timestamps)
+                command.synchronized_command.mobility_command.params.Pack(params)
 
     @staticmethod
     def _get_robot_command_feedback_request(robot_command_id):
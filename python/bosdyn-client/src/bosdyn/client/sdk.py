@@ -53,6 +53,7 @@ from .network_compute_bridge_client import NetworkComputeBridgeClient
 from .payload import PayloadClient
 from .payload_registration import PayloadRegistrationClient
 from .point_cloud import PointCloudClient
+from .pools import ChannelPool, ExecutorPool, get_default_executor
 from .power import PowerClient
 from .processors import AddRequestHeader
 from .ray_cast import RayCastClient
@@ -205,9 +206,13 @@ class Sdk(object):
         self.max_send_message_length = DEFAULT_MAX_MESSAGE_LENGTH
         self.max_receive_message_length = DEFAULT_MAX_MESSAGE_LENGTH
 
-        # ThreadPoolExecutor instance for asynchronous streaming calls.
+        # Executor for asynchronous streaming calls. When None, clients use a pool shared by the
+        # whole process. See configure_pools().
         self.executor = None
 
+        # Channels opened by the robots created from this Sdk.
+        self.channel_pool = ChannelPool()
+
 
     def create_robot(
             self,
@@ -251,6 +256,41 @@ class Sdk(object):
         self.max_send_message_length = max_message_length
         self.max_receive_message_length = max_message_length
 
+    def configure_pools(self, max_workers=None, max_workers_per_robot=None,
+                        max_channels_per_robot=None):
+        """Share one bounded thread pool among the clients of all robots created from this point
+        on, and limit the number of channels each robot may open.
+
+        Args:
+            max_workers(int): Maximum number of threads. Default None to use the ThreadPoolExecutor
+                default.
+            max_workers_per_robot(int): Maximum number of threads used by a single robot's
+                clients. Default None for no limit.
+            max_channels_per_robot(int): Maximum number of channels a single robot may open.
+                Default None for no limit.
+
+        Returns:
+            The new ExecutorPool.
+        """
+        self.executor = ExecutorPool(max_workers=max_workers,
+                                     max_workers_per_robot=max_workers_per_robot)
+        self.channel_pool.max_channels_per_robot = max_channels_per_robot
+        return self.executor
+
+    def get_executor_metrics(self):
+        """Get the ExecutorMetrics of the pool running this Sdk's asynchronous streaming calls.
+
+        Returns:
+            ExecutorMetrics, or None if the executor was replaced by one without metrics.
+        """
+        executor = self.executor or get_default_executor()
+        metrics = getattr(executor, 'metrics', None)
+        return metrics() if metrics else None
+
+    def get_channel_metrics(self):
+        """Get the ChannelMetrics of the channels opened by this Sdk's robots."""
+        return self.channel_pool.metrics()
+
     def register_service_client(self, creation_func, service_type=None, service_name=None):
         """Tell the Sdk how to create a specific type of service client.
 
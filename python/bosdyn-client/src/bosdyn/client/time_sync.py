@@ -11,6 +11,8 @@ system clock of clients, and sends an estimate of this difference to the client.
 uses this information when it needs to send a timestamp to the robot in a request proto.
 Timestamps in request protos generally need to be specified relative to the robot's system clock.
 """
+import collections
+import math
 import time
 from threading import Event, Lock, Thread
 
@@ -19,8 +21,9 @@ from google.protobuf import duration_pb2
 from bosdyn.api import time_sync_pb2, time_sync_service_pb2_grpc
 from bosdyn.api.time_range_pb2 import TimeRange
 from bosdyn.client.robot_command import NoTimeSyncError, _TimeConverter
-from bosdyn.util import (RobotTimeConverter, now_nsec, now_sec, nsec_to_timestamp, parse_timespan,
-                         set_timestamp_from_nsec, timestamp_to_nsec)
+from bosdyn.util import (RobotTimeConverter, SkewHistoryTimeConverter, now_nsec, now_sec,
+                         nsec_to_timestamp, parse_timespan, set_timestamp_from_nsec,
+                         timestamp_to_nsec)
 
 from .common import BaseClient, common_header_errors
 from .exceptions import Error
@@ -200,6 +203,196 @@ def update_timestamp_filter(client, timestamp, timesync_endpoint):
 
 
 
+ClockSkewSample = collections.namedtuple('ClockSkewSample',
+                                         ['local_time_nsec', 'skew_nsec', 'round_trip_nsec'])
+ClockSkewSample.__doc__ = """One clock-skew measurement, from the timestamps of a TimeSyncRoundTrip.
+
+    local_time_nsec: Local time at the middle of the round trip.
+    skew_nsec: Robot clock minus local clock, assuming the request and the response took as long.
+    round_trip_nsec: Round trip time, excluding the time spent in the server.
+"""
+
+
+class ClockSkewEstimate(
+        collections.namedtuple('ClockSkewEstimate', [
+            'skew_nsec', 'drift', 'uncertainty_nsec', 'reference_time_nsec', 'num_samples',
+            'num_rejected'
+        ])):
+    """A client-side estimate of the robot clock skew, see ClockSkewEstimator.
+
+    Attributes:
+        skew_nsec: Robot clock minus local clock at reference_time_nsec.
+        drift: Rate of change of the skew, in nanoseconds per nanosecond of local time.
+        uncertainty_nsec: Bound on the error of the skew, from the round trip time of the best
+                          samples and the scatter of the samples around the drift model.
+        reference_time_nsec: Local time at which skew_nsec applies.
+        num_samples: Number of samples used by the estimate.
+        num_rejected: Number of samples in the window rejected as round trip time outliers.
+    """
+
+    __slots__ = ()
+
+    def skew_at(self, local_time_nsec):
+        """Get the skew predicted by the drift model at a local time in nanoseconds."""
+        return int(self.skew_nsec + self.drift * (local_time_nsec - self.reference_time_nsec))
+
+
+class ClockSkewEstimator:
+    """Filters the round trips of time-sync updates into a clock-skew estimate.
+
+    The time-sync service reports its own best estimate, but each update only gives the client
+    one round trip. This estimator keeps a window of the round trips, rejects those whose round
+    trip time shows they were delayed by a congested network, and fits a linear model of the skew
+    drifting over time to the rest. Samples are weighted by the inverse square of their round
+    trip time, since that bounds their error.
+
+    It also suggests the interval to the next time-sync update: the interval doubles each time a
+    sample agrees with the model, and drops to the minimum when a sample does not, or is rejected.
+
+    Args:
+        window_size (int): Number of round trips to keep.
+        rtt_outlier_factor (float): Samples whose round trip time is over this multiple of the
+                                    lowest round trip time in the window are rejected.
+        rtt_outlier_floor_nsec (int): Samples within this much of the lowest round trip time are
+                                      never rejected, so jitter on a fast network is tolerated.
+        min_drift_span_nsec (int): Time the accepted samples must span before drift is modelled.
+        max_drift (float): Bound on the magnitude of the modelled drift.
+        min_innovation_nsec (int): Smallest disagreement between a sample and the model which
+                                   resets the suggested interval.
+
+    This object is thread-safe.
+    """
+
+    def __init__(self, window_size=25, rtt_outlier_factor=2.0, rtt_outlier_floor_nsec=1000000,
+                 min_drift_span_nsec=10 * 1000000000, max_drift=500e-6,
+                 min_innovation_nsec=1000000):
+        if window_size < 1:
+            raise ValueError('window_size must be at least 1, was {}'.format(window_size))
+        self.rtt_outlier_factor = rtt_outlier_factor
+        self.rtt_outlier_floor_nsec = rtt_outlier_floor_nsec
+        self.min_drift_span_nsec = min_drift_span_nsec
+        self.max_drift = max_drift
+        self.min_innovation_nsec = min_innovation_nsec
+        self._lock = Lock()
+        # Access these using the lock.
+        self._locked_samples = collections.deque(maxlen=window_size)
+        self._locked_estimate = None
+        self._locked_stable_count = 0
+
+    @staticmethod
+    def sample_from_round_trip(round_trip):
+        """Compute a ClockSkewSample from a bosdyn.api.TimeSyncRoundTrip.
+
+        Returns:
+            The sample, or None if the round trip is missing timestamps or is inconsistent.
+        """
+        client_tx = timestamp_to_nsec(round_trip.client_tx)
+        server_rx = timestamp_to_nsec(round_trip.server_rx)
+        server_tx = timestamp_to_nsec(round_trip.server_tx)
+        client_rx = timestamp_to_nsec(round_trip.client_rx)
+        if not (client_tx and server_rx and server_tx and client_rx):
+            return None
+        round_trip_nsec = (client_rx - client_tx) - (server_tx - server_rx)
+        if round_trip_nsec < 0:
+            return None
+        skew_nsec = ((server_rx - client_tx) + (server_tx - client_rx)) // 2
+        return ClockSkewSample((client_tx + client_rx) // 2, skew_nsec, round_trip_nsec)
+
+    def add_round_trip(self, round_trip):
+        """Add the round trip of a time-sync update. See add_sample().
+
+        Returns:
+            True if the round trip was accepted into the estimate.
+        """
+        sample = self.sample_from_round_trip(round_trip)
+        if sample is None:
+            return False
+        return self.add_sample(sample)
+
+    def add_sample(self, sample):
+        """Add a ClockSkewSample to the window and update the estimate.
+
+        Returns:
+            True if the sample was accepted into the estimate, False if it was rejected as an
+            outlier.
+        """
+        with self._lock:
+            previous = self._locked_estimate
+            self._locked_samples.append(sample)
+            self._locked_estimate = self._fit(self._locked_samples)
+            accepted = sample.round_trip_nsec <= self._rtt_threshold(self._locked_samples)
+            if not accepted or previous is None:
+                self._locked_stable_count = 0
+            else:
+                innovation = abs(sample.skew_nsec - previous.skew_at(sample.local_time_nsec))
+                if innovation > max(2 * previous.uncertainty_nsec, self.min_innovation_nsec):
+                    self._locked_stable_count = 0
+                else:
+                    self._locked_stable_count += 1
+            return accepted
+
+    def reset(self):
+        """Forget all samples, as when the robot's clock identifier changes."""
+        with self._lock:
+            self._locked_samples.clear()
+            self._locked_estimate = None
+            self._locked_stable_count = 0
+
+    @property
+    def estimate(self):
+        """The current ClockSkewEstimate, or None if there are no samples."""
+        with self._lock:
+            return self._locked_estimate
+
+    def suggested_interval_sec(self, min_interval_sec, max_interval_sec):
+        """Get the time to wait before the next time-sync update.
+
+        Args:
+            min_interval_sec (float): Interval while the samples disagree with the model.
+            max_interval_sec (float): Longest interval, used once the model is stable.
+        """
+        with self._lock:
+            stable_count = self._locked_stable_count
+        min_interval_sec = min(min_interval_sec, max_interval_sec)
+        # Cap the exponent, the interval has reached the maximum long before.
+        return min(max_interval_sec, min_interval_sec * 2**min(stable_count, 32))
+
+    def _rtt_threshold(self, samples):
+        best_rtt = min(sample.round_trip_nsec for sample in samples)
+        return max(best_rtt * self.rtt_outlier_factor, best_rtt + self.rtt_outlier_floor_nsec)
+
+    def _fit(self, samples):
+        """Fit the skew model to the samples which are not outliers."""
+        threshold = self._rtt_threshold(samples)
+        accepted = [sample for sample in samples if sample.round_trip_nsec <= threshold]
+        # Floor the round trip times used as weights so a zero round trip time cannot dominate.
+        weights = [1.0 / float(max(sample.round_trip_nsec, 1000))**2 for sample in accepted]
+        total_weight = sum(weights)
+        # Fit around the newest sample, to keep the numbers small and the skew current.
+        reference = accepted[-1].local_time_nsec
+        times = [sample.local_time_nsec - reference for sample in accepted]
+        skews = [sample.skew_nsec for sample in accepted]
+        mean_time = sum(w * t for w, t in zip(weights, times)) / total_weight
+        mean_skew = sum(w * skew for w, skew in zip(weights, skews)) / total_weight
+
+        drift = 0.0
+        if len(accepted) >= 3 and max(times) - min(times) >= self.min_drift_span_nsec:
+            time_var = sum(w * (t - mean_time)**2 for w, t in zip(weights, times))
+            if time_var > 0:
+                covariance = sum(w * (t - mean_time) * (skew - mean_skew)
+                                 for w, t, skew in zip(weights, times, skews))
+                drift = max(-self.max_drift, min(self.max_drift, covariance / time_var))
+        skew_at_reference = mean_skew - drift * mean_time
+
+        residual_var = sum(w * (skew - skew_at_reference - drift * t)**2
+                           for w, t, skew in zip(weights, times, skews)) / total_weight
+        best_rtt = min(sample.round_trip_nsec for sample in accepted)
+        uncertainty = best_rtt / 2.0 + math.sqrt(residual_var)
+        return ClockSkewEstimate(int(round(skew_at_reference)), drift, int(math.ceil(uncertainty)),
+                                 reference, len(accepted),
+                                 len(samples) - len(accepted))
+
+
 class TimeSyncEndpoint:
     """A wrapper that uses a TimeSyncClient object to establish and maintain timesync with a robot.
 
@@ -207,11 +400,19 @@ class TimeSyncEndpoint:
     estimates. This class automatically builds requests passed to the TimeSyncClient, so users
     don't have to worry about the details of establishing and maintaining timesync.
 
+    By default the clock skew is the best estimate reported by the time-sync service. If a
+    ClockSkewEstimator is given as skew_estimator, the round trips of the updates are filtered
+    on the client instead, and the clock skew is the estimator's drift-corrected estimate.
+
     This object is thread-safe.
     """
 
-    def __init__(self, time_sync_client):
+    # Number of clock skew estimates kept for get_skew_history_time_converter().
+    SKEW_HISTORY_SIZE = 1000
+
+    def __init__(self, time_sync_client, skew_estimator=None):
         self._client = time_sync_client
+        self.skew_estimator = skew_estimator
         self._lock = Lock()
         # Access these using the lock.
         # These should be updated by replacement, not mutation so that they may be used
@@ -219,6 +420,8 @@ class TimeSyncEndpoint:
         self._locked_previous_round_trip = None
         self._locked_previous_response = None
         self._locked_clock_identifier = ""
+        # (local time in nanoseconds, clock skew in nanoseconds) of each established update.
+        self._locked_skew_history = collections.deque(maxlen=self.SKEW_HISTORY_SIZE)
 
     @property
     def response(self):
@@ -265,7 +468,10 @@ class TimeSyncEndpoint:
 
     @property
     def clock_skew(self):
-        """The best current estimate of clock skew from the time-sync service.
+        """The best current estimate of clock skew.
+
+        This is the estimate of the time-sync service, or of the skew_estimator at the current
+        time if there is one.
 
         Returns:
             The google.protobuf.Duration representing the clock skew.
@@ -277,7 +483,25 @@ class TimeSyncEndpoint:
         # pylint: disable=no-member
         if not response or response.state.status != time_sync_pb2.TimeSyncState.STATUS_OK:
             raise NotEstablishedError
-        return response.state.best_estimate.clock_skew
+        estimate = self.skew_estimator.estimate if self.skew_estimator else None
+        if estimate is None:
+            return response.state.best_estimate.clock_skew
+        clock_skew = duration_pb2.Duration()
+        clock_skew.FromNanoseconds(estimate.skew_at(now_nsec()))
+        return clock_skew
+
+    @property
+    def clock_skew_estimate(self):
+        """The ClockSkewEstimate of the skew_estimator, with its drift and uncertainty.
+
+        Raises:
+            NotEstablishedError: Time sync has not yet been established, or there is no
+                                 skew_estimator.
+        """
+        estimate = self.skew_estimator.estimate if self.skew_estimator else None
+        if estimate is None or not self.has_established_time_sync:
+            raise NotEstablishedError
+        return estimate
 
     def establish_timesync(self, max_samples=25, break_on_success=False):
         """Perform time-synchronization until time sync established.
@@ -299,7 +523,7 @@ class TimeSyncEndpoint:
             counter += 1
         return self.has_established_time_sync
 
-    def _get_update(self):
+    def _get_update_args(self):
         round_trip = None
         clock_identifier = None
         with self._lock:
@@ -311,8 +535,10 @@ class TimeSyncEndpoint:
             if self._locked_clock_identifier:
                 round_trip = self._locked_previous_round_trip
                 clock_identifier = self._locked_clock_identifier
-        return self._client.get_time_sync_update(previous_round_trip=round_trip,
-                                                 clock_identifier=clock_identifier)
+        return dict(previous_round_trip=round_trip, clock_identifier=clock_identifier)
+
+    def _get_update(self):
+        return self._client.get_time_sync_update(**self._get_update_args())
 
     def get_new_estimate(self):
         """Perform an update-cycle toward achieving time-synchronization.
@@ -321,8 +547,26 @@ class TimeSyncEndpoint:
             Boolean true if valid timesync has been established.
         """
         response = self._get_update()
+        return self._handle_update(response, now_nsec())
+
+    def get_new_estimate_async(self):
+        """Async version of get_new_estimate().
+
+        Return:
+            The future of the time-sync update RPC. The estimate is updated when it completes,
+            before any callbacks added to the future by the caller run.
+        """
+        future = self._client.get_time_sync_update_async(**self._get_update_args())
+        future.add_done_callback(self._handle_update_future)
+        return future
+
+    def _handle_update_future(self, future):
         rx_time = now_nsec()
+        if future.exception() is None:
+            self._handle_update(future.result(), rx_time)
 
+    def _handle_update(self, response, rx_time):
+        """Record the response of a time-sync update received at rx_time nanoseconds."""
         # Record the timing information for this GRPC call to pass to the next update
         round_trip = time_sync_pb2.TimeSyncRoundTrip()
         # pylint: disable=no-member
@@ -331,13 +575,31 @@ class TimeSyncEndpoint:
         round_trip.server_tx.CopyFrom(response.header.response_timestamp)
         set_timestamp_from_nsec(round_trip.client_rx, rx_time)
 
+        skew_estimator = self.skew_estimator
+        if skew_estimator is not None:
+            with self._lock:
+                previous_clock_identifier = self._locked_clock_identifier
+            if previous_clock_identifier and previous_clock_identifier != response.clock_identifier:
+                # The service restarted, its clock may have been changed.
+                skew_estimator.reset()
+            skew_estimator.add_round_trip(round_trip)
+
         with self._lock:
             self._locked_previous_round_trip = round_trip
             # Store the response to get clock-skew estimate, etc.
             self._locked_previous_response = response
             self._locked_clock_identifier = response.clock_identifier
 
-        return self.has_established_time_sync
+        if not self.has_established_time_sync:
+            return False
+        estimate = skew_estimator.estimate if skew_estimator is not None else None
+        if estimate is None:
+            skew_nsec = timestamp_to_nsec(response.state.best_estimate.clock_skew)
+        else:
+            skew_nsec = estimate.skew_at(rx_time)
+        with self._lock:
+            self._locked_skew_history.append((rx_time, skew_nsec))
+        return True
 
     def get_robot_time_converter(self):
         """Get a RobotTimeConverter for current estimate for robot clock skew from local time.
@@ -350,6 +612,22 @@ class TimeSyncEndpoint:
         """
         return RobotTimeConverter(timestamp_to_nsec(self.clock_skew))
 
+    def get_skew_history_time_converter(self):
+        """Get a SkewHistoryTimeConverter for the clock skew estimated over time.
+
+        The converter applies the clock skew that was estimated at the time of each converted
+        sample, which is more accurate than the current skew for samples recorded earlier.
+
+        Raises:
+          NotEstablishedError: If time sync has not yet been established.
+        """
+        with self._lock:
+            history = list(self._locked_skew_history)
+        if not history:
+            raise NotEstablishedError
+        local_times, clock_skews = zip(*history)
+        return SkewHistoryTimeConverter(local_times, clock_skews)
+
     def robot_timestamp_from_local_secs(self, local_time_secs):
         """Convert a local time in seconds to a timestamp proto in robot time.
 
@@ -371,7 +649,11 @@ class TimeSyncEndpoint:
 
 
 class TimeSyncThread:
-    """Background thread for achieving and maintaining time-sync to the robot."""
+    """Background thread for achieving and maintaining time-sync to the robot.
+
+    If a HeartbeatScheduler is given as scheduler, the time-sync updates are issued as async RPCs
+    from the scheduler's thread rather than from a thread of this object.
+    """
 
     # After achieving time sync, update estimate every minute.
     DEFAULT_TIME_SYNC_INTERVAL_SEC = 60
@@ -379,8 +661,13 @@ class TimeSyncThread:
     # When time-sync service is not yet ready, poll it at this interval
     TIME_SYNC_SERVICE_NOT_READY_INTERVAL_SEC = 5
 
-    def __init__(self, time_sync_client, time_sync_endpoint=None):
+    # With a ClockSkewEstimator, update at least this often while its estimate is not stable.
+    MIN_ADAPTIVE_TIME_SYNC_INTERVAL_SEC = 1
+
+    def __init__(self, time_sync_client, time_sync_endpoint=None, scheduler=None):
         self._time_sync_endpoint = time_sync_endpoint or TimeSyncEndpoint(time_sync_client)
+        self._scheduler = scheduler
+        self._heartbeat = None
         self._lock = Lock()
         self._locked_time_sync_interval_sec = self.DEFAULT_TIME_SYNC_INTERVAL_SEC
         self._locked_should_exit = False  # Used to tell the thread to stop running.
@@ -397,15 +684,28 @@ class TimeSyncThread:
         with self._lock:
             if self._thread and self._thread.is_alive():
                 return
+            if self._heartbeat and self._heartbeat.is_active():
+                return
             self._locked_should_exit = False
             self._locked_thread_exception = None
             self._event.clear()
+            if self._scheduler is not None:
+                # No wait before the first update, as in the thread.
+                self._heartbeat = self._scheduler.add('time sync', self._scheduled_update,
+                                                      self._locked_time_sync_interval_sec)
+                return
             self._thread = Thread(target=self._timesync_thread)
             self._thread.daemon = True
         self._thread.start()
 
     def stop(self):
         """Shut down the thread if it is running."""
+        if self._heartbeat:
+            with self._lock:
+                self._locked_should_exit = True
+            self._heartbeat.cancel()
+            self._heartbeat.wait()
+            self._heartbeat = None
         if self._thread:
             with self._lock:
                 self._locked_should_exit = True  # Signal the thread to exit.
@@ -429,6 +729,11 @@ class TimeSyncThread:
         with self._lock:
             self._locked_time_sync_interval_sec = val
             self._event.set()
+            heartbeat = self._heartbeat
+        if heartbeat is not None:
+            # Update now, as the thread does when its wait is interrupted.
+            heartbeat.period_sec = val
+            heartbeat.run_after(0)
 
     @property
     def should_exit(self):
@@ -474,6 +779,8 @@ class TimeSyncThread:
     def stopped(self):
         """Returns True if thread is no longer running."""
         with self._lock:
+            if self._heartbeat is not None:
+                return not self._heartbeat.is_active()
             return not self._thread or not self._thread.is_alive()
 
     @property
@@ -540,6 +847,46 @@ class TimeSyncThread:
         converter = self.get_robot_time_converter(timesync_timeout_sec)
         return converter.robot_timestamp_from_local_secs(local_time_secs)
 
+    def _next_update_delay(self):
+        """Time to wait before the next time-sync update, based on the last response."""
+        response = self._time_sync_endpoint.response
+        # pylint: disable=no-member
+        if (not response or
+                response.state.status == time_sync_pb2.TimeSyncState.STATUS_MORE_SAMPLES_NEEDED):
+            # No wait between updates while time-sync is not established.
+            return 0
+        if response.state.status == time_sync_pb2.TimeSyncState.STATUS_SERVICE_NOT_READY:
+            # Wait a few seconds between updates while waiting for time-sync service to be ready.
+            return self.TIME_SYNC_SERVICE_NOT_READY_INTERVAL_SEC
+        skew_estimator = self._time_sync_endpoint.skew_estimator
+        if skew_estimator is not None:
+            # Adapt the wait time to the stability of the estimate, up to the configured wait.
+            return skew_estimator.suggested_interval_sec(self.MIN_ADAPTIVE_TIME_SYNC_INTERVAL_SEC,
+                                                         self.time_sync_interval_sec)
+        # When sync has been established, use default wait time.
+        return self.time_sync_interval_sec
+
+    def _scheduled_update(self):
+        """Start one time-sync update from the HeartbeatScheduler's thread."""
+        if self.should_exit:
+            return None
+        heartbeat = self._heartbeat
+        future = self._time_sync_endpoint.get_new_estimate_async()
+        future.add_done_callback(lambda done_future: self._scheduled_update_done(
+            done_future, heartbeat))
+        return future
+
+    def _scheduled_update_done(self, future, heartbeat):
+        try:
+            future.result()
+        # For now, on GRPC error, store the error object and stop updating, as the thread does.
+        except Error as err:
+            with self._lock:
+                self._locked_thread_exception = err
+            heartbeat.cancel()
+            return
+        heartbeat.run_after(self._next_update_delay())
+
     def _timesync_thread(self):
         """Background thread which communicates with the time-sync service on robot.
 
@@ -548,19 +895,9 @@ class TimeSyncThread:
         """
         try:
             while not self.should_exit:
-                response = self._time_sync_endpoint.response
-                # pylint: disable=no-member
-                if (not response or response.state.status
-                        == time_sync_pb2.TimeSyncState.STATUS_MORE_SAMPLES_NEEDED):
-                    # No wait between updates while time-sync is not established.
-                    pass
-                elif response.state.status == time_sync_pb2.TimeSyncState.STATUS_SERVICE_NOT_READY:
-                    # Wait a few seconds between updates while waiting for time-sync service
-                    #  to be ready.
-                    self._event.wait(self.TIME_SYNC_SERVICE_NOT_READY_INTERVAL_SEC)
-                else:
-                    # When sync has been established, use default wait time.
-                    self._event.wait(self.time_sync_interval_sec)
+                wait_sec = self._next_update_delay()
+                if wait_sec:
+                    self._event.wait(wait_sec)
                 self._event.clear()
 
                 # Do RPC call to update time-sync information.
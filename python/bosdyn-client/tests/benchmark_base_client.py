@@ -0,0 +1,110 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Benchmark the per-call overhead of BaseClient.call compared to invoking the stub directly.
+
+Run from the bosdyn-client directory with:
+    python -m tests.benchmark_base_client
+"""
+
+import argparse
+import timeit
+
+from bosdyn.api import lease_pb2, robot_command_pb2, robot_command_service_pb2_grpc
+from bosdyn.client import lease
+from bosdyn.client.common import COPY_REQUEST_ON_WRITE
+from bosdyn.client.processors import AddRequestHeader
+from bosdyn.client.robot_command import RobotCommandClient
+
+from .helpers import setup_client_and_service
+
+
+class EchoRobotCommandServicer(robot_command_service_pb2_grpc.RobotCommandServiceServicer):
+
+    def RobotCommand(self, request, context):
+        response = robot_command_pb2.RobotCommandResponse()
+        response.header.request_header.CopyFrom(request.header)
+        response.status = robot_command_pb2.RobotCommandResponse.STATUS_OK
+        return response
+
+
+def _make_request(num_points):
+    request = robot_command_pb2.RobotCommandRequest()
+    arm_command = request.command.synchronized_command.arm_command
+    trajectory = arm_command.arm_cartesian_command.pose_trajectory_in_task
+    for i in range(num_points):
+        point = trajectory.points.add()
+        point.pose.position.x = i
+        point.pose.rotation.w = 1
+        point.time_since_reference.nanos = i
+    return request
+
+
+def _report(name, seconds, number, baseline=None):
+    usec = seconds / number * 1e6
+    if baseline is None:
+        print('{:<40} {:10.1f} us/call'.format(name, usec))
+    else:
+        print('{:<40} {:10.1f} us/call  ({:+.1f} us)'.format(name, usec, usec - baseline))
+    return usec
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=2000, help='Calls per measurement.')
+    parser.add_argument('--points', type=int, nargs='+', default=[0, 1000],
+                        help='Trajectory points per request, to vary the request size.')
+    options = parser.parse_args()
+
+    wallet = lease.LeaseWallet()
+    wallet.add(lease.Lease(lease_pb2.Lease(resource='body', sequence=[1], client_names=['root'])))
+    client = RobotCommandClient()
+    client.request_processors = [
+        AddRequestHeader(lambda: 'benchmark'),
+        lease.LeaseWalletRequestProcessor(wallet)
+    ]
+    server = setup_client_and_service(
+        client, EchoRobotCommandServicer(),
+        robot_command_service_pb2_grpc.add_RobotCommandServiceServicer_to_server)
+    rpc = client._stub.RobotCommand
+
+    try:
+        for num_points in options.points:
+            request = _make_request(num_points)
+            print('Request of {} bytes ({} trajectory points)'.format(request.ByteSize(),
+                                                                      num_points))
+            number = options.number
+
+            baseline = _report('raw stub', timeit.timeit(lambda: rpc(request), number=number),
+                               number)
+            for name, copy_request in (('call, copy_request=True', True),
+                                       ('call, COPY_REQUEST_ON_WRITE', COPY_REQUEST_ON_WRITE),
+                                       ('call, copy_request=False', False)):
+                # Clear the fields set in place by copy_request=False on the previous pass.
+                request.ClearField('header')
+                request.ClearField('lease')
+                _report(
+                    name,
+                    timeit.timeit(lambda: client.call(rpc, request, copy_request=copy_request),
+                                  number=number), number, baseline)
+
+            for name, copy_request in (('processors only, copy_request=True', True),
+                                       ('processors only, COPY_REQUEST_ON_WRITE',
+                                        COPY_REQUEST_ON_WRITE)):
+
+                def run_processors():
+                    _, restore_request = client._prepare_request(request, copy_request)
+                    restore_request()
+
+                _report(name, timeit.timeit(run_processors, number=number), number)
+            print()
+    finally:
+        server.stop(None)
+
+
+if __name__ == '__main__':
+    main()
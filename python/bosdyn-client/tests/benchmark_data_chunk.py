@@ -0,0 +1,91 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Benchmark time and peak Python memory of sending and receiving data as DataChunks.
+
+Receiving compares growing a bytes object chunk by chunk (as GraphNav and choreography downloads
+did) and joining all chunks, with assembling into a buffer preallocated from total_size. Sending
+compares reading a file whole before chunking it with streaming its chunks from a memory map.
+Memory is measured with tracemalloc, which does not count the pages of a memory map.
+
+Run from the bosdyn-client directory with:
+    python -m tests.benchmark_data_chunk
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from bosdyn.api.graph_nav import graph_nav_pb2
+from bosdyn.client import data_chunk
+
+
+def _measure(function):
+    tracemalloc.start()
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--megabytes', type=int, default=64, help='Size of the data.')
+    parser.add_argument('--chunk-size', type=int, default=1024 * 1024, help='Bytes per chunk.')
+    options = parser.parse_args()
+
+    data = os.urandom(options.megabytes * 1024 * 1024)
+    responses = [
+        graph_nav_pb2.DownloadWaypointSnapshotResponse(chunk=chunk)
+        for chunk in data_chunk.chunk_serialized(data, options.chunk_size)
+    ]
+
+    def _receive_concatenate():
+        received = bytes()
+        for response in responses:
+            received += response.chunk.data
+
+    def _receive_join():
+        data_chunk.serialized_from_messages(responses)
+
+    def _receive_preallocated():
+        data_chunk.assemble_chunks(response.chunk for response in responses)
+
+    with tempfile.NamedTemporaryFile() as temp_file:
+        temp_file.write(data)
+        temp_file.flush()
+
+        def _send_read_whole():
+            with open(temp_file.name, 'rb') as infile:
+                for _ in data_chunk.chunk_serialized(infile.read(), options.chunk_size):
+                    pass
+
+        def _send_mapped():
+            with open(temp_file.name, 'rb') as infile:
+                for _ in data_chunk.chunk_file(infile, options.chunk_size):
+                    pass
+
+        cases = [
+            ('receive +=', _receive_concatenate),
+            ('receive join', _receive_join),
+            ('receive prealloc', _receive_preallocated),
+            ('send read whole', _send_read_whole),
+            ('send mmap', _send_mapped),
+        ]
+        print('{} MB in {} byte chunks'.format(options.megabytes, options.chunk_size))
+        print('{:<18} {:>10} {:>14}'.format('method', 'ms', 'peak MB'))
+        for label, function in cases:
+            elapsed, peak = _measure(function)
+            print('{:<18} {:10.1f} {:14.1f}'.format(label, elapsed * 1e3, peak / 1e6))
+
+
+if __name__ == '__main__':
+    main()
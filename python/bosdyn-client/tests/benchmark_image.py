@@ -0,0 +1,105 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Benchmark DepthProjector against depth_image_to_pointcloud for the five body depth cameras.
+
+The depth images are synthetic 424x240 images, the resolution of the body depth cameras, with
+about 10% invalid pixels. Every set of five images is converted into point clouds in the odom
+frame.
+
+Run from the bosdyn-client directory with:
+    python -m tests.benchmark_image
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+
+from bosdyn.api import image_pb2
+from bosdyn.client.frame_helpers import get_a_tform_b
+from bosdyn.client.image import DepthProjector, depth_image_to_pointcloud
+from bosdyn.client.math_helpers import Quat, SE3Pose
+
+BODY_DEPTH_SOURCES = ('frontleft_depth', 'frontright_depth', 'left_depth', 'right_depth',
+                      'back_depth')
+
+
+def _make_depth_response(rng, name, yaw, rows=240, cols=424):
+    depth = rng.integers(300, 8000, size=(rows, cols), dtype=np.uint16)
+    depth[rng.random(size=(rows, cols)) < 0.1] = 0
+    response = image_pb2.ImageResponse()
+    source = response.source
+    source.name = name
+    source.rows = rows
+    source.cols = cols
+    source.depth_scale = 1000.0
+    source.image_type = image_pb2.ImageSource.IMAGE_TYPE_DEPTH
+    source.pinhole.intrinsics.focal_length.x = 215.0
+    source.pinhole.intrinsics.focal_length.y = 215.0
+    source.pinhole.intrinsics.principal_point.x = cols / 2.0
+    source.pinhole.intrinsics.principal_point.y = rows / 2.0
+    shot = response.shot
+    shot.image.rows = rows
+    shot.image.cols = cols
+    shot.image.format = image_pb2.Image.FORMAT_RAW
+    shot.image.pixel_format = image_pb2.Image.PIXEL_FORMAT_DEPTH_U16
+    shot.image.data = depth.tobytes()
+    shot.frame_name_image_sensor = name
+    edges = shot.transforms_snapshot.child_to_parent_edge_map
+    edges['odom'].parent_frame_name = ''
+    edges['body'].parent_frame_name = 'odom'
+    edges['body'].parent_tform_child.CopyFrom(
+        SE3Pose(5.0, -2.0, 0.5, Quat.from_yaw(0.3)).to_proto())
+    edges[name].parent_frame_name = 'body'
+    edges[name].parent_tform_child.CopyFrom(
+        SE3Pose(0.4 * np.cos(yaw), 0.2 * np.sin(yaw), 0.0,
+                Quat.from_yaw(yaw) * Quat.from_pitch(0.3)).to_proto())
+    return response
+
+
+def _pointclouds_in_odom(image_responses):
+    """The per-source loop that users write with depth_image_to_pointcloud."""
+    clouds = {}
+    for image_response in image_responses:
+        odom_tform_sensor = get_a_tform_b(image_response.shot.transforms_snapshot, 'odom',
+                                          image_response.shot.frame_name_image_sensor)
+        clouds[image_response.source.name] = odom_tform_sensor.transform_cloud(
+            depth_image_to_pointcloud(image_response, max_dist=10))
+    return clouds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=20, help='Image sets per measurement.')
+    options = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    responses = [
+        _make_depth_response(rng, name, yaw)
+        for name, yaw in zip(BODY_DEPTH_SOURCES, np.linspace(0, 2 * np.pi, 5, endpoint=False))
+    ]
+    projector = DepthProjector(max_dist=10)
+
+    expected = _pointclouds_in_odom(responses)
+    for name, cloud in projector.pointclouds(responses, frame_name='odom').items():
+        assert np.allclose(cloud, expected[name])
+
+    loop_sec = timeit.timeit(lambda: _pointclouds_in_odom(responses),
+                             number=options.number) / options.number
+    projector_sec = timeit.timeit(lambda: projector.pointclouds(responses, frame_name='odom'),
+                                  number=options.number) / options.number
+    num_points = sum(len(cloud) for cloud in expected.values())
+    print('{} sources, {} points per set'.format(len(responses), num_points))
+    print('{:<28} {:>10} {:>12}'.format('method', 'ms per set', 'max sets/s'))
+    for name, sec in (('depth_image_to_pointcloud', loop_sec), ('DepthProjector', projector_sec)):
+        print('{:<28} {:10.2f} {:12.1f}'.format(name, sec * 1e3, 1.0 / sec))
+    print('Speedup: {:.1f}x'.format(loop_sec / projector_sec))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Benchmark CameraBaseImageServicer.GetImage for a request covering several payload cameras.
+
+Each fake camera returns a fixed synthetic RGB frame with a new capture time on every capture
+and JPEG-encodes it with OpenCV, so the benchmark measures the encode cost that the servicer
+spreads over its worker threads. The same request is answered serially (max_workers=1) and
+concurrently (the default of one worker per image source). A last run repeats requests for the
+same captured frames, as when several clients poll a background capture thread, which are
+answered from the encoded image cache.
+
+Run from the bosdyn-client directory with:
+    python -m tests.benchmark_image_service_helpers
+"""
+
+import argparse
+import itertools
+import timeit
+
+import cv2
+import numpy as np
+from google.protobuf import timestamp_pb2
+
+from bosdyn.api import image_pb2
+from bosdyn.client.image_service_helpers import (CameraBaseImageServicer, CameraInterface,
+                                                 VisualImageSource)
+
+
+class _FakeTimeSync(object):
+
+    def wait_for_sync(self):
+        pass
+
+    def robot_timestamp_from_local_secs(self, seconds):
+        return timestamp_pb2.Timestamp(seconds=int(seconds))
+
+
+class _FakeRobot(object):
+
+    def __init__(self):
+        self.time_sync = _FakeTimeSync()
+
+    def ensure_client(self, name):
+        return None
+
+
+class _FakeCamera(CameraInterface):
+    """Camera returning one synthetic frame, encoded as a JPEG on every decode."""
+
+    def __init__(self, image, new_frames):
+        self.image = image
+        self.new_frames = new_frames
+        self._capture_times = itertools.count()
+
+    def blocking_capture(self, *, custom_params=None, **kwargs):
+        if self.new_frames:
+            return self.image, float(next(self._capture_times))
+        return self.image, 0.0
+
+    def image_decode(self, image_data, image_proto, image_req):
+        quality = int(image_req.quality_percent) or 75
+        image_proto.format = image_pb2.Image.FORMAT_JPEG
+        image_proto.pixel_format = image_pb2.Image.PIXEL_FORMAT_RGB_U8
+        image_proto.data = cv2.imencode('.jpg', image_data,
+                                        [int(cv2.IMWRITE_JPEG_QUALITY), quality])[1].tobytes()
+
+
+def _make_servicer(images, max_workers, new_frames=True):
+    image_sources = [
+        VisualImageSource('camera_%d' % index, _FakeCamera(image, new_frames),
+                          rows=image.shape[0], cols=image.shape[1])
+        for index, image in enumerate(images)
+    ]
+    return CameraBaseImageServicer(_FakeRobot(), 'benchmark-image-service', image_sources,
+                                   use_background_capture_thread=False, max_workers=max_workers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sources', type=int, default=5, help='Number of payload cameras.')
+    parser.add_argument('--rows', type=int, default=1080, help='Rows of each frame.')
+    parser.add_argument('--cols', type=int, default=1920, help='Columns of each frame.')
+    parser.add_argument('--number', type=int, default=20, help='Requests per measurement.')
+    options = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    # Smooth gradients plus noise, so the JPEG encode does a realistic amount of work.
+    gradient = np.linspace(0, 200, options.cols, dtype=np.float32)[np.newaxis, :, np.newaxis]
+    images = [(gradient + rng.integers(0, 55, size=(options.rows, options.cols, 3))).astype(
+        np.uint8) for _ in range(options.sources)]
+
+    request = image_pb2.GetImageRequest()
+    for index in range(options.sources):
+        request.image_requests.add(image_source_name='camera_%d' % index, quality_percent=75,
+                                   image_format=image_pb2.Image.FORMAT_JPEG)
+
+    results = []
+    for label, max_workers, new_frames in (('serial', 1, True), ('concurrent', None, True),
+                                           ('cached', 1, False)):
+        servicer = _make_servicer(images, max_workers, new_frames)
+        response = servicer.GetImage(request, None)
+        assert all(img_resp.status == image_pb2.ImageResponse.STATUS_OK
+                   for img_resp in response.image_responses)
+        sec = timeit.timeit(lambda: servicer.GetImage(request, None),
+                            number=options.number) / options.number
+        encode_sec = sum(timing.decode_secs for timing in servicer.last_image_timings)
+        results.append((label, sec, encode_sec))
+
+    print('{} sources of {}x{}'.format(options.sources, options.cols, options.rows))
+    print('{:<12} {:>14} {:>20}'.format('mode', 'ms per request', 'ms decoding (sum)'))
+    for label, sec, encode_sec in results:
+        print('{:<12} {:14.2f} {:20.2f}'.format(label, sec * 1e3, encode_sec * 1e3))
+    print('Concurrent speedup: {:.1f}x'.format(results[0][1] / results[1][1]))
+    print('Cached speedup: {:.1f}x'.format(results[0][1] / results[2][1]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Benchmark decode_local_grid against the per-cell RLE expansion of the visualizer example.
+
+The grids are synthetic 128x128 terrain (int16, RLE encoded, scaled) and no-step (uint8, RLE
+encoded) grids, like the ones returned by the robot.
+
+Run from the bosdyn-client directory with:
+    python -m tests.benchmark_local_grid
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+
+from bosdyn.api import local_grid_pb2
+from bosdyn.client.local_grid import decode_local_grid, local_grid_cell_centers
+
+
+def _example_expand_data_by_rle_count(local_grid_proto, data_type=np.int16):
+    """expand_data_by_rle_count from examples/visualizer/basic_streaming_visualizer.py."""
+    cells_pz = np.frombuffer(local_grid_proto.local_grid.data, dtype=data_type)
+    cells_pz_full = []
+    for i in range(0, len(local_grid_proto.local_grid.rle_counts)):
+        for j in range(0, local_grid_proto.local_grid.rle_counts[i]):
+            cells_pz_full.append(cells_pz[i])
+    return np.array(cells_pz_full)
+
+
+def _example_unpack_grid(local_grid_proto, data_type):
+    """unpack_grid from examples/visualizer/basic_streaming_visualizer.py, for RLE grids."""
+    full_grid = _example_expand_data_by_rle_count(local_grid_proto, data_type=data_type)
+    if local_grid_proto.local_grid.cell_value_scale == 0:
+        return full_grid
+    full_grid_float = full_grid.astype(np.float64)
+    full_grid_float *= local_grid_proto.local_grid.cell_value_scale
+    full_grid_float += local_grid_proto.local_grid.cell_value_offset
+    return full_grid_float
+
+
+def _make_response(cells, cell_format, dtype, scale=0, offset=0):
+    response = local_grid_pb2.LocalGridResponse(status=local_grid_pb2.LocalGridResponse.STATUS_OK)
+    local_grid = response.local_grid
+    local_grid.cell_format = cell_format
+    local_grid.encoding = local_grid.ENCODING_RLE
+    local_grid.cell_value_scale = scale
+    local_grid.cell_value_offset = offset
+    local_grid.extent.cell_size = 0.03
+    local_grid.extent.num_cells_y, local_grid.extent.num_cells_x = cells.shape
+    flat = cells.ravel()
+    starts = np.flatnonzero(np.r_[True, flat[1:] != flat[:-1]])
+    local_grid.data = flat[starts].astype(dtype).tobytes()
+    local_grid.rle_counts.extend(np.diff(np.r_[starts, len(flat)]).tolist())
+    return response
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=128, help='Number of cells along each side.')
+    parser.add_argument('--number', type=int, default=20, help='Decodes per measurement.')
+    options = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    rows, cols = np.mgrid[0:options.size, 0:options.size]
+    # Terrain heights in 1 cm steps, so neighboring cells often repeat.
+    terrain = (rows // 4 + cols // 8 + rng.integers(0, 2, size=rows.shape)).astype(np.int16)
+    no_step = (((rows // 16) + (cols // 16)) % 3 == 0).astype(np.uint8)
+    grids = (
+        ('terrain',
+         _make_response(terrain, local_grid_pb2.LocalGrid.CELL_FORMAT_INT16, '<i2', scale=0.01,
+                        offset=-0.5), np.int16),
+        ('no_step', _make_response(no_step, local_grid_pb2.LocalGrid.CELL_FORMAT_UINT8,
+                                   'u1'), np.uint8),
+    )
+
+    print('{:<10} {:>8} {:>14} {:>14} {:>9}'.format('grid', 'runs', 'example ms', 'decode ms',
+                                                    'speedup'))
+    for name, response, data_type in grids:
+        assert np.allclose(_example_unpack_grid(response, data_type),
+                           decode_local_grid(response).ravel())
+        example_sec = timeit.timeit(lambda: _example_unpack_grid(response, data_type),
+                                    number=options.number) / options.number
+        decode_sec = timeit.timeit(lambda: decode_local_grid(response),
+                                   number=options.number) / options.number
+        print('{:<10} {:8d} {:14.3f} {:14.3f} {:8.0f}x'.format(name,
+                                                               len(response.local_grid.rle_counts),
+                                                               example_sec * 1e3, decode_sec * 1e3,
+                                                               example_sec / decode_sec))
+
+    response = grids[0][1]
+    centers_sec = timeit.timeit(
+        lambda: local_grid_cell_centers(response, heights=decode_local_grid(response)),
+        number=options.number) / options.number
+    print('Decoding the terrain grid with cell centers: {:.3f} ms'.format(centers_sec * 1e3))
+
+
+if __name__ == '__main__':
+    main()
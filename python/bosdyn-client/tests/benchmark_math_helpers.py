@@ -0,0 +1,106 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Benchmark the math_helpers classes.
+
+Reports the per-operation cost of the scalar classes, including the in-place variants and the
+cached matrix forms, and compares SE3PoseArray operations against loops over SE3Pose objects.
+
+Run from the bosdyn-client directory with:
+    python -m tests.benchmark_math_helpers
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+
+from bosdyn.client.math_helpers import Quat, QuatArray, SE2Pose, SE3Pose, SE3PoseArray
+
+
+def _random_pose_array(rng, num):
+    data = np.empty((num, 7))
+    data[:, :3] = rng.uniform(-5, 5, size=(num, 3))
+    rot = rng.normal(size=(num, 4))
+    data[:, 3:] = rot / np.linalg.norm(rot, axis=1, keepdims=True)
+    return SE3PoseArray(data)
+
+
+def _benchmark_scalar_ops(number):
+    a = SE3Pose(1.0, 2.0, 3.0, Quat.from_yaw(0.3) * Quat.from_roll(0.2))
+    b = SE3Pose(-0.5, 0.25, 1.0, Quat.from_pitch(-0.4))
+    out = SE3Pose.from_identity()
+    matrix_out = np.empty((4, 4))
+    se2_a = SE2Pose(1.0, 2.0, 0.3)
+    se2_b = SE2Pose(-0.5, 0.25, -1.2)
+    se2_out = SE2Pose(0.0, 0.0, 0.0)
+
+    def uncached_to_matrix():
+        # Mutating the pose invalidates the cached matrices, which is simulated here.
+        a._matrix_key = None
+        a.rot._matrix_key = None
+        return a.to_matrix()
+
+    cases = (
+        ('SE3Pose.mult', lambda: a.mult(b)),
+        ('SE3Pose.mult_into', lambda: a.mult_into(b, out)),
+        ('SE3Pose.inverse', lambda: a.inverse()),
+        ('SE3Pose.inverse_into', lambda: a.inverse_into(out)),
+        ('SE3Pose.transform_point', lambda: a.transform_point(1.0, 2.0, 3.0)),
+        ('SE3Pose.to_matrix uncached', uncached_to_matrix),
+        ('SE3Pose.to_matrix', lambda: a.to_matrix()),
+        ('SE3Pose.to_matrix(out)', lambda: a.to_matrix(out=matrix_out)),
+        ('Quat.mult', lambda: a.rot.mult(b.rot)),
+        ('Quat.mult_into', lambda: a.rot.mult_into(b.rot, out.rot)),
+        ('SE2Pose.mult', lambda: se2_a.mult(se2_b)),
+        ('SE2Pose.mult_into', lambda: se2_a.mult_into(se2_b, se2_out)),
+    )
+    print('{:<28} {:>10}'.format('operation', 'us per op'))
+    for name, operation in cases:
+        sec = timeit.timeit(operation, number=number) / number
+        print('{:<28} {:10.3f}'.format(name, sec * 1e6))
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--num-poses', type=int, default=10000, help='Number of poses.')
+    parser.add_argument('--number', type=int, default=5, help='Runs per array measurement.')
+    parser.add_argument('--scalar-number', type=int, default=100000,
+                        help='Runs per scalar operation measurement.')
+    options = parser.parse_args()
+
+    _benchmark_scalar_ops(options.scalar_number)
+
+    rng = np.random.default_rng(0)
+    a_array = _random_pose_array(rng, options.num_poses)
+    b_array = _random_pose_array(rng, options.num_poses)
+    a_poses = a_array.to_poses()
+    b_poses = b_array.to_poses()
+    points = rng.uniform(-1, 1, size=(options.num_poses, 3))
+
+    cases = (
+        ('mult', lambda: [a * b for a, b in zip(a_poses, b_poses)], lambda: a_array * b_array),
+        ('inverse', lambda: [a.inverse() for a in a_poses], lambda: a_array.inverse()),
+        ('transform', lambda: [a.transform_point(*p) for a, p in zip(a_poses, points)],
+         lambda: a_array.transform_points(points)),
+        ('interp', lambda: [SE3Pose.interp(a, b, 0.3) for a, b in zip(a_poses, b_poses)],
+         lambda: SE3PoseArray.interp(a_array, b_array, 0.3)),
+        ('slerp', lambda: [Quat.slerp(a.rot, b.rot, 0.3) for a, b in zip(a_poses, b_poses)],
+         lambda: QuatArray.slerp(a_array.rotation, b_array.rotation, 0.3)),
+    )
+
+    print('{:<12} {:>12} {:>12} {:>9}'.format('operation', 'loop ms', 'array ms', 'speedup'))
+    for name, loop, vectorized in cases:
+        array_sec = timeit.timeit(vectorized, number=options.number) / options.number
+        loop_sec = timeit.timeit(loop, number=options.number) / options.number
+        print('{:<12} {:12.3f} {:12.3f} {:8.1f}x'.format(name, loop_sec * 1e3, array_sec * 1e3,
+                                                         loop_sec / array_sec))
+
+
+if __name__ == '__main__':
+    main()
@@ -6,9 +6,11 @@
 
 """Common unit test helpers for bosdyn.client tests."""
 
+import asyncio
 import concurrent
 
 import grpc
+import grpc.aio
 
 import bosdyn.api.header_pb2 as HeaderProto
 
@@ -38,6 +40,17 @@ def setup_client_and_service(client, service, service_adder):
     return server
 
 
+def run_with_aio_channel(client, port, coroutine_func):
+    """Run coroutine_func() on a new event loop, with the client on a grpc.aio channel to port."""
+
+    async def run():
+        async with grpc.aio.insecure_channel('127.0.0.1:{}'.format(port)) as channel:
+            client.channel = channel
+            return await coroutine_func()
+
+    return asyncio.run(run())
+
+
 def add_common_header(response, request, error_code=HeaderProto.CommonError.CODE_OK,
                       error_message=None):
     """Sets the common header on the response.
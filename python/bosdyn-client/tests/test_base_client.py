@@ -4,9 +4,24 @@
 # is subject to the terms and conditions of the Boston Dynamics Software
 # Development Kit License (20191101-BDSDK-SL).
 
+import asyncio
+import concurrent
+import copy
 from functools import partial
 
-from bosdyn.client.common import BaseClient
+import grpc
+import pytest
+
+import bosdyn.api.robot_id_service_pb2_grpc as robot_id_service
+from bosdyn.api import (header_pb2, lease_pb2, robot_command_pb2, robot_id_pb2,
+                        service_customization_pb2)
+from bosdyn.client import lease
+from bosdyn.client.exceptions import InternalServerError
+from bosdyn.client.robot_id import RobotIdClient
+from bosdyn.client.common import COPY_REQUEST_ON_WRITE, BaseClient
+from bosdyn.client.processors import AddRequestHeader, are_read_only, get_mutated_fields
+
+from . import helpers
 
 
 def method_wrapper(func):
@@ -103,3 +118,159 @@ def test_base_client():
     response = client.call_async_streaming(client._stub.rpc_method, None,
                                            value_from_response=value_from_response, **kwargs)
     assert isinstance(response.result(), Response)
+
+
+class SerializingRpc():
+    """Records the serialized form of each request, like a gRPC stub would send it."""
+
+    _method = b"MockStub.serializing_rpc"
+
+    def __init__(self):
+        self.sent = []
+
+    def __call__(self, request, **kwargs):
+        self.sent.append(request.SerializeToString())
+        return Response()
+
+    def future(self, request, **kwargs):
+        return self(request, **kwargs)
+
+
+class UndeclaredProcessor():
+
+    def mutate(self, request):
+        request.values.clear()
+
+
+def _make_lease_client():
+    wallet = lease.LeaseWallet()
+    lease_proto = lease_pb2.Lease(resource='body', sequence=[1], client_names=['root'])
+    wallet.add(lease.Lease(lease_proto))
+    client = BaseClient(stub_creation_func)
+    client.request_processors = [
+        AddRequestHeader(lambda: 'test-client'),
+        lease.LeaseWalletRequestProcessor(wallet)
+    ]
+    return client
+
+
+def _make_command_request():
+    request = robot_command_pb2.RobotCommandRequest()
+    request.command.synchronized_command.mobility_command.se2_velocity_request.end_time.seconds = 5
+    return request
+
+
+def test_mutated_fields():
+    client = _make_lease_client()
+    assert get_mutated_fields(client.request_processors) == {'header', 'lease', 'leases'}
+    assert not are_read_only(client.request_processors)
+    assert are_read_only([lease.LeaseWalletResponseProcessor(None)])
+    assert are_read_only([])
+    assert get_mutated_fields([UndeclaredProcessor()]) is None
+
+
+def test_copy_request_on_write():
+    client = _make_lease_client()
+    rpc = SerializingRpc()
+    for call in (client.call, client.call_async):
+        request = _make_command_request()
+        original = copy.deepcopy(request)
+        call(rpc, request, copy_request=COPY_REQUEST_ON_WRITE)
+
+        # The caller's request is restored, but the sent request had the header and lease.
+        assert request == original
+        sent = robot_command_pb2.RobotCommandRequest.FromString(rpc.sent[-1])
+        assert sent.header.client_name == 'test-client'
+        assert sent.lease.resource == 'body'
+        assert sent.command == original.command
+
+        # A lease that was already set is kept.
+        request.lease.resource = 'arm'
+        call(rpc, request, copy_request=COPY_REQUEST_ON_WRITE)
+        assert request.lease.resource == 'arm'
+        assert not request.HasField('header')
+        sent = robot_command_pb2.RobotCommandRequest.FromString(rpc.sent[-1])
+        assert sent.lease.resource == 'arm'
+
+
+def test_copy_request_on_write_undeclared_processor():
+    client = BaseClient(stub_creation_func)
+    client.request_processors = [UndeclaredProcessor()]
+    rpc = SerializingRpc()
+    request = service_customization_pb2.DictParam()
+    request.values['key'].int_value.value = 1
+    client.call(rpc, request, copy_request=COPY_REQUEST_ON_WRITE)
+    assert 'key' in request.values
+
+
+class FailingProcessor():
+
+    mutated_fields = ('header',)
+
+    def mutate(self, request):
+        raise ValueError('processor failed')
+
+
+def test_copy_request_on_write_processor_failure():
+    client = _make_lease_client()
+    client.request_processors.append(FailingProcessor())
+    request = _make_command_request()
+    original = copy.deepcopy(request)
+    with pytest.raises(ValueError):
+        client.call(SerializingRpc(), request, copy_request=COPY_REQUEST_ON_WRITE)
+    assert request == original
+
+
+def test_read_only_processors_skip_copy():
+    client = BaseClient(stub_creation_func)
+    request = _make_command_request()
+    assert client._apply_request_processors(request) is request
+    client.request_processors = [AddRequestHeader(lambda: 'test-client')]
+    assert client._apply_request_processors(request) is not request
+    assert not request.HasField('header')
+
+
+class MockRobotIdServicer(robot_id_service.RobotIdServiceServicer):
+
+    def __init__(self):
+        super(MockRobotIdServicer, self).__init__()
+        self.error_code = header_pb2.CommonError.CODE_OK
+
+    def GetRobotId(self, request, context):
+        response = robot_id_pb2.RobotIdResponse()
+        helpers.add_common_header(response, request, error_code=self.error_code)
+        response.robot_id.serial_number = 'B12313'
+        return response
+
+
+@pytest.fixture
+def aio_port():
+    service = MockRobotIdServicer()
+    server = grpc.server(concurrent.futures.ThreadPoolExecutor(max_workers=4))
+    robot_id_service.add_RobotIdServiceServicer_to_server(service, server)
+    port = server.add_insecure_port('127.0.0.1:0')
+    server.start()
+    yield port, service
+    server.stop(0)
+
+
+@pytest.mark.parametrize('func', ('get_id_async', 'get_id'))
+def test_aio_call(aio_port, func):
+    """Awaiting a call on a grpc.aio channel runs the usual value and error handlers."""
+    port, service = aio_port
+    client = RobotIdClient()
+
+    async def run():
+        robot_id = await getattr(client, func)()
+        assert robot_id.serial_number == 'B12313'
+
+        service.error_code = header_pb2.CommonError.CODE_INTERNAL_SERVER_ERROR
+        with pytest.raises(InternalServerError):
+            await getattr(client, func)()
+
+        # Several calls can be in flight on the same event loop.
+        service.error_code = header_pb2.CommonError.CODE_OK
+        results = await asyncio.gather(*[getattr(client, func)() for _ in range(10)])
+        assert len(results) == 10
+
+    helpers.run_with_aio_channel(client, port, run)
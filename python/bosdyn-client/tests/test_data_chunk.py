@@ -4,7 +4,7 @@
 # is subject to the terms and conditions of the Boston Dynamics Software
 # Development Kit License (20191101-BDSDK-SL).
 
-from bosdyn.api.graph_nav import map_pb2
+from bosdyn.api.graph_nav import graph_nav_pb2, map_pb2
 from bosdyn.client import data_chunk
 
 
@@ -45,3 +45,64 @@ def test_messages():
     data_chunk.parse_from_chunks(data_chunk.chunk_message(message, 100), out)
 
     assert out == message
+
+
+def test_buffer_inputs():
+    """Test that chunks can be cut from any object supporting the buffer protocol."""
+    input_serialized = bytes(range(256)) * 10
+    expected = list(data_chunk.chunk_serialized(input_serialized, 100))
+    for buffer in (bytearray(input_serialized), memoryview(input_serialized)):
+        chunks = list(data_chunk.chunk_serialized(buffer, 100))
+        assert chunks == expected
+        assert all(chunk.total_size == len(input_serialized) for chunk in chunks)
+    chunks = list(data_chunk.chunk_serialized(memoryview(input_serialized)[1000:1250], 100))
+    assert [len(chunk.data) for chunk in chunks] == [100, 100, 50]
+    assert data_chunk.serialized_from_chunks(chunks) == input_serialized[1000:1250]
+
+
+def test_chunk_file(tmp_path):
+    """Test streaming chunks from a file, from its current position."""
+    input_serialized = bytes(range(256)) * 10
+    path = tmp_path / 'data'
+    path.write_bytes(input_serialized)
+    with open(str(path), 'rb') as infile:
+        chunks = list(data_chunk.chunk_file(infile, 1000))
+        assert infile.read() == b''
+    assert [len(chunk.data) for chunk in chunks] == [1000, 1000, 560]
+    assert chunks == list(data_chunk.chunk_serialized(input_serialized, 1000))
+
+    with open(str(path), 'rb') as infile:
+        infile.seek(2000)
+        chunks = list(data_chunk.chunk_file(infile, 1000))
+    assert data_chunk.serialized_from_chunks(chunks) == input_serialized[2000:]
+    assert chunks[0].total_size == 560
+
+    path.write_bytes(b'')
+    with open(str(path), 'rb') as infile:
+        assert list(data_chunk.chunk_file(infile, 1000)) == []
+
+
+def test_assemble_chunks():
+    """Test assembling into a preallocated buffer, including inconsistent total sizes."""
+    input_serialized = bytes(range(256)) * 10
+    chunks = list(data_chunk.chunk_serialized(input_serialized, 100))
+    assert data_chunk.assemble_chunks(iter(chunks)) == input_serialized
+    assert data_chunk.assemble_chunks([]) == b''
+    for total_size in (0, 100, len(input_serialized) * 2, 2**64 - 1):
+        for chunk in chunks:
+            chunk.total_size = total_size
+        assert data_chunk.assemble_chunks(chunks) == input_serialized
+
+
+def test_parse_from_messages():
+    """Test parsing a message from wrapper messages with a chunk field."""
+    message = map_pb2.WaypointSnapshot()
+    message.id = 'id'
+    message.robot_id.nickname = 'A' * 1000
+    responses = [
+        graph_nav_pb2.DownloadWaypointSnapshotResponse(chunk=chunk)
+        for chunk in data_chunk.chunk_message(message, 100)
+    ]
+    out = map_pb2.WaypointSnapshot()
+    data_chunk.parse_from_messages(responses, out)
+    assert out == message
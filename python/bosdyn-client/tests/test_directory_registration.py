@@ -20,6 +20,7 @@ from bosdyn.client.directory_registration import (DirectoryRegistrationKeepAlive
                                                   ServiceDoesNotExistError)
 from bosdyn.client.error_callback_result import ErrorCallbackResult
 from bosdyn.client.exceptions import InvalidRequestError
+from bosdyn.client.heartbeat import HeartbeatScheduler
 
 from . import error_callback_helpers, helpers
 
@@ -348,3 +349,25 @@ def test_keep_alive_update_error_callback_exponential_backoff_levels_off(
     assert t_diff == pytest.approx(
         tuple(initial_retry_seconds * (2**count) for count in range(4)) +
         (interval_seconds, interval_seconds))
+
+
+def test_keep_alive_with_scheduler(default_service_entry, default_service_endpoint):
+    client, service, server = _setup()
+    scheduler = HeartbeatScheduler()
+    keepalive = DirectoryRegistrationKeepAlive(client, rpc_interval_seconds=0.05,
+                                               scheduler=scheduler)
+    name = default_service_entry.name
+    with keepalive.start(name, default_service_entry.type, default_service_entry.authority,
+                         default_service_endpoint.host_ip, default_service_endpoint.port):
+        assert name in service.service_entries
+        time.sleep(0.3)
+        assert keepalive.is_alive()
+        # Reregistrations fail with the expected "already exists" error, which does not stop the
+        # keep-alive.
+        metrics = scheduler.metrics()[0]
+        assert metrics.beats > 1
+        assert metrics.failures >= metrics.beats - 1
+
+    assert not keepalive.is_alive()
+    assert name not in service.service_entries
+    scheduler.shutdown()
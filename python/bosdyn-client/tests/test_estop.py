@@ -13,6 +13,7 @@ import pytest
 import bosdyn.api.estop_pb2
 import bosdyn.api.estop_service_pb2_grpc
 import bosdyn.client.estop
+import bosdyn.client.heartbeat
 from bosdyn.client import InternalServerError
 
 
@@ -165,3 +166,27 @@ def test_challenge_exc_async():
         fut.result()
     time.sleep(0.1)
     assert old_challenge + 1 == endpoint.get_challenge()
+
+
+def test_keep_alive_with_scheduler():
+    # Keep a reference to the server, which would otherwise stop while the keep-alive runs.
+    server = grpc.server(concurrent.futures.ThreadPoolExecutor(max_workers=10))
+    bosdyn.api.estop_service_pb2_grpc.add_EstopServiceServicer_to_server(MockEstopServicer(),
+                                                                         server)
+    port = server.add_insecure_port('127.0.0.1:0')
+    server.start()
+    client = bosdyn.client.estop.EstopClient()
+    client.channel = grpc.insecure_channel('127.0.0.1:{}'.format(port))
+    endpoint = bosdyn.client.estop.EstopEndpoint(client, 'test-endpoint', estop_timeout=1)
+    scheduler = bosdyn.client.heartbeat.HeartbeatScheduler()
+    keep_alive = bosdyn.client.estop.EstopKeepAlive(endpoint, rpc_interval_seconds=0.05,
+                                                    scheduler=scheduler)
+    time.sleep(0.3)
+    metrics = scheduler.metrics()
+    assert len(metrics) == 1
+    assert metrics[0].beats > 1
+    assert metrics[0].failures == 0
+    keep_alive.shutdown()
+    assert not scheduler.heartbeats()
+    scheduler.shutdown()
+    server.stop(None)
@@ -712,3 +712,154 @@ def test_express_velocity_types():
     assert isinstance(body_vel.linear_velocity_x, float)
     assert body_vel.linear_velocity_x == 1.1
     assert body_vel.linear.x == 1.1
+
+
+# The following tests are for the FrameTree class
+
+
+def _create_robot_like_snapshot():
+    """Builds a snapshot rooted at odom with rotated edges."""
+    edges = [
+        ('odom', '', math_helpers.SE3Pose.from_identity()),
+        ('vision', 'odom', math_helpers.SE3Pose(3, -2, 0, math_helpers.Quat.from_yaw(0.4))),
+        ('body', 'odom', math_helpers.SE3Pose(12.5, 4, 0.5, math_helpers.Quat.from_yaw(-1.2))),
+        ('flat_body', 'body', math_helpers.SE3Pose(0, 0, 0, math_helpers.Quat.from_roll(0.1))),
+        ('hand', 'body', math_helpers.SE3Pose(0.8, 0.1, 0.3, math_helpers.Quat.from_pitch(0.7))),
+        ('tool', 'hand', math_helpers.SE3Pose(0.2, 0, 0, math_helpers.Quat.from_roll(-0.3))),
+        ('head', 'body', math_helpers.SE3Pose(0.4, 0, 0.1, math_helpers.Quat())),
+    ]
+    edge_map = {}
+    for child, parent, pose in edges:
+        frame_helpers.add_edge_to_tree(edge_map, pose.to_proto(), parent, child)
+    return geom_protos.FrameTreeSnapshot(child_to_parent_edge_map=edge_map)
+
+
+def _assert_poses_close(pose_a, pose_b):
+    assert math.isclose(pose_a.x, pose_b.x, abs_tol=1e-9)
+    assert math.isclose(pose_a.y, pose_b.y, abs_tol=1e-9)
+    assert math.isclose(pose_a.z, pose_b.z, abs_tol=1e-9)
+    assert abs(abs(pose_a.rot.w * pose_b.rot.w + pose_a.rot.x * pose_b.rot.x +
+                   pose_a.rot.y * pose_b.rot.y + pose_a.rot.z * pose_b.rot.z) - 1) < 1e-9
+
+
+def test_frame_tree_matches_get_a_tform_b():
+    snapshot = _create_robot_like_snapshot()
+    frame_tree = frame_helpers.FrameTree(snapshot)
+    assert frame_tree.root_frame_name == 'odom'
+    assert len(frame_tree) == 7
+    assert sorted(frame_tree.frame_names) == sorted(frame_helpers.get_frame_names(snapshot))
+    assert 'hand' in frame_tree
+    assert 'gripper' not in frame_tree
+    assert frame_tree.parent_frame_name('tool') == 'hand'
+
+    for frame_a in frame_tree.frame_names:
+        for frame_b in frame_tree.frame_names:
+            expected = frame_helpers.get_a_tform_b(snapshot, frame_a, frame_b)
+            _assert_poses_close(frame_tree.a_tform_b(frame_a, frame_b), expected)
+            # A FrameTree can be used in place of the snapshot.
+            _assert_poses_close(frame_helpers.get_a_tform_b(frame_tree, frame_a, frame_b),
+                                expected)
+        _assert_poses_close(frame_tree.root_tform_frame(frame_a),
+                            frame_helpers.get_a_tform_b(snapshot, 'odom', frame_a))
+
+    assert frame_tree.a_tform_b('odom', 'gripper') is None
+    assert frame_tree.a_tform_b('gripper', 'odom') is None
+    assert frame_tree.root_tform_frame('gripper') is None
+    _assert_poses_close(frame_helpers.get_odom_tform_body(frame_tree),
+                        frame_helpers.get_odom_tform_body(snapshot))
+    se2_pose = frame_helpers.get_se2_a_tform_b(frame_tree, 'vision', 'body')
+    expected_se2_pose = frame_helpers.get_se2_a_tform_b(snapshot, 'vision', 'body')
+    assert math.isclose(se2_pose.x, expected_se2_pose.x)
+    assert math.isclose(se2_pose.angle, expected_se2_pose.angle)
+
+
+def test_frame_tree_results_are_independent():
+    frame_tree = frame_helpers.FrameTree(_create_robot_like_snapshot())
+    odom_tform_body = frame_tree.a_tform_b('odom', 'body')
+    odom_tform_body.x = 1000
+    odom_tform_body.rot.w = 0
+    _assert_poses_close(frame_tree.a_tform_b('odom', 'body'),
+                        frame_tree.root_tform_frame('body'))
+    assert frame_tree.a_tform_b('odom', 'body').x == 12.5
+
+    matrix = frame_tree.root_tform_frame_matrix('hand')
+    assert matrix is frame_tree.root_tform_frame_matrix('hand')
+    assert math.isclose(matrix[0, 3], frame_tree.root_tform_frame('hand').x)
+    with pytest.raises(ValueError):
+        matrix[0, 3] = 0
+    with pytest.raises(frame_helpers.ValidateFrameTreeUnknownFrameError):
+        frame_tree.root_tform_frame_matrix('gripper')
+
+
+def test_frame_tree_lowest_common_ancestor():
+    frame_tree = frame_helpers.FrameTree(_create_robot_like_snapshot())
+    assert frame_tree.lowest_common_ancestor('tool', 'head') == 'body'
+    assert frame_tree.lowest_common_ancestor('tool', 'hand') == 'hand'
+    assert frame_tree.lowest_common_ancestor('hand', 'tool') == 'hand'
+    assert frame_tree.lowest_common_ancestor('tool', 'vision') == 'odom'
+    assert frame_tree.lowest_common_ancestor('flat_body', 'flat_body') == 'flat_body'
+    with pytest.raises(frame_helpers.ValidateFrameTreeUnknownFrameError):
+        frame_tree.lowest_common_ancestor('tool', 'gripper')
+
+
+def test_frame_tree_a_tform_frames():
+    snapshot = _create_robot_like_snapshot()
+    frame_tree = frame_helpers.FrameTree(snapshot)
+    frame_names = ['tool', 'odom', 'head', 'tool']
+    vision_tform_frames = frame_tree.a_tform_frames('vision', frame_names)
+    assert len(vision_tform_frames) == 4
+    for pose, frame_name in zip(vision_tform_frames, frame_names):
+        _assert_poses_close(pose, frame_helpers.get_a_tform_b(snapshot, 'vision', frame_name))
+    with pytest.raises(frame_helpers.ValidateFrameTreeUnknownFrameError):
+        frame_tree.a_tform_frames('vision', ['tool', 'gripper'])
+    with pytest.raises(frame_helpers.ValidateFrameTreeUnknownFrameError):
+        frame_tree.a_tform_frames('gripper', ['tool'])
+
+
+def test_frame_tree_validation():
+    with pytest.raises(ValueError):
+        frame_helpers.FrameTree(None)
+    with pytest.raises(frame_helpers.ValidateFrameTreeError):
+        frame_helpers.FrameTree(_create_snapshot(""))
+    with pytest.raises(frame_helpers.ValidateFrameTreeError):
+        frame_helpers.FrameTree(
+            _create_snapshot("""child_to_parent_edge_map {
+              key: ""
+              value: { parent_frame_name: "alpha" }
+            }"""))
+    with pytest.raises(frame_helpers.ValidateFrameTreeCycleError):
+        frame_helpers.FrameTree(
+            _create_snapshot("""child_to_parent_edge_map {
+              key: "alpha"
+              value: { parent_frame_name: "alpha" }
+            }"""))
+    with pytest.raises(frame_helpers.ValidateFrameTreeCycleError):
+        frame_helpers.FrameTree(
+            _create_snapshot("""child_to_parent_edge_map {
+              key: "alpha"
+              value: { parent_frame_name: "" }
+            }
+            child_to_parent_edge_map {
+              key: "beta"
+              value: { parent_frame_name: "gamma" }
+            }
+            child_to_parent_edge_map {
+              key: "gamma"
+              value: { parent_frame_name: "beta" }
+            }"""))
+    with pytest.raises(frame_helpers.ValidateFrameTreeDisjointError):
+        frame_helpers.FrameTree(
+            _create_snapshot("""child_to_parent_edge_map {
+              key: "alpha"
+              value: { parent_frame_name: "" }
+            }
+            child_to_parent_edge_map {
+              key: "gamma"
+              value: { parent_frame_name: "" }
+            }"""))
+    with pytest.raises(frame_helpers.ValidateFrameTreeUnknownFrameError):
+        frame_helpers.FrameTree(
+            _create_snapshot("""child_to_parent_edge_map {
+              key: "beta"
+              value: { parent_frame_name: "foo" }
+            }"""))
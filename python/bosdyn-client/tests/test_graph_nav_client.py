@@ -18,6 +18,8 @@ from bosdyn.client.graph_nav import (GraphNavClient, NoPathError, RobotNotLocali
                                      UnknownMapInformationError, UnrecognizedCommandError)
 from bosdyn.client.time_sync import TimeSyncEndpoint
 
+from . import helpers
+
 
 class MockGraphNavServicer(graph_nav_service_pb2_grpc.GraphNavServiceServicer):
     """GraphNav servicer for testing.
@@ -43,6 +45,7 @@ class MockGraphNavServicer(graph_nav_service_pb2_grpc.GraphNavServiceServicer):
         self.download_wp_snapshot_status = graph_nav_pb2.DownloadWaypointSnapshotResponse.STATUS_OK
         self.download_edge_snapshot_status = graph_nav_pb2.DownloadEdgeSnapshotResponse.STATUS_OK
         self.lease_use_result = None
+        self.graph = map_pb2.Graph()
 
     def SetLocalization(self, request, context):
         resp = graph_nav_pb2.SetLocalizationResponse()
@@ -84,6 +87,12 @@ class MockGraphNavServicer(graph_nav_service_pb2_grpc.GraphNavServiceServicer):
         return resp
 
 
+    def DownloadGraph(self, request, context):
+        resp = graph_nav_pb2.DownloadGraphResponse()
+        resp.graph.CopyFrom(self.graph)
+        resp.header.error.code = self.common_header_code
+        return resp
+
     def UploadWaypointSnapshot(self, request_iterator, context):
         resp = graph_nav_pb2.UploadWaypointSnapshotResponse()
         resp.status = graph_nav_pb2.UploadWaypointSnapshotResponse.STATUS_OK
@@ -159,6 +168,59 @@ def server(client, service):
     server.stop(0)
 
 
+@pytest.fixture
+def aio_port(service):
+    server = grpc.server(concurrent.futures.ThreadPoolExecutor(max_workers=4))
+    graph_nav_service_pb2_grpc.add_GraphNavServiceServicer_to_server(service, server)
+    port = server.add_insecure_port('127.0.0.1:0')
+    server.start()
+    yield port
+    server.stop(0)
+
+
+def test_aio_download_waypoint_snapshot(client, service, aio_port):
+    """Streaming responses can be awaited as a whole or iterated."""
+
+    async def run():
+        snapshot = await client.download_waypoint_snapshot(waypoint_snapshot_id='mywaypoint')
+        assert isinstance(snapshot, map_pb2.WaypointSnapshot)
+
+        responses = [
+            response async for response in client.download_waypoint_snapshot(
+                waypoint_snapshot_id='mywaypoint')
+        ]
+        assert len(responses) == 1
+
+        service.common_header_code = header_pb2.CommonError.CODE_INTERNAL_SERVER_ERROR
+        with pytest.raises(InternalServerError):
+            await client.download_waypoint_snapshot(waypoint_snapshot_id='mywaypoint')
+        with pytest.raises(InternalServerError):
+            async for _ in client.download_waypoint_snapshot(waypoint_snapshot_id='mywaypoint'):
+                pass
+
+    helpers.run_with_aio_channel(client, aio_port, run)
+
+
+def test_aio_graph_falls_back_to_unary_rpcs(client, service, aio_port):
+    """On a grpc.aio channel, unimplemented streaming graph RPCs fall back to the unary ones."""
+    service.graph.waypoints.add(id='mywaypoint')
+
+    async def run():
+        graph = await client.download_graph()
+        assert graph == service.graph
+
+        response = await client.upload_graph(graph=service.graph)
+        assert response.status == graph_nav_pb2.UploadGraphResponse.STATUS_OK
+
+        service.common_header_code = header_pb2.CommonError.CODE_INTERNAL_SERVER_ERROR
+        with pytest.raises(InternalServerError):
+            await client.download_graph()
+        with pytest.raises(InternalServerError):
+            await client.upload_graph(graph=service.graph)
+
+    helpers.run_with_aio_channel(client, aio_port, run)
+
+
 @pytest.mark.parametrize('func', ('navigation_feedback_async', 'navigation_feedback'))
 def test_feedback_exceptions(client, service, server, func):
     """Client's navigation feedback should provide expected exceptions/responses."""
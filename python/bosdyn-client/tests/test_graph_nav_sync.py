@@ -0,0 +1,260 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Unit tests for the graph_nav_sync module."""
+import os
+import threading
+import time
+
+import pytest
+
+from bosdyn.api.graph_nav import graph_nav_pb2, map_pb2
+from bosdyn.client.exceptions import UnimplementedError
+from bosdyn.client.graph_nav import GraphNavClient
+from bosdyn.client.graph_nav_sync import (EDGE_SNAPSHOTS, WAYPOINT_SNAPSHOTS, GraphNavMapSync,
+                                          MapSyncError, SnapshotCache)
+
+
+def _make_graph(num_waypoints):
+    graph = map_pb2.Graph()
+    for index in range(num_waypoints):
+        graph.waypoints.add(id='wp{}'.format(index), snapshot_id='wps{}'.format(index))
+        if index:
+            edge = graph.edges.add(snapshot_id='es{}'.format(index))
+            edge.id.from_waypoint = 'wp{}'.format(index - 1)
+            edge.id.to_waypoint = 'wp{}'.format(index)
+    # Snapshots may be shared between waypoints, and are only transferred once.
+    graph.waypoints.add(id='wp_shared', snapshot_id='wps0')
+    return graph
+
+
+class FakeGraphNavClient(object):
+    """In-memory GraphNav map, recording the snapshot RPCs made and how many overlapped."""
+
+    def __init__(self, graph, delay_sec=0.0):
+        self.graph = graph
+        self.delay_sec = delay_sec
+        self.waypoint_snapshots = {}
+        self.edge_snapshots = {}
+        for waypoint in graph.waypoints:
+            self.waypoint_snapshots[waypoint.snapshot_id] = map_pb2.WaypointSnapshot(
+                id=waypoint.snapshot_id, version_id='x' * 100)
+        for edge in graph.edges:
+            self.edge_snapshots[edge.snapshot_id] = map_pb2.EdgeSnapshot(id=edge.snapshot_id)
+        self.downloads = []
+        self.uploaded_batches = []
+        self.uploaded_single = []
+        self.fail_ids = set()
+        self.upload_snapshots_implemented = True
+        self.upload_snapshots_calls = 0
+        self.upload_error = None
+        self._lock = threading.Lock()
+        self._active = 0
+        self.max_active = 0
+
+    def _rpc(self, snapshot_id):
+        with self._lock:
+            self._active += 1
+            self.max_active = max(self.max_active, self._active)
+        try:
+            time.sleep(self.delay_sec)
+            if snapshot_id in self.fail_ids:
+                raise IOError('failed {}'.format(snapshot_id))
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def download_graph(self):
+        return self.graph
+
+    def download_waypoint_snapshot(self, snapshot_id):
+        self._rpc(snapshot_id)
+        self.downloads.append(snapshot_id)
+        return self.waypoint_snapshots[snapshot_id]
+
+    def download_edge_snapshot(self, snapshot_id):
+        self._rpc(snapshot_id)
+        self.downloads.append(snapshot_id)
+        return self.edge_snapshots[snapshot_id]
+
+    def upload_graph(self, lease=None, graph=None, generate_new_anchoring=False,
+                     replace_graph=False):
+        self.uploaded_graph = graph
+        response = graph_nav_pb2.UploadGraphResponse()
+        for snapshot_id in sorted({waypoint.snapshot_id for waypoint in graph.waypoints}):
+            if snapshot_id in self.waypoint_snapshots:
+                response.loaded_waypoint_snapshot_ids.append(snapshot_id)
+            else:
+                response.unknown_waypoint_snapshot_ids.append(snapshot_id)
+        for edge in graph.edges:
+            if edge.snapshot_id in self.edge_snapshots:
+                response.loaded_edge_snapshot_ids.append(edge.snapshot_id)
+            else:
+                response.unknown_edge_snapshot_ids.append(edge.snapshot_id)
+        return response
+
+    def upload_snapshots(self, snapshots, lease=None):
+        self.upload_snapshots_calls += 1
+        if self.upload_error is not None:
+            raise self.upload_error
+        if not self.upload_snapshots_implemented:
+            raise UnimplementedError(None, 'UploadSnapshots')
+        parsed = graph_nav_pb2.UploadSnapshotsRequest.Snapshots()
+        parsed.ParseFromString(snapshots)
+        if snapshots:
+            self.uploaded_batches.append(parsed)
+        for snapshot in parsed.waypoint_snapshots:
+            self.waypoint_snapshots[snapshot.id] = snapshot
+        for snapshot in parsed.edge_snapshots:
+            self.edge_snapshots[snapshot.id] = snapshot
+
+    def upload_waypoint_snapshot(self, waypoint_snapshot, lease=None):
+        self.uploaded_single.append(waypoint_snapshot.id)
+        self.waypoint_snapshots[waypoint_snapshot.id] = waypoint_snapshot
+
+    def upload_edge_snapshot(self, edge_snapshot, lease=None):
+        self.uploaded_single.append(edge_snapshot.id)
+        self.edge_snapshots[edge_snapshot.id] = edge_snapshot
+
+
+def _snapshot_files(directory):
+    return {
+        kind: sorted(os.listdir(os.path.join(directory, kind)))
+        for kind in (WAYPOINT_SNAPSHOTS, EDGE_SNAPSHOTS)
+    }
+
+
+def test_download_concurrently(tmp_path):
+    client = FakeGraphNavClient(_make_graph(8), delay_sec=0.02)
+    report = GraphNavMapSync(client, max_workers=4).download(str(tmp_path))
+    assert report.transferred == 15
+    assert report.skipped == 0
+    assert report.num_bytes > 0
+    assert report.bytes_per_sec > 0
+    assert client.max_active == 4
+    assert sorted(client.downloads) == sorted(list(client.waypoint_snapshots) +
+                                              list(client.edge_snapshots))
+    files = _snapshot_files(str(tmp_path))
+    assert files[WAYPOINT_SNAPSHOTS] == sorted(client.waypoint_snapshots)
+    assert files[EDGE_SNAPSHOTS] == sorted(client.edge_snapshots)
+    with open(os.path.join(str(tmp_path), WAYPOINT_SNAPSHOTS, 'wps3'), 'rb') as infile:
+        assert infile.read() == client.waypoint_snapshots['wps3'].SerializeToString()
+    graph = map_pb2.Graph()
+    with open(os.path.join(str(tmp_path), 'graph'), 'rb') as infile:
+        graph.ParseFromString(infile.read())
+    assert graph == client.graph
+    assert not [name for name in os.listdir(os.path.join(str(tmp_path), WAYPOINT_SNAPSHOTS))
+                if name.endswith('.tmp')]
+
+
+def test_download_failure_then_resume(tmp_path):
+    client = FakeGraphNavClient(_make_graph(8))
+    client.fail_ids = {'es4'}
+    sync = GraphNavMapSync(client, max_workers=1)
+    with pytest.raises(MapSyncError) as excinfo:
+        sync.download(str(tmp_path))
+    # Snapshots downloaded before the failure are kept, but the graph is not written.
+    partial = excinfo.value.report.transferred
+    assert 0 < partial < 15
+    assert not os.path.exists(os.path.join(str(tmp_path), 'graph'))
+
+    client.fail_ids = set()
+    client.downloads = []
+    report = sync.download(str(tmp_path))
+    assert report.skipped == partial
+    assert report.transferred == 15 - partial
+    assert len(client.downloads) == 15 - partial
+    assert os.path.exists(os.path.join(str(tmp_path), 'graph'))
+
+
+def test_write_graph_and_snapshots_raises_original_error(tmp_path):
+    client = FakeGraphNavClient(_make_graph(4))
+    client.fail_ids = {'es2'}
+    # The GraphNavClient method keeps raising the error of the failed RPC.
+    with pytest.raises(IOError) as excinfo:
+        GraphNavClient.write_graph_and_snapshots(client, str(tmp_path))
+    assert not isinstance(excinfo.value, MapSyncError)
+    assert str(excinfo.value) == 'failed es2'
+
+
+def test_download_from_cache(tmp_path):
+    cache = SnapshotCache(str(tmp_path / 'cache'))
+    client = FakeGraphNavClient(_make_graph(4))
+    GraphNavMapSync(client, cache=cache).download(str(tmp_path / 'map1'))
+    assert cache.has(WAYPOINT_SNAPSHOTS, 'wps1')
+
+    client.downloads = []
+    report = GraphNavMapSync(client, cache=cache).download(str(tmp_path / 'map2'))
+    assert client.downloads == []
+    assert report.cached == 7
+    assert report.transferred == 0
+    assert _snapshot_files(str(tmp_path / 'map2')) == _snapshot_files(str(tmp_path / 'map1'))
+
+    # Corrupt cache entries are discarded and downloaded again.
+    digest = (tmp_path / 'cache' / EDGE_SNAPSHOTS / 'es2').read_text()
+    (tmp_path / 'cache' / 'objects' / digest).write_bytes(b'corrupt')
+    assert cache.get(EDGE_SNAPSHOTS, 'es2') is None
+    assert not cache.has(EDGE_SNAPSHOTS, 'es2')
+    report = GraphNavMapSync(client, cache=cache).download(str(tmp_path / 'map3'))
+    assert client.downloads == ['es2']
+    assert report.cached == 6
+    assert cache.get(EDGE_SNAPSHOTS, 'es2') == client.edge_snapshots['es2'].SerializeToString()
+
+
+def test_upload_only_unknown_snapshots_in_batches(tmp_path):
+    source = FakeGraphNavClient(_make_graph(8))
+    GraphNavMapSync(source).download(str(tmp_path))
+
+    robot = FakeGraphNavClient(map_pb2.Graph())
+    robot.waypoint_snapshots['wps0'] = source.waypoint_snapshots['wps0']
+    robot.edge_snapshots['es1'] = source.edge_snapshots['es1']
+    sync = GraphNavMapSync(robot, upload_batch_bytes=300)
+    response, report = sync.upload(str(tmp_path))
+    assert robot.uploaded_graph == source.graph
+    assert report.skipped == 2
+    assert report.transferred == 13
+    assert len(robot.uploaded_batches) > 1
+    uploaded = [snapshot.id for batch in robot.uploaded_batches
+                for snapshot in list(batch.waypoint_snapshots) + list(batch.edge_snapshots)]
+    assert sorted(uploaded) == sorted(
+        list(response.unknown_waypoint_snapshot_ids) + list(response.unknown_edge_snapshot_ids))
+    assert robot.waypoint_snapshots == source.waypoint_snapshots
+    assert robot.edge_snapshots == source.edge_snapshots
+    # Only batches of snapshots are sent, without an empty probe upload.
+    assert robot.upload_snapshots_calls == len(robot.uploaded_batches)
+
+    # Once the robot has every snapshot, no snapshot RPC is made at all.
+    robot.upload_snapshots_calls = 0
+    _, report = sync.upload(str(tmp_path))
+    assert report.transferred == 0
+    assert report.skipped == 15
+    assert robot.upload_snapshots_calls == 0
+
+
+def test_upload_falls_back_to_single_snapshots(tmp_path):
+    source = FakeGraphNavClient(_make_graph(3))
+    GraphNavMapSync(source).download(str(tmp_path))
+
+    robot = FakeGraphNavClient(map_pb2.Graph())
+    robot.upload_snapshots_implemented = False
+    _, report = GraphNavMapSync(robot).upload(str(tmp_path))
+    assert report.transferred == 5
+    assert sorted(robot.uploaded_single) == ['es1', 'es2', 'wps0', 'wps1', 'wps2']
+    assert robot.upload_snapshots_calls == 1
+    assert robot.waypoint_snapshots == source.waypoint_snapshots
+    assert robot.edge_snapshots == source.edge_snapshots
+
+
+def test_upload_failure(tmp_path):
+    source = FakeGraphNavClient(_make_graph(3))
+    GraphNavMapSync(source).download(str(tmp_path))
+
+    robot = FakeGraphNavClient(map_pb2.Graph())
+    robot.upload_error = IOError('connection lost')
+    with pytest.raises(MapSyncError) as excinfo:
+        GraphNavMapSync(robot).upload(str(tmp_path))
+    assert excinfo.value.report.transferred == 0
+    assert robot.upload_snapshots_calls == 1
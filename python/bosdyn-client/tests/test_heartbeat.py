@@ -0,0 +1,192 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Unit tests for the heartbeat module."""
+import concurrent.futures
+import threading
+import time
+
+import pytest
+
+import bosdyn.client.heartbeat
+from bosdyn.client.heartbeat import HeartbeatScheduler, LatencyHistogram
+
+
+class CountingBeat(object):
+
+    def __init__(self, result=None, exc=None):
+        self.calls = 0
+        self.result = result
+        self.exc = exc
+
+    def __call__(self):
+        self.calls += 1
+        if self.exc is not None:
+            raise self.exc
+        return self.result
+
+
+def _wait_for(predicate, timeout=2.0):
+    end = time.time() + timeout
+    while time.time() < end:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return predicate()
+
+
+def test_latency_histogram():
+    histogram = LatencyHistogram()
+    assert histogram.mean_sec == 0.0
+    assert histogram.percentile(50) == 0.0
+    for _ in range(98):
+        histogram.add(0.0015)
+    histogram.add(0.3)
+    histogram.add(30.0)
+    assert histogram.count == 100
+    assert histogram.max_sec == 30.0
+    assert histogram.mean_sec == pytest.approx((98 * 0.0015 + 30.3) / 100)
+    assert histogram.percentile(50) == 0.002
+    assert histogram.percentile(99) == 0.5
+    assert histogram.percentile(100) == 30.0
+    copy = histogram.copy()
+    histogram.add(1.0)
+    assert copy.count == 100
+
+
+def test_heartbeat_beats_periodically():
+    scheduler = HeartbeatScheduler()
+    beat = CountingBeat()
+    heartbeat = scheduler.add('counting', beat, period_sec=0.02)
+    assert heartbeat in scheduler.heartbeats()
+    assert _wait_for(lambda: beat.calls >= 5)
+    heartbeat.cancel()
+    assert heartbeat.wait(1.0)
+    assert not heartbeat.is_active()
+    assert heartbeat not in scheduler.heartbeats()
+    calls = beat.calls
+    time.sleep(0.1)
+    assert beat.calls == calls
+    metrics = heartbeat.metrics()
+    assert metrics.name == 'counting'
+    assert metrics.beats == calls
+    assert metrics.failures == 0
+    assert metrics.missed_deadlines == 0
+    assert metrics.latency.count == calls
+    scheduler.shutdown()
+
+
+def test_heartbeat_first_delay_and_run_after():
+    scheduler = HeartbeatScheduler()
+    beat = CountingBeat()
+    heartbeat = scheduler.add('delayed', beat, period_sec=10.0, first_delay_sec=10.0)
+    time.sleep(0.1)
+    assert beat.calls == 0
+    heartbeat.run_after(0)
+    assert _wait_for(lambda: beat.calls == 1)
+    scheduler.shutdown()
+    assert not heartbeat.is_active()
+
+
+def test_heartbeat_run_after_from_done_callback():
+    scheduler = HeartbeatScheduler()
+    futures = []
+
+    def retry(_):
+        heartbeat.run_after(0)
+        # Give the scheduler thread time to reach the next beat before the beat finishes.
+        time.sleep(0.05)
+
+    def beat():
+        future = concurrent.futures.Future()
+        # Like a client callback, this is added before the scheduler's own callback.
+        future.add_done_callback(retry)
+        futures.append(future)
+        return future
+
+    heartbeat = scheduler.add('retrying', beat, period_sec=10.0)
+    assert _wait_for(lambda: len(futures) == 1)
+    futures[0].set_result(None)
+    assert _wait_for(lambda: len(futures) == 2)
+    metrics = heartbeat.metrics()
+    assert metrics.beats == 2
+    assert metrics.missed_deadlines == 0
+    scheduler.shutdown(wait=False)
+
+
+def test_heartbeat_failures_are_counted():
+    scheduler = HeartbeatScheduler()
+    raising = scheduler.add('raising', CountingBeat(exc=ValueError('bad beat')), period_sec=0.02)
+    future = concurrent.futures.Future()
+    future.set_exception(ValueError('bad rpc'))
+    failed_future = scheduler.add('failed future', CountingBeat(result=future), period_sec=0.02)
+    assert _wait_for(lambda: raising.metrics().failures >= 2 and failed_future.metrics().
+                     failures >= 2)
+    # The scheduler keeps beating after failures.
+    assert raising.is_active()
+    assert failed_future.is_active()
+    scheduler.shutdown()
+
+
+def test_heartbeat_skips_beats_and_reports_missed_deadline():
+    scheduler = HeartbeatScheduler()
+    future = concurrent.futures.Future()
+    beat = CountingBeat(result=future)
+    missed = []
+    heartbeat = scheduler.add('slow', beat, period_sec=0.02, deadline_sec=0.05,
+                              on_missed_deadline=lambda hb, late: missed.append((hb, late)))
+    assert _wait_for(lambda: missed)
+    time.sleep(0.1)
+    # The beat never finished, so the following beats were skipped and the deadline was only
+    # missed once.
+    assert beat.calls == 1
+    assert len(missed) == 1
+    assert missed[0][0] is heartbeat
+    assert missed[0][1] > 0
+
+    # Cancelling waits for the outstanding beat.
+    heartbeat.cancel()
+    assert not heartbeat.wait(0.05)
+    future.set_result(None)
+    assert heartbeat.wait(1.0)
+    metrics = heartbeat.metrics()
+    assert metrics.beats == 1
+    assert metrics.failures == 0
+    assert metrics.missed_deadlines == 1
+    assert metrics.latency.max_sec > 0.05
+    scheduler.shutdown()
+
+
+def test_heartbeat_slow_beat_does_not_delay_others():
+    scheduler = HeartbeatScheduler()
+    slow = scheduler.add('slow', CountingBeat(result=concurrent.futures.Future()),
+                         period_sec=0.02)
+    fast_beat = CountingBeat()
+    fast = scheduler.add('fast', fast_beat, period_sec=0.02)
+    assert _wait_for(lambda: fast_beat.calls >= 5)
+    assert slow.metrics().beats == 1
+    assert [metrics.name for metrics in scheduler.metrics()] == ['slow', 'fast']
+    scheduler.shutdown(wait=False)
+    assert not fast.is_active()
+
+
+def test_heartbeat_scheduler_shutdown():
+    scheduler = HeartbeatScheduler()
+    heartbeat = scheduler.add('counting', CountingBeat(), period_sec=0.02)
+    scheduler.shutdown()
+    assert not heartbeat.is_active()
+    assert not scheduler._thread.is_alive()
+    with pytest.raises(RuntimeError):
+        scheduler.add('late', CountingBeat(), period_sec=0.02)
+    with pytest.raises(ValueError):
+        HeartbeatScheduler().add('zero period', CountingBeat(), period_sec=0)
+
+
+def test_default_heartbeat_scheduler():
+    scheduler = bosdyn.client.heartbeat.get_default_heartbeat_scheduler()
+    assert scheduler is bosdyn.client.heartbeat.get_default_heartbeat_scheduler()
+    scheduler.shutdown()
+    assert scheduler is not bosdyn.client.heartbeat.get_default_heartbeat_scheduler()
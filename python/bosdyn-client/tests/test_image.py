@@ -7,6 +7,7 @@
 """Unit tests for the image client."""
 import time
 
+import numpy as np
 import pytest
 
 import bosdyn.api.image_pb2 as image_protos
@@ -14,6 +15,8 @@ import bosdyn.api.image_service_pb2_grpc as image_service
 import bosdyn.client.image
 from bosdyn.api.service_customization_pb2 import CustomParamError
 from bosdyn.client.exceptions import TimedOutError
+from bosdyn.client.frame_helpers import add_edge_to_tree
+from bosdyn.client.math_helpers import Quat, SE3Pose
 
 from . import helpers
 
@@ -195,3 +198,205 @@ def test_get_image_custom_params_errror():
     with pytest.raises(bosdyn.client.CustomParamError) as excinfo:
         res = client.get_image_from_sources(image_sources=['foo'])
     assert excinfo.value.custom_param_error.status == CustomParamError.STATUS_UNSUPPORTED_PARAMETER
+
+
+def _make_depth_response(name='frontleft_depth', rows=6, cols=8, seed=0, odom_tform_sensor=None):
+    rng = np.random.default_rng(seed)
+    depth = rng.integers(0, 6000, size=(rows, cols), dtype=np.uint16)
+    depth[0, 0] = 0
+    depth[-1, -1] = np.iinfo(np.uint16).max
+    response = image_protos.ImageResponse()
+    response.source.name = name
+    response.source.rows = rows
+    response.source.cols = cols
+    response.source.depth_scale = 1000.0
+    response.source.image_type = image_protos.ImageSource.IMAGE_TYPE_DEPTH
+    response.source.pinhole.intrinsics.focal_length.x = 5.0
+    response.source.pinhole.intrinsics.focal_length.y = 6.0
+    response.source.pinhole.intrinsics.principal_point.x = 3.5
+    response.source.pinhole.intrinsics.principal_point.y = 2.5
+    response.shot.image.rows = rows
+    response.shot.image.cols = cols
+    response.shot.image.pixel_format = image_protos.Image.PIXEL_FORMAT_DEPTH_U16
+    response.shot.image.format = image_protos.Image.FORMAT_RAW
+    response.shot.image.data = depth.tobytes()
+    response.shot.frame_name_image_sensor = name + '_sensor'
+    if odom_tform_sensor is None:
+        odom_tform_sensor = SE3Pose(1, 2, 0.5, Quat.from_yaw(0.7) * Quat.from_pitch(0.2))
+    edges = {}
+    add_edge_to_tree(edges, SE3Pose.from_identity().to_proto(), '', 'odom')
+    add_edge_to_tree(edges, odom_tform_sensor.to_proto(), 'odom', name + '_sensor')
+    for child, edge in edges.items():
+        response.shot.transforms_snapshot.child_to_parent_edge_map[child].CopyFrom(edge)
+    return response
+
+
+def test_depth_projector_matches_depth_image_to_pointcloud():
+    response = _make_depth_response()
+    expected = bosdyn.client.image.depth_image_to_pointcloud(response, min_dist=0.5, max_dist=5)
+    projector = bosdyn.client.image.DepthProjector(min_dist=0.5, max_dist=5)
+    points = projector.pointcloud(response)
+    assert points.shape == expected.shape
+    assert np.allclose(points, expected)
+
+    odom_tform_sensor = SE3Pose(-3, 0.5, 1, Quat.from_roll(0.4))
+    response = _make_depth_response(odom_tform_sensor=odom_tform_sensor)
+    expected = odom_tform_sensor.transform_cloud(
+        bosdyn.client.image.depth_image_to_pointcloud(response, min_dist=0.5, max_dist=5))
+    assert np.allclose(projector.pointcloud(response, frame_name='odom'), expected)
+
+    with pytest.raises(ValueError):
+        projector.pointcloud(response, frame_name='vision')
+    response.source.image_type = image_protos.ImageSource.IMAGE_TYPE_VISUAL
+    with pytest.raises(ValueError):
+        projector.pointcloud(response)
+
+
+def test_depth_projector_multiple_sources_and_buffers():
+    responses = [
+        _make_depth_response('frontleft_depth', seed=1),
+        _make_depth_response('back_depth', rows=5, cols=9, seed=2),
+        image_protos.ImageResponse(),
+    ]
+    projector = bosdyn.client.image.DepthProjector()
+    clouds = projector.pointclouds(responses, frame_name='odom')
+    assert sorted(clouds) == ['back_depth', 'frontleft_depth']
+    for response in responses[:2]:
+        expected = bosdyn.client.image.depth_image_to_pointcloud(response)
+        odom_tform_sensor = SE3Pose.from_proto(
+            response.shot.transforms_snapshot.child_to_parent_edge_map[
+                response.shot.frame_name_image_sensor].parent_tform_child)
+        assert np.allclose(clouds[response.source.name],
+                           odom_tform_sensor.transform_cloud(expected))
+
+    # The next image from the same source reuses the buffer of the previous one.
+    first = projector.pointcloud(responses[0])
+    first_copy = first.copy()
+    projector.pointcloud(_make_depth_response('frontleft_depth', seed=3))
+    assert not np.allclose(first[:len(first_copy)], first_copy)
+
+    projector = bosdyn.client.image.DepthProjector(reuse_buffers=False)
+    first = projector.pointcloud(responses[0])
+    first_copy = first.copy()
+    projector.pointcloud(_make_depth_response('frontleft_depth', seed=3))
+    assert np.array_equal(first, first_copy)
+
+
+def test_depth_projector_intrinsics_change():
+    projector = bosdyn.client.image.DepthProjector()
+    response = _make_depth_response()
+    projector.pointcloud(response)
+    response.source.pinhole.intrinsics.focal_length.x = 10.0
+    assert np.allclose(projector.pointcloud(response),
+                       bosdyn.client.image.depth_image_to_pointcloud(response))
+
+
+def _make_visual_response(depth_response, pixels, image_format=image_protos.Image.FORMAT_RAW):
+    response = image_protos.ImageResponse()
+    response.source.name = depth_response.source.name.replace('_depth_in_visual_frame',
+                                                              '_fisheye_image')
+    response.source.image_type = image_protos.ImageSource.IMAGE_TYPE_VISUAL
+    response.shot.frame_name_image_sensor = depth_response.shot.frame_name_image_sensor
+    response.shot.image.rows, response.shot.image.cols = pixels.shape[:2]
+    response.shot.image.format = image_format
+    if pixels.ndim == 2:
+        response.shot.image.pixel_format = image_protos.Image.PIXEL_FORMAT_GREYSCALE_U8
+    else:
+        response.shot.image.pixel_format = image_protos.Image.PIXEL_FORMAT_RGB_U8
+    if image_format == image_protos.Image.FORMAT_JPEG:
+        import cv2
+        bgr = pixels if pixels.ndim == 2 else pixels[:, :, ::-1]
+        encoded = cv2.imencode('.jpg', bgr, [cv2.IMWRITE_JPEG_QUALITY, 100])[1]
+        response.shot.image.data = encoded.tobytes()
+    else:
+        response.shot.image.data = pixels.tobytes()
+    return response
+
+
+def test_decode_image():
+    rng = np.random.default_rng(4)
+    depth_response = _make_depth_response()
+    rgb = rng.integers(0, 256, size=(6, 8, 3), dtype=np.uint8)
+    assert np.array_equal(
+        bosdyn.client.image.decode_image(_make_visual_response(depth_response, rgb)), rgb)
+    grey = rng.integers(0, 256, size=(6, 8), dtype=np.uint8)
+    assert np.array_equal(
+        bosdyn.client.image.decode_image(_make_visual_response(depth_response, grey)), grey)
+
+    # JPEG compression changes the colors slightly, so use a uniform image.
+    uniform = np.empty((6, 8, 3), dtype=np.uint8)
+    uniform[:] = (200, 100, 50)
+    decoded = bosdyn.client.image.decode_image(
+        _make_visual_response(depth_response, uniform, image_protos.Image.FORMAT_JPEG))
+    assert decoded.shape == (6, 8, 3)
+    assert np.allclose(decoded, uniform, atol=3)
+
+    bad_response = _make_visual_response(depth_response, rgb)
+    bad_response.shot.image.rows = 7
+    with pytest.raises(ValueError):
+        bosdyn.client.image.decode_image(bad_response)
+    bad_response.shot.image.format = image_protos.Image.FORMAT_RLE
+    with pytest.raises(ValueError):
+        bosdyn.client.image.decode_image(bad_response)
+
+
+def test_colored_pointcloud():
+    rng = np.random.default_rng(5)
+    depth_response = _make_depth_response('frontleft_depth_in_visual_frame')
+    rgb = rng.integers(0, 256, size=(6, 8, 3), dtype=np.uint8)
+    visual_response = _make_visual_response(depth_response, rgb)
+    projector = bosdyn.client.image.DepthProjector()
+
+    colored = projector.colored_pointcloud(depth_response, visual_response, frame_name='odom')
+    expected_points = projector.pointcloud(depth_response, frame_name='odom')
+    assert colored.shape == (len(expected_points), 6)
+    assert np.allclose(colored[:, 0:3], expected_points)
+    depth = np.frombuffer(depth_response.shot.image.data, dtype=np.uint16).reshape(6, 8)
+    valid = (depth > 0) & (depth < np.iinfo(np.uint16).max)
+    assert np.array_equal(colored[:, 3:6], rgb[valid])
+
+    grey = rng.integers(0, 256, size=(6, 8), dtype=np.uint8)
+    colored = projector.colored_pointcloud(depth_response,
+                                           _make_visual_response(depth_response, grey))
+    assert np.array_equal(colored[:, 3], grey[valid])
+    assert np.array_equal(colored[:, 3], colored[:, 5])
+
+    with pytest.raises(ValueError):
+        projector.colored_pointcloud(depth_response,
+                                     _make_visual_response(depth_response, rgb[:5]))
+
+
+def test_colored_pointclouds_and_merge():
+    rng = np.random.default_rng(6)
+    responses = []
+    for name in ('frontleft', 'back'):
+        depth_response = _make_depth_response(name + '_depth_in_visual_frame',
+                                              seed=len(responses))
+        rgb = rng.integers(0, 256, size=(6, 8, 3), dtype=np.uint8)
+        responses += [depth_response, _make_visual_response(depth_response, rgb)]
+    # A depth image without a matching visual image is skipped.
+    responses.append(_make_depth_response('left_depth_in_visual_frame', rows=4, cols=4))
+
+    projector = bosdyn.client.image.DepthProjector()
+    clouds = projector.colored_pointclouds(responses, frame_name='odom')
+    assert sorted(clouds) == ['back_depth_in_visual_frame', 'frontleft_depth_in_visual_frame']
+    for depth_response, visual_response in (responses[0:2], responses[2:4]):
+        assert np.array_equal(
+            clouds[depth_response.source.name],
+            projector.colored_pointcloud(depth_response, visual_response, frame_name='odom'))
+
+    merged = bosdyn.client.image.merge_pointclouds(clouds.values())
+    assert merged.shape == (sum(len(cloud) for cloud in clouds.values()), 6)
+    assert bosdyn.client.image.merge_pointclouds([]).shape == (0, 3)
+
+
+def test_merge_pointclouds_voxel_downsampling():
+    cloud_a = np.array([[0.01, 0.01, 0.01, 10, 20, 30], [0.02, 0.03, 0.04, 30, 40, 50]])
+    cloud_b = np.array([[0.5, 0.01, 0.01, 0, 0, 0], [-0.01, 0.01, 0.01, 0, 0, 0]])
+    merged = bosdyn.client.image.merge_pointclouds([cloud_a, cloud_b], voxel_size=0.1)
+    assert merged.shape == (3, 6)
+    # Points in the same voxel are averaged, including their colors.
+    rows = {tuple(np.floor(row[0:3] / 0.1).astype(int)): row for row in merged}
+    assert np.allclose(rows[(0, 0, 0)], [0.015, 0.02, 0.025, 20, 30, 40])
+    assert np.allclose(rows[(5, 0, 0)], cloud_b[0])
+    assert np.allclose(rows[(-1, 0, 0)], cloud_b[1])
@@ -14,9 +14,12 @@ from PIL import Image
 
 from bosdyn.api import header_pb2, image_pb2, service_customization_pb2, service_fault_pb2
 from bosdyn.client.fault import FaultClient, ServiceFaultDoesNotExistError
-from bosdyn.client.image_service_helpers import (CameraBaseImageServicer, CameraInterface,
-                                                 ImageCaptureThread, VisualImageSource,
-                                                 convert_RGB_to_grayscale)
+from bosdyn.client.image_service_helpers import (IMAGE_TIMING_METADATA_KEY,
+                                                 CameraBaseImageServicer, CameraInterface,
+                                                 EncodedImageCache, ImageCaptureThread,
+                                                 VisualImageSource,
+                                                 convert_RGB_to_grayscale,
+                                                 image_timings_from_metadata)
 from bosdyn.client.service_customization_helpers import InvalidCustomParamSpecError
 
 
@@ -463,6 +466,100 @@ def test_image_capture_thread():
         barrier.wait(0.5)
 
 
+def test_image_capture_thread_ring_buffer():
+    cap_thread = ImageCaptureThread("source1", capture_fake, buffer_size=3)
+    assert cap_thread.buffer_metrics() == (0, 3, 0)
+    # Nothing has been captured yet.
+    assert not cap_thread.get_image_nearest(1.0).is_valid
+
+    frames = [np.full((2, 4), index, dtype=np.uint8) for index in range(5)]
+    for index, frame in enumerate(frames[:2]):
+        cap_thread.set_last_captured_image(frame, 10.0 + index)
+    assert cap_thread.buffer_metrics() == (2, 3, 16)
+    output = cap_thread.get_image_nearest(10.2)
+    assert output.is_valid
+    assert output.image is frames[0]
+    assert output.timestamp == 10.0
+    assert cap_thread.get_image_nearest(100.0).image is frames[1]
+
+    # Older frames are replaced once the buffer is full.
+    for index, frame in enumerate(frames[2:], start=2):
+        cap_thread.set_last_captured_image(frame, 10.0 + index)
+    assert cap_thread.buffer_metrics() == (3, 3, 24)
+    output = cap_thread.get_image_nearest(9.0)
+    assert output.image is frames[2]
+    assert output.timestamp == 12.0
+    assert cap_thread.get_image_nearest(13.4).image is frames[3]
+    assert cap_thread.get_latest_captured_image().image is frames[4]
+
+    # Failed captures are not buffered.
+    cap_thread.set_last_captured_image(None, None)
+    assert cap_thread.buffer_metrics() == (3, 3, 24)
+    assert cap_thread.get_image_nearest(14.0).image is frames[4]
+
+    # Changing the capture parameters drops the buffered captures.
+    params = service_customization_pb2.DictParam()
+    params.values["int"].int_value.value = 1
+    assert not cap_thread.get_image_nearest(14.0, custom_params=params).is_valid
+    assert cap_thread.buffer_metrics() == (0, 3, 0)
+    cap_thread.set_last_captured_image(None, None)
+    output = cap_thread.get_image_nearest(14.0, custom_params=params)
+    assert output.is_valid
+    assert output.image is None and output.timestamp is None
+    cap_thread.set_last_captured_image(b"bytes", 20.0)
+    assert cap_thread.buffer_metrics() == (1, 3, 5)
+    assert cap_thread.get_image_nearest(14.0, custom_params=params).image == b"bytes"
+
+    with pytest.raises(ValueError):
+        ImageCaptureThread("source1", capture_fake, buffer_size=0)
+
+
+def test_image_service_synchronize_sources():
+    image_sources = [
+        VisualImageSource(name, FakeCamera(capture_fake, decode_fake), rows=10, cols=21)
+        for name in ["source1", "source2"]
+    ]
+    camera_service = CameraBaseImageServicer(MockRobot(), "camera-service", image_sources,
+                                             use_background_capture_thread=False,
+                                             capture_buffer_size=4, synchronize_sources=True)
+    # Feed the capture buffers by hand rather than from running threads.
+    for source in image_sources:
+        source.capture_thread = ImageCaptureThread(source.image_source_name,
+                                                   source.capture_function, buffer_size=4)
+    source1_thread, source2_thread = [source.capture_thread for source in image_sources]
+    for capture_time in [1.0, 2.0, 3.0]:
+        source1_thread.set_last_captured_image("source1 %.1f" % capture_time, capture_time)
+    for capture_time in [1.1, 2.1, 3.1, 4.1]:
+        source2_thread.set_last_captured_image("source2 %.1f" % capture_time, capture_time)
+
+    req = image_pb2.GetImageRequest()
+    req.image_requests.add(image_source_name="source1")
+    req.image_requests.add(image_source_name="source2")
+    resp = camera_service.GetImage(req, None)
+    assert [img_resp.shot.image.data for img_resp in resp.image_responses
+           ] == [b"source1 3.0", b"source2 3.1"]
+
+    # The first requested source sets the reference time.
+    req = image_pb2.GetImageRequest()
+    req.image_requests.add(image_source_name="source2")
+    req.image_requests.add(image_source_name="source1")
+    resp = camera_service.GetImage(req, None)
+    assert [img_resp.shot.image.data for img_resp in resp.image_responses
+           ] == [b"source2 4.1", b"source1 3.0"]
+
+    metrics = camera_service.capture_buffer_metrics()
+    assert metrics["source1"].frames == 3
+    assert metrics["source2"].frames == 4
+    assert metrics["source2"].capacity == 4
+
+    # Without synchronization each source returns its latest capture.
+    camera_service.synchronize_sources = False
+    source1_thread.set_last_captured_image("source1 1.5", 1.5)
+    resp = camera_service.GetImage(req, None)
+    assert [img_resp.shot.image.data for img_resp in resp.image_responses
+           ] == [b"source2 4.1", b"source1 1.5"]
+
+
 def _test_camera_service(use_background_capture_thread, logger=None):
     robot = MockRobot()
 
@@ -609,6 +706,203 @@ def test_image_service_with_thread(caplog, capsys):
     _test_camera_service(use_background_capture_thread=True)
 
 
+class MockServicerContext:
+
+    def __init__(self):
+        self.trailing_metadata = None
+
+    def set_trailing_metadata(self, metadata):
+        self.trailing_metadata = metadata
+
+
+def test_image_service_captures_sources_concurrently():
+    # Each capture waits for the captures of the other sources, so the request can only complete
+    # if every source is captured on its own thread.
+    barrier = threading.Barrier(3)
+
+    def capture_with_barrier(custom_params=None, **kwargs):
+        barrier.wait(timeout=5)
+        return "image", 1
+
+    names = ["source1", "source2", "source3"]
+    image_sources = [
+        VisualImageSource(name, FakeCamera(capture_with_barrier, decode_fake), rows=10, cols=21)
+        for name in names
+    ]
+    camera_service = CameraBaseImageServicer(MockRobot(), "camera-service", image_sources,
+                                             use_background_capture_thread=False)
+    req = image_pb2.GetImageRequest()
+    req.image_requests.extend([
+        image_pb2.ImageRequest(image_source_name=name) for name in reversed(names)
+    ] + [image_pb2.ImageRequest(image_source_name="unknown")])
+    context = MockServicerContext()
+    resp = camera_service.GetImage(req, context)
+    assert resp.header.error.code == header_pb2.CommonError.CODE_OK
+    assert [img_resp.source.name for img_resp in resp.image_responses] == names[::-1] + [""]
+    for img_resp in resp.image_responses[:3]:
+        assert img_resp.status == image_pb2.ImageResponse.STATUS_OK
+        assert img_resp.shot.image.rows == 15
+        assert img_resp.shot.image.data == b"image"
+    assert resp.image_responses[3].status == image_pb2.ImageResponse.STATUS_UNKNOWN_CAMERA
+
+    # Timing is reported for every captured source, in request order.
+    timings = camera_service.last_image_timings
+    assert [timing.source_name for timing in timings] == names[::-1]
+    assert all(timing.capture_secs >= 0 and timing.decode_secs >= 0 for timing in timings)
+    assert context.trailing_metadata[0][0] == IMAGE_TIMING_METADATA_KEY
+    parsed = image_timings_from_metadata(context.trailing_metadata)
+    assert [timing.source_name for timing in parsed] == names[::-1]
+    for timing, parsed_timing in zip(timings, parsed):
+        assert parsed_timing.capture_secs == pytest.approx(timing.capture_secs, abs=1e-6)
+        assert parsed_timing.decode_secs == pytest.approx(timing.decode_secs, abs=1e-6)
+    assert image_timings_from_metadata([("other-key", "value")]) == []
+
+
+def test_image_service_serial_workers():
+    threads = []
+
+    def capture_recording_thread(custom_params=None, **kwargs):
+        threads.append(threading.current_thread())
+        return "image", 1
+
+    image_sources = [
+        VisualImageSource(name, FakeCamera(capture_recording_thread, decode_fake), rows=10,
+                          cols=21) for name in ["source1", "source2"]
+    ]
+    camera_service = CameraBaseImageServicer(MockRobot(), "camera-service", image_sources,
+                                             use_background_capture_thread=False, max_workers=1)
+    req = image_pb2.GetImageRequest()
+    req.image_requests.extend([
+        image_pb2.ImageRequest(image_source_name="source2"),
+        image_pb2.ImageRequest(image_source_name="source1"),
+        image_pb2.ImageRequest(image_source_name="source2"),
+    ])
+    resp = camera_service.GetImage(req, None)
+    assert [img_resp.source.name for img_resp in resp.image_responses
+           ] == ["source2", "source1", "source2"]
+    assert all(img_resp.status == image_pb2.ImageResponse.STATUS_OK
+               for img_resp in resp.image_responses)
+    assert threads == [threading.current_thread()] * 3
+    assert len(camera_service.last_image_timings) == 3
+
+
+class CountingDecode():
+
+    def __init__(self):
+        self.count = 0
+
+    def decode(self, img_data, img_proto, img_req):
+        self.count += 1
+        img_proto.rows = 15
+        img_proto.data = b"%s-%d" % (img_data.encode(), img_req.quality_percent)
+
+
+def test_encoded_image_cache_in_visual_source():
+    counter = CountingDecode()
+    visual_src = VisualImageSource("source1", FakeCamera(capture_fake, counter.decode),
+                                   encoded_image_cache_size=2)
+    req = image_pb2.ImageRequest(image_source_name="source1", quality_percent=50)
+
+    im_proto = image_pb2.Image()
+    status = visual_src.image_decode_with_error_checking("image", im_proto, req, capture_time=1)
+    assert status == image_pb2.ImageResponse.STATUS_OK
+    assert counter.count == 1
+    cached_proto = image_pb2.Image()
+    status = visual_src.image_decode_with_error_checking("image", cached_proto, req,
+                                                         capture_time=1)
+    assert status == image_pb2.ImageResponse.STATUS_OK
+    assert counter.count == 1
+    assert cached_proto == im_proto
+    assert visual_src.encoded_image_cache.metrics() == (1, 1, 1, 2)
+
+    # A different quality or a new frame is decoded again.
+    other_req = image_pb2.ImageRequest(image_source_name="source1", quality_percent=90)
+    visual_src.image_decode_with_error_checking("image", image_pb2.Image(), other_req,
+                                                capture_time=1)
+    assert counter.count == 2
+    visual_src.image_decode_with_error_checking("image", image_pb2.Image(), req, capture_time=2)
+    assert counter.count == 3
+    # The first entry was the least recently used, and was evicted.
+    visual_src.image_decode_with_error_checking("image", image_pb2.Image(), req, capture_time=1)
+    assert counter.count == 4
+    assert visual_src.encoded_image_cache.metrics() == (1, 4, 2, 2)
+
+    # Without a capture time the cache is not used.
+    visual_src.image_decode_with_error_checking("image", image_pb2.Image(), req)
+    assert counter.count == 5
+    assert visual_src.encoded_image_cache.metrics().misses == 4
+
+    # Failed decodes are not cached.
+    error_src = VisualImageSource("source2", FakeCamera(capture_fake, decode_with_error))
+    for _ in range(2):
+        status = error_src.image_decode_with_error_checking("image", image_pb2.Image(), req,
+                                                            capture_time=1)
+        assert status == image_pb2.ImageResponse.STATUS_UNSUPPORTED_IMAGE_FORMAT_REQUESTED
+    assert error_src.encoded_image_cache.metrics() == (0, 2, 0, 8)
+
+    disabled_src = VisualImageSource("source3", FakeCamera(capture_fake, counter.decode),
+                                     encoded_image_cache_size=0)
+    assert disabled_src.encoded_image_cache is None
+    for _ in range(2):
+        disabled_src.image_decode_with_error_checking("image", image_pb2.Image(), req,
+                                                      capture_time=1)
+    assert counter.count == 7
+
+
+def test_encoded_image_cache_keys():
+    req = image_pb2.ImageRequest(image_source_name="source1", quality_percent=50,
+                                 image_format=image_pb2.Image.FORMAT_JPEG)
+    key = EncodedImageCache.make_key(1.5, req)
+    assert key == EncodedImageCache.make_key(1.5, image_pb2.ImageRequest(
+        image_source_name="source1", quality_percent=50, image_format=image_pb2.Image.FORMAT_JPEG))
+    for changed in [
+            dict(quality_percent=75),
+            dict(image_format=image_pb2.Image.FORMAT_RAW),
+            dict(pixel_format=image_pb2.Image.PIXEL_FORMAT_RGB_U8),
+            dict(resize_ratio=0.5),
+    ]:
+        other_req = image_pb2.ImageRequest()
+        other_req.CopyFrom(req)
+        for field, value in changed.items():
+            setattr(other_req, field, value)
+        assert EncodedImageCache.make_key(1.5, other_req) != key
+    assert EncodedImageCache.make_key(2.5, req) != key
+    other_req = image_pb2.ImageRequest()
+    other_req.CopyFrom(req)
+    other_req.custom_params.values["int"].int_value.value = 3
+    assert EncodedImageCache.make_key(1.5, other_req) != key
+
+
+def test_image_service_uses_encoded_image_cache():
+    counter = CountingDecode()
+    visual_src = VisualImageSource("source1", FakeCamera(capture_fake, counter.decode), rows=10,
+                                   cols=21)
+    camera_service = CameraBaseImageServicer(MockRobot(), "camera-service", [visual_src],
+                                             use_background_capture_thread=False)
+    req = image_pb2.GetImageRequest()
+    req.image_requests.add(image_source_name="source1", quality_percent=50)
+    first_resp = camera_service.GetImage(req, None)
+    # capture_fake always returns the same capture time, so the frame is only decoded once.
+    second_resp = camera_service.GetImage(req, None)
+    assert counter.count == 1
+    assert first_resp.image_responses[0].shot == second_resp.image_responses[0].shot
+    assert second_resp.image_responses[0].status == image_pb2.ImageResponse.STATUS_OK
+    assert second_resp.image_responses[0].shot.image.data == b"image-50"
+
+    class OldDecodeServicer(CameraBaseImageServicer):
+
+        def _set_format_and_decode(self, image_data, img_proto, img_req):
+            return super(OldDecodeServicer, self)._set_format_and_decode(
+                image_data, img_proto, img_req)
+
+    old_service = OldDecodeServicer(MockRobot(), "camera-service", [visual_src],
+                                    use_background_capture_thread=False)
+    for _ in range(2):
+        resp = old_service.GetImage(req, None)
+        assert resp.image_responses[0].status == image_pb2.ImageResponse.STATUS_OK
+    assert counter.count == 3
+
+
 def test_gain_and_exposure_as_functions():
 
     class GainAndExposure():
@@ -4,6 +4,7 @@
 # is subject to the terms and conditions of the Boston Dynamics Software
 # Development Kit License (20191101-BDSDK-SL).
 
+import concurrent.futures
 import copy
 import random
 import threading
@@ -14,6 +15,7 @@ from google.protobuf import text_format
 
 import bosdyn.client
 from bosdyn.api import lease_pb2 as LeaseProto
+from bosdyn.client.heartbeat import HeartbeatScheduler
 from bosdyn.client.lease import (Lease, LeaseKeepAlive, LeaseNotOwnedByWallet, LeaseState,
                                  LeaseWallet, NoSuchLease)
 from bosdyn.client.lease import test_active_lease as active_lease_test
@@ -529,6 +531,14 @@ class MockLeaseClient(object):
         else:
             return None
 
+    def retain_lease_async(self, lease, **kwargs):
+        future = concurrent.futures.Future()
+        try:
+            future.set_result(self.retain_lease(lease, **kwargs))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
     def acquire(self, resource):
         lease = Lease(
             LeaseProto.Lease(resource=resource, sequence=[1], epoch='1', client_names=['root']))
@@ -631,6 +641,41 @@ def test_lease_keep_alive_shutdown():
     assert not keep_alive.is_alive()
 
 
+def test_lease_keep_alive_with_scheduler():
+    # Check-ins run from the scheduler thread, and failures do not stop them.
+    lease_wallet = LeaseWallet()
+    lease_wallet.add(_create_lease('A', 'epoch', [1]))
+    lease_client = MockLeaseClient(lease_wallet, error_on_call_N=3)
+    failures = []
+    max_loops = MaxKeepAliveLoops(5)
+    scheduler = HeartbeatScheduler()
+    keep_alive = LeaseKeepAlive(lease_client, resource='A', rpc_interval_seconds=.02,
+                                keep_running_cb=max_loops, on_failure_callback=failures.append,
+                                scheduler=scheduler)
+    keep_alive.wait_until_done()
+    assert not keep_alive.is_alive()
+    assert 5 == max_loops.cur_loops
+    assert 3 == lease_client.retain_lease_calls
+    # One failed RetainLease, then two check-ins without a lease in the wallet.
+    assert 3 == len(failures)
+    scheduler.shutdown()
+
+
+def test_lease_keep_alive_shutdown_with_scheduler():
+    lease_wallet = LeaseWallet()
+    lease_client = MockLeaseClient(lease_wallet)
+    scheduler = HeartbeatScheduler()
+    keep_alive = LeaseKeepAlive(lease_client, resource='A', rpc_interval_seconds=.02,
+                                scheduler=scheduler)
+    assert keep_alive.is_alive()
+    time.sleep(.1)
+    assert lease_client.retain_lease_calls > 0
+    keep_alive.shutdown()
+    assert not keep_alive.is_alive()
+    assert not scheduler.heartbeats()
+    scheduler.shutdown()
+
+
 def test_lease_compare_result_to_status():
     # Test the implicit conversion between CompareResult enum and LeaseUseResult status enum.
     assert Lease.compare_result_to_lease_use_result_status(
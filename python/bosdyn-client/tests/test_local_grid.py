@@ -0,0 +1,191 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Unit tests for decoding local grids."""
+import numpy as np
+import pytest
+
+from bosdyn.api import local_grid_pb2
+from bosdyn.client.local_grid import (LocalGridCache, decode_local_grid, decode_unknown_cells,
+                                      local_grid_cell_centers)
+from bosdyn.client.math_helpers import Quat, SE3Pose
+
+
+def _make_grid(cells, cell_format, dtype, rle=False, scale=0, offset=0):
+    local_grid = local_grid_pb2.LocalGrid(frame_name_local_grid_data='terrain_local_grid_corner',
+                                          cell_format=cell_format, cell_value_scale=scale,
+                                          cell_value_offset=offset)
+    local_grid.extent.cell_size = 0.5
+    local_grid.extent.num_cells_y, local_grid.extent.num_cells_x = cells.shape
+    flat = cells.ravel()
+    if rle:
+        starts = np.flatnonzero(np.r_[True, flat[1:] != flat[:-1]])
+        local_grid.encoding = local_grid.ENCODING_RLE
+        local_grid.data = flat[starts].astype(dtype).tobytes()
+        local_grid.rle_counts.extend(np.diff(np.r_[starts, len(flat)]).tolist())
+    else:
+        local_grid.encoding = local_grid.ENCODING_RAW
+        local_grid.data = flat.astype(dtype).tobytes()
+    return local_grid
+
+
+def test_decode_raw():
+    cells = np.arange(12).reshape(3, 4)
+    local_grid = _make_grid(cells, local_grid_pb2.LocalGrid.CELL_FORMAT_UINT16, '<u2')
+    decoded = decode_local_grid(local_grid)
+    assert decoded.dtype == np.uint16
+    assert np.array_equal(decoded, cells)
+    # A LocalGridResponse can be decoded directly.
+    response = local_grid_pb2.LocalGridResponse(local_grid=local_grid)
+    assert np.array_equal(decode_local_grid(response), cells)
+
+
+def test_decode_rle_scaled():
+    cells = np.array([[1, 1, 1, 2], [2, 2, 3, 3], [3, 3, 3, 3]])
+    local_grid = _make_grid(cells, local_grid_pb2.LocalGrid.CELL_FORMAT_INT16, '<i2', rle=True,
+                            scale=0.1, offset=-1)
+    assert len(local_grid.rle_counts) == 3
+    decoded = decode_local_grid(local_grid)
+    assert decoded.dtype == np.float64
+    assert np.allclose(decoded, cells * 0.1 - 1)
+    assert decode_local_grid(local_grid, dtype=np.float32).dtype == np.float32
+    assert np.array_equal(decode_local_grid(local_grid, apply_scale=False), cells)
+
+
+def test_decode_all_formats():
+    cells = np.array([[0, 1], [2, 3]])
+    for cell_format, dtype in ((local_grid_pb2.LocalGrid.CELL_FORMAT_FLOAT32,
+                                '<f4'), (local_grid_pb2.LocalGrid.CELL_FORMAT_FLOAT64,
+                                         '<f8'), (local_grid_pb2.LocalGrid.CELL_FORMAT_INT8, 'i1'),
+                               (local_grid_pb2.LocalGrid.CELL_FORMAT_UINT8,
+                                'u1'), (local_grid_pb2.LocalGrid.CELL_FORMAT_INT16, '<i2'),
+                               (local_grid_pb2.LocalGrid.CELL_FORMAT_UINT16, '<u2')):
+        for rle in (False, True):
+            decoded = decode_local_grid(_make_grid(cells, cell_format, dtype, rle=rle))
+            assert decoded.dtype == np.dtype(dtype)
+            assert np.array_equal(decoded, cells)
+
+
+def test_decode_invalid():
+    cells = np.arange(6).reshape(2, 3)
+    local_grid = _make_grid(cells, local_grid_pb2.LocalGrid.CELL_FORMAT_UINT8, 'u1')
+    local_grid.cell_format = local_grid.CELL_FORMAT_UNKNOWN
+    with pytest.raises(ValueError):
+        decode_local_grid(local_grid)
+
+    local_grid = _make_grid(cells, local_grid_pb2.LocalGrid.CELL_FORMAT_UINT8, 'u1')
+    local_grid.encoding = local_grid.ENCODING_UNKNOWN
+    with pytest.raises(ValueError):
+        decode_local_grid(local_grid)
+
+    local_grid = _make_grid(cells, local_grid_pb2.LocalGrid.CELL_FORMAT_UINT8, 'u1')
+    local_grid.extent.num_cells_x = 4
+    with pytest.raises(ValueError):
+        decode_local_grid(local_grid)
+
+    local_grid = _make_grid(cells, local_grid_pb2.LocalGrid.CELL_FORMAT_UINT8, 'u1', rle=True)
+    local_grid.rle_counts.append(1)
+    with pytest.raises(ValueError):
+        decode_local_grid(local_grid)
+
+
+def test_decode_unknown_cells():
+    cells = np.zeros((2, 3))
+    local_grid = _make_grid(cells, local_grid_pb2.LocalGrid.CELL_FORMAT_UINT8, 'u1')
+    assert decode_unknown_cells(local_grid) is None
+    local_grid.unknown_cells = bytes([0, 1, 0, 0, 0, 1])
+    assert np.array_equal(decode_unknown_cells(local_grid),
+                          [[False, True, False], [False, False, True]])
+
+
+def test_cell_centers():
+    cells = np.zeros((2, 3))
+    local_grid = _make_grid(cells, local_grid_pb2.LocalGrid.CELL_FORMAT_UINT8, 'u1')
+    centers = local_grid_cell_centers(local_grid)
+    assert centers.shape == (2, 3, 3)
+    # The cell at [yj, xi] is centered at ((xi + 0.5) * cell_size, (yj + 0.5) * cell_size).
+    assert np.allclose(centers[1, 2], [1.25, 0.75, 0])
+
+    heights = np.arange(6, dtype=np.float32).reshape(2, 3)
+    vision_tform_grid = SE3Pose(1, 2, 3, Quat.from_yaw(np.pi / 2))
+    edges = local_grid.transforms_snapshot.child_to_parent_edge_map
+    edges['vision'].parent_frame_name = ''
+    edge = edges[local_grid.frame_name_local_grid_data]
+    edge.parent_frame_name = 'vision'
+    edge.parent_tform_child.CopyFrom(vision_tform_grid.to_proto())
+    in_vision = local_grid_cell_centers(local_grid, 'vision', heights=heights)
+    expected = vision_tform_grid.transform_cloud(
+        local_grid_cell_centers(local_grid, heights=heights).reshape(-1, 3))
+    assert np.allclose(in_vision.reshape(-1, 3), expected)
+    assert np.allclose(in_vision[1, 2], [1 - 0.75, 2 + 1.25, 3 + 5])
+
+    with pytest.raises(ValueError):
+        local_grid_cell_centers(local_grid, 'odom')
+
+
+def _make_response(cells, nsec, name='terrain'):
+    local_grid = _make_grid(cells, local_grid_pb2.LocalGrid.CELL_FORMAT_INT16, '<i2', rle=True,
+                            scale=0.5)
+    local_grid.local_grid_type_name = name
+    local_grid.acquisition_time.FromNanoseconds(nsec)
+    return local_grid_pb2.LocalGridResponse(local_grid_type_name=name, local_grid=local_grid,
+                                            status=local_grid_pb2.LocalGridResponse.STATUS_OK)
+
+
+def test_decode_into_out():
+    cells = np.arange(6).reshape(2, 3)
+    local_grid = _make_response(cells, 1).local_grid
+    out = np.zeros((2, 3))
+    assert decode_local_grid(local_grid, out=out) is out
+    assert np.allclose(out, cells * 0.5)
+    out = np.zeros((2, 3), dtype=np.int16)
+    assert decode_local_grid(local_grid, apply_scale=False, out=out) is out
+    assert np.array_equal(out, cells)
+
+
+def test_local_grid_cache():
+    cache = LocalGridCache()
+    assert cache.get('terrain') is None
+    terrain = np.arange(6).reshape(2, 3)
+    no_step = np.ones((2, 2))
+    changed = cache.update([
+        _make_response(terrain, 100),
+        _make_response(no_step, 100, name='no_step'),
+        local_grid_pb2.LocalGridResponse(
+            local_grid_type_name='obstacle_distance',
+            status=local_grid_pb2.LocalGridResponse.STATUS_DATA_UNAVAILABLE),
+    ])
+    assert changed == ['terrain', 'no_step']
+    cached = cache.get('terrain')
+    assert cached.acquisition_time_nsec == 100
+    assert np.allclose(cached.cells, terrain * 0.5)
+    assert cached.unknown_cells is None
+    assert cache.get('obstacle_distance') is None
+
+    # A grid with the same acquisition time is not decoded again.
+    assert cache.update([_make_response(terrain + 1, 100)]) == []
+    assert cache.get('terrain') is cached
+
+    # A new grid with the same extent is decoded into the same array.
+    assert cache.update([_make_response(terrain + 1, 200)]) == ['terrain']
+    assert cache.get('terrain').cells is cached.cells
+    assert np.allclose(cached.cells, (terrain + 1) * 0.5)
+    assert cache.changed_since(100) == ['terrain']
+    assert sorted(cache.changed_since(0)) == ['no_step', 'terrain']
+    assert cache.changed_since(200) == []
+
+    # A new grid with another extent gets a new array.
+    assert cache.update([_make_response(np.zeros((4, 4)), 300)]) == ['terrain']
+    assert cache.get('terrain').cells.shape == (4, 4)
+
+    cache = LocalGridCache(reuse_arrays=False)
+    cache.update([_make_response(terrain, 100)])
+    cells = cache.get('terrain').cells
+    cache.update([_make_response(terrain + 1, 200)])
+    assert cache.get('terrain').cells is not cells
+    assert np.allclose(cells, terrain * 0.5)
+    cache.clear()
+    assert cache.get('terrain') is None
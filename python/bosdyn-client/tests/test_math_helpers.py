@@ -9,9 +9,12 @@
 import random
 from math import cos, fabs, pi, sin, sqrt
 
+import numpy
 import pytest
 
+from bosdyn.api import trajectory_pb2
 from bosdyn.client.math_helpers import *
+from bosdyn.util import seconds_to_timestamp
 
 # The following set of tests are for the math_helpers
 # Still needing tests: Quat class, se3_times_vec3
@@ -985,3 +988,236 @@ def test_se3_vec3_mult_exceptions():
         " " * vec
     with pytest.raises(TypeError):
         se3 * ""
+
+
+def _random_poses(num, seed=0):
+    rng = random.Random(seed)
+    poses = []
+    for _ in range(num):
+        rot = Quat(rng.uniform(-1, 1), rng.uniform(-1, 1), rng.uniform(-1, 1),
+                   rng.uniform(-1, 1)).normalize()
+        poses.append(SE3Pose(rng.uniform(-5, 5), rng.uniform(-5, 5), rng.uniform(-5, 5), rot))
+    return poses
+
+
+def _assert_same_pose(pose, expected):
+    assert numpy.allclose(list(pose), list(expected), atol=EPSILON)
+
+
+def _assert_same_quat(quat, expected):
+    assert numpy.allclose([quat.w, quat.x, quat.y, quat.z],
+                          [expected.w, expected.x, expected.y, expected.z], atol=EPSILON)
+
+
+def test_se3_pose_array_conversions():
+    poses = _random_poses(5)
+    pose_array = SE3PoseArray.from_poses(poses)
+    assert len(pose_array) == 5
+    assert pose_array.data.shape == (5, 7)
+    for pose, expected in zip(pose_array, poses):
+        _assert_same_pose(pose, expected)
+    _assert_same_pose(pose_array[3], poses[3])
+    assert len(pose_array[1:3]) == 2
+
+    from_proto = SE3PoseArray.from_proto(pose.to_proto() for pose in poses)
+    assert numpy.allclose(from_proto.data, pose_array.data)
+    for proto, pose in zip(pose_array.to_proto(), poses):
+        _assert_same_pose(SE3Pose.from_proto(proto), pose)
+
+    # A proto without rotation is the identity rotation.
+    no_rotation = SE3PoseArray.from_proto([geometry_pb2.SE3Pose()])
+    assert numpy.allclose(no_rotation.data, SE3PoseArray.from_identity(1).data)
+
+    assert numpy.allclose(pose_array.position, [[p.x, p.y, p.z] for p in poses])
+    assert len(pose_array.rotation) == 5
+    _assert_same_quat(pose_array.rotation[2], poses[2].rot)
+
+    matrices = pose_array.to_matrix()
+    for mat, pose in zip(matrices, poses):
+        assert numpy.allclose(mat, pose.to_matrix())
+    for pose, expected in zip(SE3PoseArray.from_matrix(matrices), poses):
+        assert numpy.allclose(pose.to_matrix(), expected.to_matrix())
+
+    with pytest.raises(ValueError):
+        SE3PoseArray(numpy.zeros((3, 6)))
+    with pytest.raises(ValueError):
+        QuatArray(numpy.zeros((3, 3)))
+
+
+def test_se3_pose_array_mult_inverse():
+    a_poses = _random_poses(10, seed=1)
+    b_poses = _random_poses(10, seed=2)
+    a_array = SE3PoseArray.from_poses(a_poses)
+    b_array = SE3PoseArray.from_poses(b_poses)
+
+    for pose, a, b in zip(a_array * b_array, a_poses, b_poses):
+        _assert_same_pose(pose, a * b)
+    for pose, a in zip(a_array.inverse(), a_poses):
+        _assert_same_pose(pose, a.inverse())
+    for pose in a_array.mult(a_array.inverse()):
+        _assert_same_pose(pose, SE3Pose.from_identity())
+
+    # A single pose is composed with every element, on either side.
+    single = b_poses[0]
+    for pose, a in zip(a_array * single, a_poses):
+        _assert_same_pose(pose, a * single)
+    for pose, a in zip(single * a_array, a_poses):
+        _assert_same_pose(pose, single * a)
+
+    for quat, a, b in zip(a_array.rotation * b_array.rotation, a_poses, b_poses):
+        _assert_same_quat(quat, a.rot * b.rot)
+    for quat, a in zip(single.rot * a_array.rotation, a_poses):
+        _assert_same_quat(quat, single.rot * a.rot)
+
+    with pytest.raises(TypeError):
+        a_array * 'a'
+    with pytest.raises(TypeError):
+        a_array.rotation * 'a'
+
+
+def test_se3_pose_array_transform():
+    poses = _random_poses(4, seed=3)
+    pose_array = SE3PoseArray.from_poses(poses)
+    points = numpy.array([[1.0, 2.0, 3.0], [-1.0, 0.5, 0.0], [0.0, 0.0, 0.0], [4.0, -2.0, 1.0]])
+
+    transformed = pose_array.transform_points(points)
+    for out, pose, point in zip(transformed, poses, points):
+        assert numpy.allclose(out, pose.transform_point(*point))
+    rotated = pose_array.rotation.transform_points(points)
+    for out, pose, point in zip(rotated, poses, points):
+        assert numpy.allclose(out, pose.rot.transform_point(*point))
+
+    clouds = pose_array.transform_cloud(points)
+    assert clouds.shape == (4, 4, 3)
+    for cloud, pose in zip(clouds, poses):
+        assert numpy.allclose(cloud, pose.transform_cloud(points))
+
+    assert numpy.allclose(pose_array.translation_norm(), [p.translation_norm() for p in poses])
+
+
+def test_quat_array_yaw_and_normalize():
+    quats = [Quat.from_yaw(angle) for angle in (-3.0, -1.0, 0.0, 0.5, 3.1)]
+    quats.append(Quat(w=0, x=1, y=0, z=0))
+    quat_array = QuatArray.from_quats(quats)
+    assert numpy.allclose(quat_array.to_yaw(), [q.to_yaw() for q in quats])
+
+    quat_array = QuatArray(numpy.array([[2.0, 0, 0, 0], [0, 0, 0, 0], [1.0, 1.0, 1.0, 1.0]]))
+    quat_array.normalize()
+    assert numpy.allclose(quat_array.data, [[1, 0, 0, 0], [1, 0, 0, 0], [0.5, 0.5, 0.5, 0.5]])
+
+
+@pytest.mark.parametrize('fraction', [0.0, 0.25, 0.5, 1.0])
+def test_se3_pose_array_interp(fraction):
+    a_poses = _random_poses(6, seed=4)
+    b_poses = _random_poses(6, seed=5)
+    # Nearly identical rotations take the linear blend path of slerp.
+    b_poses[0].rot = Quat(a_poses[0].rot.w, a_poses[0].rot.x, a_poses[0].rot.y,
+                          a_poses[0].rot.z + 1e-5).normalize()
+    interp = SE3PoseArray.interp(SE3PoseArray.from_poses(a_poses),
+                                 SE3PoseArray.from_poses(b_poses), fraction)
+    for pose, a, b in zip(interp, a_poses, b_poses):
+        _assert_same_pose(pose, SE3Pose.interp(a, b, fraction))
+
+
+def test_se3_pose_array_interp_fractions():
+    a, b = _random_poses(2, seed=6)
+    fractions = numpy.linspace(0, 1, 11)
+    interp = SE3PoseArray.interp(a, b, fractions)
+    assert len(interp) == 11
+    for pose, fraction in zip(interp, fractions):
+        _assert_same_pose(pose, SE3Pose.interp(a, b, fraction))
+
+    poses = SE3PoseArray.from_poses([a, b, a])
+    samples = poses.interp_times([0.0, 2.0, 3.0], [-1.0, 0.5, 2.0, 2.5, 4.0])
+    _assert_same_pose(samples[0], a)
+    _assert_same_pose(samples[1], SE3Pose.interp(a, b, 0.25))
+    _assert_same_pose(samples[2], b)
+    _assert_same_pose(samples[3], SE3Pose.interp(b, a, 0.5))
+    _assert_same_pose(samples[4], a)
+
+
+def test_se3_pose_array_trajectory_proto():
+    poses = _random_poses(3, seed=7)
+    pose_array = SE3PoseArray.from_poses(poses)
+    reference_time = seconds_to_timestamp(100.0)
+    traj = pose_array.to_trajectory_proto(
+        [0.5, 1.0, 2.25], reference_time=reference_time,
+        pos_interpolation=trajectory_pb2.POS_INTERP_CUBIC)
+    assert len(traj.points) == 3
+    assert traj.reference_time == reference_time
+    assert traj.pos_interpolation == trajectory_pb2.POS_INTERP_CUBIC
+    assert traj.points[2].time_since_reference.seconds == 2
+    assert traj.points[2].time_since_reference.nanos == 250000000
+    _assert_same_pose(SE3Pose.from_proto(traj.points[1].pose), poses[1])
+
+    from_proto, times = SE3PoseArray.from_trajectory_proto(traj)
+    assert numpy.allclose(from_proto.data, pose_array.data)
+    assert numpy.allclose(times, [0.5, 1.0, 2.25])
+
+    with pytest.raises(ValueError):
+        pose_array.to_trajectory_proto([0.5, 1.0])
+
+
+def test_slots():
+    for obj in (Vec2(1, 2), Vec3(1, 2, 3), SE2Pose(1, 2, 3), SE2Velocity(1, 2, 3),
+                SE3Velocity(1, 2, 3, 4, 5, 6), SE3Pose.from_identity(), Quat()):
+        assert not hasattr(obj, '__dict__')
+        with pytest.raises(AttributeError):
+            obj.not_a_field = 1
+
+
+def test_in_place_operations():
+    a, b = _random_poses(2, seed=8)
+    expected = a * b
+    out = SE3Pose.from_identity()
+    assert a.mult_into(b, out) is out
+    _assert_same_pose(out, expected)
+    # The output may alias either input.
+    a_copy = SE3Pose(a.x, a.y, a.z, Quat(a.rot.w, a.rot.x, a.rot.y, a.rot.z))
+    a_copy.mult_into(b, a_copy)
+    _assert_same_pose(a_copy, expected)
+    b_copy = SE3Pose(b.x, b.y, b.z, Quat(b.rot.w, b.rot.x, b.rot.y, b.rot.z))
+    a.mult_into(b_copy, b_copy)
+    _assert_same_pose(b_copy, expected)
+
+    a_copy = SE3Pose(a.x, a.y, a.z, Quat(a.rot.w, a.rot.x, a.rot.y, a.rot.z))
+    assert a_copy.inverse_into(a_copy) is a_copy
+    _assert_same_pose(a_copy, a.inverse())
+
+    quat = Quat(a.rot.w, a.rot.x, a.rot.y, a.rot.z)
+    quat.mult_into(b.rot, quat)
+    _assert_same_quat(quat, a.rot * b.rot)
+    _assert_same_quat(a.rot.inverse_into(Quat()), a.rot.inverse())
+
+    se2_a = SE2Pose(1, 2, 0.3)
+    se2_b = SE2Pose(-3, 1, 3.0)
+    se2_out = se2_a.mult_into(se2_b, SE2Pose(0, 0, 0))
+    se2_expected = se2_a * se2_b
+    assert fabs(se2_out.x - se2_expected.x) < EPSILON
+    assert fabs(se2_out.y - se2_expected.y) < EPSILON
+    assert fabs(se2_out.angle - se2_expected.angle) < EPSILON
+    se2_inverse = se2_a.inverse()
+    se2_a.inverse_into(se2_a)
+    assert (se2_a.x, se2_a.y, se2_a.angle) == (se2_inverse.x, se2_inverse.y, se2_inverse.angle)
+
+
+def test_cached_matrix_invalidation():
+    pose = SE3Pose(1, 2, 3, Quat.from_yaw(0.5))
+    matrix = pose.to_matrix()
+    # Callers get their own copy of the cached matrix.
+    matrix[0, 3] = 100
+    assert pose.to_matrix()[0, 3] == 1
+
+    pose.x = 4
+    assert pose.to_matrix()[0, 3] == 4
+    pose.rot.w, pose.rot.z = 1, 0
+    assert numpy.allclose(pose.to_matrix()[0:3, 0:3], numpy.eye(3))
+    pose.rot = Quat.from_yaw(pi / 2)
+    assert numpy.allclose(pose.to_matrix()[0:3, 0:3], [[0, -1, 0], [1, 0, 0], [0, 0, 1]])
+
+    out = numpy.zeros((4, 4))
+    assert pose.to_matrix(out=out) is out
+    assert numpy.allclose(out, pose.to_matrix())
+    rot_out = numpy.zeros((3, 3))
+    assert pose.rot.to_matrix(out=rot_out) is rot_out
+    assert numpy.allclose(rot_out, pose.to_matrix()[0:3, 0:3])
@@ -0,0 +1,95 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Unit tests for the pools module."""
+import threading
+
+import pytest
+
+from bosdyn.client.pools import ChannelLimitError, ChannelPool, ExecutorPool, RobotExecutor
+
+
+class FakeChannel(object):
+
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_executor_pool_submit():
+    pool = ExecutorPool(max_workers=2)
+    assert pool.submit(lambda a, b: a + b, 1, b=2).result() == 3
+
+    def fail():
+        raise ValueError('boom')
+
+    with pytest.raises(ValueError):
+        pool.submit(fail).result()
+
+    # Counters are updated after the futures complete, so wait for the workers first.
+    pool.shutdown()
+    metrics = pool.metrics()
+    assert metrics.max_workers == 2
+    assert metrics.completed == 2
+    assert metrics.active == 0
+    assert metrics.queued == 0
+
+
+def test_executor_pool_robot_limit():
+    pool = ExecutorPool(max_workers=4, max_workers_per_robot=1)
+    robot_executor = pool.for_robot('robot-1')
+    assert isinstance(robot_executor, RobotExecutor)
+
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking():
+        started.set()
+        release.wait()
+        return 'done'
+
+    first = robot_executor.submit(blocking)
+    started.wait()
+    second = robot_executor.submit(lambda: 'second')
+    other = pool.for_robot('robot-2').submit(lambda: 'other')
+
+    # Another robot is not held back by robot-1's limit.
+    assert other.result(timeout=5) == 'other'
+    assert not second.done()
+    metrics = pool.metrics()
+    assert metrics.robots['robot-1'].active == 1
+    assert metrics.robots['robot-1'].queued == 1
+    assert metrics.queued == 1
+    assert robot_executor.metrics() == metrics.robots['robot-1']
+
+    release.set()
+    assert first.result(timeout=5) == 'done'
+    assert second.result(timeout=5) == 'second'
+    pool.shutdown()
+    metrics = pool.metrics()
+    # Idle robots are dropped from the pool.
+    assert 'robot-1' not in metrics.robots
+    assert robot_executor.metrics() == (0, 0)
+    assert metrics.completed == 3
+
+
+def test_channel_pool():
+    pool = ChannelPool(max_channels_per_robot=2)
+    first = pool.get_or_create('robot-1', 'address', 'api.spot.robot', [], FakeChannel)
+    assert pool.get_or_create('robot-1', 'address', 'api.spot.robot', [], FakeChannel) is first
+    assert pool.get_or_create('robot-2', 'address', 'api.spot.robot', [], FakeChannel) is not first
+    pool.get_or_create('robot-1', 'address', 'auth.spot.robot', [], FakeChannel)
+    with pytest.raises(ChannelLimitError):
+        pool.get_or_create('robot-1', 'address', 'id.spot.robot', [], FakeChannel)
+
+    metrics = pool.metrics()
+    assert metrics.total == 3
+    assert metrics.robots == {'robot-1': 2, 'robot-2': 1}
+
+    assert first in pool.remove_robot('robot-1')
+    assert pool.metrics().robots == {'robot-2': 1}
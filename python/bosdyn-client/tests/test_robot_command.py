@@ -9,13 +9,16 @@ import pytest
 from google.protobuf import timestamp_pb2
 
 from bosdyn.api import (arm_command_pb2, basic_command_pb2, geometry_pb2, robot_command_pb2,
-                        synchronized_command_pb2)
+                        synchronized_command_pb2, trajectory_pb2)
+from bosdyn.api.spot import robot_command_pb2 as spot_command_pb2
 from bosdyn.client import InternalServerError, LeaseUseError, ResponseError, UnsetStatusError
 from bosdyn.client.frame_helpers import BODY_FRAME_NAME, ODOM_FRAME_NAME
 from bosdyn.client.robot_command import (EDIT_TREE_CONVERT_LOCAL_TIME_TO_ROBOT_TIME,
                                          END_TIME_EDIT_TREE, RobotCommandBuilder,
-                                         _clear_behavior_fault_error, _edit_proto,
-                                         _robot_command_error, _robot_command_feedback_error)
+                                         RobotCommandClient, _clear_behavior_fault_error,
+                                         _collect_timestamps, _edit_proto, _robot_command_error,
+                                         _robot_command_feedback_error)
+from bosdyn.util import RobotTimeConverter
 
 
 def test_robot_command_error():
@@ -438,3 +441,43 @@ def test_edit_timestamps():
     command.synchronized_command.arm_command.arm_velocity_command.end_time.seconds = 25
     _edit_proto(command, END_TIME_EDIT_TREE, _set_new_time)
     assert command.synchronized_command.arm_command.arm_velocity_command.end_time.seconds == 10
+
+
+def test_collect_timestamps_in_repeated_fields():
+    trajectory = trajectory_pb2.SE2Trajectory()
+    for index in range(3):
+        trajectory.points.add().time_since_reference.seconds = index
+    timestamps = _collect_timestamps(trajectory, {'points': {'time_since_reference': None}})
+    assert [timestamp.seconds for timestamp in timestamps] == [0, 1, 2]
+    # The collected messages are the ones in the proto, so they can be edited in place.
+    timestamps[1].seconds = 10
+    assert trajectory.points[1].time_since_reference.seconds == 10
+
+
+class MockTimeSyncEndpoint(object):
+
+    def __init__(self, clock_skew_nsec):
+        self.clock_skew_nsec = clock_skew_nsec
+        self.converters = 0
+
+    def get_robot_time_converter(self):
+        self.converters += 1
+        return RobotTimeConverter(self.clock_skew_nsec)
+
+
+def test_update_command_timestamps():
+    command = robot_command_pb2.RobotCommand()
+    arm_cartesian_command = command.synchronized_command.arm_command.arm_cartesian_command
+    arm_cartesian_command.pose_trajectory_in_task.reference_time.seconds = 25
+    arm_cartesian_command.wrench_trajectory_in_task.reference_time.seconds = 30
+    params = spot_command_pb2.MobilityParams()
+    params.body_control.base_offset_rt_footprint.reference_time.seconds = 40
+    command.synchronized_command.mobility_command.params.Pack(params)
+
+    endpoint = MockTimeSyncEndpoint(2 * 10**9)
+    RobotCommandClient()._update_command_timestamps(command, 100.0, endpoint)
+    assert endpoint.converters == 1
+    assert arm_cartesian_command.pose_trajectory_in_task.reference_time.seconds == 27
+    assert arm_cartesian_command.wrench_trajectory_in_task.reference_time.seconds == 32
+    command.synchronized_command.mobility_command.params.Unpack(params)
+    assert params.body_control.base_offset_rt_footprint.reference_time.seconds == 42
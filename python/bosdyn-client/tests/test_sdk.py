@@ -9,6 +9,7 @@ import unittest
 
 import bosdyn.client
 import bosdyn.client.common
+import bosdyn.client.pools
 import bosdyn.client.processors
 
 
@@ -101,6 +102,42 @@ Spam, Spam, Spam, Spam!
         client = robot.ensure_client(service_name,
                                      channel=robot.ensure_secure_channel('the-knights-of-ni'))
 
+    def test_configure_pools(self):
+        sdk = self._create_sdk()
+        sdk.configure_pools(max_workers=4, max_workers_per_robot=2, max_channels_per_robot=1)
+        robot = self._create_robot(sdk, 'test-robot')
+        self.assertIsInstance(robot.executor, bosdyn.client.pools.RobotExecutor)
+        self.assertEqual(robot.executor.robot, robot.pool_key)
+
+        channel = robot.ensure_secure_channel('the-knights-of-ni')
+        self.assertIs(channel, robot.ensure_secure_channel('the-knights-of-ni'))
+        with self.assertRaises(bosdyn.client.pools.ChannelLimitError):
+            robot.ensure_secure_channel('the-knights-who-say-ekke-ekke')
+        self.assertEqual(sdk.get_channel_metrics().robots, {robot.pool_key: 1})
+
+        self.assertEqual(robot.executor.submit(lambda: 42).result(), 42)
+        self.assertEqual(sdk.get_executor_metrics().max_workers, 4)
+
+        robot.shutdown()
+        self.assertEqual(sdk.get_channel_metrics().total, 0)
+
+    def test_pools_keep_robots_with_the_same_name_apart(self):
+        sdk = self._create_sdk()
+        sdk.configure_pools(max_workers=4, max_workers_per_robot=2, max_channels_per_robot=1)
+        first = self._create_robot(sdk, 'test-robot', address='address-1')
+        second = self._create_robot(sdk, 'test-robot', address='address-2')
+        self.assertNotEqual(first.pool_key, second.pool_key)
+
+        # Each robot has its own channel limit.
+        first.ensure_secure_channel('the-knights-of-ni')
+        second.ensure_secure_channel('the-knights-of-ni')
+        self.assertEqual(sdk.get_channel_metrics().robots, {first.pool_key: 1, second.pool_key: 1})
+
+        # Shutting down one robot leaves the other's channels alone.
+        first.shutdown()
+        self.assertEqual(sdk.get_channel_metrics().robots, {second.pool_key: 1})
+        second.shutdown()
+
     def test_load_robot_cert(self):
         sdk = bosdyn.client.Sdk()
         sdk.load_robot_cert()
@@ -0,0 +1,225 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Unit tests for the time_sync module."""
+import random
+
+import pytest
+
+from bosdyn.api import time_sync_pb2
+from bosdyn.client.robot_command import _TimeConverter
+from bosdyn.client.time_sync import (ClockSkewEstimator, ClockSkewSample, NotEstablishedError,
+                                     TimeSyncEndpoint, TimeSyncThread)
+from bosdyn.util import now_nsec, set_timestamp_from_nsec, timestamp_to_nsec
+
+NSEC_PER_SEC = 1000000000
+NSEC_PER_MSEC = 1000000
+SKEW_NSEC = 1234 * NSEC_PER_SEC
+
+
+def _round_trip(client_tx, request_nsec, server_nsec, response_nsec, skew_nsec=SKEW_NSEC):
+    """Build a TimeSyncRoundTrip for the given one-way delays and skew."""
+    round_trip = time_sync_pb2.TimeSyncRoundTrip()
+    set_timestamp_from_nsec(round_trip.client_tx, client_tx)
+    set_timestamp_from_nsec(round_trip.server_rx, client_tx + request_nsec + skew_nsec)
+    set_timestamp_from_nsec(round_trip.server_tx,
+                            client_tx + request_nsec + server_nsec + skew_nsec)
+    set_timestamp_from_nsec(round_trip.client_rx,
+                            client_tx + request_nsec + server_nsec + response_nsec)
+    return round_trip
+
+
+def test_sample_from_round_trip():
+    sample = ClockSkewEstimator.sample_from_round_trip(
+        _round_trip(100 * NSEC_PER_SEC, 2 * NSEC_PER_MSEC, 5 * NSEC_PER_MSEC, 2 * NSEC_PER_MSEC))
+    assert sample.skew_nsec == SKEW_NSEC
+    assert sample.round_trip_nsec == 4 * NSEC_PER_MSEC
+    assert sample.local_time_nsec == 100 * NSEC_PER_SEC + 4500000
+
+    # An asymmetric delay shows up as skew error, bounded by half the round trip time.
+    sample = ClockSkewEstimator.sample_from_round_trip(
+        _round_trip(100 * NSEC_PER_SEC, 4 * NSEC_PER_MSEC, 0, 0))
+    assert sample.skew_nsec - SKEW_NSEC == 2 * NSEC_PER_MSEC
+
+    assert ClockSkewEstimator.sample_from_round_trip(time_sync_pb2.TimeSyncRoundTrip()) is None
+
+
+def test_estimator_rejects_high_round_trip_outliers():
+    rng = random.Random(0)
+    estimator = ClockSkewEstimator(window_size=20)
+    assert estimator.estimate is None
+    client_tx = 100 * NSEC_PER_SEC
+    rejected = 0
+    for index in range(40):
+        if index % 4 == 3:
+            # A congested network delays the response much more than the request.
+            accepted = estimator.add_round_trip(
+                _round_trip(client_tx, 5 * NSEC_PER_MSEC, NSEC_PER_MSEC, 200 * NSEC_PER_MSEC))
+            rejected += not accepted
+        else:
+            jitter = rng.randint(0, 200000)
+            estimator.add_round_trip(
+                _round_trip(client_tx, NSEC_PER_MSEC + jitter, NSEC_PER_MSEC, NSEC_PER_MSEC))
+        client_tx += NSEC_PER_SEC // 10
+    assert rejected == 10
+    estimate = estimator.estimate
+    assert estimate.num_samples == 15
+    assert estimate.num_rejected == 5
+    assert abs(estimate.skew_at(client_tx) - SKEW_NSEC) < 200000
+    assert estimate.uncertainty_nsec < 2 * NSEC_PER_MSEC
+
+
+def test_estimator_models_drift():
+    drift = 50e-6
+    estimator = ClockSkewEstimator()
+    start = 100 * NSEC_PER_SEC
+    for index in range(25):
+        client_tx = start + index * NSEC_PER_SEC
+        skew = SKEW_NSEC + int(drift * (client_tx - start))
+        estimator.add_round_trip(
+            _round_trip(client_tx, NSEC_PER_MSEC, NSEC_PER_MSEC, NSEC_PER_MSEC, skew))
+    estimate = estimator.estimate
+    assert estimate.drift == pytest.approx(drift, rel=1e-3)
+    later = start + 100 * NSEC_PER_SEC
+    assert abs(estimate.skew_at(later) - (SKEW_NSEC + drift * (later - start))) < 10000
+
+    # Without enough time spanned by the samples, no drift is modelled.
+    estimator = ClockSkewEstimator(min_drift_span_nsec=60 * NSEC_PER_SEC)
+    for index in range(25):
+        client_tx = start + index * NSEC_PER_SEC
+        skew = SKEW_NSEC + int(drift * (client_tx - start))
+        estimator.add_round_trip(
+            _round_trip(client_tx, NSEC_PER_MSEC, NSEC_PER_MSEC, NSEC_PER_MSEC, skew))
+    assert estimator.estimate.drift == 0.0
+
+
+def test_estimator_suggested_interval():
+    estimator = ClockSkewEstimator()
+    local_time = 100 * NSEC_PER_SEC
+    estimator.add_sample(ClockSkewSample(local_time, SKEW_NSEC, NSEC_PER_MSEC))
+    assert estimator.suggested_interval_sec(1, 60) == 1
+    for _ in range(3):
+        local_time += NSEC_PER_SEC
+        estimator.add_sample(ClockSkewSample(local_time, SKEW_NSEC + 1000, NSEC_PER_MSEC))
+    assert estimator.suggested_interval_sec(1, 60) == 8
+    for _ in range(10):
+        local_time += NSEC_PER_SEC
+        estimator.add_sample(ClockSkewSample(local_time, SKEW_NSEC, NSEC_PER_MSEC))
+    assert estimator.suggested_interval_sec(1, 60) == 60
+
+    # A jump in the skew drops back to the minimum interval.
+    local_time += NSEC_PER_SEC
+    estimator.add_sample(ClockSkewSample(local_time, SKEW_NSEC + 50 * NSEC_PER_MSEC,
+                                         NSEC_PER_MSEC))
+    assert estimator.suggested_interval_sec(1, 60) == 1
+
+    estimator.reset()
+    assert estimator.estimate is None
+    assert estimator.suggested_interval_sec(1, 60) == 1
+
+
+class MockTimeSyncClient(object):
+    """Answers time-sync updates from a robot clock SKEW_NSEC ahead, after a fixed delay."""
+
+    def __init__(self, status=time_sync_pb2.TimeSyncState.STATUS_OK):
+        self.status = status
+        self.clock_identifier = 'clock-1'
+        self.server_skew_nsec = 0
+
+    def get_time_sync_update(self, previous_round_trip, clock_identifier, **kwargs):
+        client_tx = now_nsec() - 2 * NSEC_PER_MSEC
+        response = time_sync_pb2.TimeSyncUpdateResponse(clock_identifier=self.clock_identifier)
+        set_timestamp_from_nsec(response.header.request_header.request_timestamp, client_tx)
+        set_timestamp_from_nsec(response.header.request_received_timestamp,
+                                client_tx + NSEC_PER_MSEC + SKEW_NSEC)
+        set_timestamp_from_nsec(response.header.response_timestamp,
+                                client_tx + NSEC_PER_MSEC + SKEW_NSEC)
+        response.state.status = self.status
+        response.state.best_estimate.clock_skew.FromNanoseconds(self.server_skew_nsec)
+        return response
+
+
+def test_endpoint_with_skew_estimator():
+    client = MockTimeSyncClient()
+    endpoint = TimeSyncEndpoint(client)
+    assert endpoint.get_new_estimate()
+    assert timestamp_to_nsec(endpoint.clock_skew) == 0
+    with pytest.raises(NotEstablishedError):
+        endpoint.clock_skew_estimate
+
+    endpoint = TimeSyncEndpoint(client, skew_estimator=ClockSkewEstimator())
+    assert endpoint.establish_timesync(max_samples=5)
+    estimate = endpoint.clock_skew_estimate
+    assert estimate.num_samples == 5
+    # The mock's round trip time is at least 2ms, the skew is accurate to half of that.
+    assert abs(timestamp_to_nsec(endpoint.clock_skew) - SKEW_NSEC) <= estimate.uncertainty_nsec
+    converter_skew = endpoint.get_robot_time_converter()._clock_skew_nsec
+    assert abs(converter_skew - SKEW_NSEC) <= estimate.uncertainty_nsec
+
+    # A new clock identifier means the service restarted, so old samples are dropped.
+    client.clock_identifier = 'clock-2'
+    endpoint.get_new_estimate()
+    assert endpoint.clock_skew_estimate.num_samples == 1
+
+    client.status = time_sync_pb2.TimeSyncState.STATUS_MORE_SAMPLES_NEEDED
+    endpoint.get_new_estimate()
+    with pytest.raises(NotEstablishedError):
+        endpoint.clock_skew_estimate
+
+
+def test_thread_adapts_interval_to_skew_estimator():
+    endpoint = TimeSyncEndpoint(MockTimeSyncClient(), skew_estimator=ClockSkewEstimator())
+    thread = TimeSyncThread(None, time_sync_endpoint=endpoint)
+    thread.time_sync_interval_sec = 30
+    endpoint.get_new_estimate()
+    assert thread._next_update_delay() == TimeSyncThread.MIN_ADAPTIVE_TIME_SYNC_INTERVAL_SEC
+    for _ in range(10):
+        endpoint.get_new_estimate()
+    assert thread._next_update_delay() == 30
+
+    endpoint.skew_estimator = None
+    assert thread._next_update_delay() == 30
+
+
+def test_command_end_time_margin_from_skew_estimator():
+    endpoint = TimeSyncEndpoint(MockTimeSyncClient(), skew_estimator=ClockSkewEstimator())
+    endpoint.establish_timesync(max_samples=5)
+    estimate = endpoint.clock_skew_estimate
+    end_time_secs = 1000.0
+    converter = _TimeConverter(None, endpoint)
+    end_time = timestamp_to_nsec(converter.robot_end_timestamp_from_local_secs(end_time_secs))
+    unadjusted = timestamp_to_nsec(converter.robot_timestamp_from_local_secs(end_time_secs))
+    assert unadjusted - end_time == estimate.uncertainty_nsec
+    assert end_time <= end_time_secs * NSEC_PER_SEC + SKEW_NSEC
+
+    # Without an estimator the end time is converted as before.
+    endpoint.skew_estimator = None
+    converter = _TimeConverter(None, endpoint)
+    assert (converter.robot_end_timestamp_from_local_secs(end_time_secs) ==
+            converter.robot_timestamp_from_local_secs(end_time_secs))
+
+
+def test_endpoint_skew_history():
+    client = MockTimeSyncClient(status=time_sync_pb2.TimeSyncState.STATUS_MORE_SAMPLES_NEEDED)
+    endpoint = TimeSyncEndpoint(client)
+    endpoint.get_new_estimate()
+    with pytest.raises(NotEstablishedError):
+        endpoint.get_skew_history_time_converter()
+
+    client.status = time_sync_pb2.TimeSyncState.STATUS_OK
+    start = now_nsec()
+    client.server_skew_nsec = SKEW_NSEC
+    endpoint.get_new_estimate()
+    middle = now_nsec()
+    client.server_skew_nsec = SKEW_NSEC + 5 * NSEC_PER_MSEC
+    endpoint.get_new_estimate()
+
+    converter = endpoint.get_skew_history_time_converter()
+    robot_nsecs = converter.robot_nsecs_from_local_nsecs([start - NSEC_PER_SEC, middle,
+                                                          now_nsec()])
+    assert robot_nsecs[0] == start - NSEC_PER_SEC + SKEW_NSEC
+    assert robot_nsecs[1] == middle + SKEW_NSEC
+    assert robot_nsecs[2] > middle + SKEW_NSEC + 5 * NSEC_PER_MSEC
@@ -11,8 +11,10 @@
 # pylint: disable=unused-import
 from .common import (LOGGER, PROTOBUF_CONTENT_TYPE, AddSeriesError, ChecksumError, DataError,
                      DataFormatError, ParseError, SeriesNotUniqueError)
+# Class for writing data to a file from a background thread.
+from .async_data_writer import AsyncDataWriter, AsyncWriterStats
 # Class for reading data from a file-like object which is seekable.
-from .data_reader import DataReader
+from .data_reader import DataReader, PodSeriesRange
 # Class for writing data to a file.
 from .data_writer import DataWriter
 # Class for registering a series which stores GRPC request/response pairs.
@@ -21,15 +23,21 @@ from .grpc_reader import GrpcReader
 from .grpc_service_writer import GrpcServiceWriter
 # A class for reading message data from a DataFile.
 from .message_reader import MessageReader
+# A class for decoding a channel of Protobuf data from a DataFile in worker processes.
+from .parallel_channel_reader import ParallelChannelReader
 # Class for reading a series of POD data from a DataFile.
 from .pod_series_reader import PodSeriesReader
 # Class which assists with writing POD data values into a series, within a DataWriter.
 from .pod_series_writer import PodSeriesWriter
 # A class for reading a single channel of Protobuf data from a DataFile.
-from .protobuf_channel_reader import ProtobufChannelReader
+from .protobuf_channel_reader import ProtobufChannelReader, iter_merged_channels
 # A class for reading Protobuf data from a DataFile.
 from .protobuf_reader import ProtobufReader
 # Class which assists with writing POD data values into a series, within a DataWriter.
 from .protobuf_series_writer import ProtobufSeriesWriter
+# Rebuild the index of a file which was not closed.
+from .recovery import RecoveryResult, recover_file
+# Class for writing data to a sequence of files, starting a new file by size or duration.
+from .rolling_data_writer import RollingDataWriter
 # A data reader which reads the file format from a stream, without seeking.
 from .stream_data_reader import StreamDataReader
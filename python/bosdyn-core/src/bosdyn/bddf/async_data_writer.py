@@ -0,0 +1,218 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""AsyncDataWriter is a DataWriter which writes data to the file from a background thread."""
+
+import queue
+import threading
+import time
+from collections import namedtuple
+
+from .common import LOGGER, DataError
+from .data_writer import DataWriter
+
+AsyncWriterStats = namedtuple(
+    'AsyncWriterStats',
+    ['queue_size', 'max_queue_size', 'written', 'bytes_written', 'dropped', 'blocked', 'flushes'])
+AsyncWriterStats.__doc__ = """Snapshot of the statistics of an AsyncDataWriter.
+
+    queue_size: Number of blocks waiting to be written.
+    max_queue_size: Largest number of blocks that have been waiting to be written at once.
+    written: Number of data blocks written.
+    bytes_written: Number of bytes of data written, not counting block headers and descriptors.
+    dropped: Number of data blocks dropped because the queue was full.
+    blocked: Number of calls to write_data() which waited because the queue was full.
+    flushes: Number of times the write buffer was flushed to the file.
+"""
+
+_STOP = object()
+
+
+class AsyncDataWriter(DataWriter):
+    """DataWriter which indexes and writes data blocks on a background thread.
+
+    write_data() only puts the data on a bounded queue, so that logging does not hold up the
+    calling thread. When the queue is full, write_data() either waits for room or drops the data,
+    depending on drop_when_full.
+
+    The writer must be closed, or used as a context manager, for the queued data and the index to
+    be written to the file.
+    """
+
+    # pylint: disable=too-many-instance-attributes,too-many-arguments
+
+    def __init__(self, outfile, annotations=None, max_queue_size=1024, drop_when_full=False,
+                 write_buffer_size=1 << 20, flush_interval_sec=1.0, batch_size=64):
+        """
+        Args:
+         outfile:       a file-like objet for writing binary data (e.g., from open(fname, 'wb')).
+         annotations:   optional dict of key (string) -> value (string) pairs.
+         max_queue_size: maximum number of data blocks waiting to be written.
+         drop_when_full: if True, write_data() drops the data when the queue is full, otherwise
+                          it waits for room in the queue.
+         write_buffer_size: number of bytes to collect before writing them to outfile.
+         flush_interval_sec: maximum time written data may wait in the buffer before being
+                          flushed to the file, or None to flush only when the buffer is full.
+         batch_size:    maximum number of queued data blocks to write while holding the lock.
+        """
+        super().__init__(outfile, annotations, write_buffer_size=write_buffer_size)
+        self._queue = queue.Queue(max_queue_size)
+        self._drop_when_full = drop_when_full
+        self._flush_interval_sec = flush_interval_sec
+        self._batch_size = batch_size
+        # Held while writing to the file, as series may be added from other threads.
+        self._write_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._max_queue_size = 0
+        self._written = 0
+        self._bytes_written = 0
+        self._dropped = 0
+        self._blocked = 0
+        self._flushes = 0
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name='bddf-writer', daemon=True)
+        self._thread.start()
+
+    @property
+    def stats(self):
+        """Get an AsyncWriterStats snapshot of the writer."""
+        with self._stats_lock:
+            return AsyncWriterStats(self._queue.qsize(), self._max_queue_size, self._written,
+                                    self._bytes_written, self._dropped, self._blocked,
+                                    self._flushes)
+
+    def add_series(self, series_type, series_spec, message_type=None, pod_type=None,
+                   annotations=None, additional_index_names=None, codec=None):
+        """Register a new series for messages.
+
+        The series descriptor is written immediately, ahead of any data still in the queue.
+        Data is compressed by the writer thread. See DataWriter.add_series.
+        """
+        self._check_error()
+        with self._write_lock:
+            return super().add_series(series_type, series_spec, message_type, pod_type, annotations,
+                                      additional_index_names, codec)
+
+    def write_data(self, series_index, timestamp_nsec, data, additional_indexes=None):
+        """Queue binary data to be stored into the file, under a previously-defined channel.
+
+        Args:
+         series_index:   integer returned when series was registered with the file.
+         timestamp_nsec: nsec since unix epoch to timestamp the data.
+         data:           binary data to store. It must not be modified after this call.
+         additional_indexes: additional timestamps if needed for this channel.
+
+        Returns:
+            False if the data was dropped because the queue was full, otherwise True.
+
+        Raises:
+            DataFormatError if the additional_indexes are not valid for this series.
+            DataError if the writer is closed.
+            Any error raised by the writer thread while writing earlier data.
+        """
+        self._check_error()
+        if not self._thread.is_alive():
+            raise DataError('Cannot write data to a closed AsyncDataWriter')
+        self._indexer.check_additional_indexes(series_index, additional_indexes)
+        return self._put((series_index, timestamp_nsec, data, additional_indexes))
+
+    def flush(self):
+        """Wait for all queued data to be written, then flush the write buffer to the file."""
+        self._queue.join()
+        self._check_error()
+        with self._write_lock:
+            self._writer.flush()
+        with self._stats_lock:
+            self._flushes += 1
+
+    def _put(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            if self._drop_when_full:
+                with self._stats_lock:
+                    self._dropped += 1
+                return False
+            with self._stats_lock:
+                self._blocked += 1
+            self._queue.put(item)
+        queue_size = self._queue.qsize()
+        if queue_size > self._max_queue_size:
+            with self._stats_lock:
+                self._max_queue_size = max(self._max_queue_size, queue_size)
+        return True
+
+    def _check_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def _next_batch(self, timeout):
+        """Wait up to timeout seconds for queued items, returning up to batch_size of them."""
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(batch) < self._batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        last_flush = time.monotonic()
+        unflushed = False
+        while True:
+            timeout = None
+            if unflushed and self._flush_interval_sec is not None:
+                timeout = max(0, last_flush + self._flush_interval_sec - time.monotonic())
+            batch = self._next_batch(timeout)
+            stop = _STOP in batch
+            blocks = [item for item in batch if item is not _STOP]
+            try:
+                with self._write_lock:
+                    if self._error is None:
+                        for series_index, timestamp_nsec, data, additional_indexes in blocks:
+                            super().write_data(series_index, timestamp_nsec, data,
+                                               additional_indexes)
+                    unflushed = unflushed or bool(blocks)
+                    flush_due = (self._flush_interval_sec is not None and
+                                 time.monotonic() - last_flush >= self._flush_interval_sec)
+                    if unflushed and self._error is None and (flush_due or stop):
+                        self._writer.flush()
+                        last_flush = time.monotonic()
+                        unflushed = False
+                        with self._stats_lock:
+                            self._flushes += 1
+            except Exception as exc:  # pylint: disable=broad-except
+                LOGGER.exception('Failed to write bddf data')
+                self._error = exc
+            else:
+                with self._stats_lock:
+                    self._written += len(blocks)
+                    self._bytes_written += sum(len(block[2]) for block in blocks)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _close(self):
+        if self._writer.closed:
+            return
+        try:
+            try:
+                for thunk in self._on_close:
+                    thunk()
+            finally:
+                # Stop the thread after the on-close functions have queued their final data.
+                self._queue.put(_STOP)
+                self._thread.join()
+            self._check_error()
+            self._indexer.write_index(self._writer)
+        finally:
+            # The file is closed even if the thread failed, so that later calls do nothing.
+            self._writer.close()
@@ -18,13 +18,25 @@ from .common import (BLOCK_HEADER_SIZE_MASK, DATA_BLOCK_TYPE, DESCRIPTOR_BLOCK_T
 class BlockWriter:
     """Writes data structures in the data file."""
 
-    def __init__(self, outfile):
+    def __init__(self, outfile, buffer_size=0):
+        """
+        Args:
+         outfile:      a file-like object for writing binary data.
+         buffer_size:  number of bytes to collect before writing them to outfile, or 0 to write
+                         every block as it comes.
+        """
         self._outfile = outfile
         self._hasher = sha1()
+        self._buffer_size = buffer_size
+        self._buffer = bytearray()
 
     def tell(self):
         """Return location from start of file."""
-        return self._outfile.tell()
+        return self._outfile.tell() + len(self._buffer)
+
+    def add_to_checksum(self, data):
+        """Add data which is already in the file to the checksum, when appending to a file."""
+        self._hasher.update(data)
 
     def write_descriptor_block(self, block):
         """Write a DescriptorBlock to the file."""
@@ -35,21 +47,47 @@ class BlockWriter:
     def write_data_block(self, desc_block, data):
         """Write a block of data to the file."""
         serialized_desc = desc_block.SerializeToString()
-        self._write_block_header(DATA_BLOCK_TYPE, len(data) + len(serialized_desc))
-        self._write(struct.pack('<I', len(serialized_desc)))
-        self._write(serialized_desc)
+        block_len = len(data) + len(serialized_desc)
+        self._check_block_len(block_len)
+        # Write the block header, descriptor size and descriptor together.
+        self._write(
+            struct.pack('<QI', DATA_BLOCK_TYPE << 56 | block_len, len(serialized_desc)) +
+            serialized_desc)
         self._write(data)
 
     def _write(self, data):
         self._hasher.update(data)
-        self._outfile.write(data)
+        if not self._buffer_size:
+            self._outfile.write(data)
+            return
+        if len(data) >= self._buffer_size:
+            # Large data is not worth copying into the buffer.
+            self._write_buffer()
+            self._outfile.write(data)
+            return
+        self._buffer += data
+        if len(self._buffer) >= self._buffer_size:
+            self._write_buffer()
+
+    def _write_buffer(self):
+        if self._buffer:
+            self._outfile.write(self._buffer)
+            self._buffer = bytearray()
+
+    def flush(self):
+        """Write any buffered data to the file, and flush the file."""
+        self._write_buffer()
+        self._outfile.flush()
 
     def close(self):
         """Close the file, if not already closed."""
         if self.closed:
             return
-        self._outfile.close()
-        self._outfile = None
+        try:
+            self._write_buffer()
+        finally:
+            self._outfile.close()
+            self._outfile = None
 
     @property
     def closed(self):
@@ -76,12 +114,17 @@ class BlockWriter:
         """Write the end of the data file."""
         self._write_block_header(END_BLOCK_TYPE, 24)
         self._write(struct.pack('<Q', index_offset))
+        self._write_buffer()
         self._outfile.write(self._hasher.digest())
         self._outfile.write(END_MAGIC)
 
     def _write_block_header(self, block_type, block_len):
+        self._check_block_len(block_len)
+        block_descriptor = block_type << 56 | block_len  # mark this as a desc block
+        self._write(struct.pack('<Q', block_descriptor))
+
+    @staticmethod
+    def _check_block_len(block_len):
         if block_len > BLOCK_HEADER_SIZE_MASK:
             raise DataFormatError('block size ({}) is too big (> {})'.format(
                 block_len, BLOCK_HEADER_SIZE_MASK))
-        block_descriptor = block_type << 56 | block_len  # mark this as a desc block
-        self._write(struct.pack('<Q', block_descriptor))
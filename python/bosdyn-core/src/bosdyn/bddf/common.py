@@ -59,6 +59,20 @@ POD_TYPE_TO_NUM_BYTES = {
     bddf.TYPE_FLOAT64: 8,
 }
 
+# Little-endian NumPy dtype strings, for reading POD data without unpacking each value.
+POD_TYPE_TO_DTYPE = {
+    bddf.TYPE_INT8: '<i1',
+    bddf.TYPE_INT16: '<i2',
+    bddf.TYPE_INT32: '<i4',
+    bddf.TYPE_INT64: '<i8',
+    bddf.TYPE_UINT8: '<u1',
+    bddf.TYPE_UINT16: '<u2',
+    bddf.TYPE_UINT32: '<u4',
+    bddf.TYPE_UINT64: '<u8',
+    bddf.TYPE_FLOAT32: '<f4',
+    bddf.TYPE_FLOAT64: '<f8',
+}
+
 
 class DataError(Exception):
     """Errors related to the DataWriter/DataReader system."""
@@ -0,0 +1,95 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Codecs for compressing the data blocks of a series.
+
+The codec of a series is recorded in the CODEC_ANNOTATION annotation of its SeriesDescriptor.
+'zlib' is always available. 'zstd' needs the zstandard package and 'lz4' needs the lz4 package.
+"""
+
+import zlib
+
+from .common import DataFormatError, ParseError
+
+# SeriesDescriptor annotation key holding the name of the codec of the data blocks.
+CODEC_ANNOTATION = 'bosdyn:codec'
+
+
+def _zlib_codec():
+    return (lambda data: zlib.compress(data, 1)), zlib.decompress
+
+
+def _zstd_codec():
+    import zstandard  # pylint: disable=import-outside-toplevel
+
+    # Compressor objects may not be used from several threads at once, so make one per call.
+    return ((lambda data: zstandard.ZstdCompressor().compress(data)),
+            (lambda data: zstandard.ZstdDecompressor().decompress(data)))
+
+
+def _lz4_codec():
+    import lz4.frame  # pylint: disable=import-outside-toplevel
+    return lz4.frame.compress, lz4.frame.decompress
+
+
+_CODEC_LOADERS = {
+    'zlib': _zlib_codec,
+    'zstd': _zstd_codec,
+    'lz4': _lz4_codec,
+}
+
+_loaded_codecs = {}  # {codec name -> (compress function, decompress function)}
+
+
+def get_codec(name):
+    """Return the (compress, decompress) functions of the named codec.
+
+    Raises DataFormatError if the codec is unknown or its package is not installed.
+    """
+    try:
+        return _loaded_codecs[name]
+    except KeyError:
+        pass
+    try:
+        loader = _CODEC_LOADERS[name]
+    except KeyError:
+        raise DataFormatError('Unknown codec {!r}, expected one of {}'.format(
+            name, sorted(_CODEC_LOADERS)))
+    try:
+        codec = loader()
+    except ImportError as err:
+        raise DataFormatError('Codec {!r} is not available: {}'.format(name, err))
+    _loaded_codecs[name] = codec
+    return codec
+
+
+def series_codec(series_descriptor):
+    """Return the name of the codec of a series, or None if its data is not compressed."""
+    return series_descriptor.annotations.get(CODEC_ANNOTATION) or None
+
+
+def add_codec_annotation(annotations, codec):
+    """Return a copy of the annotations dict which records the codec, if it is not None."""
+    if not codec:
+        return annotations
+    annotations = dict(annotations or {})
+    annotations[CODEC_ANNOTATION] = codec
+    return annotations
+
+
+def compress(codec, data):
+    """Compress data with the named codec."""
+    return get_codec(codec)[0](data)
+
+
+def decompress(codec, data):
+    """Decompress data which was compressed with the named codec."""
+    try:
+        return get_codec(codec)[1](data)
+    except DataFormatError:
+        raise
+    except Exception as err:  # pylint: disable=broad-except
+        raise ParseError('Failed to decompress {} data: {}'.format(codec, err))
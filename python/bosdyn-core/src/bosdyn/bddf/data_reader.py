@@ -5,11 +5,30 @@
 # Development Kit License (20191101-BDSDK-SL).
 
 """Class for reading data from a file-like object which is seekable."""
+import mmap
 import os
 import struct
+from collections import namedtuple
+
+import numpy as np
 
 from .base_data_reader import BaseDataReader
-from .common import END_MAGIC, INDEX_OFFSET_OFFSET, MAGIC, ParseError
+from .common import (BLOCK_HEADER_SIZE_MASK, DATA_BLOCK_TYPE, END_MAGIC, INDEX_OFFSET_OFFSET, MAGIC,
+                     POD_TYPE_TO_DTYPE, ParseError)
+from .compression import decompress, series_codec
+
+# Size of the block header plus the descriptor size which start every data block.
+_DATA_BLOCK_PREFIX_NBYTES = 12
+
+PodSeriesRange = namedtuple('PodSeriesRange', ['timestamps', 'sample_starts', 'values'])
+PodSeriesRange.__doc__ = """POD data read from a range of data blocks by DataReader.read_series_range.
+
+    timestamps: int64 array of the timestamp_nsec of each data block.
+    sample_starts: int64 array of the index into values of the first sample of each data block.
+      All samples in a data block share the timestamp of the block.
+    values: array of every sample in the data blocks, of shape (num_samples,) + the dimension of
+      the series, with the dtype matching the pod_type of the series.
+"""
 
 
 class DataReader(BaseDataReader):  # pylint: disable=too-many-instance-attributes
@@ -18,19 +37,35 @@ class DataReader(BaseDataReader):  # pylint: disable=too-many-instance-attribute
     Methods raise ParseError if there is a problem with the format of the file.
     """
 
-    def __init__(self, infile=None, filename=None):
+    def __init__(self, infile=None, filename=None, use_mmap=False):
         """
         At least one of the following arguments must be specified.
 
         Args:
          infile:      binary file-like object for reading (e.g., from open(fname, "rb")).
          filename:    path of input file, if applicable.
+         use_mmap:    if True, read the file through a read-only memory map. The infile must then
+                       be a real file, with a fileno().
         """
+        self._mapped_file = None
         super().__init__(infile, filename)
+        if use_mmap:
+            # mmap objects are file-like, so every other read goes through the map as well.
+            self._mapped_file = self._file
+            self._file = mmap.mmap(self._mapped_file.fileno(), 0, access=mmap.ACCESS_READ)
         self._series_index_to_descriptor = {}
+        self._series_index_to_codec = {}  # {series_index -> codec name or None}
         self._series_index_to_block_index = {}  # {series_index -> SeriesBlockIndex}
+        self._series_index_to_block_arrays = {}  # {series_index -> (file_offsets, timestamps)}
+        # {series_index -> (sorted timestamps, index_in_series of each sorted timestamp)}
+        self._series_index_to_timestamp_index = {}
         self._read_index()
 
+    @property
+    def is_mmap(self):
+        """Return True if the file is read through a memory map."""
+        return self._mapped_file is not None
+
     def series_descriptor(self, series_index):
         """Return SeriesDescriptor for given series index, loading it if necessary."""
         try:
@@ -66,8 +101,136 @@ class DataReader(BaseDataReader):  # pylint: disable=too-many-instance-attribute
         series_block_index = self.series_block_index(series_index)
         msg_idx = series_block_index.block_entries[index_in_series]
         desc, data = self._read_data_block_at(msg_idx.file_offset)
+        codec = self._series_codec(series_index)
+        if codec:
+            data = decompress(codec, data)
         return desc, msg_idx.timestamp.ToNanoseconds(), data
 
+    def find_at_or_before(self, series_index, timestamp_nsec):
+        """Returns the index_in_series of the last block at or before timestamp_nsec.
+
+        Args:
+         series_index: int selecting the series.
+         timestamp_nsec: nsec since unix epoch.
+
+        Returns: index_in_series (int), or None if every block of the series is after
+         timestamp_nsec.
+        """
+        timestamps, indexes = self._timestamp_index(series_index)
+        position = int(np.searchsorted(timestamps, timestamp_nsec, side='right'))
+        if position == 0:
+            return None
+        return int(indexes[position - 1])
+
+    def time_range_indexes(self, series_index, start_nsec=None, end_nsec=None):
+        """Returns the index_in_series of each block with a timestamp in [start_nsec, end_nsec).
+
+        Args:
+         series_index: int selecting the series.
+         start_nsec: nsec since unix epoch of the start of the range, or None for no lower bound.
+         end_nsec: nsec since unix epoch of the end of the range, or None for no upper bound.
+
+        Returns: int64 array of index_in_series, ordered by timestamp.
+        """
+        timestamps, indexes = self._timestamp_index(series_index)
+        begin = 0 if start_nsec is None else np.searchsorted(timestamps, start_nsec)
+        end = len(timestamps) if end_nsec is None else np.searchsorted(timestamps, end_nsec)
+        return indexes[begin:end]
+
+    def iter_time_range(self, series_index, start_nsec=None, end_nsec=None):
+        """Iterates over the blocks of a series with a timestamp in [start_nsec, end_nsec).
+
+        Only the blocks in the range are read from the file.
+
+        Args:
+         series_index: int selecting the series.
+         start_nsec: nsec since unix epoch of the start of the range, or None for no lower bound.
+         end_nsec: nsec since unix epoch of the end of the range, or None for no upper bound.
+
+        Yields: DataTypeDescriptor for channel, timestamp_nsec (int), message-data (bytes),
+         ordered by timestamp.
+        """
+        indexes = self.time_range_indexes(series_index, start_nsec, end_nsec)
+        for index_in_series in indexes.tolist():
+            yield self.read(series_index, index_in_series)
+
+    def iter_merged_time_range(self, series_indexes, start_nsec=None, end_nsec=None):
+        """Iterates over the blocks of several series in [start_nsec, end_nsec), in time order.
+
+        Blocks with the same timestamp are ordered as their series are in series_indexes.
+
+        Args:
+         series_indexes: list of ints selecting the series.
+         start_nsec: nsec since unix epoch of the start of the range, or None for no lower bound.
+         end_nsec: nsec since unix epoch of the end of the range, or None for no upper bound.
+
+        Yields: series_index (int), DataTypeDescriptor, timestamp_nsec (int), message-data (bytes)
+        """
+        all_series = []
+        all_indexes = []
+        all_timestamps = []
+        for series_index in series_indexes:
+            indexes = self.time_range_indexes(series_index, start_nsec, end_nsec)
+            all_series.append(np.full(len(indexes), series_index, dtype=np.int64))
+            all_indexes.append(indexes)
+            all_timestamps.append(self._block_arrays(series_index)[1][indexes])
+        if not all_timestamps:
+            return
+        # Each series is already sorted, so a stable sort merges them.
+        order = np.argsort(np.concatenate(all_timestamps), kind='stable')
+        merged_series = np.concatenate(all_series)[order].tolist()
+        merged_indexes = np.concatenate(all_indexes)[order].tolist()
+        for series_index, index_in_series in zip(merged_series, merged_indexes):
+            yield (series_index,) + self.read(series_index, index_in_series)
+
+    def read_series_range(self, series_index, start=0, stop=None):
+        """Reads the POD data of a range of data blocks of a series into NumPy arrays.
+
+        Uncompressed data is copied once, from the file into the returned values array, without
+        creating Python objects for the samples. This is fastest when the reader uses a memory map.
+
+        Args:
+         series_index: int selecting the series, which must hold POD data.
+         start: index of the first data block to read.
+         stop: index past the last data block to read, or None to read to the end of the series.
+
+        Returns: PodSeriesRange of (timestamps, sample_starts, values)
+
+        Raises ParseError if the series does not hold POD data or the file has a bad format.
+        """
+        series_descriptor = self.series_descriptor(series_index)
+        if series_descriptor.WhichOneof("DataType") != "pod_type":
+            raise ParseError("Expected DataType 'pod_type' but got {}.".format(
+                series_descriptor.WhichOneof("DataType")))
+        pod_type = series_descriptor.pod_type
+        dtype = np.dtype(POD_TYPE_TO_DTYPE[pod_type.pod_type])
+        sample_shape = tuple(pod_type.dimension)
+        bytes_per_sample = dtype.itemsize * int(np.prod(sample_shape, dtype=np.int64))
+
+        file_offsets, timestamps = self._block_arrays(series_index)
+        file_offsets = file_offsets[start:stop]
+        timestamps = timestamps[start:stop]
+        if self.is_mmap:
+            blocks = self._mapped_data_blocks(file_offsets)
+        else:
+            blocks = [
+                np.frombuffer(self._read_data_block_at(offset)[1], dtype=np.uint8)
+                for offset in file_offsets.tolist()
+            ]
+        codec = self._series_codec(series_index)
+        if codec:
+            blocks = [np.frombuffer(decompress(codec, block), dtype=np.uint8) for block in blocks]
+        block_sizes = np.fromiter((len(block) for block in blocks), dtype=np.int64,
+                                  count=len(blocks))
+        if np.any(block_sizes % bytes_per_sample):
+            raise ParseError('{} has a data block which is not a multiple of {} bytes'.format(
+                series_descriptor.series_identifier, bytes_per_sample))
+        data = np.concatenate(blocks) if blocks else np.empty(0, dtype=np.uint8)
+        sample_starts = np.zeros(len(blocks), dtype=np.int64)
+        np.cumsum(block_sizes[:-1] // bytes_per_sample, out=sample_starts[1:])
+        values = data.view(dtype).reshape((-1,) + sample_shape)
+        return PodSeriesRange(timestamps, sample_starts, values)
+
     def series_block_index(self, series_index):
         """Returns the SeriesBlockIndexes for the given series_index, loading it as needed."""
         try:
@@ -80,6 +243,69 @@ class DataReader(BaseDataReader):  # pylint: disable=too-many-instance-attribute
         self._series_index_to_block_index[series_index] = block_index
         return block_index
 
+    def _block_arrays(self, series_index):
+        """Returns int64 arrays of the file offsets and timestamps of the blocks of a series."""
+        try:
+            return self._series_index_to_block_arrays[series_index]
+        except KeyError:
+            pass
+        entries = self.series_block_index(series_index).block_entries
+        file_offsets = np.fromiter((entry.file_offset for entry in entries), dtype=np.int64,
+                                   count=len(entries))
+        timestamps = np.fromiter(
+            (entry.timestamp.seconds * 1000000000 + entry.timestamp.nanos for entry in entries),
+            dtype=np.int64, count=len(entries))
+        self._series_index_to_block_arrays[series_index] = (file_offsets, timestamps)
+        return file_offsets, timestamps
+
+    def _series_codec(self, series_index):
+        try:
+            return self._series_index_to_codec[series_index]
+        except KeyError:
+            pass
+        codec = series_codec(self.series_descriptor(series_index))
+        self._series_index_to_codec[series_index] = codec
+        return codec
+
+    def _timestamp_index(self, series_index):
+        """Returns the sorted timestamps of the blocks of a series, and their index_in_series."""
+        try:
+            return self._series_index_to_timestamp_index[series_index]
+        except KeyError:
+            pass
+        _file_offsets, timestamps = self._block_arrays(series_index)
+        indexes = np.argsort(timestamps, kind='stable')
+        timestamp_index = (timestamps[indexes], indexes)
+        self._series_index_to_timestamp_index[series_index] = timestamp_index
+        return timestamp_index
+
+    def _mapped_data_blocks(self, file_offsets):
+        """Returns views into the memory map of the data of the data blocks at file_offsets."""
+        max_offset = len(self._file) - _DATA_BLOCK_PREFIX_NBYTES
+        if np.any(file_offsets < len(MAGIC)) or np.any(file_offsets > max_offset):
+            raise ParseError('Invalid offset for block in {}'.format(file_offsets))
+        buf = np.frombuffer(self._file, dtype=np.uint8)
+        # Gather the block headers and descriptor sizes of all blocks at once.
+        prefixes = buf[file_offsets[:, np.newaxis] + np.arange(_DATA_BLOCK_PREFIX_NBYTES)]
+        block_headers = prefixes[:, :8].copy().view('<u8')[:, 0]
+        desc_sizes = prefixes[:, 8:].copy().view('<u4')[:, 0].astype(np.int64)
+        block_sizes = (block_headers & BLOCK_HEADER_SIZE_MASK).astype(np.int64)
+        if np.any((block_headers >> 56) != DATA_BLOCK_TYPE):
+            raise ParseError("Expected data blocks at offsets {}.".format(file_offsets))
+        if np.any(desc_sizes > block_sizes):
+            raise ParseError("Data block descriptor size larger than block size.")
+        data_starts = file_offsets + _DATA_BLOCK_PREFIX_NBYTES + desc_sizes
+        data_ends = data_starts + block_sizes - desc_sizes
+        if np.any(data_ends > len(buf)):
+            raise EOFError("Unexpected end of bddf file")
+        return [buf[begin:end] for begin, end in zip(data_starts.tolist(), data_ends.tolist())]
+
+    def _close(self):
+        super()._close()
+        if self._mapped_file is not None:
+            self._mapped_file.close()
+            self._mapped_file = None
+
     def _read_index(self):
         self._file.seek(-len(END_MAGIC), os.SEEK_END)
         end_magic = self._read(len(END_MAGIC))
@@ -9,6 +9,7 @@
 import bosdyn.api.bddf_pb2 as bddf
 
 from .block_writer import BlockWriter
+from .compression import CODEC_ANNOTATION, add_codec_annotation, compress, get_codec
 from .file_indexer import FileIndexer
 
 
@@ -17,17 +18,20 @@ class DataWriter:
 
     # pylint: disable=too-many-arguments
 
-    def __init__(self, outfile, annotations=None):
+    def __init__(self, outfile, annotations=None, write_buffer_size=0):
         """
         Args:
          outfile:       a file-like objet for writing binary data (e.g., from open(fname, 'wb')).
          annotations:   optional dict of key (string) -> value (string) pairs.
+         write_buffer_size: number of bytes to collect before writing them to outfile, or 0
+                          to write every block as it comes.
         """
-        self._writer = BlockWriter(outfile)
+        self._writer = BlockWriter(outfile, write_buffer_size)
         self._indexer = FileIndexer()
         self._annotations = annotations
         self._writer.write_header(annotations)
         self._on_close = []
+        self._series_index_to_codec = {}
 
     def __del__(self):
         self._close()
@@ -38,13 +42,27 @@ class DataWriter:
     def __exit__(self, type_, value_, tb_):
         self._close()
 
+    @property
+    def closed(self):
+        """Returns True if the writer has been closed."""
+        return self._writer.closed
+
+    def tell(self):
+        """Return the number of bytes written to the file so far."""
+        return self._writer.tell()
+
+    def close(self):
+        """Write the index and the end of the file, and close it, if not already closed."""
+        self._close()
+
     @property
     def file_index(self):
         """Get the FileIndex proto used which describes how to access data in the file."""
         return self._indexer.file_index
 
     def add_message_series(self, series_type, series_spec, content_type, type_name,
-                           is_metadata=False, annotations=None, additional_index_names=None):
+                           is_metadata=False, annotations=None, additional_index_names=None,
+                           codec=None):
         """Add a new series for storing message data.  Message data is variable-sized binary data.
 
         Args:
@@ -59,6 +77,8 @@ class DataWriter:
                           associate with the message channel
          additional_index_names: names of additional timestamps to store with
                                         each message (list of string).
+         codec:         optional name of the codec compressing the data blocks of the series,
+                          see bosdyn.bddf.compression.
 
         Returns series id (int).
         """
@@ -66,9 +86,10 @@ class DataWriter:
                                                   is_metadata=is_metadata)
         return self.add_series(series_type, series_spec, message_type=message_type,
                                annotations=annotations,
-                               additional_index_names=additional_index_names)
+                               additional_index_names=additional_index_names, codec=codec)
 
-    def add_pod_series(self, series_type, series_spec, type_enum, dimension=None, annotations=None):
+    def add_pod_series(self, series_type, series_spec, type_enum, dimension=None, annotations=None,
+                       codec=None):
         """Add a new series for storing data POD data (float, double, int, etc....).
 
         Args:
@@ -79,14 +100,17 @@ class DataWriter:
                            [3] means vectors of size 3, [4, 4] is a 4x4 matrix, etc....
          annotations:   optional dict of key (string) -> value (string) pairs to
                             associate with the message channel
+         codec:         optional name of the codec compressing the data blocks of the series,
+                          see bosdyn.bddf.compression.
 
         Returns series id (int).
         """
         pod_type = bddf.PodTypeDescriptor(pod_type=type_enum, dimension=dimension)
-        return self.add_series(series_type, series_spec, pod_type=pod_type, annotations=annotations)
+        return self.add_series(series_type, series_spec, pod_type=pod_type, annotations=annotations,
+                               codec=codec)
 
     def add_series(self, series_type, series_spec, message_type=None, pod_type=None,
-                   annotations=None, additional_index_names=None):
+                   annotations=None, additional_index_names=None, codec=None):
         """Register a new series for messages.
 
         Args:
@@ -98,13 +122,23 @@ class DataWriter:
                             associate with the message channel
          additional_index_names: names of additional timestamps to store with
                                         each message (list of string).
+         codec:         optional name of the codec compressing the data blocks of the series,
+                          see bosdyn.bddf.compression. It is recorded in the annotations.
 
         Returns series id (int).
 
         Raises SeriesNotUniqueError if a series matching series_spec is already added.
+               DataFormatError if the codec is not available.
         """
-        return self._indexer.add_series(series_type, series_spec, message_type, pod_type,
-                                        annotations, additional_index_names, self._writer)
+        annotations = add_codec_annotation(annotations, codec)
+        codec = annotations.get(CODEC_ANNOTATION) if annotations else None
+        if codec:
+            get_codec(codec)
+        series_index = self._indexer.add_series(series_type, series_spec, message_type, pod_type,
+                                                annotations, additional_index_names, self._writer)
+        if codec:
+            self._series_index_to_codec[series_index] = codec
+        return series_index
 
     def write_data(self, series_index, timestamp_nsec, data, additional_indexes=None):
         """Store binary data into the file, under a previously-defined channel.
@@ -118,7 +152,11 @@ class DataWriter:
         Raises:
             DataFormatError if the data or additional_indexes are not valid for this series.
         """
-        self._indexer.index_data_block(series_index, timestamp_nsec, self._writer.tell(), len(data),
+        codec = self._series_index_to_codec.get(series_index)
+        nbytes = len(data)
+        if codec:
+            data = compress(codec, data)
+        self._indexer.index_data_block(series_index, timestamp_nsec, self._writer.tell(), nbytes,
                                        additional_indexes)
         data_descriptor = self._indexer.make_data_descriptor(series_index, timestamp_nsec,
                                                              additional_indexes)
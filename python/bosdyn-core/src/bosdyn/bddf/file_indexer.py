@@ -149,18 +149,22 @@ class FileIndexer:
 
     def make_data_descriptor(self, series_index, timestamp_nsec, additional_indexes):
         """Return DataDescriptor for writing a data block, and add the block to the series index."""
-        series_descriptor = self._series_descriptors[series_index]
+        self.check_additional_indexes(series_index, additional_indexes)
         data_descriptor = bddf.DataDescriptor(series_index=series_index)
         data_descriptor.timestamp.FromNanoseconds(timestamp_nsec)  # pylint: disable=no-member
+        if additional_indexes:
+            for idx_val in additional_indexes:
+                data_descriptor.additional_indexes.append(idx_val)  # pylint: disable=no-member
+        return data_descriptor
+
+    def check_additional_indexes(self, series_index, additional_indexes):
+        """Raise DataFormatError if the series needs a different number of additional indexes."""
+        series_descriptor = self._series_descriptors[series_index]
         additional_indexes = additional_indexes or []
         if len(additional_indexes) != len(series_descriptor.additional_index_names):
             raise DataFormatError('Series {} needs {} additional indexes, but {} provided.'.format(
                 series_descriptor, len(series_descriptor.additional_index_names),
                 len(additional_indexes)))
-        if additional_indexes:
-            for idx_val in additional_indexes:
-                data_descriptor.additional_indexes.append(idx_val)  # pylint: disable=no-member
-        return data_descriptor
 
     def write_index(self, block_writer):
         """Write all the indexes of the data file, and the file end."""
@@ -85,7 +85,7 @@ class MessageReader:
         Args:
          series_index:  index (int) from the series_index() call
         """
-        return self._data_reader.file_index.series_descriptor(series_index)
+        return self._data_reader.series_descriptor(series_index)
 
     def get_blob(self, series_index, index_in_series):
         """Return binary data from message stored in the file.
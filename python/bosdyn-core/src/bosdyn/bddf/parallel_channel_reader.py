@@ -0,0 +1,108 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""A class for decoding a channel of Protobuf data from a DataFile in worker processes."""
+
+import collections
+import concurrent.futures
+
+from .data_reader import DataReader
+from .protobuf_reader import ProtobufReader
+
+# Readers opened by a worker process, by filename, so each file is opened once per worker.
+_worker_readers = {}
+
+
+def _decode_blocks(filename, series_index, protobuf_type, indexes, map_fn):
+    """Decode the given blocks of a series in a worker process."""
+    try:
+        data_reader = _worker_readers[filename]
+    except KeyError:
+        data_reader = DataReader(filename=filename, use_mmap=True)
+        _worker_readers[filename] = data_reader
+    results = []
+    for index_in_series in indexes:
+        _desc, timestamp_nsec, data = data_reader.read(series_index, index_in_series)
+        protobuf = protobuf_type()
+        protobuf.ParseFromString(data)
+        results.append((timestamp_nsec, map_fn(protobuf) if map_fn else protobuf))
+    return results
+
+
+class ParallelChannelReader:
+    """A class for decoding a channel of Protobuf data from a DataFile in worker processes.
+
+    The blocks of the channel are split into chunks, and each chunk is read and deserialized by
+    a worker process which opens the file itself. Results are yielded in timestamp order.
+
+    Results are pickled to be sent back from the workers, and pickling a protobuf serializes it
+    again. To get the most from the workers, pass a map_fn which reduces each message to the
+    data that is needed, such as a NumPy array. The protobuf_type and map_fn must be picklable,
+    e.g., module-level classes and functions.
+    """
+
+    # pylint: disable=too-many-arguments
+
+    def __init__(self, filename, protobuf_type, channel_name=None, max_workers=None, chunk_size=32):
+        """
+        Args:
+         filename:       path of the bddf file.
+         protobuf_type:  class of the protobuf messages in the channel.
+         channel_name:   name of the channel, by default the full name of protobuf_type.
+         max_workers:    number of worker processes, by default the number of processors.
+         chunk_size:     number of messages decoded by a worker at a time.
+        """
+        self._filename = filename
+        self._protobuf_type = protobuf_type
+        self._chunk_size = chunk_size
+        # Only the index is read in this process, to plan the chunks for the workers.
+        self._data_reader = DataReader(filename=filename)
+        self._series_index = ProtobufReader(self._data_reader).series_index(
+            channel_name or protobuf_type.DESCRIPTOR.full_name,
+            message_type=protobuf_type.DESCRIPTOR.full_name)
+        self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+        self._max_workers = self._executor._max_workers  # pylint: disable=protected-access
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type_, value_, tb_):
+        self.shutdown()
+
+    def shutdown(self):
+        """Stop the worker processes and close the file."""
+        self._executor.shutdown()
+        self._data_reader._close()  # pylint: disable=protected-access
+
+    @property
+    def num_messages(self):
+        """Number of messages in this series."""
+        return self._data_reader.num_data_blocks(self._series_index)
+
+    def iter_messages(self, start_nsec=None, end_nsec=None, map_fn=None):
+        """Iterate over the messages with a timestamp in [start_nsec, end_nsec).
+
+        Args:
+         start_nsec:  nsec since unix epoch of the start of the range, or None for no lower bound
+         end_nsec:    nsec since unix epoch of the end of the range, or None for no upper bound
+         map_fn:      optional function applied to each deserialized protobuf in the workers
+
+        Yields: timestamp_nsec (int), deserialized protobuf object or result of map_fn,
+         ordered by timestamp
+        """
+        indexes = self._data_reader.time_range_indexes(self._series_index, start_nsec,
+                                                       end_nsec).tolist()
+        chunks = (indexes[i:i + self._chunk_size] for i in range(0, len(indexes), self._chunk_size))
+        # Keep a couple of chunks per worker in flight, so results are not all held in memory.
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append(
+                self._executor.submit(_decode_blocks, self._filename, self._series_index,
+                                      self._protobuf_type, chunk, map_fn))
+            if len(pending) >= 2 * self._max_workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
@@ -81,3 +81,15 @@ class PodSeriesReader:
         split_data = _split(pod_data, self._pod_type.dimension)
 
         return timestamp_nsec, split_data
+
+    def read_series_range(self, start=0, stop=None):
+        """Return the POD data values from a range of data blocks as NumPy arrays.
+
+        Args:
+         start: index of the first data block to read.
+         stop: index past the last data block to read, or None to read to the end of the series.
+
+        Returns: PodSeriesRange of (timestamps, sample_starts, values), see
+         DataReader.read_series_range.
+        """
+        return self._data_reader.read_series_range(self._series_index, start, stop)
@@ -16,7 +16,7 @@ class PodSeriesWriter:  # pylint: disable=too-many-instance-attributes
 
     def __init__(  # pylint: disable=too-many-arguments
             self, data_writer, series_type, series_spec, pod_type, dimensions=None,
-            annotations=None, data_block_size=2048):
+            annotations=None, data_block_size=2048, codec=None):
         self._data_writer = data_writer
         self._series_type = series_type
         self._series_spec = series_spec
@@ -25,7 +25,7 @@ class PodSeriesWriter:  # pylint: disable=too-many-instance-attributes
         self._series_index = self._data_writer.add_pod_series(self.series_type, self.series_spec,
                                                               type_enum=self._pod_type,
                                                               dimension=self._dimensions,
-                                                              annotations=annotations)
+                                                              annotations=annotations, codec=codec)
 
         self._data_block_size = data_block_size
         self._num_values_per_sample = 1
@@ -5,6 +5,7 @@
 # Development Kit License (20191101-BDSDK-SL).
 
 """A class for reading a single channel of Protobuf data from a DataFile."""
+import heapq
 
 
 class ProtobufChannelReader:
@@ -47,6 +48,31 @@ class ProtobufChannelReader:
                                                                   index_in_series)
         return timestamp, msg
 
+    def find_at_or_before(self, timestamp_nsec):
+        """Get the index of the last message in the series at or before timestamp_nsec.
+
+        Args:
+         timestamp_nsec:  nsec since unix epoch
+
+        Returns: index_in_series (int), or None if every message is after timestamp_nsec.
+        """
+        return self._protobuf_reader.data_reader.find_at_or_before(self._series_index,
+                                                                   timestamp_nsec)
+
+    def iter_time_range(self, start_nsec=None, end_nsec=None):
+        """Iterate over the messages in the series with a timestamp in [start_nsec, end_nsec).
+
+        Args:
+         start_nsec:  nsec since unix epoch of the start of the range, or None for no lower bound
+         end_nsec:    nsec since unix epoch of the end of the range, or None for no upper bound
+
+        Yields: timestamp_nsec (int), deserialized protobuf object, ordered by timestamp
+        """
+        indexes = self._protobuf_reader.data_reader.time_range_indexes(
+            self._series_index, start_nsec, end_nsec)
+        for index_in_series in indexes.tolist():
+            yield self.get_message(index_in_series)
+
     def __iter__(self):
         return ProtobufChannelReader.Iterator(self)
 
@@ -64,3 +90,25 @@ class ProtobufChannelReader:
             msg = self._channel_reader.get_message(self._index)
             self._index += 1
             return msg
+
+
+def iter_merged_channels(channel_readers, start_nsec=None, end_nsec=None):
+    """Iterate over the messages of several channels with a timestamp in [start_nsec, end_nsec).
+
+    The channels may come from different files. Messages are read as they are needed, and are
+    ordered by timestamp, with ties ordered as their channels are in channel_readers.
+
+    Args:
+     channel_readers:  list of ProtobufChannelReader
+     start_nsec:       nsec since unix epoch of the start of the range, or None for no lower bound
+     end_nsec:         nsec since unix epoch of the end of the range, or None for no upper bound
+
+    Yields: ProtobufChannelReader, timestamp_nsec (int), deserialized protobuf object
+    """
+
+    def _iter_channel(channel_reader):
+        for timestamp_nsec, msg in channel_reader.iter_time_range(start_nsec, end_nsec):
+            yield channel_reader, timestamp_nsec, msg
+
+    return heapq.merge(*[_iter_channel(reader) for reader in channel_readers],
+                       key=lambda item: item[1])
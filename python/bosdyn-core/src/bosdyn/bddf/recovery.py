@@ -0,0 +1,196 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Recover bddf files which were not closed, by rebuilding and appending their index.
+
+A DataWriter writes the index at the end of the file when it is closed. If the writing process
+dies first, the file has no index and cannot be opened by a DataReader. recover_file() scans the
+blocks of such a file, reading only block headers and descriptors, drops any partly written block
+at the end, and appends the index and the end of the file in place.
+
+Like DataWriter, the index records the uncompressed size of the data blocks of compressed series,
+so the blocks of those series are decompressed to measure them. If the codec of a series is not
+available, the compressed size is recorded instead, with a warning.
+
+Run as a tool with:
+    python -m bosdyn.bddf.recovery FILE [FILE ...]
+"""
+
+import argparse
+import mmap
+import os
+import struct
+from collections import namedtuple
+
+import bosdyn.api.bddf_pb2 as bddf
+from google.protobuf.message import DecodeError
+
+from .block_writer import BlockWriter
+from .common import (BLOCK_HEADER_SIZE_MASK, DATA_BLOCK_TYPE, DESCRIPTOR_BLOCK_TYPE, END_BLOCK_TYPE,
+                     END_MAGIC, INDEX_OFFSET_OFFSET, LOGGER, MAGIC, DataFormatError, ParseError)
+from .compression import decompress, get_codec, series_codec
+from .file_indexer import FileIndexer
+
+RecoveryResult = namedtuple('RecoveryResult',
+                            ['recovered', 'num_series', 'num_data_blocks', 'truncated_bytes'])
+RecoveryResult.__doc__ = """Outcome of recover_file.
+
+    recovered: False if the file was already complete and was left unchanged.
+    num_series: Number of series found in the file.
+    num_data_blocks: Number of data blocks found in the file.
+    truncated_bytes: Number of bytes of partly written blocks dropped from the end of the file.
+"""
+
+
+def _has_file_end(buf):
+    """Return True if buf ends with the block written when a DataWriter is closed."""
+    end_block_offset = len(buf) - INDEX_OFFSET_OFFSET - 8
+    if end_block_offset < len(MAGIC) or buf[-len(END_MAGIC):] != END_MAGIC:
+        return False
+    (block_header,) = struct.unpack_from('<Q', buf, end_block_offset)
+    return block_header >> 56 == END_BLOCK_TYPE
+
+
+def _available_codec(series_descriptor):
+    """Return the codec of a series if its data can be decompressed, otherwise None."""
+    codec = series_codec(series_descriptor)
+    if codec:
+        try:
+            get_codec(codec)
+        except DataFormatError as err:
+            LOGGER.warning('Indexing compressed sizes for series %s: %s',
+                           series_descriptor.series_index, err)
+            return None
+    return codec
+
+
+def _scan_blocks(buf, indexer):
+    """Index the blocks in buf, until the data ends or the index starts.
+
+    Scanning stops at the first block which is incomplete or implausible, such as a zero-filled
+    or garbage tail left by the writing process, so that the file is truncated there.
+
+    Returns: (offset of the end of the last complete block, whether the file is complete)
+    """
+    series_codecs = []  # codec name, or None for uncompressed data, by series index
+    offset = len(MAGIC)
+    end = len(buf)
+    while offset + 8 <= end:
+        (block_header,) = struct.unpack_from('<Q', buf, offset)
+        block_size = block_header & BLOCK_HEADER_SIZE_MASK
+        block_type = block_header >> 56
+        if block_type == END_BLOCK_TYPE:
+            return offset, True
+        if block_size == 0:
+            break
+        if block_type == DATA_BLOCK_TYPE:
+            if offset + 12 > end:
+                break
+            (desc_size,) = struct.unpack_from('<I', buf, offset + 8)
+            block_end = offset + 12 + block_size
+            if desc_size == 0 or desc_size > block_size or block_end > end:
+                break
+            try:
+                desc = bddf.DataDescriptor.FromString(buf[offset + 12:offset + 12 + desc_size])
+            except DecodeError:
+                break
+            if desc.series_index >= len(indexer.series_block_indexes):
+                break
+            nbytes = block_size - desc_size
+            codec = series_codecs[desc.series_index]
+            if codec:
+                data_start = offset + 12 + desc_size
+                try:
+                    nbytes = len(decompress(codec, buf[data_start:data_start + nbytes]))
+                except ParseError:
+                    break
+            indexer.index_data_block(desc.series_index, desc.timestamp.ToNanoseconds(), offset,
+                                     nbytes, desc.additional_indexes)
+        elif block_type == DESCRIPTOR_BLOCK_TYPE:
+            block_end = offset + 8 + block_size
+            if block_end > end:
+                break
+            try:
+                desc = bddf.DescriptorBlock.FromString(buf[offset + 8:block_end])
+            except DecodeError:
+                break
+            desc_type = desc.WhichOneof('DescriptorType')
+            if desc_type == 'series_descriptor':
+                indexer.add_series_descriptor(desc.series_descriptor, offset)
+                series_codecs.append(_available_codec(desc.series_descriptor))
+            elif desc_type != 'file_descriptor':
+                # The writer died while writing the index, which will be written again,
+                # or this is not a descriptor block at all.
+                break
+        else:
+            break
+        offset = block_end
+    return offset, False
+
+
+def recover_file(filename, dry_run=False):
+    """Rebuild the index of a bddf file which was not closed, and append it to the file.
+
+    Args:
+     filename:  path of the file to recover.
+     dry_run:   if True, only scan the file and report what would be done.
+
+    Returns: RecoveryResult
+
+    Raises ParseError if the start of the file is not a valid bddf header.
+    """
+    with open(filename, 'r+b') as outfile:
+        if os.fstat(outfile.fileno()).st_size < len(MAGIC) + 8:
+            raise ParseError('File is too short to have a bddf header.')
+        with mmap.mmap(outfile.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            if buf[:len(MAGIC)] != MAGIC:
+                raise ParseError('Bad magic bytes at the start of the file.')
+            indexer = FileIndexer()
+            (header,) = struct.unpack_from('<Q', buf, len(MAGIC))
+            if header >> 56 != DESCRIPTOR_BLOCK_TYPE:
+                raise ParseError('File does not start with a file descriptor block.')
+            if _has_file_end(buf):
+                return RecoveryResult(False, 0, 0, 0)
+            data_end, complete = _scan_blocks(buf, indexer)
+            truncated_bytes = len(buf) - data_end
+            num_data_blocks = sum(
+                len(block_index.block_entries) for block_index in indexer.series_block_indexes)
+            result = RecoveryResult(not complete, len(indexer.series_block_indexes),
+                                    num_data_blocks, 0 if complete else truncated_bytes)
+            if complete or dry_run:
+                return result
+            block_writer = BlockWriter(outfile)
+            block_writer.add_to_checksum(memoryview(buf)[:data_end])
+        if truncated_bytes:
+            LOGGER.warning('Dropping %d bytes of partly written data from the end of %s',
+                           truncated_bytes, filename)
+        outfile.truncate(data_end)
+        outfile.seek(data_end)
+        indexer.write_index(block_writer)
+    return result
+
+
+def main(args=None):
+    """Recover the bddf files named on the command line."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('filenames', nargs='+', help='bddf files to recover.')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Only report what would be done, without changing the files.')
+    options = parser.parse_args(args)
+    for filename in options.filenames:
+        result = recover_file(filename, dry_run=options.dry_run)
+        if not result.recovered:
+            print('{}: complete, nothing to do'.format(filename))
+            continue
+        print('{}: {} {} series with {} data blocks, {} {} bytes'.format(
+            filename, 'would index' if options.dry_run else 'indexed', result.num_series,
+            result.num_data_blocks, 'would drop' if options.dry_run else 'dropped',
+            result.truncated_bytes))
+
+
+if __name__ == '__main__':
+    main()
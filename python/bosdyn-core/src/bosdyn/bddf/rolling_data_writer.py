@@ -0,0 +1,191 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""RollingDataWriter writes data to a sequence of files, starting a new file by size or duration."""
+
+import bosdyn.api.bddf_pb2 as bddf
+
+from .compression import add_codec_annotation
+from .data_writer import DataWriter
+
+
+class RollingDataWriter:  # pylint: disable=too-many-instance-attributes
+    """Class for writing data to a sequence of bddf files, called parts.
+
+    A new part is started when the current one would grow past max_part_bytes, or when data is
+    more than max_part_duration_nsec newer than the first data in the part. Every part is a
+    complete bddf file: all series are registered in every part, with the same series indexes,
+    and all messages written to metadata series are written again at the start of every part.
+
+    It can be used in place of a DataWriter, for example with a ProtobufSeriesWriter.
+    """
+
+    # pylint: disable=too-many-arguments
+
+    def __init__(self, filename_format, annotations=None, max_part_bytes=None,
+                 max_part_duration_nsec=None, on_roll=None, write_buffer_size=0):
+        """
+        Args:
+         filename_format: format string for the path of each part, with a {part} field for the
+                            part number (e.g., 'log-{part:04d}.bddf').
+         annotations:     optional dict of key (string) -> value (string) pairs for every part.
+         max_part_bytes:  start a new part before the part size would pass this, not counting
+                            the index written at the end of the part, or None.
+         max_part_duration_nsec: start a new part before writing data this much newer than the
+                            first data in the part, or None.
+         on_roll:         optional function called with the filename of each finished part.
+         write_buffer_size: number of bytes to collect before writing them to the file.
+        """
+        self._filename_format = filename_format
+        self._annotations = annotations
+        self._max_part_bytes = max_part_bytes
+        self._max_part_duration_nsec = max_part_duration_nsec
+        self._on_roll = on_roll
+        self._write_buffer_size = write_buffer_size
+        self._series_args = []  # series_index -> args to add_series
+        self._metadata_messages = []  # (series_index, timestamp_nsec, data, additional_indexes)
+        self._part_filenames = []
+        self._part_start_nsec = None
+        self._part_has_data = False
+        self._on_close = []
+        self._writer = None
+        self._start_part()
+
+    def __del__(self):
+        self._close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type_, value_, tb_):
+        self._close()
+
+    @property
+    def file_index(self):
+        """Get the FileIndex proto which describes how to access data in the current part."""
+        return self._writer.file_index
+
+    @property
+    def part_filenames(self):
+        """List of the filenames of all parts, including the current one."""
+        return list(self._part_filenames)
+
+    def add_message_series(self, series_type, series_spec, content_type, type_name,
+                           is_metadata=False, annotations=None, additional_index_names=None,
+                           codec=None):
+        """Add a new series for storing message data. See DataWriter.add_message_series.
+
+        Messages written to a series with is_metadata=True are written to every later part.
+
+        Returns series id (int).
+        """
+        message_type = bddf.MessageTypeDescriptor(content_type=content_type, type_name=type_name,
+                                                  is_metadata=is_metadata)
+        return self.add_series(series_type, series_spec, message_type=message_type,
+                               annotations=annotations,
+                               additional_index_names=additional_index_names, codec=codec)
+
+    def add_pod_series(self, series_type, series_spec, type_enum, dimension=None, annotations=None,
+                       codec=None):
+        """Add a new series for storing POD data. See DataWriter.add_pod_series.
+
+        Returns series id (int).
+        """
+        pod_type = bddf.PodTypeDescriptor(pod_type=type_enum, dimension=dimension)
+        return self.add_series(series_type, series_spec, pod_type=pod_type, annotations=annotations,
+                               codec=codec)
+
+    def add_series(self, series_type, series_spec, message_type=None, pod_type=None,
+                   annotations=None, additional_index_names=None, codec=None):
+        """Register a new series for messages, in this part and all later ones.
+
+        See DataWriter.add_series.
+
+        Returns series id (int).
+
+        Raises SeriesNotUniqueError if a series matching series_spec is already added.
+        """
+        annotations = add_codec_annotation(annotations, codec)
+        args = (series_type, series_spec, message_type, pod_type, annotations,
+                additional_index_names)
+        series_index = self._writer.add_series(*args)
+        assert series_index == len(self._series_args)
+        self._series_args.append(args)
+        return series_index
+
+    def write_data(self, series_index, timestamp_nsec, data, additional_indexes=None):
+        """Store binary data into the file, under a previously-defined channel.
+
+        Starts a new part first if the data would not fit within the limits of the current part.
+
+        Args:
+         series_index:   integer returned when series was registered with the file.
+         timestamp_nsec: nsec since unix epoch to timestamp the data.
+         data:           binary data to store.
+         additional_indexes: additional timestamps if needed for this channel.
+
+        Raises:
+            DataFormatError if the data or additional_indexes are not valid for this series.
+        """
+        message_type = self._series_args[series_index][2]
+        is_metadata = message_type is not None and message_type.is_metadata
+        if not is_metadata and self._should_roll(timestamp_nsec, len(data)):
+            self.roll()
+        self._writer.write_data(series_index, timestamp_nsec, data, additional_indexes)
+        if is_metadata:
+            self._metadata_messages.append((series_index, timestamp_nsec, data, additional_indexes))
+        else:
+            self._part_has_data = True
+            if self._part_start_nsec is None:
+                self._part_start_nsec = timestamp_nsec
+
+    def run_on_close(self, thunk):
+        """Register a function to be called when the last part is closed, before its index."""
+        self._on_close.append(thunk)
+
+    def close(self):
+        """Finish the last part, writing its index, if not already closed."""
+        self._close()
+
+    def roll(self):
+        """Finish the current part, writing its index, and start the next one."""
+        self._finish_part()
+        self._start_part()
+
+    def _should_roll(self, timestamp_nsec, nbytes):
+        # Always put some data in a part, even when it alone passes the limits.
+        if not self._part_has_data:
+            return False
+        if (self._max_part_bytes is not None and
+                self._writer.tell() + nbytes > self._max_part_bytes):
+            return True
+        return (self._max_part_duration_nsec is not None and
+                timestamp_nsec - self._part_start_nsec >= self._max_part_duration_nsec)
+
+    def _start_part(self):
+        filename = self._filename_format.format(part=len(self._part_filenames))
+        outfile = open(filename, 'wb')  # pylint: disable=consider-using-with
+        self._writer = DataWriter(outfile, self._annotations,
+                                  write_buffer_size=self._write_buffer_size)
+        self._part_filenames.append(filename)
+        self._part_start_nsec = None
+        self._part_has_data = False
+        for args in self._series_args:
+            self._writer.add_series(*args)
+        for metadata_message in self._metadata_messages:
+            self._writer.write_data(*metadata_message)
+
+    def _finish_part(self):
+        self._writer.close()
+        if self._on_roll:
+            self._on_roll(self._part_filenames[-1])
+
+    def _close(self):
+        if self._writer is None or self._writer.closed:
+            return
+        for thunk in self._on_close:
+            thunk()
+        self._finish_part()
@@ -9,6 +9,7 @@ from hashlib import sha1
 
 from .base_data_reader import BaseDataReader
 from .common import ParseError
+from .compression import decompress, series_codec
 from .file_indexer import FileIndexer
 
 
@@ -80,8 +81,11 @@ class StreamDataReader(BaseDataReader):
             self._eof = True
             raise err
         if is_data:
+            codec = series_codec(self.series_descriptor(desc.series_index))
+            if codec:
+                data = decompress(codec, data)
             self._indexer.index_data_block(desc.series_index, desc.timestamp.ToNanoseconds(),
-                                           len(data), file_offset, desc.additional_indexes)
+                                           file_offset, len(data), desc.additional_indexes)
         else:
             desc_type = desc.WhichOneof("DescriptorType")
             if desc_type == 'file_index':
@@ -10,6 +10,7 @@ import re
 import time
 from typing import Callable
 
+import numpy as np
 from google.protobuf.duration_pb2 import Duration
 from google.protobuf.timestamp_pb2 import Timestamp
 
@@ -198,6 +199,32 @@ def timestamp_to_nsec(timestamp_proto):
     return timestamp_proto.seconds * BILLION + timestamp_proto.nanos
 
 
+def timestamps_to_nsec_array(timestamp_protos):
+    """From a sequence of Timestamp protos, return an int64 numpy array of nanoseconds.
+
+    Args:
+     timestamp_protos (sequence of google.protobuf.Timestamp): input times
+    """
+    count = len(timestamp_protos)
+    seconds = np.fromiter((proto.seconds for proto in timestamp_protos), dtype=np.int64,
+                          count=count)
+    nanos = np.fromiter((proto.nanos for proto in timestamp_protos), dtype=np.int64, count=count)
+    return seconds * BILLION + nanos
+
+
+def set_timestamps_from_nsec_array(timestamp_protos, time_nsecs):
+    """Sets a sequence of Timestamp protos from an array of integer nanoseconds since the epoch.
+
+    Args:
+     timestamp_protos[out] (sequence of google.protobuf.Timestamp): timestamps to be written
+     time_nsecs[in]:        the times, as integers of nanoseconds from the unix epoch
+    """
+    seconds, nanos = np.divmod(np.asarray(time_nsecs, dtype=np.int64), BILLION)
+    for timestamp_proto, sec, nsec in zip(timestamp_protos, seconds.tolist(), nanos.tolist()):
+        timestamp_proto.seconds = sec
+        timestamp_proto.nanos = nsec
+
+
 def timestamp_to_datetime(timestamp_proto, use_nanos=True):
     """Convert a google.protobuf.Timestamp to a Python datetime.datetime object.
 
@@ -330,18 +357,66 @@ class RobotTimeConverter:
     """Converts times in the local system clock to times in the robot clock.
 
     Conversions are made given an estimate of clock skew from the local clock to the robot clock.
+    Besides single times and Timestamp protos, the *_nsecs and convert_timestamps_* methods
+    convert whole numpy arrays or lists of Timestamp protos at once.
     """
 
     def __init__(self, robot_clock_skew_nsec):
         self._clock_skew_nsec = robot_clock_skew_nsec
 
+    def _skew_nsec_at_local(self, local_time_nsecs):
+        """Returns the clock skew to apply at local times in nanoseconds (a scalar or an array)."""
+        return self._clock_skew_nsec
+
+    def _skew_nsec_at_robot(self, robot_time_nsecs):
+        """Returns the clock skew to remove at robot times in nanoseconds (a scalar or an array)."""
+        return self._clock_skew_nsec
+
+    def robot_nsecs_from_local_nsecs(self, local_time_nsecs):
+        """Returns an int64 numpy array of robot times for an array of local times.
+
+        Args:
+          local_time_nsecs:  Local system times, in integer nanoseconds from the unix epoch.
+        """
+        local_time_nsecs = np.asarray(local_time_nsecs, dtype=np.int64)
+        return local_time_nsecs + self._skew_nsec_at_local(local_time_nsecs)
+
+    def local_nsecs_from_robot_nsecs(self, robot_time_nsecs):
+        """Returns an int64 numpy array of local times for an array of robot times.
+
+        Args:
+          robot_time_nsecs:  Robot clock times, in integer nanoseconds from the unix epoch.
+        """
+        robot_time_nsecs = np.asarray(robot_time_nsecs, dtype=np.int64)
+        return robot_time_nsecs - self._skew_nsec_at_robot(robot_time_nsecs)
+
+    def convert_timestamps_from_local_to_robot(self, timestamp_protos):
+        """Edits Timestamp protos in place to convert them from the local clock to the robot clock.
+
+        Args:
+          timestamp_protos[in/out] (sequence of google.protobuf.Timestamp): local system times
+        """
+        set_timestamps_from_nsec_array(
+            timestamp_protos,
+            self.robot_nsecs_from_local_nsecs(timestamps_to_nsec_array(timestamp_protos)))
+
+    def convert_timestamps_from_robot_to_local(self, timestamp_protos):
+        """Edits Timestamp protos in place to convert them from the robot clock to the local clock.
+
+        Args:
+          timestamp_protos[in/out] (sequence of google.protobuf.Timestamp): robot clock times
+        """
+        set_timestamps_from_nsec_array(
+            timestamp_protos,
+            self.local_nsecs_from_robot_nsecs(timestamps_to_nsec_array(timestamp_protos)))
+
     def robot_timestamp_from_local_nsecs(self, local_time_nsecs):
         """Returns a robot-clock Timestamp proto for a local time in nanoseconds.
 
         Args:
           local_time_nsecs:  Local system time, in integer of nanoseconds from the unix epoch.
         """
-        return nsec_to_timestamp(local_time_nsecs + self._clock_skew_nsec)
+        return nsec_to_timestamp(local_time_nsecs + self._skew_nsec_at_local(local_time_nsecs))
 
     def robot_timestamp_from_local_secs(self, local_time_secs):
         """Returns a robot-clock Timestamp proto for a local time in seconds.
@@ -372,9 +447,11 @@ class RobotTimeConverter:
         """Returns the robot time in seconds from a local time in seconds.
 
         Args:
-          local_time_secs:  Local system time, in seconds from the unix epoch.
+          local_time_secs:  Local system time, in seconds from the unix epoch, or a numpy array
+                            of such times.
         """
-        return local_time_secs + nsec_to_sec(self._clock_skew_nsec)
+        skew_nsec = self._skew_nsec_at_local(np.multiply(local_time_secs, NSEC_PER_SEC))
+        return local_time_secs + skew_nsec / NSEC_PER_SEC
 
     def local_seconds_from_robot_timestamp(self, robot_timestamp):
         """Returns the local time in seconds from a robot-clock Timestamp proto.
@@ -382,4 +459,44 @@ class RobotTimeConverter:
         Args:
           local_time_secs:  Local system time, in seconds from the unix epoch.
         """
-        return nsec_to_sec(timestamp_to_nsec(robot_timestamp) - self._clock_skew_nsec)
+        robot_nsecs = timestamp_to_nsec(robot_timestamp)
+        return nsec_to_sec(robot_nsecs - self._skew_nsec_at_robot(robot_nsecs))
+
+
+class SkewHistoryTimeConverter(RobotTimeConverter):
+    """A RobotTimeConverter which applies the clock skew that was valid at the time of each sample.
+
+    Over a long recording the estimated clock skew changes. Converting every sample with the
+    latest skew shifts older samples by the change; this converter instead looks up, for each
+    time, the last skew estimated at or before it. Times before the first estimate use the first.
+
+    Args:
+      local_times_nsec:  Local times at which the skew estimates were made, in nanoseconds.
+      clock_skews_nsec:  Clock skew estimates, robot clock minus local clock, in nanoseconds.
+    """
+
+    def __init__(self, local_times_nsec, clock_skews_nsec):
+        local_times_nsec = np.asarray(local_times_nsec, dtype=np.int64)
+        clock_skews_nsec = np.asarray(clock_skews_nsec, dtype=np.int64)
+        if local_times_nsec.ndim != 1 or local_times_nsec.shape != clock_skews_nsec.shape:
+            raise ValueError('Expected 1D arrays of times and skews of the same length')
+        if not local_times_nsec.size:
+            raise ValueError('Need at least one clock skew estimate')
+        order = np.argsort(local_times_nsec, kind='stable')
+        self._local_times_nsec = local_times_nsec[order]
+        self._clock_skews_nsec = clock_skews_nsec[order]
+        # The robot times at which each estimate takes over, for converting from robot time.
+        self._robot_times_nsec = self._local_times_nsec + self._clock_skews_nsec
+        super(SkewHistoryTimeConverter, self).__init__(int(self._clock_skews_nsec[-1]))
+
+    @staticmethod
+    def _lookup(times_nsec, skews_nsec, query_nsecs):
+        indices = np.searchsorted(times_nsec, query_nsecs, side='right') - 1
+        skews = skews_nsec[np.maximum(indices, 0)]
+        return skews if np.ndim(skews) else int(skews)
+
+    def _skew_nsec_at_local(self, local_time_nsecs):
+        return self._lookup(self._local_times_nsec, self._clock_skews_nsec, local_time_nsecs)
+
+    def _skew_nsec_at_robot(self, robot_time_nsecs):
+        return self._lookup(self._robot_times_nsec, self._clock_skews_nsec, robot_time_nsecs)
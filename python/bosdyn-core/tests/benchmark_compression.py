@@ -0,0 +1,99 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Benchmark bddf write/read throughput and file size with each compression codec.
+
+The payloads are synthetic depth images and point clouds, which compress roughly like real ones.
+Codecs whose packages are not installed are skipped.
+
+Run from the bosdyn-core directory with:
+    python -m tests.benchmark_compression
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from bosdyn.bddf import DataFormatError, DataReader, DataWriter
+from bosdyn.bddf.compression import get_codec
+
+
+def _depth_images(number, rng):
+    """Smooth uint16 depth images of 640x480, with some invalid (zero) pixels."""
+    rows, cols = np.mgrid[0:480, 0:640]
+    for _ in range(number):
+        depth = 1000 + 3 * rows + cols + rng.integers(0, 8, size=rows.shape)
+        depth[rng.random(rows.shape) < 0.05] = 0
+        yield depth.astype(np.uint16).tobytes()
+
+
+def _point_clouds(number, rng):
+    """float32 xyz points on a noisy ground plane, 20000 points each."""
+    for _ in range(number):
+        points = rng.uniform(-5, 5, size=(20000, 3)).astype(np.float32)
+        points[:, 2] = np.round(rng.normal(0, 0.01, size=20000), 3)
+        yield points.tobytes()
+
+
+def _run(filename, payloads, codec):
+    start = time.perf_counter()
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        series_index = data_writer.add_message_series('bosdyn/benchmark', {'channel': 'data'},
+                                                      'application/octet-stream', 'bytes',
+                                                      codec=codec)
+        for nsec, payload in enumerate(payloads):
+            data_writer.write_data(series_index, nsec, payload)
+    write_sec = time.perf_counter() - start
+    start = time.perf_counter()
+    with DataReader(filename=filename) as data_reader:
+        for index_in_series in range(len(payloads)):
+            data_reader.read(series_index, index_in_series)
+    read_sec = time.perf_counter() - start
+    return write_sec, read_sec, os.path.getsize(filename)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=50, help='Messages per measurement.')
+    parser.add_argument('--codecs', nargs='+', default=['zlib', 'zstd', 'lz4'],
+                        help='Codecs to compare against uncompressed data.')
+    options = parser.parse_args()
+
+    codecs = [None]
+    for codec in options.codecs:
+        try:
+            get_codec(codec)
+        except DataFormatError as err:
+            print('Skipping {}'.format(err))
+            continue
+        codecs.append(codec)
+
+    rng = np.random.default_rng(0)
+    filename = os.path.join(tempfile.gettempdir(), 'benchmark_compression.bddf')
+    try:
+        for name, payloads in (('depth images', list(_depth_images(options.number, rng))),
+                               ('point clouds', list(_point_clouds(options.number, rng)))):
+            total_mb = sum(len(payload) for payload in payloads) / 1e6
+            print('{} {} of {:.1f} MB total'.format(len(payloads), name, total_mb))
+            print('{:<8} {:>12} {:>12} {:>10} {:>8}'.format('codec', 'write MB/s', 'read MB/s',
+                                                            'file MB', 'ratio'))
+            for codec in codecs:
+                write_sec, read_sec, nbytes = _run(filename, payloads, codec)
+                print('{:<8} {:12.1f} {:12.1f} {:10.2f} {:8.2f}'.format(
+                    codec or 'none', total_mb / write_sec, total_mb / read_sec, nbytes / 1e6,
+                    total_mb * 1e6 / nbytes))
+            print()
+    finally:
+        if os.path.exists(filename):
+            os.unlink(filename)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Benchmark writing bddf messages with DataWriter and AsyncDataWriter.
+
+For each payload size this reports the messages per second seen by the calling thread, the
+slowest single write_data() call, and the messages per second until the file is closed.
+
+Run from the bosdyn-core directory with:
+    python -m tests.benchmark_data_writer
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from bosdyn.bddf import AsyncDataWriter, DataWriter
+
+
+def _run(make_writer, filename, payload, number):
+    start = time.perf_counter()
+    slowest = 0
+    with open(filename, 'wb') as outfile, make_writer(outfile) as data_writer:
+        series_index = data_writer.add_message_series('bosdyn/benchmark', {'channel': 'data'},
+                                                      'application/octet-stream', 'bytes')
+        for nsec in range(number):
+            call_start = time.perf_counter()
+            data_writer.write_data(series_index, nsec, payload)
+            slowest = max(slowest, time.perf_counter() - call_start)
+        caller_done = time.perf_counter()
+    end = time.perf_counter()
+    return number / (caller_done - start), slowest, number / (end - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 10000, 1000000],
+                        help='Payload sizes in bytes.')
+    parser.add_argument('--bytes', type=int, default=200000000,
+                        help='Approximate number of bytes to write per measurement.')
+    parser.add_argument('--max-messages', type=int, default=100000,
+                        help='Maximum number of messages per measurement.')
+    options = parser.parse_args()
+
+    writers = (
+        ('DataWriter', DataWriter),
+        ('DataWriter, 1MB buffer', lambda outfile: DataWriter(outfile, write_buffer_size=1 << 20)),
+        ('AsyncDataWriter', AsyncDataWriter),
+        ('AsyncDataWriter, drop when full',
+         lambda outfile: AsyncDataWriter(outfile, drop_when_full=True)),
+    )
+    filename = os.path.join(tempfile.gettempdir(), 'benchmark_data_writer.bddf')
+    print('{:<34} {:>14} {:>14} {:>14}'.format('', 'caller msg/s', 'max call ms', 'total msg/s'))
+    try:
+        for size in options.sizes:
+            payload = os.urandom(size)
+            number = max(1, min(options.max_messages, options.bytes // size))
+            print('{} messages of {} bytes'.format(number, size))
+            for name, make_writer in writers:
+                caller_rate, slowest, total_rate = _run(make_writer, filename, payload, number)
+                print('{:<34} {:14.0f} {:14.3f} {:14.0f}'.format(name, caller_rate, slowest * 1e3,
+                                                                 total_rate))
+            print()
+    finally:
+        if os.path.exists(filename):
+            os.unlink(filename)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+# Copyright (c) 2023 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Benchmark converting many times between the local and robot clocks with RobotTimeConverter.
+
+Each conversion is done one time at a time, as a loop over the single-time methods, and in bulk
+with the array methods: nanosecond arrays, and lists of Timestamp protos rewritten in place.
+
+Run from the bosdyn-core directory with:
+    python -m tests.benchmark_time_conversion
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+from google.protobuf.timestamp_pb2 import Timestamp
+
+from bosdyn.util import RobotTimeConverter, SkewHistoryTimeConverter, nsec_to_timestamp
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=50000, help='Number of times to convert.')
+    parser.add_argument('--number', type=int, default=5, help='Repetitions per measurement.')
+    options = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    local_nsecs = np.sort(1700000000 * 10**9 + rng.integers(0, 3600 * 10**9, size=options.count))
+    local_list = local_nsecs.tolist()
+    timestamps = [nsec_to_timestamp(nsec) for nsec in local_list]
+    converter = RobotTimeConverter(1234567890)
+    history = SkewHistoryTimeConverter(local_nsecs[::100], 1234567890 + np.arange(
+        len(local_nsecs[::100])))
+
+    def _copy_timestamps():
+        return [Timestamp(seconds=t.seconds, nanos=t.nanos) for t in timestamps]
+
+    def _timestamps_loop():
+        for timestamp in _copy_timestamps():
+            converter.convert_timestamp_from_local_to_robot(timestamp)
+
+    def _timestamps_bulk():
+        converter.convert_timestamps_from_local_to_robot(_copy_timestamps())
+
+    cases = [
+        ('nsec loop', lambda: [converter.robot_timestamp_from_local_nsecs(t) for t in local_list]),
+        ('nsec array', lambda: converter.robot_nsecs_from_local_nsecs(local_nsecs)),
+        ('history array', lambda: history.robot_nsecs_from_local_nsecs(local_nsecs)),
+        ('proto loop', _timestamps_loop),
+        ('proto bulk', _timestamps_bulk),
+        ('(proto copy)', _copy_timestamps),
+    ]
+    print('{} times'.format(options.count))
+    print('{:<16} {:>12}'.format('method', 'ms'))
+    for label, function in cases:
+        sec = timeit.timeit(function, number=options.number) / options.number
+        print('{:<16} {:12.2f}'.format(label, sec * 1e3))
+
+
+if __name__ == '__main__':
+    main()
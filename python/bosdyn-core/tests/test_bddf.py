@@ -6,18 +6,25 @@
 
 """Test code for bosdyn.bddf"""
 
+import io
+import operator
 import os
 import tempfile
+import threading
 
+import numpy as np
 import pytest
 from google.protobuf.timestamp_pb2 import Timestamp
 
 import bosdyn.api.bddf_pb2 as bddf
 import bosdyn.api.robot_id_pb2 as robot_id
 from bosdyn.api.data_buffer_pb2 import OperatorComment
-from bosdyn.bddf import (DataReader, DataWriter, GrpcReader, GrpcServiceWriter, PodSeriesReader,
-                         PodSeriesWriter, ProtobufChannelReader, ProtobufReader,
-                         ProtobufSeriesWriter, StreamDataReader)
+from bosdyn.bddf import (AsyncDataWriter, DataError, DataFormatError, DataReader, DataWriter,
+                         GrpcReader, GrpcServiceWriter, ParallelChannelReader, ParseError,
+                         PodSeriesReader, PodSeriesWriter, ProtobufChannelReader, ProtobufReader,
+                         ProtobufSeriesWriter, RollingDataWriter, StreamDataReader,
+                         iter_merged_channels, recover_file)
+from bosdyn.bddf.compression import CODEC_ANNOTATION
 from bosdyn.util import now_nsec, now_timestamp, nsec_to_timestamp, timestamp_to_nsec
 
 
@@ -159,12 +166,425 @@ def test_write_read():  # pylint: disable=too-many-statements,too-many-locals
     os.unlink(filename)
 
 
+def _write_pod_file(filename, num_samples):
+    """Write a file with a scalar float64 series, a 2x3 int16 series, and a message series."""
+    base_nsec = now_nsec()
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        scalar_writer = PodSeriesWriter(data_writer, 'bosdyn/test/pod', {'varname': 'scalar'},
+                                        bddf.TYPE_FLOAT64, data_block_size=80)
+        for i in range(num_samples):
+            scalar_writer.write(base_nsec + i, i * 0.5)
+        matrix_index = data_writer.add_pod_series('bosdyn/test/pod', {'varname': 'matrix'},
+                                                  bddf.TYPE_INT16, dimension=[2, 3])
+        for i in range(num_samples):
+            samples = np.arange(6 * (i % 3 + 1), dtype='<i2') + i
+            data_writer.write_data(matrix_index, base_nsec + i, samples.tobytes())
+        data_writer.add_message_series('bosdyn/test/1', {'channel': 'a'}, 'text/plain', 'text')
+    return base_nsec
+
+
+@pytest.mark.parametrize('use_mmap', [False, True])
+def test_read_series_range(use_mmap):
+    """Test reading POD data in bulk into NumPy arrays."""
+    filename = os.path.join(gettempdir(), 'test_range.bdf')
+    base_nsec = _write_pod_file(filename, 25)
+
+    with DataReader(filename=filename, use_mmap=use_mmap) as data_reader:
+        assert data_reader.is_mmap == use_mmap
+
+        # 25 scalar samples, 10 per block.
+        pod_reader = PodSeriesReader(data_reader, {'varname': 'scalar'})
+        result = pod_reader.read_series_range()
+        assert result.values.dtype == np.float64
+        assert result.values.tolist() == [i * 0.5 for i in range(25)]
+        assert result.timestamps.dtype == np.int64
+        assert result.timestamps.tolist() == [base_nsec, base_nsec + 10, base_nsec + 20]
+        assert result.sample_starts.tolist() == [0, 10, 20]
+        for block in range(pod_reader.num_data_blocks):
+            timestamp_nsec, samples = pod_reader.read_samples(block)
+            assert timestamp_nsec == result.timestamps[block]
+            begin = result.sample_starts[block]
+            assert samples == result.values[begin:begin + len(samples)].tolist()
+
+        # One block per write, with 1 to 3 samples of 2x3 values each.
+        matrix_index = data_reader.series_spec_to_index({'varname': 'matrix'})
+        result = data_reader.read_series_range(matrix_index, 4, 7)
+        assert result.values.dtype == np.int16
+        assert result.values.shape == (6, 2, 3)
+        assert result.timestamps.tolist() == [base_nsec + 4, base_nsec + 5, base_nsec + 6]
+        assert result.sample_starts.tolist() == [0, 2, 5]
+        assert result.values[2].tolist() == [[5, 6, 7], [8, 9, 10]]
+
+        result = data_reader.read_series_range(matrix_index, 3, 3)
+        assert result.values.shape == (0, 2, 3)
+        assert len(result.timestamps) == 0
+
+        with pytest.raises(ParseError):
+            data_reader.read_series_range(data_reader.series_spec_to_index({'channel': 'a'}))
+
+    os.unlink(filename)
+
+
+def test_time_range():
+    """Test finding and iterating over data blocks by timestamp."""
+    filename = os.path.join(gettempdir(), 'test_time_range.bdf')
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        comment_writer = ProtobufSeriesWriter(data_writer, OperatorComment)
+        robot_id_writer = ProtobufSeriesWriter(data_writer, robot_id.RobotId)
+        for nsec in range(100, 200, 10):
+            comment_writer.write(nsec, OperatorComment(message=str(nsec)))
+            robot_id_writer.write(nsec + 5, robot_id.RobotId(serial_number=str(nsec + 5)))
+        # A series with blocks out of timestamp order.
+        text_index = data_writer.add_message_series('bosdyn/test/1', {'channel': 'a'}, 'text/plain',
+                                                    'text')
+        for nsec in (30, 10, 20):
+            data_writer.write_data(text_index, nsec, str(nsec).encode())
+
+    with DataReader(filename=filename) as data_reader:
+        assert data_reader.find_at_or_before(text_index, 5) is None
+        assert data_reader.find_at_or_before(text_index, 10) == 1
+        assert data_reader.find_at_or_before(text_index, 25) == 2
+        assert data_reader.find_at_or_before(text_index, 1000) == 0
+        assert [data for _desc, _nsec, data in data_reader.iter_time_range(text_index, 15)
+               ] == [b'20', b'30']
+
+        proto_reader = ProtobufReader(data_reader)
+        comment_reader = ProtobufChannelReader(proto_reader, OperatorComment)
+        robot_id_reader = ProtobufChannelReader(proto_reader, robot_id.RobotId)
+        assert comment_reader.find_at_or_before(139) == 3
+        assert [msg.message for _nsec, msg in comment_reader.iter_time_range(130, 160)
+               ] == ['130', '140', '150']
+        assert list(comment_reader.iter_time_range(500)) == []
+
+        merged = list(iter_merged_channels([comment_reader, robot_id_reader], 150, 170))
+        assert [nsec for _reader, nsec, _msg in merged] == [150, 155, 160, 165]
+        assert [reader for reader, _nsec, _msg in merged] == [comment_reader, robot_id_reader] * 2
+        assert merged[1][2].serial_number == '155'
+
+        comment_index = proto_reader.series_index(OperatorComment.DESCRIPTOR.full_name)
+        series_indexes = [text_index, comment_index]
+        merged = list(data_reader.iter_merged_time_range(series_indexes, end_nsec=110))
+        assert [(series_index, nsec) for series_index, _desc, nsec, _data in merged
+               ] == [(text_index, 10), (text_index, 20), (text_index, 30), (comment_index, 100)]
+
+    os.unlink(filename)
+
+
+def test_async_write():
+    """Test writing data from a background thread."""
+    filename = os.path.join(gettempdir(), 'test_async.bdf')
+    with open(filename, 'wb') as outfile, \
+         AsyncDataWriter(outfile, write_buffer_size=4096, batch_size=8) as data_writer:
+        proto_writer = ProtobufSeriesWriter(data_writer, OperatorComment)
+        pod_writer = PodSeriesWriter(data_writer, 'bosdyn/test/pod', {'varname': 'x'},
+                                     bddf.TYPE_FLOAT32, data_block_size=40)
+        for nsec in range(100):
+            assert proto_writer.write(nsec, OperatorComment(message=str(nsec))) is None
+            pod_writer.write(nsec, nsec)
+        data_writer.flush()
+        stats = data_writer.stats
+        assert stats.queue_size == 0
+        assert stats.written == 110
+        assert stats.dropped == 0
+        assert stats.flushes >= 1
+        # Large data skips the write buffer.
+        series_index = data_writer.add_message_series('bosdyn/test/1', {'channel': 'big'},
+                                                      'application/octet-stream', 'bytes')
+        assert data_writer.write_data(series_index, 1000, b'x' * 10000)
+
+    assert data_writer.stats.written == 111
+    with pytest.raises(DataError):
+        data_writer.write_data(series_index, 1001, b'y')
+
+    with DataReader(filename=filename) as data_reader:
+        proto_reader = ProtobufReader(data_reader)
+        comment_reader = ProtobufChannelReader(proto_reader, OperatorComment)
+        assert [(nsec, msg.message) for nsec, msg in comment_reader
+               ] == [(nsec, str(nsec)) for nsec in range(100)]
+        pod_reader = PodSeriesReader(data_reader, {'varname': 'x'})
+        assert pod_reader.read_series_range().values.tolist() == list(range(100))
+        assert data_reader.read(series_index, 0)[1:] == (1000, b'x' * 10000)
+
+    os.unlink(filename)
+
+
+class _BlockingFile(io.BytesIO):
+    """BytesIO which waits for an event before each write."""
+
+    def __init__(self):
+        super().__init__()
+        self.can_write = threading.Event()
+        self.can_write.set()
+
+    def write(self, data):
+        self.can_write.wait()
+        return super().write(data)
+
+
+def test_async_write_full_queue():
+    """Test dropping data when the writer falls behind."""
+    outfile = _BlockingFile()
+    data_writer = AsyncDataWriter(outfile, max_queue_size=2, drop_when_full=True,
+                                  write_buffer_size=0)
+    series_index = data_writer.add_message_series('bosdyn/test/1', {'channel': 'a'}, 'text/plain',
+                                                  'text')
+    outfile.can_write.clear()
+    results = [data_writer.write_data(series_index, nsec, b'data') for nsec in range(10)]
+    # At most one block can be taken off the queue by the stalled writer thread.
+    assert results[:2] == [True, True]
+    assert results.count(False) >= 7
+    stats = data_writer.stats
+    assert stats.dropped == results.count(False)
+    assert stats.max_queue_size == 2
+
+    with pytest.raises(DataFormatError):
+        data_writer.write_data(series_index, 10, b'data', additional_indexes=[1])
+
+    outfile.can_write.set()
+    data_writer.flush()
+    assert data_writer.stats.written == results.count(True)
+
+
+class _FailingFile(io.BytesIO):
+    """BytesIO which fails every write once fail is set."""
+
+    def __init__(self):
+        super().__init__()
+        self.fail = False
+
+    def write(self, data):
+        if self.fail:
+            raise IOError('disk full')
+        return super().write(data)
+
+
+def test_async_write_error_closes_file():
+    """Test that an error in the writer thread is raised once by close, which closes the file."""
+    outfile = _FailingFile()
+    data_writer = AsyncDataWriter(outfile, write_buffer_size=0)
+    series_index = data_writer.add_message_series('bosdyn/test/1', {'channel': 'a'}, 'text/plain',
+                                                  'text')
+    outfile.fail = True
+    data_writer.write_data(series_index, 1, b'data')
+    with pytest.raises(IOError):
+        data_writer.close()
+    assert data_writer.closed
+    assert outfile.closed
+    # Later closes, including from __del__, do nothing.
+    data_writer.close()
+    assert data_writer._on_close == []
+
+
+def test_rolling_write():
+    """Test splitting data into parts by size and by duration."""
+    filename_format = os.path.join(gettempdir(), 'test_rolling_{part}.bdf')
+    rolled = []
+    robot_id_msg = robot_id.RobotId(serial_number='spot-BD-99990001')
+    with RollingDataWriter(filename_format, annotations={'robot': 'spot'}, max_part_bytes=2000,
+                           max_part_duration_nsec=1000, on_roll=rolled.append) as data_writer:
+        robot_id_writer = ProtobufSeriesWriter(data_writer, robot_id.RobotId, is_metadata=True)
+        robot_id_writer.write(0, robot_id_msg)
+        comment_writer = ProtobufSeriesWriter(data_writer, OperatorComment)
+        pod_writer = PodSeriesWriter(data_writer, 'bosdyn/test/pod', {'varname': 'x'},
+                                     bddf.TYPE_FLOAT64, data_block_size=80)
+        # Roll by size.
+        for nsec in range(100):
+            comment_writer.write(nsec, OperatorComment(message='x' * 50))
+        num_size_parts = len(data_writer.part_filenames)
+        assert num_size_parts > 2
+        assert rolled == data_writer.part_filenames[:-1]
+        # Roll by duration, with a data block every 1000 nsec.
+        for nsec in range(1000, 4000, 100):
+            pod_writer.write(nsec, nsec)
+        filenames = data_writer.part_filenames
+    assert rolled == filenames
+    assert len(filenames) == num_size_parts + 2
+
+    total_comments = 0
+    pod_values = []
+    for filename in filenames:
+        with DataReader(filename=filename) as data_reader:
+            assert data_reader.annotations == {'robot': 'spot'}
+            assert len(data_reader.file_index.series_identifiers) == 3
+            proto_reader = ProtobufReader(data_reader)
+            robot_id_reader = ProtobufChannelReader(proto_reader, robot_id.RobotId)
+            assert list(robot_id_reader) == [(0, robot_id_msg)]
+            total_comments += ProtobufChannelReader(proto_reader, OperatorComment).num_messages
+            pod_range = PodSeriesReader(data_reader, {'varname': 'x'}).read_series_range()
+            assert np.all(pod_range.timestamps - pod_range.timestamps[:1] < 1000)
+            pod_values.extend(pod_range.values.tolist())
+        os.unlink(filename)
+    assert total_comments == 100
+    assert pod_values == list(range(1000, 4000, 100))
+
+
+def test_parallel_channel_reader():
+    """Test decoding a channel in worker processes."""
+    filename = os.path.join(gettempdir(), 'test_parallel.bdf')
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        comment_writer = ProtobufSeriesWriter(data_writer, OperatorComment)
+        for nsec in range(100):
+            comment_writer.write(nsec, OperatorComment(message=str(nsec)))
+
+    with ParallelChannelReader(filename, OperatorComment, max_workers=2,
+                               chunk_size=7) as parallel_reader:
+        assert parallel_reader.num_messages == 100
+        assert list(parallel_reader.iter_messages()) == [
+            (nsec, OperatorComment(message=str(nsec))) for nsec in range(100)
+        ]
+        messages = parallel_reader.iter_messages(10, 20, map_fn=operator.attrgetter('message'))
+        assert list(messages) == [(nsec, str(nsec)) for nsec in range(10, 20)]
+        assert list(parallel_reader.iter_messages(200)) == []
+
+    os.unlink(filename)
+
+
+@pytest.mark.parametrize('writer_type', [DataWriter, AsyncDataWriter])
+def test_compressed_write_read(writer_type):
+    """Test writing and reading series with compressed data blocks."""
+    filename = os.path.join(gettempdir(), 'test_compressed.bdf')
+    comments = [OperatorComment(message='comment ' * nsec) for nsec in range(20)]
+    with open(filename, 'wb') as outfile, writer_type(outfile) as data_writer:
+        with pytest.raises(DataFormatError):
+            data_writer.add_message_series('bosdyn/test/1', {'channel': 'a'}, 'text/plain', 'text',
+                                           codec='bogus')
+        comment_writer = ProtobufSeriesWriter(data_writer, OperatorComment, codec='zlib')
+        pod_writer = PodSeriesWriter(data_writer, 'bosdyn/test/pod', {'varname': 'x'},
+                                     bddf.TYPE_UINT16, data_block_size=200, codec='zlib')
+        for nsec, comment in enumerate(comments):
+            comment_writer.write(nsec, comment)
+        for nsec in range(1000):
+            pod_writer.write(nsec, nsec // 10)
+    # The whole file is smaller than the uncompressed data.
+    assert os.path.getsize(filename) < sum(comment.ByteSize() for comment in comments) + 2000
+
+    with DataReader(filename=filename, use_mmap=True) as data_reader:
+        proto_reader = ProtobufReader(data_reader)
+        comment_reader = ProtobufChannelReader(proto_reader, OperatorComment)
+        assert comment_reader.series_descriptor.annotations[CODEC_ANNOTATION] == 'zlib'
+        assert list(comment_reader) == list(enumerate(comments))
+        pod_reader = PodSeriesReader(data_reader, {'varname': 'x'})
+        assert pod_reader.read_samples(1)[1] == [nsec // 10 for nsec in range(100, 200)]
+        assert pod_reader.read_series_range().values.tolist() == [
+            nsec // 10 for nsec in range(1000)
+        ]
+
+    with open(filename, 'rb') as infile, StreamDataReader(infile) as data_reader:
+        for comment in comments:
+            _desc, _sdesc, data = data_reader.read_data_block()
+            assert data == comment.SerializeToString()
+
+    os.unlink(filename)
+
+
+def _read_all(filename):
+    """Return (series_index, timestamp_nsec, data) for every data block in a file."""
+    with DataReader(filename=filename) as data_reader:
+        series_indexes = range(len(data_reader.file_index.series_identifiers))
+        blocks = data_reader.iter_merged_time_range(series_indexes)
+        return [(series_index, nsec, data) for series_index, _desc, nsec, data in blocks]
+
+
+def test_recover_file():
+    """Test rebuilding the index of files which were cut off at various points."""
+    filename = os.path.join(gettempdir(), 'test_recover.bdf')
+    truncated_filename = os.path.join(gettempdir(), 'test_recover_truncated.bdf')
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        comment_writer = ProtobufSeriesWriter(data_writer, OperatorComment, codec='zlib')
+        pod_writer = PodSeriesWriter(data_writer, 'bosdyn/test/pod', {'varname': 'x'},
+                                     bddf.TYPE_FLOAT32, data_block_size=40)
+        for nsec in range(50):
+            comment_writer.write(nsec, OperatorComment(message=str(nsec)))
+            pod_writer.write(nsec, nsec)
+    with DataReader(filename=filename) as data_reader:
+        index_start = min(data_reader.file_index.series_block_index_offsets)
+        total_bytes = [data_reader.total_bytes(series_index) for series_index in range(2)]
+    expected = _read_all(filename)
+    file_size = os.path.getsize(filename)
+
+    # A complete file is left alone.
+    assert not recover_file(filename).recovered
+    assert os.path.getsize(filename) == file_size
+
+    # Cut off before the index, during the index, and in the middle of the last data block.
+    for size, num_data_blocks in ((index_start, 55), (index_start + 10, 55), (index_start - 3, 54)):
+        with open(filename, 'rb') as infile, open(truncated_filename, 'wb') as outfile:
+            outfile.write(infile.read(size))
+        with pytest.raises(ParseError):
+            DataReader(filename=truncated_filename)
+
+        result = recover_file(truncated_filename, dry_run=True)
+        assert result.recovered
+        assert os.path.getsize(truncated_filename) == size
+
+        result = recover_file(truncated_filename)
+        assert result.num_series == 2
+        assert result.num_data_blocks == num_data_blocks
+        assert 0 <= size - result.truncated_bytes <= index_start
+        # Every complete block is recovered, and the file checksum is valid.
+        recovered = _read_all(truncated_filename)
+        assert len(recovered) == num_data_blocks
+        assert set(recovered) <= set(expected)
+        if num_data_blocks == 55:
+            # Uncompressed sizes are indexed for the compressed series, as by DataWriter.
+            with DataReader(filename=truncated_filename) as data_reader:
+                assert [data_reader.total_bytes(series_index)
+                        for series_index in range(2)] == total_bytes
+        with open(truncated_filename, 'rb') as infile, StreamDataReader(infile) as data_reader:
+            while True:
+                try:
+                    data_reader.read_data_block()
+                except EOFError:
+                    break
+            assert data_reader.checksum == data_reader.read_checksum
+
+    os.unlink(truncated_filename)
+    os.unlink(filename)
+
+
+@pytest.mark.parametrize('tail', [
+    bytes(4096),
+    b'\x01' + bytes(15),
+    (100).to_bytes(8, 'little') + (50).to_bytes(4, 'little') + b'\xff' * 100,
+    b'\x07' * 64,
+], ids=['zeros', 'empty-descriptor', 'bad-descriptor', 'unknown-type'])
+def test_recover_file_bad_tail(tail):
+    """Test that recovery truncates at a zero-filled or garbage tail after the last block."""
+    filename = os.path.join(gettempdir(), 'test_recover_tail.bdf')
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        comment_writer = ProtobufSeriesWriter(data_writer, OperatorComment, codec='zlib')
+        for nsec in range(3):
+            comment_writer.write(nsec, OperatorComment(message=str(nsec)))
+    with DataReader(filename=filename) as data_reader:
+        index_start = min(data_reader.file_index.series_block_index_offsets)
+    expected = _read_all(filename)
+    with open(filename, 'r+b') as outfile:
+        outfile.truncate(index_start)
+        outfile.seek(index_start)
+        outfile.write(tail)
+
+    result = recover_file(filename)
+    assert result.recovered
+    assert result.num_data_blocks == 3
+    assert result.truncated_bytes == len(tail)
+    assert _read_all(filename) == expected
+    os.unlink(filename)
+
+
+def test_recover_file_too_short():
+    """Test that recovering an empty file raises ParseError."""
+    filename = os.path.join(gettempdir(), 'test_recover_empty.bdf')
+    open(filename, 'wb').close()
+    with pytest.raises(ParseError):
+        recover_file(filename)
+    os.unlink(filename)
+
+
 def test_grpc_read_write():
     """Test writing GRPC data."""
     file_annotations = {'robot': 'spot', 'individual': 'spot-BD-99990001'}
     service_name = 'robot-id'
-    filename = os.path.join(tempfile.gettempdir(), service_name + '.bddf')
-    filename = service_name + '.bddf'
+    filename = os.path.join(gettempdir(), service_name + '.bddf')
 
     # pylint: disable=no-member
     request = robot_id.RobotIdRequest()
@@ -197,3 +617,5 @@ def test_grpc_read_write():
         nsec, msg = proto_reader.get_message(0)
         assert msg == response
         assert nsec_to_timestamp(nsec) == msg.header.response_timestamp
+
+    os.unlink(filename)
@@ -5,6 +5,8 @@
 # Development Kit License (20191101-BDSDK-SL).
 
 """Tests for bosdyn.util"""
+import numpy as np
+import pytest
 from google.protobuf.timestamp_pb2 import Timestamp
 
 from bosdyn import util
@@ -25,3 +27,48 @@ def test_timestamp_conversion():
     """Check timestamp conversion functions."""
     sec = util.timestamp_to_sec(Timestamp(seconds=2, nanos=5 * 10**8))
     assert sec == 2.5
+
+
+def test_time_converter_arrays():
+    """Conversions of numpy arrays of times and lists of Timestamp protos."""
+    converter = util.RobotTimeConverter(-1500)
+    local_nsecs = np.array([0, 1000, 1700000000 * util.NSEC_PER_SEC + 999999999], dtype=np.int64)
+    robot_nsecs = converter.robot_nsecs_from_local_nsecs(local_nsecs)
+    assert robot_nsecs.dtype == np.int64
+    assert robot_nsecs.tolist() == (local_nsecs - 1500).tolist()
+    assert converter.local_nsecs_from_robot_nsecs(robot_nsecs).tolist() == local_nsecs.tolist()
+    assert converter.robot_seconds_from_local_seconds(np.array([1.0, 2.0])).tolist() == [
+        1.0 - 1.5e-6, 2.0 - 1.5e-6
+    ]
+
+    timestamps = [Timestamp(seconds=10, nanos=1000), Timestamp(seconds=11, nanos=0)]
+    converter.convert_timestamps_from_local_to_robot(timestamps)
+    assert timestamps == [Timestamp(seconds=9, nanos=999999500), Timestamp(seconds=10,
+                                                                          nanos=999998500)]
+    converter.convert_timestamps_from_robot_to_local(timestamps)
+    assert timestamps == [Timestamp(seconds=10, nanos=1000), Timestamp(seconds=11, nanos=0)]
+
+    # The bulk conversion matches the conversion of each timestamp.
+    timestamps = [Timestamp(seconds=1700000000 + i, nanos=i * 7919) for i in range(100)]
+    expected = [converter.robot_timestamp_from_local(timestamp) for timestamp in timestamps]
+    converter.convert_timestamps_from_local_to_robot(timestamps)
+    assert timestamps == expected
+
+    assert util.timestamps_to_nsec_array([]).tolist() == []
+
+
+def test_skew_history_time_converter():
+    """Each time is converted with the skew estimated last before it."""
+    converter = util.SkewHistoryTimeConverter([3000, 1000, 2000], [30, 10, 20])
+    local_nsecs = [0, 1000, 1500, 2000, 2999, 5000]
+    robot_nsecs = converter.robot_nsecs_from_local_nsecs(local_nsecs)
+    assert robot_nsecs.tolist() == [10, 1010, 1510, 2020, 3019, 5030]
+    assert converter.local_nsecs_from_robot_nsecs(robot_nsecs).tolist() == local_nsecs
+    # The single-time methods use the history too.
+    assert converter.robot_timestamp_from_local_nsecs(1500) == Timestamp(nanos=1510)
+    assert converter.local_seconds_from_robot_timestamp(Timestamp(nanos=2020)) == 2e-6
+
+    with pytest.raises(ValueError):
+        util.SkewHistoryTimeConverter([], [])
+    with pytest.raises(ValueError):
+        util.SkewHistoryTimeConverter([1, 2], [1])